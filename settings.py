@@ -38,3 +38,11 @@ INVESTMENT_MODULE_CONFIG = {
         "auto_progression_enabled": False
     }
 }
+
+# Periodic tasks the module relies on; merge into the project's CELERY_BEAT_SCHEDULE
+CELERY_BEAT_SCHEDULE = {
+    "contacts-sweep-due-sequence-steps": {
+        "task": "contacts.tasks_outreach.sweep_due_sequence_steps",
+        "schedule": 60.0,
+    },
+}
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ContactsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'contacts'
+    
+    def ready(self):
+        """Import signals when app is ready."""
+        try:
+            import contacts.signals  # noqa F401
+        except ImportError:
+            pass
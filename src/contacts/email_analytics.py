@@ -9,13 +9,15 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 
-from django.db.models import Count, Sum, Avg, Q, F, Case, When, Value, IntegerField, Min
-from django.db.models.functions import TruncDate, TruncHour, ExtractHour, Cast
+from django.db.models import Count, Sum, Avg, Q, F, Case, When, Value
+from django.db.models.functions import TruncHour, TruncWeek, ExtractHour
 from django.utils import timezone
 
+from .email_rollups import rollup_hour
+from .services.contact_scoring import BulkContactScoringEngine
 from .models import (
     EmailCampaign, EmailMessage, EmailEvent, EmailTemplate,
-    Contact, ContactList, ContactActivity
+    Contact, ContactList, ContactActivity, EmailEngagementRollup
 )
 
 
@@ -141,58 +143,50 @@ class EmailAnalytics:
         """
         Calculate engagement score for a contact based on email interactions.
         """
-        # Get recent messages
-        messages = EmailMessage.objects.filter(
-            contact=contact,
-            sent_at__gte=timezone.now() - timedelta(days=90)
-        )
+        engine = BulkContactScoringEngine()
+        rows = engine.feature_rows(Contact.objects.filter(pk=contact.pk))
         
-        if not messages.exists():
+        if not rows or not rows[0]['emails_sent']:
             return {
                 'contact_id': str(contact.id),
                 'engagement_score': 0,
                 'metrics': {}
             }
         
-        # Calculate engagement metrics
-        total_sent = messages.count()
-        total_opened = messages.filter(open_count__gt=0).count()
-        total_clicked = messages.filter(click_count__gt=0).count()
-        total_bounced = messages.filter(status='bounced').count()
-        
-        # Calculate score (0-100)
-        score = 0
-        if total_sent > 0:
-            open_rate = total_opened / total_sent
-            click_rate = total_clicked / total_sent
-            bounce_rate = total_bounced / total_sent
+        result = self._engagement_result(rows[0], engine.engagement_scores(rows)[0])
+        result['metrics']['last_engagement'] = self._get_last_engagement(contact)
+        return result
+    
+    def get_contact_engagement_scores(self, contacts) -> List[Dict[str, Any]]:
+        """
+        Engagement scores for many contacts, in one query per chunk.
+        
+        Same scores and metrics as ``get_contact_engagement_score``, without
+        the ``last_engagement`` detail.
+        """
+        engine = BulkContactScoringEngine()
+        results = []
+        
+        last_pk = None
+        while True:
+            page = contacts.order_by('pk')
+            if last_pk is not None:
+                page = page.filter(pk__gt=last_pk)
+            rows = engine.feature_rows(page, limit=engine.chunk_size)
+            if not rows:
+                break
             
-            # Weight different factors
-            score += open_rate * 40  # 40 points for opens
-            score += click_rate * 40  # 40 points for clicks
-            score -= bounce_rate * 20  # -20 points for bounces
+            for row, score in zip(rows, engine.engagement_scores(rows)):
+                if row['emails_sent']:
+                    results.append(self._engagement_result(row, score))
+                else:
+                    results.append({'contact_id': str(row['id']), 'engagement_score': 0, 'metrics': {}})
             
-            # Recency bonus
-            last_open = messages.filter(open_count__gt=0).order_by('-last_opened_at').first()
-            if last_open and last_open.last_opened_at:
-                days_since_open = (timezone.now() - last_open.last_opened_at).days
-                if days_since_open < 7:
-                    score += 20
-                elif days_since_open < 30:
-                    score += 10
+            last_pk = rows[-1]['id']
+            if len(rows) < engine.chunk_size:
+                break
         
-        return {
-            'contact_id': str(contact.id),
-            'engagement_score': round(max(0, min(100, score)), 2),
-            'metrics': {
-                'total_sent': total_sent,
-                'total_opened': total_opened,
-                'total_clicked': total_clicked,
-                'open_rate': self._calculate_rate(total_opened, total_sent),
-                'click_rate': self._calculate_rate(total_clicked, total_sent),
-                'last_engagement': self._get_last_engagement(contact)
-            }
-        }
+        return results
     
     def get_list_performance(self, contact_list: ContactList) -> Dict[str, Any]:
         """
@@ -343,6 +337,20 @@ class EmailAnalytics:
             return 0.0
         return round((numerator / denominator) * 100, 2)
     
+    def _engagement_result(self, row: Dict[str, Any], score: float) -> Dict[str, Any]:
+        """Engagement score payload from a scoring feature row."""
+        return {
+            'contact_id': str(row['id']),
+            'engagement_score': float(score),
+            'metrics': {
+                'total_sent': row['emails_sent'],
+                'total_opened': row['emails_opened'],
+                'total_clicked': row['emails_clicked'],
+                'open_rate': self._calculate_rate(row['emails_opened'], row['emails_sent']),
+                'click_rate': self._calculate_rate(row['emails_clicked'], row['emails_sent']),
+            }
+        }
+    
     def _calculate_average(self, total: int, count: int) -> float:
         """Calculate average."""
         if count == 0:
@@ -351,34 +359,24 @@ class EmailAnalytics:
     
     def _get_time_based_metrics(self, campaign: EmailCampaign) -> Dict[str, Any]:
         """Get time-based engagement metrics."""
-        events = EmailEvent.objects.filter(message__campaign=campaign)
-        
         # Time to first open
-        first_opens = events.filter(
-            event_type='opened'
-        ).values('message_id').annotate(
-            first_open=Min('timestamp')
-        )
+        time_to_open = campaign.messages.filter(
+            sent_at__isnull=False,
+            first_opened_at__isnull=False
+        ).aggregate(
+            average=Avg(F('first_opened_at') - F('sent_at'))
+        )['average']
         
-        time_to_open_data = []
-        for fo in first_opens:
-            message = EmailMessage.objects.get(id=fo['message_id'])
-            if message.sent_at and fo['first_open']:
-                delta = (fo['first_open'] - message.sent_at).total_seconds() / 3600
-                time_to_open_data.append(delta)
-        
-        avg_time_to_open = sum(time_to_open_data) / len(time_to_open_data) if time_to_open_data else 0
+        avg_time_to_open = time_to_open.total_seconds() / 3600 if time_to_open else 0
         
         # Best time of day
-        hourly_opens = events.filter(
-            event_type='opened'
-        ).annotate(
-            hour=ExtractHour('timestamp')
-        ).values('hour').annotate(
-            count=Count('id')
-        ).order_by('-count')
+        hourly_opens = campaign.engagement_rollups.annotate(
+            hour_of_day=ExtractHour('hour')
+        ).values('hour_of_day').annotate(
+            count=Sum('opens')
+        ).filter(count__gt=0).order_by('-count')
         
-        best_hour = hourly_opens[0]['hour'] if hourly_opens else None
+        best_hour = hourly_opens[0]['hour_of_day'] if hourly_opens else None
         
         return {
             'average_time_to_open_hours': round(avg_time_to_open, 2),
@@ -603,49 +601,45 @@ class EmailAnalytics:
     
     def _get_hourly_pattern(self) -> List[Dict[str, Any]]:
         """Get average engagement by hour of day."""
-        # Get all opens and clicks in the period
-        events = EmailEvent.objects.filter(
-            event_type__in=['opened', 'clicked'],
-            timestamp__gte=self.start_date,
-            timestamp__lte=self.end_date
+        # Opens and clicks in the period, from the hourly rollups
+        rollups = EmailEngagementRollup.objects.filter(
+            hour__gte=rollup_hour(self.start_date),
+            hour__lte=self.end_date
         )
         
         if self.group:
-            events = events.filter(message__campaign__group=self.group)
+            rollups = rollups.filter(group=self.group)
         
-        hourly_data = events.annotate(
-            hour=ExtractHour('timestamp')
-        ).values('hour', 'event_type').annotate(
-            count=Count('id')
-        ).order_by('hour')
-        
-        # Organize by hour
-        pattern = defaultdict(lambda: {'opens': 0, 'clicks': 0})
-        for item in hourly_data:
-            if item['event_type'] == 'opened':
-                pattern[item['hour']]['opens'] = item['count']
-            elif item['event_type'] == 'clicked':
-                pattern[item['hour']]['clicks'] = item['count']
+        hourly_data = rollups.annotate(
+            hour_of_day=ExtractHour('hour')
+        ).values('hour_of_day').annotate(
+            opens=Sum('opens'),
+            clicks=Sum('clicks')
+        ).filter(
+            Q(opens__gt=0) | Q(clicks__gt=0)
+        ).order_by('hour_of_day')
         
         return [
             {
-                'hour': hour,
-                'opens': data['opens'],
-                'clicks': data['clicks']
+                'hour': item['hour_of_day'],
+                'opens': item['opens'],
+                'clicks': item['clicks']
             }
-            for hour, data in sorted(pattern.items())
+            for item in hourly_data
         ]
     
     def _get_weekly_trend(self, campaigns) -> List[Dict[str, Any]]:
         """Get weekly trend of email performance."""
-        # Group campaigns by week
-        weekly_data = campaigns.annotate(
-            week=TruncDate('created_at')
+        # Group the campaigns' rollups by week of activity
+        weekly_data = EmailEngagementRollup.objects.filter(
+            campaign__in=campaigns
+        ).annotate(
+            week=TruncWeek('hour')
         ).values('week').annotate(
-            campaigns=Count('id'),
-            emails_sent=Sum('emails_sent'),
-            emails_opened=Sum('emails_opened'),
-            emails_clicked=Sum('emails_clicked')
+            campaigns=Count('campaign', distinct=True),
+            emails_sent=Sum('sent'),
+            emails_opened=Sum('unique_opens'),
+            emails_clicked=Sum('unique_clicks')
         ).order_by('week')
         
         return [
@@ -670,41 +664,25 @@ class EmailAnalytics:
         if not campaign.started_at:
             return []
         
-        # Get events in first 48 hours
-        end_time = campaign.started_at + timedelta(hours=48)
-        events = EmailEvent.objects.filter(
-            message__campaign=campaign,
-            event_type__in=['opened', 'clicked'],
-            timestamp__gte=campaign.started_at,
-            timestamp__lte=end_time
-        )
-        
-        # Group by hour
-        hourly_events = events.annotate(
-            hours_after=Cast(
-                (F('timestamp') - campaign.started_at),
-                output_field=IntegerField()
-            ) / 3600
-        ).values('hours_after', 'event_type').annotate(
-            count=Count('id')
-        ).order_by('hours_after')
-        
-        timeline = defaultdict(lambda: {'opens': 0, 'clicks': 0})
-        for event in hourly_events:
-            hour = int(event['hours_after'])
-            if hour <= 48:
-                if event['event_type'] == 'opened':
-                    timeline[hour]['opens'] = event['count']
-                elif event['event_type'] == 'clicked':
-                    timeline[hour]['clicks'] = event['count']
+        # Rollups for the first 48 hours
+        start_hour = rollup_hour(campaign.started_at)
+        hourly_rollups = campaign.engagement_rollups.filter(
+            hour__gte=start_hour,
+            hour__lte=start_hour + timedelta(hours=48)
+        ).values('hour').annotate(
+            opens=Sum('opens'),
+            clicks=Sum('clicks')
+        ).filter(
+            Q(opens__gt=0) | Q(clicks__gt=0)
+        ).order_by('hour')
         
         return [
             {
-                'hours_after_send': hour,
-                'opens': data['opens'],
-                'clicks': data['clicks']
+                'hours_after_send': int((item['hour'] - start_hour).total_seconds() // 3600),
+                'opens': item['opens'],
+                'clicks': item['clicks']
             }
-            for hour, data in sorted(timeline.items())
+            for item in hourly_rollups
         ]
     
     def _get_top_email_clients(self, events, limit: int = 5) -> List[Dict[str, Any]]:
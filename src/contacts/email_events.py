@@ -0,0 +1,425 @@
+"""
+Batched ingestion of email service provider webhook events.
+
+``EmailEventIngestor`` applies a batch of delivered/open/click/bounce/...
+events with a fixed number of queries: messages are resolved in bulk and
+locked, events and activities are bulk-created, and each message, campaign
+and contact row receives a single update carrying the batch's aggregated
+changes. ``EmailEventBuffer`` collects events from many webhook requests in
+the shared cache so they can be ingested together.
+"""
+
+import logging
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .email_rollups import RollupRecorder
+from .models import (
+    EmailCampaign, EmailMessage, EmailEvent, Contact, ContactActivity, ActivityType
+)
+
+logger = logging.getLogger(__name__)
+
+# Map ESP event types to our event types
+EVENT_TYPE_MAP = {
+    'delivered': EmailEvent.EventType.DELIVERED,
+    'open': EmailEvent.EventType.OPENED,
+    'opened': EmailEvent.EventType.OPENED,
+    'click': EmailEvent.EventType.CLICKED,
+    'clicked': EmailEvent.EventType.CLICKED,
+    'bounce': EmailEvent.EventType.BOUNCED,
+    'bounced': EmailEvent.EventType.BOUNCED,
+    'dropped': EmailEvent.EventType.FAILED,
+    'spam': EmailEvent.EventType.COMPLAINED,
+    'complaint': EmailEvent.EventType.COMPLAINED,
+    'unsubscribe': EmailEvent.EventType.UNSUBSCRIBED,
+}
+
+# Message status each event type moves the message to
+EVENT_MESSAGE_STATUS = {
+    EmailEvent.EventType.DELIVERED: EmailMessage.MessageStatus.DELIVERED,
+    EmailEvent.EventType.OPENED: EmailMessage.MessageStatus.OPENED,
+    EmailEvent.EventType.CLICKED: EmailMessage.MessageStatus.CLICKED,
+    EmailEvent.EventType.BOUNCED: EmailMessage.MessageStatus.BOUNCED,
+    EmailEvent.EventType.UNSUBSCRIBED: EmailMessage.MessageStatus.UNSUBSCRIBED,
+    EmailEvent.EventType.COMPLAINED: EmailMessage.MessageStatus.COMPLAINED,
+}
+
+
+def parse_event_timestamp(value) -> datetime:
+    """Event timestamp from a Unix time, ISO 8601 string or datetime; now if absent."""
+    if isinstance(value, datetime):
+        return value if timezone.is_aware(value) else timezone.make_aware(value)
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+    if isinstance(value, str):
+        if value.isdigit():
+            return datetime.fromtimestamp(int(value), tz=dt_timezone.utc)
+        parsed = parse_datetime(value)
+        if parsed:
+            return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+    return timezone.now()
+
+
+class EmailEventIngestor:
+    """
+    Applies batches of ESP webhook events.
+
+    Each event is handled as ``process_email_event`` always has (status
+    change, unique open/click counting, activities, opt-outs), but the
+    writes for a batch are aggregated. Two kinds of repeat are dropped:
+    deliveries of the same ESP event id, and opens of the same message from
+    the same client within ``OPEN_DEDUPE_SECONDS`` (mail client prefetches
+    and reloads).
+    """
+
+    OPEN_DEDUPE_SECONDS = 60
+
+    def ingest(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Ingest a batch of raw webhook payloads.
+
+        Returns:
+            Summary counts plus ``results``, one dict per input event with
+            its ``status`` (and ``event_id`` when processed)
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(events)
+        parsed = self._parse(events, results)
+
+        with transaction.atomic():
+            messages = self._resolve_messages({event['message_ref'] for event in parsed})
+
+            changes = _BatchChanges()
+            last_open = {}
+            for event in parsed:
+                message = messages.get(event['message_ref'])
+                if message is None:
+                    results[event['index']] = {'status': 'error', 'error': 'Message not found'}
+                    continue
+
+                if event['event_type'] == EmailEvent.EventType.OPENED:
+                    client = (message.pk, event['data'].get('ip'), event['data'].get('user_agent'))
+                    previous = last_open.get(client)
+                    if previous and event['timestamp'] - previous < timedelta(seconds=self.OPEN_DEDUPE_SECONDS):
+                        results[event['index']] = {'status': 'skipped', 'reason': 'Duplicate open'}
+                        continue
+                    last_open[client] = event['timestamp']
+
+                email_event = changes.apply(message, event)
+                results[event['index']] = {'status': 'processed', 'event_id': str(email_event.id)}
+
+            changes.save()
+
+        summary = defaultdict(int)
+        for result in results:
+            summary[result['status']] += 1
+        return {
+            'received': len(events),
+            'processed': summary['processed'],
+            'skipped': summary['skipped'],
+            'not_found': summary['error'],
+            'results': results,
+        }
+
+    def _parse(self, events: List[Dict[str, Any]], results: List) -> List[Dict[str, Any]]:
+        """Normalize raw payloads, dropping unusable and repeated ones, in timestamp order."""
+        parsed = []
+        seen_event_ids = set()
+
+        for index, event_data in enumerate(events):
+            # Extract message ID from event data
+            # This varies by ESP - adjust based on your provider
+            message_ref = event_data.get('message_id') or event_data.get('X-Message-ID')
+            if not message_ref:
+                logger.warning(f"No message ID in event data: {event_data}")
+                results[index] = {'status': 'skipped', 'reason': 'No message ID'}
+                continue
+
+            raw_type = event_data.get('event', '').lower()
+            event_type = EVENT_TYPE_MAP.get(raw_type)
+            if not event_type:
+                logger.warning(f"Unknown event type: {raw_type}")
+                results[index] = {'status': 'skipped', 'reason': 'Unknown event type'}
+                continue
+
+            # ESPs retry webhooks; the same event id must only count once
+            esp_event_id = event_data.get('sg_event_id') or event_data.get('event_id')
+            if esp_event_id:
+                if esp_event_id in seen_event_ids:
+                    results[index] = {'status': 'skipped', 'reason': 'Duplicate event'}
+                    continue
+                seen_event_ids.add(esp_event_id)
+
+            parsed.append({
+                'index': index,
+                'message_ref': str(message_ref),
+                'event_type': event_type,
+                'timestamp': parse_event_timestamp(event_data.get('timestamp')),
+                'data': event_data,
+            })
+
+        parsed.sort(key=lambda event: event['timestamp'])
+        return parsed
+
+    def _resolve_messages(self, refs) -> Dict[str, EmailMessage]:
+        """Lock and load messages by ESP message id, falling back to our own id."""
+        if not refs:
+            return {}
+
+        messages = {
+            message.message_id: message
+            for message in EmailMessage.objects.select_for_update().filter(
+                message_id__in=refs
+            ).order_by('id')
+        }
+
+        internal_ids = []
+        for ref in refs - set(messages):
+            try:
+                internal_ids.append(uuid.UUID(ref))
+            except ValueError:
+                continue
+        if internal_ids:
+            for message in EmailMessage.objects.select_for_update().filter(
+                id__in=internal_ids
+            ).order_by('id'):
+                messages[str(message.id)] = message
+
+        return messages
+
+
+class _BatchChanges:
+    """Accumulates the writes for a batch of events."""
+
+    def __init__(self):
+        self.events = []
+        self.activities = []
+        self.message_fields = defaultdict(dict)
+        self.message_counts = defaultdict(lambda: defaultdict(int))
+        self.campaign_counts = defaultdict(lambda: defaultdict(int))
+        self.contact_last_opened = {}
+        self.contacts_opted_out = set()
+        self.contacts_unsubscribed = set()
+        self.rollups = RollupRecorder()
+
+    def apply(self, message: EmailMessage, event: Dict[str, Any]) -> EmailEvent:
+        event_type = event['event_type']
+        timestamp = event['timestamp']
+        event_data = event['data']
+        fields = self.message_fields[message.pk]
+
+        email_event = EmailEvent(
+            message_id=message.pk,
+            event_type=event_type,
+            timestamp=timestamp,
+            ip_address=event_data.get('ip'),
+            user_agent=event_data.get('user_agent', ''),
+            metadata=event_data,
+            link_url=event_data.get('url', ''),
+            link_text=event_data.get('link_text', '')
+        )
+        self.events.append(email_event)
+
+        if event_type in EVENT_MESSAGE_STATUS:
+            fields['status'] = EVENT_MESSAGE_STATUS[event_type]
+
+        if event_type == EmailEvent.EventType.DELIVERED:
+            fields['delivered_at'] = timestamp
+            self.campaign_counts[message.campaign_id]['emails_delivered'] += 1
+            self.rollups.record(message, 'delivered', timestamp)
+
+        elif event_type == EmailEvent.EventType.OPENED:
+            if not message.first_opened_at:
+                # Unique open
+                message.first_opened_at = fields['first_opened_at'] = timestamp
+                self.campaign_counts[message.campaign_id]['emails_opened'] += 1
+                self.rollups.record(message, 'unique_opens', timestamp)
+                self.contact_last_opened[message.contact_id] = timestamp
+                self.activities.append(ContactActivity(
+                    group_id=message.group_id,
+                    contact_id=message.contact_id,
+                    activity_type=ActivityType.EMAIL_OPENED,
+                    subject=f"Opened: {message.subject}",
+                    metadata={
+                        'campaign_id': str(message.campaign_id),
+                        'message_id': str(message.id)
+                    }
+                ))
+
+            fields['last_opened_at'] = timestamp
+            self.message_counts[message.pk]['open_count'] += 1
+            self.rollups.record(message, 'opens', timestamp)
+            if 'ip' in event_data:
+                fields['ip_address'] = event_data['ip']
+            if 'user_agent' in event_data:
+                fields['user_agent'] = event_data['user_agent']
+
+        elif event_type == EmailEvent.EventType.CLICKED:
+            if not message.first_clicked_at:
+                # Unique click
+                message.first_clicked_at = fields['first_clicked_at'] = timestamp
+                self.campaign_counts[message.campaign_id]['emails_clicked'] += 1
+                self.rollups.record(message, 'unique_clicks', timestamp)
+                self.activities.append(ContactActivity(
+                    group_id=message.group_id,
+                    contact_id=message.contact_id,
+                    activity_type=ActivityType.EMAIL_CLICKED,
+                    subject=f"Clicked link in: {message.subject}",
+                    description=f"Clicked: {event_data.get('url', 'Unknown URL')}",
+                    metadata={
+                        'campaign_id': str(message.campaign_id),
+                        'message_id': str(message.id),
+                        'url': event_data.get('url', '')
+                    }
+                ))
+
+            fields['last_clicked_at'] = timestamp
+            self.message_counts[message.pk]['click_count'] += 1
+            self.rollups.record(message, 'clicks', timestamp)
+
+        elif event_type == EmailEvent.EventType.BOUNCED:
+            fields['bounce_type'] = event_data.get('bounce_type', 'unknown')
+            fields['bounce_reason'] = event_data.get('reason', '')
+            self.campaign_counts[message.campaign_id]['emails_bounced'] += 1
+            self.rollups.record(message, 'bounced', timestamp)
+
+            # Mark contact as having bad email if hard bounce
+            if event_data.get('bounce_type') == 'hard':
+                self.contacts_opted_out.add(message.contact_id)
+
+        elif event_type == EmailEvent.EventType.UNSUBSCRIBED:
+            self.campaign_counts[message.campaign_id]['emails_unsubscribed'] += 1
+            self.rollups.record(message, 'unsubscribed', timestamp)
+            self.contacts_unsubscribed.add(message.contact_id)
+            self.activities.append(ContactActivity(
+                group_id=message.group_id,
+                contact_id=message.contact_id,
+                activity_type=ActivityType.EMAIL_CLICKED,
+                subject="Unsubscribed from emails",
+                metadata={
+                    'campaign_id': str(message.campaign_id),
+                    'message_id': str(message.id)
+                }
+            ))
+
+        elif event_type == EmailEvent.EventType.COMPLAINED:
+            self.rollups.record(message, 'complained', timestamp)
+            self.contacts_opted_out.add(message.contact_id)
+
+        return email_event
+
+    def save(self):
+        """Write everything with one statement per affected row (plus bulk inserts)."""
+        now = timezone.now()
+
+        EmailEvent.objects.bulk_create(self.events)
+        ContactActivity.objects.bulk_create(self.activities)
+
+        for message_id, fields in self.message_fields.items():
+            counts = {
+                field: F(field) + count
+                for field, count in self.message_counts[message_id].items()
+            }
+            if not fields and not counts:
+                continue
+            EmailMessage.objects.filter(pk=message_id).update(updated_at=now, **fields, **counts)
+
+        for campaign_id, counts in self.campaign_counts.items():
+            EmailCampaign.objects.filter(pk=campaign_id).update(
+                **{field: F(field) + count for field, count in counts.items()}
+            )
+
+        for contact_id, opened_at in self.contact_last_opened.items():
+            Contact.objects.filter(pk=contact_id).update(last_email_opened_at=opened_at)
+        if self.activities:
+            # bulk_create skips ContactActivity.save, which records the activity on the contact
+            Contact.objects.filter(
+                id__in={activity.contact_id for activity in self.activities}
+            ).update(last_activity_at=now)
+        if self.contacts_opted_out:
+            Contact.objects.filter(id__in=self.contacts_opted_out).update(email_opt_in=False)
+        if self.contacts_unsubscribed:
+            Contact.objects.filter(id__in=self.contacts_unsubscribed).update(
+                email_opt_in=False, sms_opt_in=False
+            )
+
+        self.rollups.save()
+
+
+class EmailEventBuffer:
+    """
+    Cache-backed buffer of raw webhook events shared by every web process.
+
+    Events are appended to fixed-size segments under a short lock, and
+    ``drain`` hands back everything buffered so far. Requires a cache shared
+    between web and worker processes (e.g. Redis).
+    """
+
+    KEY_PREFIX = "email_events:buffer"
+    SEGMENT_SIZE = 500
+    TTL = 3600
+    LOCK_TIMEOUT = 5
+    LOCK_WAIT = 5.0
+
+    def append(self, events: List[Dict[str, Any]]) -> int:
+        """Buffer events; returns the number buffered."""
+        with self._lock():
+            state = cache.get(self._key('state')) or {'head': 0, 'tail': 0}
+            segment = cache.get(self._key(state['tail'])) or []
+            for event in events:
+                if len(segment) >= self.SEGMENT_SIZE:
+                    cache.set(self._key(state['tail']), segment, timeout=self.TTL)
+                    state['tail'] += 1
+                    segment = []
+                segment.append(event)
+            cache.set(self._key(state['tail']), segment, timeout=self.TTL)
+            cache.set(self._key('state'), state, timeout=self.TTL)
+        return len(events)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Remove and return every buffered event, oldest first."""
+        with self._lock():
+            state = cache.get(self._key('state'))
+            if not state:
+                return []
+            keys = [self._key(index) for index in range(state['head'], state['tail'] + 1)]
+            segments = cache.get_many(keys)
+            cache.delete_many(keys)
+            next_segment = state['tail'] + 1
+            cache.set(self._key('state'), {'head': next_segment, 'tail': next_segment}, timeout=self.TTL)
+
+        events = []
+        for key in keys:
+            events.extend(segments.get(key, []))
+        return events
+
+    def _key(self, suffix) -> str:
+        return f"{self.KEY_PREFIX}:{suffix}"
+
+    @contextmanager
+    def _lock(self):
+        token = uuid.uuid4().hex
+        lock_key = self._key('lock')
+        deadline = time.monotonic() + self.LOCK_WAIT
+        while not cache.add(lock_key, token, timeout=self.LOCK_TIMEOUT):
+            if time.monotonic() > deadline:
+                raise RuntimeError("Could not acquire email event buffer lock")
+            time.sleep(0.01)
+        try:
+            yield
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+
+email_event_buffer = EmailEventBuffer()
@@ -0,0 +1,100 @@
+"""
+Send-rate limiting for email campaigns.
+
+A token bucket whose state lives in the Django cache, so every worker
+dispatching a campaign draws from the same budget. Callers reserve tokens
+ahead of time and receive the delay at which each one becomes available,
+which maps directly onto Celery ``countdown`` values instead of sleeping.
+"""
+
+import time
+import uuid
+from contextlib import contextmanager
+from typing import List
+
+from django.core.cache import cache
+
+
+class RateLimitLockError(Exception):
+    """Raised when the bucket lock cannot be acquired."""
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at ``rate_per_hour`` with a burst of ``capacity``.
+
+    The token count may go negative: a reservation that outruns the bucket
+    simply pushes later tokens further into the future.
+    """
+
+    LOCK_TIMEOUT = 5
+    LOCK_WAIT = 5.0
+    STATE_TIMEOUT = 24 * 3600
+
+    def __init__(self, key: str, rate_per_hour: int, capacity: int = None):
+        self.key = f"email_rate_limit:{key}"
+        self.lock_key = f"{self.key}:lock"
+        self.rate = max(rate_per_hour, 1) / 3600.0
+        # Default burst of one minute's allowance, matching per-minute batches
+        self.capacity = capacity or max(1, rate_per_hour // 60)
+
+    def reserve(self, max_tokens: int, within_seconds: float) -> List[float]:
+        """
+        Reserve up to ``max_tokens`` tokens that become available within
+        ``within_seconds``.
+
+        Returns:
+            Delay in seconds before each reserved token may be used, in
+            ascending order (empty if none are available in the window)
+        """
+        with self._lock():
+            now = time.time()
+            tokens = self._current_tokens(now)
+
+            # Token i (0-based) is available once the balance reaches i + 1
+            available = int(tokens + self.rate * within_seconds)
+            count = max(0, min(max_tokens, available))
+            delays = [max(0.0, (index + 1 - tokens) / self.rate) for index in range(count)]
+
+            cache.set(self.key, {'tokens': tokens - count, 'updated': now}, timeout=self.STATE_TIMEOUT)
+
+        return delays
+
+    def refund(self, count: int):
+        """Return reserved tokens that ended up unused."""
+        if count <= 0:
+            return
+        with self._lock():
+            now = time.time()
+            tokens = min(float(self.capacity), self._current_tokens(now) + count)
+            cache.set(self.key, {'tokens': tokens, 'updated': now}, timeout=self.STATE_TIMEOUT)
+
+    def seconds_until_available(self) -> float:
+        """Seconds until at least one token is available."""
+        tokens = self._current_tokens(time.time())
+        return max(0.0, (1 - tokens) / self.rate)
+
+    def reset(self):
+        """Forget the bucket state (it refills to capacity)."""
+        cache.delete(self.key)
+
+    def _current_tokens(self, now: float) -> float:
+        state = cache.get(self.key)
+        if state is None:
+            return float(self.capacity)
+        elapsed = max(0.0, now - state['updated'])
+        return min(float(self.capacity), state['tokens'] + elapsed * self.rate)
+
+    @contextmanager
+    def _lock(self):
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.LOCK_WAIT
+        while not cache.add(self.lock_key, token, timeout=self.LOCK_TIMEOUT):
+            if time.monotonic() > deadline:
+                raise RateLimitLockError(f"Could not acquire rate limit lock for {self.key}")
+            time.sleep(0.01)
+        try:
+            yield
+        finally:
+            if cache.get(self.lock_key) == token:
+                cache.delete(self.lock_key)
@@ -0,0 +1,153 @@
+"""
+Hourly email engagement rollups.
+
+``RollupRecorder`` accumulates counter increments while sends and ESP
+events are processed and applies them to ``EmailEngagementRollup`` rows
+with one upsert per (campaign, template, hour). ``rebuild_rollups``
+recomputes rows from messages and events, for the backfill command.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Coalesce, TruncHour
+
+from .models import EmailEngagementRollup, EmailEvent, EmailMessage
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COUNTERS = (
+    'sent', 'delivered', 'opens', 'unique_opens', 'clicks', 'unique_clicks',
+    'bounced', 'unsubscribed', 'complained',
+)
+
+# Event types counted from the event table on rebuild
+EVENT_COUNTERS = {
+    EmailEvent.EventType.DELIVERED: 'delivered',
+    EmailEvent.EventType.OPENED: 'opens',
+    EmailEvent.EventType.CLICKED: 'clicks',
+    EmailEvent.EventType.BOUNCED: 'bounced',
+    EmailEvent.EventType.UNSUBSCRIBED: 'unsubscribed',
+    EmailEvent.EventType.COMPLAINED: 'complained',
+}
+
+# Counters derived from message timestamps on rebuild
+MESSAGE_COUNTERS = {
+    'sent': 'sent_at',
+    'unique_opens': 'first_opened_at',
+    'unique_clicks': 'first_clicked_at',
+}
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def rollup_hour(timestamp: datetime) -> datetime:
+    """Start of the UTC hour containing ``timestamp``."""
+    return timestamp.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+class RollupRecorder:
+    """
+    Collects rollup increments for a unit of work.
+
+    Call ``record`` while processing and ``save`` once, inside the same
+    transaction as the changes being counted.
+    """
+
+    def __init__(self):
+        self.counts = defaultdict(lambda: defaultdict(int))
+
+    def record(self, message: EmailMessage, counter: str, timestamp: datetime, count: int = 1) -> None:
+        """Count ``count`` occurrences of ``counter`` for the message's campaign and template."""
+        template_id = message.template_used_id or message.campaign.template_id
+        key = (message.group_id, message.campaign_id, template_id, rollup_hour(timestamp))
+        self.counts[key][counter] += count
+
+    def save(self) -> None:
+        """Create missing rows, then add the increments to each row."""
+        if not self.counts:
+            return
+
+        EmailEngagementRollup.objects.bulk_create([
+            EmailEngagementRollup(group_id=group_id, campaign_id=campaign_id, template_id=template_id, hour=hour)
+            for group_id, campaign_id, template_id, hour in self.counts
+        ], ignore_conflicts=True)
+
+        # Sorted so concurrent writers lock rows in the same order
+        for key in sorted(self.counts, key=lambda k: (k[3], str(k[1]), str(k[2]))):
+            _, campaign_id, template_id, hour = key
+            EmailEngagementRollup.objects.filter(
+                campaign_id=campaign_id, template_id=template_id, hour=hour
+            ).update(**{
+                counter: F(counter) + count
+                for counter, count in self.counts[key].items()
+            })
+        self.counts.clear()
+
+
+def rebuild_rollups(
+    campaign_ids: Optional[Iterable[Any]] = None,
+    since: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    Recompute rollups from messages and events.
+
+    Rows for the given campaigns (all campaigns by default) from the hour
+    containing ``since`` onwards are replaced. Event-based counters only
+    cover events still in the event table (see ``cleanup_old_events``).
+
+    Returns:
+        Number of rows deleted and created
+    """
+    messages = EmailMessage.objects.all()
+    events = EmailEvent.objects.filter(event_type__in=list(EVENT_COUNTERS))
+    existing = EmailEngagementRollup.objects.all()
+    if campaign_ids is not None:
+        campaign_ids = list(campaign_ids)
+        messages = messages.filter(campaign_id__in=campaign_ids)
+        events = events.filter(message__campaign_id__in=campaign_ids)
+        existing = existing.filter(campaign_id__in=campaign_ids)
+    if since is not None:
+        since = rollup_hour(since)
+        events = events.filter(timestamp__gte=since)
+        existing = existing.filter(hour__gte=since)
+
+    rows = defaultdict(lambda: defaultdict(int))
+
+    for counter, field in MESSAGE_COUNTERS.items():
+        scoped = messages.filter(**{f'{field}__isnull': False})
+        if since is not None:
+            scoped = scoped.filter(**{f'{field}__gte': since})
+        for row in scoped.values(
+            'group_id', 'campaign_id',
+            template=Coalesce('template_used_id', 'campaign__template_id'),
+            bucket=TruncHour(field, tzinfo=dt_timezone.utc)
+        ).annotate(count=Count('id')).order_by():
+            key = (row['group_id'], row['campaign_id'], row['template'], row['bucket'])
+            rows[key][counter] += row['count']
+
+    for row in events.values(
+        'event_type',
+        group_id=F('message__group_id'),
+        campaign_id=F('message__campaign_id'),
+        template=Coalesce('message__template_used_id', 'message__campaign__template_id'),
+        bucket=TruncHour('timestamp', tzinfo=dt_timezone.utc)
+    ).annotate(count=Count('id')).order_by():
+        key = (row['group_id'], row['campaign_id'], row['template'], row['bucket'])
+        rows[key][EVENT_COUNTERS[row['event_type']]] += row['count']
+
+    with transaction.atomic():
+        deleted, _ = existing.delete()
+        EmailEngagementRollup.objects.bulk_create([
+            EmailEngagementRollup(
+                group_id=group_id, campaign_id=campaign_id, template_id=template_id, hour=hour, **counts
+            )
+            for (group_id, campaign_id, template_id, hour), counts in rows.items()
+        ], batch_size=REBUILD_BATCH_SIZE)
+
+    logger.info(f"Rebuilt email rollups: {deleted} rows replaced with {len(rows)}")
+    return {'deleted': deleted, 'created': len(rows)}
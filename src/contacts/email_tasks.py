@@ -6,43 +6,65 @@ EnterpriseLand Due-Diligence Platform.
 """
 
 import logging
+import uuid
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 
-from celery import shared_task, group, chord
+from celery import shared_task
 from celery.exceptions import MaxRetriesExceededError
 from django.utils import timezone
 from django.template import Template, Context
 from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
-from django.db.models import F
+from django.db.models import Count, F, QuerySet, Sum
 
 from .models import (
     EmailTemplate, EmailCampaign, EmailMessage, EmailEvent,
-    Contact, ContactActivity, ActivityType
+    Contact, ContactActivity, ContactList, ActivityType
 )
 from django.db.models import Q
 from .email_utils import (
     render_email_template, validate_email_address,
-    generate_unsubscribe_url, generate_tracking_pixel,
-    track_email_links, get_email_backend
+    generate_unsubscribe_url, track_email_links, get_email_backend, email_template_cache
 )
+from .email_events import EmailEventIngestor, email_event_buffer
+from .email_rate_limit import TokenBucket
+from .email_rollups import RollupRecorder
+from .services.contact_lists import ContactListService
 from notifications.models import Notification
 from accounts.models import User
 
 logger = logging.getLogger(__name__)
 
+# Campaign dispatch
+MESSAGE_CREATE_BATCH_SIZE = 1000
+DISPATCH_BATCH_SIZE = 1000
+SEND_BATCH_SIZE = 50
+DISPATCH_WINDOW_SECONDS = 60
+MIN_DISPATCH_INTERVAL_SECONDS = 1
+QUEUED_STALE_SECONDS = 3600
+DISPATCH_TOKEN_TTL = 7 * 24 * 3600
+
+# Webhook event ingestion
+EVENT_INGEST_BATCH_SIZE = 500
+EVENT_FLUSH_SCHEDULED_KEY = "email_events:flush_scheduled"
+
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=300)
 def send_campaign_emails(self, campaign_id: str) -> Dict[str, Any]:
     """
     Main task to send emails for a campaign.
     
-    Processes recipients in batches according to send rate limits.
+    Creates a pending message per recipient and hands off to
+    ``dispatch_campaign_emails``, which releases sends at the campaign's
+    send rate. Returns immediately; no worker waits on the rate limit.
     """
     try:
-        campaign = EmailCampaign.objects.get(id=campaign_id)
+        campaign = EmailCampaign.objects.select_related('template').get(id=campaign_id)
         
         # Check campaign status
         if campaign.status not in [
@@ -58,9 +80,35 @@ def send_campaign_emails(self, campaign_id: str) -> Dict[str, Any]:
             campaign.started_at = timezone.now()
             campaign.save()
         
-        # Get recipients
-        recipients = _get_campaign_recipients(campaign)
-        total_recipients = len(recipients)
+        # Dynamic lists resolve through their membership; bring it up to date
+        _refresh_dynamic_lists(campaign)
+        
+        # Compile the template once up front rather than on the first send
+        if getattr(settings, 'EMAIL_TEMPLATE_CACHE_PREWARM', True):
+            email_template_cache.warm(campaign.template)
+        
+        # Stream recipients into message records; existing ones (from an earlier run) are kept
+        recipients = _get_campaign_recipients(campaign).values_list('id', 'email')
+        total_recipients = 0
+        batch = []
+        for contact_id, email in recipients.iterator(chunk_size=MESSAGE_CREATE_BATCH_SIZE):
+            batch.append(EmailMessage(
+                group_id=campaign.group_id,
+                campaign=campaign,
+                contact_id=contact_id,
+                template_used=campaign.template,
+                subject=campaign.template.subject,
+                from_email=campaign.template.from_email,
+                to_email=email,
+                status=EmailMessage.MessageStatus.PENDING
+            ))
+            if len(batch) >= MESSAGE_CREATE_BATCH_SIZE:
+                EmailMessage.objects.bulk_create(batch, ignore_conflicts=True)
+                total_recipients += len(batch)
+                batch = []
+        if batch:
+            EmailMessage.objects.bulk_create(batch, ignore_conflicts=True)
+            total_recipients += len(batch)
         
         if total_recipients == 0:
             campaign.status = EmailCampaign.CampaignStatus.SENT
@@ -68,81 +116,24 @@ def send_campaign_emails(self, campaign_id: str) -> Dict[str, Any]:
             campaign.save()
             return {'status': 'completed', 'sent': 0}
         
-        # Calculate batch size based on send rate
-        batch_size = max(1, campaign.send_rate_per_hour // 60)  # Per minute
+        # Failed messages get another attempt
+        EmailMessage.objects.filter(
+            group=campaign.group,
+            campaign=campaign,
+            status=EmailMessage.MessageStatus.FAILED
+        ).update(status=EmailMessage.MessageStatus.PENDING, failed_reason='')
         
-        # Process recipients in batches
-        sent_count = 0
-        failed_count = 0
+        EmailCampaign.objects.filter(pk=campaign.pk).update(total_recipients=total_recipients)
         
-        for i in range(0, total_recipients, batch_size):
-            # Check if campaign was paused or cancelled
-            campaign.refresh_from_db()
-            if campaign.status == EmailCampaign.CampaignStatus.PAUSED:
-                return {'status': 'paused', 'sent': sent_count}
-            elif campaign.status == EmailCampaign.CampaignStatus.CANCELLED:
-                return {'status': 'cancelled', 'sent': sent_count}
-            
-            batch = recipients[i:i + batch_size]
-            
-            # Send emails in parallel using chord
-            email_tasks = []
-            for contact in batch:
-                # Create or get message record
-                message, created = EmailMessage.objects.get_or_create(
-                    campaign=campaign,
-                    contact=contact,
-                    defaults={
-                        'group': campaign.group,
-                        'template_used': campaign.template,
-                        'subject': campaign.template.subject,
-                        'from_email': campaign.template.from_email,
-                        'to_email': contact.email,
-                        'status': EmailMessage.MessageStatus.PENDING
-                    }
-                )
-                
-                if created or message.status in [
-                    EmailMessage.MessageStatus.PENDING,
-                    EmailMessage.MessageStatus.FAILED
-                ]:
-                    email_tasks.append(send_single_email.s(str(message.id)))
-            
-            if email_tasks:
-                # Execute batch in parallel
-                job = group(email_tasks)
-                results = job.apply_async().get()
-                
-                # Count results
-                for result in results:
-                    if result['status'] == 'sent':
-                        sent_count += 1
-                    else:
-                        failed_count += 1
-                
-                # Update campaign stats
-                campaign.emails_sent = F('emails_sent') + len(results)
-                campaign.save()
-            
-            # Rate limiting pause
-            if i + batch_size < total_recipients:
-                import time
-                time.sleep(60 / (campaign.send_rate_per_hour / batch_size))
-        
-        # Mark campaign as completed
-        campaign.refresh_from_db()
-        campaign.status = EmailCampaign.CampaignStatus.SENT
-        campaign.completed_at = timezone.now()
-        campaign.save()
-        
-        # Send completion notification
-        _send_campaign_completion_notification(campaign, sent_count, failed_count)
+        # A new dispatch generation supersedes any dispatcher chain still running
+        dispatch_token = uuid.uuid4().hex
+        cache.set(_dispatch_token_key(campaign_id), dispatch_token, timeout=DISPATCH_TOKEN_TTL)
+        dispatch_campaign_emails.delay(str(campaign_id), dispatch_token)
         
         return {
-            'status': 'completed',
-            'sent': sent_count,
-            'failed': failed_count,
-            'total': total_recipients
+            'status': 'dispatching',
+            'total': total_recipients,
+            'send_rate_per_hour': campaign.send_rate_per_hour
         }
         
     except EmailCampaign.DoesNotExist:
@@ -153,6 +144,100 @@ def send_campaign_emails(self, campaign_id: str) -> Dict[str, Any]:
         self.retry(exc=e)
 
 
+@shared_task(bind=True, max_retries=5, default_retry_delay=60)
+def dispatch_campaign_emails(self, campaign_id: str, dispatch_token: str) -> Dict[str, Any]:
+    """
+    Release the next window of a campaign's pending messages.
+    
+    Each run reserves send slots from the campaign's token bucket, queues the
+    claimed messages as ``send_email_batch`` tasks counting down to their
+    slots, and schedules the next run for when the reserved slots run out. The campaign
+    status is re-read on every run, so pausing or cancelling takes effect
+    within one window.
+    """
+    try:
+        campaign_state = EmailCampaign.objects.filter(id=campaign_id).values(
+            'status', 'send_rate_per_hour', 'group_id'
+        ).first()
+        if campaign_state is None:
+            logger.error(f"Campaign {campaign_id} not found")
+            return {'status': 'error', 'error': 'Campaign not found'}
+        
+        status = campaign_state['status']
+        if status == EmailCampaign.CampaignStatus.PAUSED:
+            return {'status': 'paused'}
+        if status == EmailCampaign.CampaignStatus.CANCELLED:
+            return {'status': 'cancelled'}
+        if status != EmailCampaign.CampaignStatus.SENDING:
+            return {'status': 'skipped', 'reason': f"Campaign status is {status}"}
+        
+        # Only the latest generation keeps dispatching; adopt the token if the cache lost it
+        token_key = _dispatch_token_key(campaign_id)
+        current_token = cache.get(token_key)
+        if current_token is None:
+            cache.add(token_key, dispatch_token, timeout=DISPATCH_TOKEN_TTL)
+            current_token = cache.get(token_key)
+        if current_token != dispatch_token:
+            return {'status': 'superseded'}
+        
+        messages = EmailMessage.objects.filter(
+            group_id=campaign_state['group_id'],
+            campaign_id=campaign_id
+        )
+        bucket = TokenBucket(f"campaign:{campaign_id}", campaign_state['send_rate_per_hour'])
+        delays = bucket.reserve(DISPATCH_BATCH_SIZE, DISPATCH_WINDOW_SECONDS)
+        
+        message_ids = []
+        if delays:
+            with transaction.atomic():
+                message_ids = list(
+                    messages.select_for_update(skip_locked=True).filter(
+                        status=EmailMessage.MessageStatus.PENDING
+                    ).order_by('to_email').values_list('id', flat=True)[:len(delays)]
+                )
+                EmailMessage.objects.filter(id__in=message_ids).update(
+                    status=EmailMessage.MessageStatus.QUEUED,
+                    queued_at=timezone.now()
+                )
+            bucket.refund(len(delays) - len(message_ids))
+        
+        # Sends due within the same second share a connection; each batch waits
+        # for its latest slot so nothing goes out ahead of the rate
+        for batch_ids, countdown in _group_sends(message_ids, delays):
+            send_email_batch.apply_async(args=[batch_ids], countdown=countdown)
+        
+        if message_ids:
+            next_run = delays[len(message_ids) - 1]
+        elif messages.filter(status=EmailMessage.MessageStatus.PENDING).exists():
+            # Rate budget exhausted for this window
+            next_run = bucket.seconds_until_available()
+        else:
+            # Nothing left to release; wait for in-flight sends, then finish
+            stale_before = timezone.now() - timedelta(seconds=QUEUED_STALE_SECONDS)
+            requeued = messages.filter(
+                status=EmailMessage.MessageStatus.QUEUED,
+                queued_at__lt=stale_before
+            ).update(status=EmailMessage.MessageStatus.PENDING)
+            if requeued:
+                logger.warning(f"Requeued {requeued} stalled messages for campaign {campaign_id}")
+            
+            if requeued or messages.filter(status=EmailMessage.MessageStatus.QUEUED).exists():
+                next_run = DISPATCH_WINDOW_SECONDS
+            else:
+                return _complete_campaign(campaign_id, messages)
+        
+        dispatch_campaign_emails.apply_async(
+            args=[str(campaign_id), dispatch_token],
+            countdown=max(next_run, MIN_DISPATCH_INTERVAL_SECONDS)
+        )
+        
+        return {'status': 'dispatching', 'queued': len(message_ids)}
+        
+    except Exception as e:
+        logger.error(f"Error dispatching campaign {campaign_id}: {str(e)}")
+        raise self.retry(exc=e)
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
 def send_single_email(self, message_id: str) -> Dict[str, str]:
     """
@@ -165,129 +250,58 @@ def send_single_email(self, message_id: str) -> Dict[str, str]:
             'campaign', 'contact', 'template_used'
         ).get(id=message_id)
         
-        # Skip if already sent
-        if message.status in [
-            EmailMessage.MessageStatus.SENT,
-            EmailMessage.MessageStatus.DELIVERED,
-            EmailMessage.MessageStatus.BOUNCED
-        ]:
-            return {'status': 'skipped', 'reason': 'Already sent'}
-        
-        # Validate email address
-        if not validate_email_address(message.to_email):
-            message.status = EmailMessage.MessageStatus.FAILED
-            message.failed_reason = "Invalid email address"
-            message.save()
-            return {'status': 'failed', 'reason': 'Invalid email'}
-        
-        # Check contact opt-in status
-        if not message.contact.email_opt_in:
-            message.status = EmailMessage.MessageStatus.FAILED
-            message.failed_reason = "Contact opted out"
+        prepared = _prepare_campaign_email(message)
+        if prepared['status'] == 'failed':
             message.save()
-            return {'status': 'failed', 'reason': 'Opted out'}
-        
-        # Prepare template context
-        context_data = _prepare_email_context(message)
-        
-        # Render email content
-        try:
-            subject = render_email_template(
-                message.template_used.subject,
-                context_data
-            )
-            html_content = render_email_template(
-                message.template_used.html_content,
-                context_data
-            )
-            text_content = render_email_template(
-                message.template_used.text_content,
-                context_data
-            )
-        except Exception as e:
-            logger.error(f"Template rendering error for message {message_id}: {str(e)}")
-            message.status = EmailMessage.MessageStatus.FAILED
-            message.failed_reason = f"Template error: {str(e)}"
-            message.save()
-            return {'status': 'failed', 'reason': 'Template error'}
-        
-        # Add tracking
-        if message.campaign.track_opens:
-            html_content = _add_tracking_pixel(html_content, message)
-        
-        if message.campaign.track_clicks:
-            html_content = track_email_links(html_content, message)
-            text_content = track_email_links(text_content, message, is_html=False)
-        
-        # Create email message
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=f"{message.template_used.from_name} <{message.template_used.from_email}>",
-            to=[message.to_email],
-            reply_to=[message.template_used.reply_to_email] if message.template_used.reply_to_email else None
-        )
-        email.attach_alternative(html_content, "text/html")
-        
-        # Add headers for tracking
-        email.extra_headers['X-Campaign-ID'] = str(message.campaign.id)
-        email.extra_headers['X-Message-ID'] = str(message.id)
+            return {'status': 'failed', 'reason': prepared['reason']}
+        if prepared['status'] != 'ready':
+            return prepared
         
         # Send email
         try:
             backend = get_email_backend()
-            backend.send_messages([email])
+            backend.send_messages([prepared['email']])
             
             # Update message status
-            message.status = EmailMessage.MessageStatus.SENT
-            message.sent_at = timezone.now()
-            message.queued_at = timezone.now()
-            message.subject = subject  # Store rendered subject
+            now = timezone.now()
+            _mark_message_sent(message, prepared['subject'], now)
             message.save()
             
-            # Update campaign stats
-            message.campaign.emails_sent = F('emails_sent') + 1
-            message.campaign.save()
+            # Update campaign stats; update() so a concurrent pause isn't overwritten
+            EmailCampaign.objects.filter(id=message.campaign_id).update(
+                emails_sent=F('emails_sent') + 1
+            )
+            rollups = RollupRecorder()
+            rollups.record(message, 'sent', now)
+            rollups.save()
             
             # Create activity record
-            ContactActivity.objects.create(
-                group=message.campaign.group,
-                contact=message.contact,
-                activity_type=ActivityType.EMAIL_SENT,
-                subject=f"Campaign: {message.campaign.name}",
-                description=f"Email sent with subject: {subject}",
-                metadata={
-                    'campaign_id': str(message.campaign.id),
-                    'message_id': str(message.id)
-                }
-            )
+            _build_sent_activity(message, prepared['subject']).save()
             
             # Update contact's last email sent timestamp
-            message.contact.last_email_sent_at = timezone.now()
+            message.contact.last_email_sent_at = now
             message.contact.save(update_fields=['last_email_sent_at'])
             
             # Log event
-            EmailEvent.objects.create(
-                message=message,
-                event_type=EmailEvent.EventType.SENT,
-                timestamp=timezone.now()
-            )
+            _build_message_event(message, EmailEvent.EventType.SENT, now).save()
             
             return {'status': 'sent', 'message_id': str(message.id)}
             
         except Exception as e:
             logger.error(f"Error sending email {message_id}: {str(e)}")
-            message.status = EmailMessage.MessageStatus.FAILED
+            # Stay in flight while retries remain so the dispatcher waits for them
+            if self.request.retries < self.max_retries:
+                message.status = EmailMessage.MessageStatus.QUEUED
+                message.queued_at = timezone.now()
+            else:
+                message.status = EmailMessage.MessageStatus.FAILED
             message.failed_reason = str(e)
             message.save()
             
             # Log failed event
-            EmailEvent.objects.create(
-                message=message,
-                event_type=EmailEvent.EventType.FAILED,
-                timestamp=timezone.now(),
-                metadata={'error': str(e)}
-            )
+            _build_message_event(
+                message, EmailEvent.EventType.FAILED, timezone.now(), {'error': str(e)}
+            ).save()
             
             raise
             
@@ -298,9 +312,122 @@ def send_single_email(self, message_id: str) -> Dict[str, str]:
         logger.error(f"Unexpected error sending email {message_id}: {str(e)}")
         if self.request.retries < self.max_retries:
             raise self.retry(exc=e)
+        EmailMessage.objects.filter(
+            id=message_id,
+            status=EmailMessage.MessageStatus.QUEUED
+        ).update(status=EmailMessage.MessageStatus.FAILED, failed_reason=str(e))
         return {'status': 'failed', 'reason': str(e)}
 
 
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_email_batch(self, message_ids: List[str]) -> Dict[str, Any]:
+    """
+    Send a batch of email messages over one backend connection.
+    
+    Messages are prepared exactly as in ``send_single_email`` and sent one by
+    one over a single open connection, so one rejected message doesn't stop
+    the rest. Status changes, activities and events for the whole batch are
+    written in bulk in one transaction. Messages whose send raised stay
+    queued and are handed to ``send_single_email``, which retries them and
+    marks them failed only once its retries run out.
+    """
+    messages = list(
+        EmailMessage.objects.select_related(
+            'campaign', 'contact', 'template_used'
+        ).filter(id__in=message_ids).order_by('to_email')
+    )
+    
+    results = {'sent': 0, 'failed': 0, 'skipped': 0, 'retrying': 0}
+    outgoing = []
+    failed = []
+    retry_ids = []
+    
+    for message in messages:
+        try:
+            prepared = _prepare_campaign_email(message)
+        except Exception as e:
+            # Unexpected errors are retried, as send_single_email would
+            logger.error(f"Unexpected error preparing email {message.id}: {str(e)}")
+            retry_ids.append(str(message.id))
+            continue
+        
+        if prepared['status'] == 'ready':
+            outgoing.append((message, prepared))
+        elif prepared['status'] == 'failed':
+            failed.append(message)
+        else:
+            results['skipped'] += 1
+    
+    sent = []
+    send_errors = []
+    if outgoing:
+        backend = get_email_backend()
+        backend.open()
+        try:
+            for message, prepared in outgoing:
+                try:
+                    backend.send_messages([prepared['email']])
+                except Exception as e:
+                    logger.error(f"Error sending email {message.id}: {str(e)}")
+                    # Still in flight: campaign completion waits for the retries
+                    message.status = EmailMessage.MessageStatus.QUEUED
+                    message.queued_at = timezone.now()
+                    message.failed_reason = str(e)
+                    send_errors.append(message)
+                    continue
+                _mark_message_sent(message, prepared['subject'], timezone.now())
+                sent.append((message, prepared['subject']))
+        finally:
+            backend.close()
+    
+    now = timezone.now()
+    updated = [message for message, _ in sent] + failed + send_errors
+    for message in updated:
+        message.updated_at = now
+    
+    with transaction.atomic():
+        EmailMessage.objects.bulk_update(
+            updated,
+            ['status', 'sent_at', 'queued_at', 'subject', 'failed_reason', 'updated_at']
+        )
+        
+        sent_by_campaign = defaultdict(int)
+        rollups = RollupRecorder()
+        for message, _ in sent:
+            sent_by_campaign[message.campaign_id] += 1
+            rollups.record(message, 'sent', message.sent_at)
+        for campaign_id, count in sent_by_campaign.items():
+            EmailCampaign.objects.filter(id=campaign_id).update(
+                emails_sent=F('emails_sent') + count
+            )
+        rollups.save()
+        
+        ContactActivity.objects.bulk_create([
+            _build_sent_activity(message, subject) for message, subject in sent
+        ])
+        Contact.objects.filter(
+            id__in=[message.contact_id for message, _ in sent]
+        ).update(last_email_sent_at=now, last_activity_at=now)
+        
+        EmailEvent.objects.bulk_create(
+            [_build_message_event(message, EmailEvent.EventType.SENT, now) for message, _ in sent]
+            + [
+                _build_message_event(message, EmailEvent.EventType.FAILED, now, {'error': message.failed_reason})
+                for message in send_errors
+            ]
+        )
+    
+    # Failed sends go through send_single_email's retries
+    retry_ids += [str(message.id) for message in send_errors]
+    for message_id in retry_ids:
+        send_single_email.apply_async(args=[message_id], countdown=self.default_retry_delay)
+    
+    results['sent'] = len(sent)
+    results['failed'] = len(failed)
+    results['retrying'] = len(retry_ids)
+    return results
+
+
 @shared_task
 def send_test_email(
     template_id: str,
@@ -406,218 +533,134 @@ def process_email_event(event_data: Dict[str, Any]) -> Dict[str, str]:
     Process incoming email events from ESP webhooks.
     
     Handles events like delivered, opened, clicked, bounced, etc.
+    Prefer ``process_email_events`` for more than one event.
     """
     try:
-        # Extract message ID from event data
-        # This varies by ESP - adjust based on your provider
-        message_id = event_data.get('message_id') or event_data.get('X-Message-ID')
-        event_type = event_data.get('event', '').lower()
-        timestamp = event_data.get('timestamp', timezone.now())
-        
-        if not message_id:
-            logger.warning(f"No message ID in event data: {event_data}")
-            return {'status': 'skipped', 'reason': 'No message ID'}
-        
-        # Get message
-        try:
-            message = EmailMessage.objects.get(message_id=message_id)
-        except EmailMessage.DoesNotExist:
-            # Try by our internal ID
-            message = EmailMessage.objects.get(id=message_id)
-        
-        # Map ESP event types to our event types
-        event_type_map = {
-            'delivered': EmailEvent.EventType.DELIVERED,
-            'open': EmailEvent.EventType.OPENED,
-            'opened': EmailEvent.EventType.OPENED,
-            'click': EmailEvent.EventType.CLICKED,
-            'clicked': EmailEvent.EventType.CLICKED,
-            'bounce': EmailEvent.EventType.BOUNCED,
-            'bounced': EmailEvent.EventType.BOUNCED,
-            'dropped': EmailEvent.EventType.FAILED,
-            'spam': EmailEvent.EventType.COMPLAINED,
-            'complaint': EmailEvent.EventType.COMPLAINED,
-            'unsubscribe': EmailEvent.EventType.UNSUBSCRIBED,
-        }
-        
-        mapped_event_type = event_type_map.get(event_type)
-        if not mapped_event_type:
-            logger.warning(f"Unknown event type: {event_type}")
-            return {'status': 'skipped', 'reason': 'Unknown event type'}
-        
-        # Create event record
-        event = EmailEvent.objects.create(
-            message=message,
-            event_type=mapped_event_type,
-            timestamp=timestamp,
-            ip_address=event_data.get('ip'),
-            user_agent=event_data.get('user_agent', ''),
-            metadata=event_data,
-            link_url=event_data.get('url', ''),
-            link_text=event_data.get('link_text', '')
-        )
-        
-        # Update message status and stats
-        with transaction.atomic():
-            if mapped_event_type == EmailEvent.EventType.DELIVERED:
-                message.status = EmailMessage.MessageStatus.DELIVERED
-                message.delivered_at = timestamp
-                message.save()
-                
-                # Update campaign stats
-                message.campaign.emails_delivered = F('emails_delivered') + 1
-                message.campaign.save()
-                
-            elif mapped_event_type == EmailEvent.EventType.OPENED:
-                message.status = EmailMessage.MessageStatus.OPENED
-                if not message.first_opened_at:
-                    message.first_opened_at = timestamp
-                    
-                    # Update campaign stats for unique opens
-                    message.campaign.emails_opened = F('emails_opened') + 1
-                    message.campaign.save()
-                    
-                    # Update contact
-                    message.contact.last_email_opened_at = timestamp
-                    message.contact.save(update_fields=['last_email_opened_at'])
-                    
-                    # Create activity
-                    ContactActivity.objects.create(
-                        group=message.campaign.group,
-                        contact=message.contact,
-                        activity_type=ActivityType.EMAIL_OPENED,
-                        subject=f"Opened: {message.subject}",
-                        metadata={
-                            'campaign_id': str(message.campaign.id),
-                            'message_id': str(message.id)
-                        }
-                    )
-                
-                message.last_opened_at = timestamp
-                message.open_count = F('open_count') + 1
-                message.ip_address = event_data.get('ip', message.ip_address)
-                message.user_agent = event_data.get('user_agent', message.user_agent)
-                message.save()
-                
-            elif mapped_event_type == EmailEvent.EventType.CLICKED:
-                message.status = EmailMessage.MessageStatus.CLICKED
-                if not message.first_clicked_at:
-                    message.first_clicked_at = timestamp
-                    
-                    # Update campaign stats for unique clicks
-                    message.campaign.emails_clicked = F('emails_clicked') + 1
-                    message.campaign.save()
-                    
-                    # Create activity
-                    ContactActivity.objects.create(
-                        group=message.campaign.group,
-                        contact=message.contact,
-                        activity_type=ActivityType.EMAIL_CLICKED,
-                        subject=f"Clicked link in: {message.subject}",
-                        description=f"Clicked: {event_data.get('url', 'Unknown URL')}",
-                        metadata={
-                            'campaign_id': str(message.campaign.id),
-                            'message_id': str(message.id),
-                            'url': event_data.get('url', '')
-                        }
-                    )
-                
-                message.last_clicked_at = timestamp
-                message.click_count = F('click_count') + 1
-                message.save()
-                
-            elif mapped_event_type == EmailEvent.EventType.BOUNCED:
-                message.status = EmailMessage.MessageStatus.BOUNCED
-                message.bounce_type = event_data.get('bounce_type', 'unknown')
-                message.bounce_reason = event_data.get('reason', '')
-                message.save()
-                
-                # Update campaign stats
-                message.campaign.emails_bounced = F('emails_bounced') + 1
-                message.campaign.save()
-                
-                # Mark contact as having bad email if hard bounce
-                if event_data.get('bounce_type') == 'hard':
-                    message.contact.email_opt_in = False
-                    message.contact.save(update_fields=['email_opt_in'])
-                    
-            elif mapped_event_type == EmailEvent.EventType.UNSUBSCRIBED:
-                message.status = EmailMessage.MessageStatus.UNSUBSCRIBED
-                message.save()
-                
-                # Update campaign stats
-                message.campaign.emails_unsubscribed = F('emails_unsubscribed') + 1
-                message.campaign.save()
-                
-                # Update contact opt-in status
-                message.contact.unsubscribe()
-                message.contact.save()
-                
-                # Create activity
-                ContactActivity.objects.create(
-                    group=message.campaign.group,
-                    contact=message.contact,
-                    activity_type=ActivityType.EMAIL_CLICKED,
-                    subject="Unsubscribed from emails",
-                    metadata={
-                        'campaign_id': str(message.campaign.id),
-                        'message_id': str(message.id)
-                    }
-                )
-                
-            elif mapped_event_type == EmailEvent.EventType.COMPLAINED:
-                message.status = EmailMessage.MessageStatus.COMPLAINED
-                message.save()
-                
-                # Mark contact as opted out
-                message.contact.email_opt_in = False
-                message.contact.save(update_fields=['email_opt_in'])
-        
-        return {'status': 'processed', 'event_id': str(event.id)}
-        
+        return EmailEventIngestor().ingest([event_data])['results'][0]
     except Exception as e:
         logger.error(f"Error processing email event: {str(e)}")
         return {'status': 'error', 'error': str(e)}
 
 
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def process_email_events(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Process a batch of ESP webhook events with bulk reads and writes.
+    """
+    summary = {'received': 0, 'processed': 0, 'skipped': 0, 'not_found': 0}
+    ingestor = EmailEventIngestor()
+    
+    try:
+        for i in range(0, len(events), EVENT_INGEST_BATCH_SIZE):
+            result = ingestor.ingest(events[i:i + EVENT_INGEST_BATCH_SIZE])
+            for key in summary:
+                summary[key] += result[key]
+    except Exception as e:
+        # Chunks are atomic, so retrying only the unprocessed remainder is safe
+        logger.error(f"Error processing email events: {str(e)}")
+        raise self.retry(exc=e, args=[events[i:]])
+    
+    return summary
+
+
+@shared_task
+def flush_email_event_buffer() -> Dict[str, Any]:
+    """
+    Queue every event buffered by ``enqueue_email_events`` for ingestion.
+    
+    Events are handed to ``process_email_events`` in batches, which retry on
+    their own. Events that could not be queued go back into the buffer and
+    are picked up by the next flush.
+    """
+    # Clear the flag first so events arriving during the drain schedule another flush
+    cache.delete(EVENT_FLUSH_SCHEDULED_KEY)
+    events = email_event_buffer.drain()
+    batches = 0
+    
+    try:
+        for i in range(0, len(events), EVENT_INGEST_BATCH_SIZE):
+            process_email_events.delay(events[i:i + EVENT_INGEST_BATCH_SIZE])
+            batches += 1
+    except Exception as e:
+        logger.error(f"Error queueing buffered email events: {str(e)}")
+        email_event_buffer.append(events[i:])
+        raise
+    
+    return {'received': len(events), 'batches': batches}
+
+
+def enqueue_email_events(events: List[Dict[str, Any]]) -> None:
+    """
+    Hand webhook events to the ingestion pipeline.
+    
+    With ``EMAIL_EVENT_BUFFER_SECONDS`` set, events from many requests are
+    buffered in the shared cache and ingested together every few seconds;
+    otherwise each request's events are queued as one batch.
+    """
+    buffer_seconds = getattr(settings, 'EMAIL_EVENT_BUFFER_SECONDS', 0)
+    if buffer_seconds:
+        email_event_buffer.append(events)
+        if cache.add(EVENT_FLUSH_SCHEDULED_KEY, True, timeout=buffer_seconds * 10):
+            flush_email_event_buffer.apply_async(countdown=buffer_seconds)
+        return
+    
+    for i in range(0, len(events), EVENT_INGEST_BATCH_SIZE):
+        process_email_events.delay(events[i:i + EVENT_INGEST_BATCH_SIZE])
+
+
 @shared_task
 def update_campaign_analytics(campaign_id: str) -> Dict[str, Any]:
     """
-    Recalculate campaign analytics from message data.
+    Recalculate campaign analytics from its hourly rollups.
     
-    Used for periodic updates or after bulk operations.
+    Used for periodic updates or after bulk operations. Reads one row per
+    hour and template rather than every message. Campaigns without rollups
+    (sent before they were recorded and not yet backfilled with
+    ``backfill_email_rollups``) are counted from their messages instead.
     """
     try:
         campaign = EmailCampaign.objects.get(id=campaign_id)
         
-        # Get aggregated stats from messages
-        stats = campaign.messages.aggregate(
-            sent=Count('id', filter=Q(status__in=[
-                EmailMessage.MessageStatus.SENT,
-                EmailMessage.MessageStatus.DELIVERED,
-                EmailMessage.MessageStatus.OPENED,
-                EmailMessage.MessageStatus.CLICKED
-            ])),
-            delivered=Count('id', filter=Q(status__in=[
-                EmailMessage.MessageStatus.DELIVERED,
-                EmailMessage.MessageStatus.OPENED,
-                EmailMessage.MessageStatus.CLICKED
-            ])),
-            opened=Count('id', filter=Q(open_count__gt=0)),
-            clicked=Count('id', filter=Q(click_count__gt=0)),
-            bounced=Count('id', filter=Q(status=EmailMessage.MessageStatus.BOUNCED)),
-            unsubscribed=Count('id', filter=Q(status=EmailMessage.MessageStatus.UNSUBSCRIBED))
+        if campaign.engagement_rollups.exists():
+            # Sum the campaign's hourly rollups
+            totals = campaign.engagement_rollups.aggregate(
+                sent=Sum('sent'),
+                delivered=Sum('delivered'),
+                opened=Sum('unique_opens'),
+                clicked=Sum('unique_clicks'),
+                bounced=Sum('bounced'),
+                unsubscribed=Sum('unsubscribed')
+            )
+        else:
+            totals = campaign.messages.aggregate(
+                sent=Count('id', filter=Q(status__in=[
+                    EmailMessage.MessageStatus.SENT,
+                    EmailMessage.MessageStatus.DELIVERED,
+                    EmailMessage.MessageStatus.OPENED,
+                    EmailMessage.MessageStatus.CLICKED
+                ])),
+                delivered=Count('id', filter=Q(status__in=[
+                    EmailMessage.MessageStatus.DELIVERED,
+                    EmailMessage.MessageStatus.OPENED,
+                    EmailMessage.MessageStatus.CLICKED
+                ])),
+                opened=Count('id', filter=Q(open_count__gt=0)),
+                clicked=Count('id', filter=Q(click_count__gt=0)),
+                bounced=Count('id', filter=Q(status=EmailMessage.MessageStatus.BOUNCED)),
+                unsubscribed=Count('id', filter=Q(status=EmailMessage.MessageStatus.UNSUBSCRIBED))
+            )
+        stats = {key: value or 0 for key, value in totals.items()}
+        
+        # Update campaign; update() so a concurrent status change isn't overwritten
+        EmailCampaign.objects.filter(id=campaign.id).update(
+            emails_sent=stats['sent'],
+            emails_delivered=stats['delivered'],
+            emails_opened=stats['opened'],
+            emails_clicked=stats['clicked'],
+            emails_bounced=stats['bounced'],
+            emails_unsubscribed=stats['unsubscribed']
         )
         
-        # Update campaign
-        campaign.emails_sent = stats['sent']
-        campaign.emails_delivered = stats['delivered']
-        campaign.emails_opened = stats['opened']
-        campaign.emails_clicked = stats['clicked']
-        campaign.emails_bounced = stats['bounced']
-        campaign.emails_unsubscribed = stats['unsubscribed']
-        campaign.save()
-        
         return {
             'status': 'updated',
             'campaign_id': campaign_id,
@@ -650,28 +693,81 @@ def cleanup_old_events(days: int = 90) -> Dict[str, int]:
 
 # Helper functions
 
-def _get_campaign_recipients(campaign: EmailCampaign) -> List[Contact]:
-    """Get unique list of recipients for a campaign."""
-    contact_ids = set()
-    
-    # Get contacts from all lists
-    for contact_list in campaign.contact_lists.all():
-        if contact_list.is_dynamic:
-            # TODO: Implement dynamic list logic
-            # For now, skip dynamic lists
-            continue
+def _dispatch_token_key(campaign_id) -> str:
+    """Cache key holding the campaign's current dispatch generation."""
+    return f"email_campaign_dispatch:{campaign_id}"
+
+
+def _group_sends(message_ids: List[Any], delays: List[float]):
+    """Group reserved sends into (message ids, countdown) batches by send second."""
+    batches = []
+    for message_id, delay in zip(message_ids, delays):
+        if (
+            batches
+            and int(delay) == int(batches[-1][1])
+            and len(batches[-1][0]) < SEND_BATCH_SIZE
+        ):
+            batches[-1][0].append(str(message_id))
+            batches[-1][1] = delay
         else:
-            contact_ids.update(
-                contact_list.contacts.values_list('id', flat=True)
-            )
+            batches.append([[str(message_id)], delay])
+    return [(batch_ids, countdown) for batch_ids, countdown in batches]
+
+
+def _complete_campaign(campaign_id: str, messages) -> Dict[str, Any]:
+    """Mark a fully dispatched campaign as sent and notify its owners."""
+    # Conditional update so a pause that lands meanwhile is not overwritten
+    completed = EmailCampaign.objects.filter(
+        id=campaign_id,
+        status=EmailCampaign.CampaignStatus.SENDING
+    ).update(
+        status=EmailCampaign.CampaignStatus.SENT,
+        completed_at=timezone.now()
+    )
+    if not completed:
+        return {'status': 'skipped', 'reason': 'Campaign no longer sending'}
     
-    # Remove excluded contacts
-    excluded_ids = campaign.excluded_contacts.values_list('id', flat=True)
-    contact_ids -= set(excluded_ids)
+    stats = messages.aggregate(
+        sent=Count('id', filter=Q(status__in=[
+            EmailMessage.MessageStatus.SENT,
+            EmailMessage.MessageStatus.DELIVERED,
+            EmailMessage.MessageStatus.OPENED,
+            EmailMessage.MessageStatus.CLICKED
+        ])),
+        failed=Count('id', filter=Q(status=EmailMessage.MessageStatus.FAILED)),
+        total=Count('id')
+    )
+    cache.delete(_dispatch_token_key(campaign_id))
     
-    # Get only opted-in, active contacts
-    contacts = Contact.objects.filter(
-        id__in=contact_ids,
+    campaign = EmailCampaign.objects.get(id=campaign_id)
+    _send_campaign_completion_notification(campaign, stats['sent'], stats['failed'])
+    
+    return {
+        'status': 'completed',
+        'sent': stats['sent'],
+        'failed': stats['failed'],
+        'total': stats['total']
+    }
+
+
+def _get_campaign_recipients(campaign: EmailCampaign) -> QuerySet:
+    """
+    Unique recipients for a campaign, as a single lazy query.
+    
+    Members of any of the campaign's lists, minus its excluded contacts,
+    restricted to opted-in contacts in a mailable status. Iterate with
+    ``iterator()`` to stream large audiences.
+    """
+    list_members = ContactList.contacts.through.objects.filter(
+        contactlist__in=campaign.contact_lists.values('id')
+    ).values('contact_id')
+    excluded = EmailCampaign.excluded_contacts.through.objects.filter(
+        emailcampaign_id=campaign.pk
+    ).values('contact_id')
+    
+    return Contact.objects.filter(
+        group_id=campaign.group_id,
+        id__in=list_members,
         email_opt_in=True,
         status__in=[
             Contact.ContactStatus.LEAD,
@@ -679,9 +775,147 @@ def _get_campaign_recipients(campaign: EmailCampaign) -> List[Contact]:
             Contact.ContactStatus.OPPORTUNITY,
             Contact.ContactStatus.CUSTOMER
         ]
+    ).exclude(
+        id__in=excluded
     ).order_by('email')
+
+
+def _refresh_dynamic_lists(campaign: EmailCampaign) -> None:
+    """Refresh the membership of the campaign's dynamic lists."""
+    service = ContactListService()
+    for contact_list in campaign.contact_lists.filter(is_dynamic=True):
+        try:
+            service.refresh(contact_list)
+        except DjangoValidationError as e:
+            # Send to the membership from the last successful refresh
+            logger.warning(f"Dynamic list {contact_list.id} has invalid criteria: {str(e)}")
+
+
+def _prepare_campaign_email(message: EmailMessage) -> Dict[str, Any]:
+    """
+    Validate, render and build the outgoing email for a campaign message.
+    
+    Returns a dict whose ``status`` is ``ready`` (with ``email`` and
+    ``subject``), ``skipped``, or ``failed``; failures are recorded on the
+    message instance for the caller to save.
+    """
+    # Skip if already sent
+    if message.status in [
+        EmailMessage.MessageStatus.SENT,
+        EmailMessage.MessageStatus.DELIVERED,
+        EmailMessage.MessageStatus.BOUNCED
+    ]:
+        return {'status': 'skipped', 'reason': 'Already sent'}
+    
+    # Campaign paused or cancelled after this send was queued; hand it back
+    if message.campaign.status in [
+        EmailCampaign.CampaignStatus.PAUSED,
+        EmailCampaign.CampaignStatus.CANCELLED
+    ]:
+        EmailMessage.objects.filter(
+            id=message.id,
+            status=EmailMessage.MessageStatus.QUEUED
+        ).update(status=EmailMessage.MessageStatus.PENDING)
+        return {'status': 'skipped', 'reason': f"Campaign {message.campaign.status}"}
+    
+    # Validate email address
+    if not validate_email_address(message.to_email):
+        message.status = EmailMessage.MessageStatus.FAILED
+        message.failed_reason = "Invalid email address"
+        return {'status': 'failed', 'reason': 'Invalid email'}
+    
+    # Check contact opt-in status
+    if not message.contact.email_opt_in:
+        message.status = EmailMessage.MessageStatus.FAILED
+        message.failed_reason = "Contact opted out"
+        return {'status': 'failed', 'reason': 'Opted out'}
     
-    return list(contacts)
+    # Prepare template context
+    context_data = _prepare_email_context(message)
+    
+    # Render email content; the HTML body renders in its link-marked form
+    link_plan = email_template_cache.plan_links(message.template_used)
+    try:
+        subject = render_email_template(
+            message.template_used.subject,
+            context_data
+        )
+        html_content = render_email_template(
+            link_plan.source,
+            context_data
+        )
+        text_content = render_email_template(
+            message.template_used.text_content,
+            context_data
+        )
+    except Exception as e:
+        logger.error(f"Template rendering error for message {message.id}: {str(e)}")
+        message.status = EmailMessage.MessageStatus.FAILED
+        message.failed_reason = f"Template error: {str(e)}"
+        return {'status': 'failed', 'reason': 'Template error'}
+    
+    # Add tracking: links and the open pixel are spliced in one pass
+    html_content = link_plan.apply(
+        html_content,
+        message,
+        track_clicks=message.campaign.track_clicks,
+        track_opens=message.campaign.track_opens
+    )
+    
+    if message.campaign.track_clicks:
+        text_content = track_email_links(text_content, message, is_html=False)
+    
+    # Create email message
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=f"{message.template_used.from_name} <{message.template_used.from_email}>",
+        to=[message.to_email],
+        reply_to=[message.template_used.reply_to_email] if message.template_used.reply_to_email else None
+    )
+    email.attach_alternative(html_content, "text/html")
+    
+    # Add headers for tracking
+    email.extra_headers['X-Campaign-ID'] = str(message.campaign.id)
+    email.extra_headers['X-Message-ID'] = str(message.id)
+    
+    return {'status': 'ready', 'email': email, 'subject': subject}
+
+
+def _mark_message_sent(message: EmailMessage, subject: str, sent_at: datetime) -> None:
+    """Record a successful send on the message instance."""
+    message.status = EmailMessage.MessageStatus.SENT
+    message.sent_at = sent_at
+    message.queued_at = sent_at
+    message.subject = subject  # Store rendered subject
+
+
+def _build_sent_activity(message: EmailMessage, subject: str) -> ContactActivity:
+    """Unsaved activity record for a sent campaign message."""
+    return ContactActivity(
+        group_id=message.campaign.group_id,
+        contact=message.contact,
+        activity_type=ActivityType.EMAIL_SENT,
+        subject=f"Campaign: {message.campaign.name}",
+        description=f"Email sent with subject: {subject}",
+        metadata={
+            'campaign_id': str(message.campaign.id),
+            'message_id': str(message.id)
+        }
+    )
+
+
+def _build_message_event(
+    message: EmailMessage,
+    event_type: str,
+    timestamp: datetime,
+    metadata: Optional[Dict[str, Any]] = None
+) -> EmailEvent:
+    """Unsaved event record for a message."""
+    event = EmailEvent(message=message, event_type=event_type, timestamp=timestamp)
+    if metadata is not None:
+        event.metadata = metadata
+    return event
 
 
 def _prepare_email_context(message: EmailMessage) -> Dict[str, Any]:
@@ -721,20 +955,6 @@ def _prepare_email_context(message: EmailMessage) -> Dict[str, Any]:
     return context
 
 
-def _add_tracking_pixel(html_content: str, message: EmailMessage) -> str:
-    """Add invisible tracking pixel to HTML content."""
-    tracking_pixel = generate_tracking_pixel(message)
-    
-    # Insert before closing body tag
-    if '</body>' in html_content:
-        html_content = html_content.replace('</body>', f'{tracking_pixel}</body>')
-    else:
-        # If no body tag, append to end
-        html_content += tracking_pixel
-    
-    return html_content
-
-
 def _send_campaign_completion_notification(
     campaign: EmailCampaign,
     sent_count: int,
@@ -6,9 +6,12 @@ and integration with email service providers.
 """
 
 import re
+import html
 import hashlib
+import threading
 import urllib.parse
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 
 from django.template import Template, Context
@@ -17,7 +20,7 @@ from django.core.mail import get_connection
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 from django.conf import settings
-from django.utils.crypto import get_random_string
+from django.utils.crypto import get_random_string, salted_hmac
 from django.urls import reverse
 from jinja2 import Environment, BaseLoader, TemplateError
 
@@ -31,21 +34,168 @@ class JinjaStringLoader(BaseLoader):
         return template, None, lambda: True
 
 
-def render_email_template(template_string: str, context: Dict[str, Any]) -> str:
+# Compiled templates are cached process-wide; a few hundred covers every active campaign
+DEFAULT_TEMPLATE_CACHE_MAX_ENTRIES = 512
+
+TRACKING_TOKEN_SALT = 'contacts.email_utils.tracking'
+
+
+class CompiledTemplateCache:
+    """
+    Thread-safe LRU cache of compiled email templates.
+    
+    Entries are keyed by engine and a hash of the template source, so an
+    edited template can never be served from a stale entry; invalidation only
+    frees the memory held by a template's previous content.
+    """
+    
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or getattr(
+            settings, 'EMAIL_TEMPLATE_CACHE_MAX_ENTRIES', DEFAULT_TEMPLATE_CACHE_MAX_ENTRIES
+        )
+        self.environment = Environment(loader=JinjaStringLoader())
+        self._entries = OrderedDict()
+        self._keys_by_template: Dict[Any, set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(engine: str, template_string: str) -> Tuple[str, str]:
+        """Cache key for a template source compiled by ``engine``."""
+        return engine, hashlib.sha1(template_string.encode('utf-8')).hexdigest()
+    
+    def get_jinja(self, template_string: str):
+        """Compiled Jinja2 template; raises ``TemplateError`` on invalid syntax."""
+        return self._get_or_compile('jinja', template_string, self.environment.from_string)
+    
+    def get_django(self, template_string: str) -> Template:
+        """Compiled Django template."""
+        return self._get_or_compile('django', template_string, Template)
+    
+    def get_link_plan(self, template_string: str) -> 'LinkRewritePlan':
+        """Click/open tracking rewrite plan for an HTML template."""
+        return self._get_or_compile('links', template_string, LinkRewritePlan)
+    
+    def plan_links(self, template) -> 'LinkRewritePlan':
+        """Link rewrite plan for an ``EmailTemplate``'s HTML body, freed by ``invalidate_template``."""
+        plan = self.get_link_plan(template.html_content)
+        with self._lock:
+            self._keys_by_template.setdefault(template.pk, set()).add(
+                self.make_key('links', template.html_content)
+            )
+        return plan
+    
+    def warm(self, template) -> int:
+        """
+        Compile an ``EmailTemplate``'s subject and bodies ahead of sending.
+        
+        The HTML body is compiled in its link-marked form (see
+        ``LinkRewritePlan``), which is what campaign sends render.
+        
+        Returns:
+            Number of template parts compiled (or already cached)
+        """
+        template_strings = [template.subject, template.text_content]
+        if template.html_content:
+            template_strings.append(self.plan_links(template).source)
+        
+        warmed = 0
+        for template_string in template_strings:
+            if not template_string:
+                continue
+            try:
+                self.get_jinja(template_string)
+                key = self.make_key('jinja', template_string)
+            except TemplateError:
+                # Rendering will fall back to Django for this part
+                self.get_django(template_string)
+                key = self.make_key('django', template_string)
+            with self._lock:
+                self._keys_by_template.setdefault(template.pk, set()).add(key)
+            warmed += 1
+        return warmed
+    
+    def invalidate_template(self, template_id) -> int:
+        """Drop the compiled parts recorded for an ``EmailTemplate`` by ``warm`` or ``plan_links``."""
+        with self._lock:
+            keys = self._keys_by_template.pop(template_id, set())
+            removed = 0
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    removed += 1
+            return removed
+    
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_template.clear()
+            self.hits = self.misses = self.evictions = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+    
+    def _get_or_compile(self, engine: str, template_string: str, compile_template):
+        key = self.make_key(engine, template_string)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+        
+        # Compile outside the lock; a concurrent duplicate compile is harmless
+        compiled = compile_template(template_string)
+        
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return compiled
+
+
+# Shared by every render in the process
+email_template_cache = CompiledTemplateCache()
+
+
+def render_email_template(template_string: str, context: Dict[str, Any], use_cache: bool = True) -> str:
     """
     Render an email template using Jinja2.
     
     Supports both Django and Jinja2 template syntax for compatibility.
+    Compiled templates come from ``email_template_cache`` unless
+    ``use_cache`` is False.
     """
     try:
         # Try Jinja2 first (preferred)
-        env = Environment(loader=JinjaStringLoader())
-        template = env.from_string(template_string)
+        if use_cache:
+            template = email_template_cache.get_jinja(template_string)
+        else:
+            env = Environment(loader=JinjaStringLoader())
+            template = env.from_string(template_string)
         return template.render(**context)
     except TemplateError:
         # Fall back to Django templates
         try:
-            template = Template(template_string)
+            if use_cache:
+                template = email_template_cache.get_django(template_string)
+            else:
+                template = Template(template_string)
             return template.render(Context(context))
         except Exception as e:
             raise TemplateError(f"Template rendering failed: {str(e)}")
@@ -108,15 +258,18 @@ def generate_unsubscribe_url(message) -> str:
     return f"{base_url}/unsubscribe?{urllib.parse.urlencode(params)}"
 
 
+def _tracking_token(value: str) -> str:
+    """Deterministic tracking id; a resend carries the same ids as the original."""
+    return salted_hmac(TRACKING_TOKEN_SALT, value).hexdigest()[:16]
+
+
 def generate_tracking_pixel(message) -> str:
     """
     Generate an invisible tracking pixel for open tracking.
     """
     # Generate tracking URL
     base_url = settings.BACKEND_URL.rstrip('/')
-    tracking_id = hashlib.sha256(
-        f"{message.id}-{datetime.now().isoformat()}".encode()
-    ).hexdigest()[:16]
+    tracking_id = _tracking_token(f"open:{message.id}")
     
     tracking_url = f"{base_url}/api/contacts/email-events/track/open/{message.id}/{tracking_id}/"
     
@@ -128,7 +281,8 @@ def track_email_links(content: str, message, is_html: bool = True) -> str:
     """
     Replace links in email content with tracking URLs.
     
-    Preserves original URLs while adding click tracking.
+    Preserves original URLs while adding click tracking. HTML is rewritten
+    with the content's cached ``LinkRewritePlan``.
     """
     if not is_html:
         # For plain text, use regex
@@ -141,34 +295,14 @@ def track_email_links(content: str, message, is_html: bool = True) -> str:
         
         return re.sub(url_pattern, replace_url, content)
     
-    else:
-        # For HTML, use BeautifulSoup
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # Track all <a> tags
-        for link in soup.find_all('a', href=True):
-            original_url = link['href']
-            
-            # Skip mailto: and tel: links
-            if original_url.startswith(('mailto:', 'tel:', '#')):
-                continue
-            
-            # Skip unsubscribe links (don't want to track those)
-            if 'unsubscribe' in original_url.lower():
-                continue
-            
-            tracking_url = _create_tracking_url(original_url, message)
-            link['href'] = tracking_url
-        
-        return str(soup)
+    plan = email_template_cache.get_link_plan(content)
+    return plan.apply(plan.source, message, track_opens=False)
 
 
 def _create_tracking_url(original_url: str, message) -> str:
     """Create a tracking URL that redirects to the original URL."""
     # Generate tracking ID
-    tracking_id = hashlib.sha256(
-        f"{message.id}-{original_url}-{datetime.now().isoformat()}".encode()
-    ).hexdigest()[:16]
+    tracking_id = _tracking_token(f"click:{message.id}:{original_url}")
     
     # Build tracking URL
     base_url = settings.BACKEND_URL.rstrip('/')
@@ -181,6 +315,93 @@ def _create_tracking_url(original_url: str, message) -> str:
     return f"{base_url}/api/contacts/email-events/track/click/?{urllib.parse.urlencode(params)}"
 
 
+def _is_untracked_url(url: str) -> bool:
+    """Links that are never rewritten: mailto/tel/fragments and unsubscribe links."""
+    return not url or url.startswith(('mailto:', 'tel:', '#')) or 'unsubscribe' in url.lower()
+
+
+# Private-use characters marking rewrite points in a plan's source. They
+# pass through Jinja2 and Django rendering untouched.
+LINK_START = '\ue000'
+LINK_END = '\ue001'
+PIXEL_MARKER = '\ue002'
+
+_ANCHOR_TAG_RE = re.compile(r'<a(?=[\s>/])(?:[^>"\']|"[^"]*"|\'[^\']*\')*>', re.IGNORECASE)
+_TAG_ATTRIBUTE_RE = re.compile(
+    r'(?P<name>[^\s=/>"\']+)'
+    r'(?:\s*=\s*(?P<value>"[^"]*"|\'[^\']*\'|(?:\{\{[^}]*\}\}|[^\s"\'>])+))?'
+)
+_BODY_CLOSE_RE = re.compile(r'</body\s*>', re.IGNORECASE)
+_REWRITE_POINT_RE = re.compile(f'{LINK_START}([^{LINK_END}]*){LINK_END}|{PIXEL_MARKER}')
+
+
+class LinkRewritePlan:
+    """
+    Tracking rewrite points for one HTML template, found once.
+    
+    ``source`` is the template with every trackable ``href`` value wrapped
+    in markers and a pixel marker before ``</body>``. Render ``source`` in
+    place of the template, then ``apply`` splices per-message tracking URLs
+    and the open pixel in a single regex pass - no per-message HTML parse.
+    Hrefs built from template variables are marked too and checked against
+    the skip rules once rendered.
+    """
+    
+    def __init__(self, template_string: str):
+        self.link_count = 0
+        self.source = self._mark_pixel(_ANCHOR_TAG_RE.sub(self._mark_anchor, template_string))
+    
+    def _mark_anchor(self, match) -> str:
+        tag = match.group(0)
+        for attribute in _TAG_ATTRIBUTE_RE.finditer(tag, 2):
+            if attribute.group('name').lower() != 'href' or attribute.group('value') is None:
+                continue
+            value = attribute.group('value')
+            if value[0] in '"\'':
+                quote, url = value[0], value[1:-1]
+            else:
+                quote, url = '"', value
+            if '{' not in url and _is_untracked_url(html.unescape(url).strip()):
+                return tag
+            self.link_count += 1
+            start, end = attribute.span('value')
+            return f'{tag[:start]}{quote}{LINK_START}{url}{LINK_END}{quote}{tag[end:]}'
+        return tag
+    
+    @staticmethod
+    def _mark_pixel(source: str) -> str:
+        closing = None
+        for closing in _BODY_CLOSE_RE.finditer(source):
+            pass
+        if closing is None:
+            return source + PIXEL_MARKER
+        return source[:closing.start()] + PIXEL_MARKER + source[closing.start():]
+    
+    def apply(self, rendered: str, message, track_clicks: bool = True, track_opens: bool = True) -> str:
+        """Splice tracking URLs and the open pixel into ``rendered`` (the rendered ``source``)."""
+        pixel = generate_tracking_pixel(message) if track_opens else ''
+        tracked = {}
+        
+        def rewrite(match):
+            raw = match.group(1)
+            if raw is None:
+                return pixel
+            if not track_clicks:
+                return raw
+            
+            tracking_href = tracked.get(raw)
+            if tracking_href is None:
+                url = html.unescape(raw).strip()
+                if _is_untracked_url(url):
+                    tracking_href = raw
+                else:
+                    tracking_href = html.escape(_create_tracking_url(url, message), quote=True)
+                tracked[raw] = tracking_href
+            return tracking_href
+        
+        return _REWRITE_POINT_RE.sub(rewrite, rendered)
+
+
 def get_email_backend(connection_name: Optional[str] = None):
     """
     Get configured email backend.
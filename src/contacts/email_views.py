@@ -29,7 +29,7 @@ from .email_serializers import (
 )
 from .email_tasks import (
     send_campaign_emails, schedule_campaign,
-    send_test_email, process_email_event
+    send_test_email, enqueue_email_events
 )
 from accounts.models import GroupMembership
 
@@ -823,8 +823,7 @@ class EmailEventViewSet(viewsets.ReadOnlyModelViewSet):
         
         events = request.data if isinstance(request.data, list) else [request.data]
         
-        for event_data in events:
-            # Process each event asynchronously
-            process_email_event.delay(event_data)
+        # Processed asynchronously in batches
+        enqueue_email_events(events)
         
         return Response({'status': 'accepted'}, status=status.HTTP_202_ACCEPTED)
\ No newline at end of file
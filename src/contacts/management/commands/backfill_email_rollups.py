@@ -0,0 +1,62 @@
+"""
+Management command to rebuild hourly email engagement rollups.
+
+Recomputes rollups from email messages and events, for campaigns sent
+before rollups existed or after rollups drifted.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from contacts.email_rollups import rebuild_rollups
+from contacts.email_tasks import update_campaign_analytics
+from contacts.models import EmailCampaign
+
+
+class Command(BaseCommand):
+    help = 'Rebuild hourly email engagement rollups from messages and events'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--campaign',
+            type=str,
+            action='append',
+            help='Campaign ID to rebuild (repeatable; default: all campaigns)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Only rebuild the last N days (default: all history)'
+        )
+        parser.add_argument(
+            '--update-campaigns',
+            action='store_true',
+            help='Also reset campaign counters from the rebuilt rollups'
+        )
+
+    def handle(self, *args, **options):
+        campaign_ids = options.get('campaign')
+        if campaign_ids:
+            found = EmailCampaign.objects.filter(id__in=campaign_ids).count()
+            if found != len(set(campaign_ids)):
+                raise CommandError('One or more campaigns not found')
+
+        since = None
+        if options.get('days'):
+            since = timezone.now() - timedelta(days=options['days'])
+
+        result = rebuild_rollups(campaign_ids=campaign_ids, since=since)
+        self.stdout.write(
+            f"Replaced {result['deleted']} rollup rows with {result['created']}"
+        )
+
+        if options['update_campaigns']:
+            campaigns = EmailCampaign.objects.all()
+            if campaign_ids:
+                campaigns = campaigns.filter(id__in=campaign_ids)
+            for campaign_id in campaigns.values_list('id', flat=True):
+                update_campaign_analytics(str(campaign_id))
+            self.stdout.write(f"Updated counters for {campaigns.count()} campaigns")
+
+        self.stdout.write(self.style.SUCCESS('Successfully rebuilt email rollups'))
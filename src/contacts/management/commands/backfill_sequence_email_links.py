@@ -0,0 +1,66 @@
+"""
+Management command to link existing sequence emails to their sequence.
+
+Sets the sequence, enrollment and step foreign keys of email messages sent
+before they existed, from the step executions that sent them, and can
+recount step open and click totals afterwards.
+"""
+from django.core.management.base import BaseCommand
+
+from contacts.models import EmailMessage
+from contacts.models_outreach import SequenceStepExecution
+from contacts.tasks_outreach import rebuild_sequence_analytics
+
+
+class Command(BaseCommand):
+    help = 'Link sequence email messages to their sequence, enrollment and step'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Messages updated per query (default: 1000)'
+        )
+        parser.add_argument(
+            '--rebuild-analytics',
+            action='store_true',
+            help='Also recount step open and click totals from email events'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        executions = SequenceStepExecution.objects.filter(
+            email_message_id__isnull=False
+        ).order_by().values_list(
+            'email_message_id', 'enrollment_id', 'enrollment__sequence_id', 'step_id'
+        )
+
+        linked = 0
+        batch = []
+        for row in executions.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                linked += self._link(batch)
+                batch = []
+        if batch:
+            linked += self._link(batch)
+        self.stdout.write(f"Linked {linked} email messages")
+
+        if options['rebuild_analytics']:
+            steps = rebuild_sequence_analytics()
+            self.stdout.write(f"Recounted analytics for {steps} steps")
+
+        self.stdout.write(self.style.SUCCESS('Successfully backfilled sequence email links'))
+
+    def _link(self, batch):
+        """Link the batch's messages that are not linked yet."""
+        links = {
+            message_id: (enrollment_id, sequence_id, step_id)
+            for message_id, enrollment_id, sequence_id, step_id in batch
+        }
+        messages = list(EmailMessage.objects.filter(id__in=links, enrollment__isnull=True))
+        for message in messages:
+            message.enrollment_id, message.sequence_id, message.sequence_step_id = links[message.id]
+        EmailMessage.objects.bulk_update(messages, ['enrollment', 'sequence', 'sequence_step'])
+        return len(messages)
@@ -0,0 +1,102 @@
+"""
+Management command to load-test webhook event ingestion.
+
+Generates a synthetic stream of delivered/open/click events for a campaign's
+sent messages and ingests it one event at a time and in batches, inside a
+transaction that is rolled back afterwards.
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from contacts.email_events import EmailEventIngestor
+from contacts.models import EmailCampaign, EmailMessage
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ESP webhook event ingestion (changes are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--campaign',
+            type=str,
+            required=True,
+            help='Campaign ID whose messages receive the synthetic events'
+        )
+        parser.add_argument(
+            '--events',
+            type=int,
+            default=10000,
+            help='Number of events to generate (default: 10000)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Events per ingestion batch (default: 500)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the event stream'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            campaign = EmailCampaign.objects.get(id=options['campaign'])
+        except EmailCampaign.DoesNotExist:
+            raise CommandError(f"Campaign {options['campaign']} not found")
+
+        message_ids = [
+            str(message_id) for message_id in
+            EmailMessage.objects.filter(campaign=campaign).values_list('id', flat=True)
+        ]
+        if not message_ids:
+            raise CommandError(f"Campaign {campaign.id} has no messages")
+
+        events = self._generate_events(message_ids, options['events'], random.Random(options['seed']))
+        self.stdout.write(
+            f"Generated {len(events)} events across {len(message_ids)} messages"
+        )
+
+        single = self._run(events, batch_size=1)
+        self.stdout.write(f"One event per batch:   {single:.2f}s ({len(events) / single:.0f} events/s)")
+
+        batched = self._run(events, batch_size=options['batch_size'])
+        self.stdout.write(
+            f"{options['batch_size']} events per batch: {batched:.2f}s ({len(events) / batched:.0f} events/s)"
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Batched ingestion {single / batched:.1f}x faster"))
+
+    def _generate_events(self, message_ids, count, rng):
+        """Event stream weighted like a large send: mostly opens, some clicks and repeats."""
+        now = timezone.now().timestamp()
+        events = []
+        for index in range(count):
+            event_type = rng.choices(['delivered', 'open', 'click'], weights=[2, 6, 2])[0]
+            events.append({
+                'message_id': rng.choice(message_ids),
+                'event': event_type,
+                'timestamp': int(now) + index // 100,
+                'ip': f"10.0.{rng.randint(0, 3)}.{rng.randint(1, 254)}",
+                'user_agent': 'Mozilla/5.0 (benchmark)',
+                'url': 'https://example.com/offer' if event_type == 'click' else '',
+                'sg_event_id': f"benchmark-{index}",
+            })
+        return events
+
+    def _run(self, events, batch_size):
+        """Ingest the stream in batches and roll everything back."""
+        ingestor = EmailEventIngestor()
+        with transaction.atomic():
+            started = time.perf_counter()
+            for i in range(0, len(events), batch_size):
+                ingestor.ingest(events[i:i + batch_size])
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return elapsed
@@ -0,0 +1,75 @@
+"""
+Management command to benchmark personalized email template rendering.
+
+Renders a subject, HTML body and text body for synthetic contacts with and
+without the compiled template cache and reports both timings.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from contacts.email_utils import email_template_cache, render_email_template
+
+SUBJECT = "{{ first_name }}, your {{ city }} update"
+HTML_CONTENT = """
+<html>
+<body>
+    <h1>Hello {{ first_name }} {{ last_name }}!</h1>
+    <p>Here is what is new for {{ company_name }} in {{ city }}.</p>
+    {% if job_title %}<p>As {{ job_title }} you may be interested in:</p>{% endif %}
+    <ul>
+    {% for item in items %}
+        <li>{{ item.name }} - {{ item.price|round(2) }}</li>
+    {% endfor %}
+    </ul>
+    <a href="{{ unsubscribe_url }}">Unsubscribe</a>
+</body>
+</html>
+"""
+TEXT_CONTENT = "Hello {{ first_name }}! News for {{ company_name }}. Unsubscribe: {{ unsubscribe_url }}"
+
+
+class Command(BaseCommand):
+    help = 'Benchmark email template rendering with and without the compiled template cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--messages',
+            type=int,
+            default=10000,
+            help='Number of personalized messages to render (default: 10000)'
+        )
+
+    def handle(self, *args, **options):
+        contexts = [
+            {
+                'first_name': f"Contact{i}",
+                'last_name': 'Test',
+                'company_name': f"Company {i % 50}",
+                'city': 'London',
+                'job_title': 'Director' if i % 2 else '',
+                'items': [{'name': 'Report', 'price': 10.5}, {'name': 'Briefing', 'price': 4.25}],
+                'unsubscribe_url': f"https://example.com/unsubscribe/{i}",
+            }
+            for i in range(options['messages'])
+        ]
+
+        uncached = self._run(contexts, use_cache=False)
+        self.stdout.write(f"Without cache: {uncached:.2f}s")
+
+        email_template_cache.clear()
+        cached = self._run(contexts, use_cache=True)
+        self.stdout.write(f"With cache:    {cached:.2f}s ({email_template_cache.stats()})")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {len(contexts)} messages {uncached / cached:.1f}x faster with the cache"
+        ))
+
+    def _run(self, contexts, use_cache):
+        """Render subject, HTML and text for every context."""
+        started = time.perf_counter()
+        for context in contexts:
+            render_email_template(SUBJECT, context, use_cache=use_cache)
+            render_email_template(HTML_CONTENT, context, use_cache=use_cache)
+            render_email_template(TEXT_CONTENT, context, use_cache=use_cache)
+        return time.perf_counter() - started
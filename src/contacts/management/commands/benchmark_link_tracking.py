@@ -0,0 +1,81 @@
+"""
+Management command to benchmark click and open tracking.
+
+Rewrites a rendered newsletter for many messages by parsing each one with
+BeautifulSoup, as tracking used to, and by splicing tracking URLs into the
+cached ``LinkRewritePlan`` rewrite points, and reports both timings.
+"""
+import time
+import uuid
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand
+
+from contacts.email_utils import (
+    LinkRewritePlan, _create_tracking_url, generate_tracking_pixel, render_email_template
+)
+from contacts.models import EmailMessage
+
+FOOTER = """
+<p>Hello {{ first_name }}, see <a class="btn" href="https://example.com/offer?a=1&amp;b=2">the offer</a>.</p>
+<p><a href='{{ profile_url }}' target="_blank">Your profile</a></p>
+<p><a href="mailto:support@example.com">Email us</a> or <a href="#top">back to top</a></p>
+<p><a href="{{ unsubscribe_url }}">Unsubscribe</a></p>
+"""
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-message link tracking: BeautifulSoup parse vs cached splice'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--messages',
+            type=int,
+            default=1000,
+            help='Number of messages to track (default: 1000)'
+        )
+        parser.add_argument(
+            '--links',
+            type=int,
+            default=20,
+            help='Item links in the newsletter body (default: 20)'
+        )
+
+    def handle(self, *args, **options):
+        body = ''.join(
+            f'<tr><td><p>Item {i}</p><a href="https://example.com/items/{i}?ref=email">View</a></td></tr>'
+            for i in range(options['links'])
+        )
+        template_string = f'<html><body><table>{body}</table>{FOOTER}</body></html>'
+        context = {
+            'first_name': 'Jane',
+            'profile_url': 'https://example.com/profile/7',
+            'unsubscribe_url': 'https://example.com/unsubscribe/7',
+        }
+        messages = [EmailMessage(id=uuid.uuid4()) for _ in range(options['messages'])]
+
+        plan = LinkRewritePlan(template_string)
+        marked = render_email_template(plan.source, context)
+        rendered = render_email_template(template_string, context)
+
+        started = time.perf_counter()
+        for message in messages:
+            soup = BeautifulSoup(rendered, 'html.parser')
+            for link in soup.find_all('a', href=True):
+                href = link['href']
+                if href.startswith(('mailto:', 'tel:', '#')) or 'unsubscribe' in href.lower():
+                    continue
+                link['href'] = _create_tracking_url(href, message)
+            str(soup).replace('</body>', f'{generate_tracking_pixel(message)}</body>')
+        parsed = time.perf_counter() - started
+        self.stdout.write(f"BeautifulSoup per message: {parsed:.2f}s")
+
+        started = time.perf_counter()
+        for message in messages:
+            plan.apply(marked, message)
+        spliced = time.perf_counter() - started
+        self.stdout.write(f"Spliced rewrite points:    {spliced:.2f}s")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Tracked {len(messages)} messages {parsed / spliced:.1f}x faster by splicing"
+        ))
@@ -0,0 +1,58 @@
+"""
+Management command to recompute contact lead scores in bulk.
+"""
+from django.core.management.base import BaseCommand
+
+from accounts.models import Group
+from contacts.models import Contact
+from contacts.services.contact_scoring import BulkContactScoringEngine
+from contacts.tasks_scoring import score_group_contacts
+
+
+class Command(BaseCommand):
+    help = 'Recompute current_score for contacts in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--group',
+            type=str,
+            help='Specific group name to score (default: all groups)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=BulkContactScoringEngine.DEFAULT_CHUNK_SIZE,
+            help=f'Contacts per chunk (default: {BulkContactScoringEngine.DEFAULT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--async',
+            action='store_true',
+            dest='run_async',
+            help='Queue a Celery task per group instead of scoring in this process'
+        )
+
+    def handle(self, *args, **options):
+        group_name = options.get('group')
+
+        if group_name:
+            groups = Group.objects.filter(name=group_name)
+            if not groups.exists():
+                self.stdout.write(self.style.ERROR(f'Group "{group_name}" not found'))
+                return
+        else:
+            groups = Group.objects.all()
+
+        engine = BulkContactScoringEngine(chunk_size=options['chunk_size'])
+        for group in groups:
+            if options['run_async']:
+                score_group_contacts.delay(str(group.id), None, options['chunk_size'])
+                self.stdout.write(f'Queued scoring for group: {group.name}')
+                continue
+
+            summary = engine.score_queryset(Contact.objects.filter(group=group))
+            self.stdout.write(
+                f"{group.name}: scored {summary['total_scored']} contacts, "
+                f"{summary['updated']} changed ({summary['elapsed_seconds']}s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Successfully scored contacts'))
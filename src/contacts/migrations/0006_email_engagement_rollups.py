@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-16 09:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_initial'),
+        ('contacts', '0005_add_outreach_sequence_models'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailEngagementRollup',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('hour', models.DateTimeField(help_text='Start of the hour (UTC) the counts cover')),
+                ('sent', models.PositiveIntegerField(default=0)),
+                ('delivered', models.PositiveIntegerField(default=0)),
+                ('opens', models.PositiveIntegerField(default=0)),
+                ('unique_opens', models.PositiveIntegerField(default=0)),
+                ('clicks', models.PositiveIntegerField(default=0)),
+                ('unique_clicks', models.PositiveIntegerField(default=0)),
+                ('bounced', models.PositiveIntegerField(default=0)),
+                ('unsubscribed', models.PositiveIntegerField(default=0)),
+                ('complained', models.PositiveIntegerField(default=0)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='engagement_rollups', to='contacts.emailcampaign')),
+                ('group', models.ForeignKey(help_text='Group this record belongs to for multi-tenant access control', on_delete=django.db.models.deletion.CASCADE, to='accounts.group')),
+                ('template', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='engagement_rollups', to='contacts.emailtemplate')),
+            ],
+            options={
+                'verbose_name': 'Email Engagement Rollup',
+                'verbose_name_plural': 'Email Engagement Rollups',
+                'db_table': 'email_engagement_rollups',
+                'ordering': ['hour'],
+                'unique_together': {('campaign', 'template', 'hour')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='emailengagementrollup',
+            index=models.Index(fields=['group', 'hour'], name='email_engag_group_i_dae6bb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailengagementrollup',
+            index=models.Index(fields=['template', 'hour'], name='email_engag_templat_65582f_idx'),
+        ),
+    ]
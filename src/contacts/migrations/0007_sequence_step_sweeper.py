@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-16 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0006_email_engagement_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sequencestepexecution',
+            name='status',
+            field=models.CharField(choices=[('scheduled', 'Scheduled'), ('queued', 'Queued'), ('executing', 'Executing'), ('completed', 'Completed'), ('failed', 'Failed'), ('skipped', 'Skipped')], default='scheduled', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='sequencestepexecution',
+            index=models.Index(fields=['status', 'scheduled_at'], name='sequence_st_status_19b236_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-16 09:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0007_sequence_step_sweeper'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailmessage',
+            name='sequence',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='email_messages', to='contacts.outreachsequence'),
+        ),
+        migrations.AddField(
+            model_name='emailmessage',
+            name='enrollment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='email_messages', to='contacts.sequenceenrollment'),
+        ),
+        migrations.AddField(
+            model_name='emailmessage',
+            name='sequence_step',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='email_messages', to='contacts.sequencestep'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-16 09:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0009_contact_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sequencestep',
+            name='email_campaign',
+            field=models.ForeignKey(blank=True, help_text="Campaign the step's emails are sent and tracked under (created on first send)", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sequence_steps', to='contacts.emailcampaign'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0010_sequence_step_email_campaign'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailevent',
+            index=models.Index(fields=['created_at'], name='email_event_created_a7f2d9_idx'),
+        ),
+    ]
@@ -10,6 +10,7 @@ import uuid
 from datetime import datetime
 from typing import Optional, Dict, Any
 from django.db import models
+from django.utils import timezone
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.validators import MinValueValidator, MaxValueValidator, EmailValidator
@@ -241,6 +242,7 @@ class Contact(PlatformModel, TimestampedModel, UUIDModel):
             models.Index(fields=['group', 'current_score']),
             models.Index(fields=['group', 'last_activity_at']),
             models.Index(fields=['group', 'assigned_to']),
+            models.Index(fields=['group', 'updated_at']),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -306,7 +308,8 @@ class Contact(PlatformModel, TimestampedModel, UUIDModel):
         Calculate lead score based on activities and attributes.
         
         This is a simplified scoring algorithm that can be enhanced
-        with more sophisticated rules and machine learning.
+        with more sophisticated rules and machine learning. To score many
+        contacts, use ``BulkContactScoringEngine``, which applies the same rules.
         """
         score = 0
         
@@ -320,19 +323,20 @@ class Contact(PlatformModel, TimestampedModel, UUIDModel):
         if self.job_title:
             score += 5
         
-        # Engagement scoring
-        activities = self.activities.all()
-        email_opens = activities.filter(activity_type=ActivityType.EMAIL_OPENED).count()
-        email_clicks = activities.filter(activity_type=ActivityType.EMAIL_CLICKED).count()
-        meetings = activities.filter(activity_type=ActivityType.MEETING_COMPLETED).count()
+        # Engagement scoring (one aggregate query)
+        counts = self.activities.aggregate(
+            email_opens=models.Count('id', filter=models.Q(activity_type=ActivityType.EMAIL_OPENED)),
+            email_clicks=models.Count('id', filter=models.Q(activity_type=ActivityType.EMAIL_CLICKED)),
+            meetings=models.Count('id', filter=models.Q(activity_type=ActivityType.MEETING_COMPLETED))
+        )
         
-        score += min(email_opens * 2, 20)  # Max 20 points for email engagement
-        score += min(email_clicks * 5, 25)  # Max 25 points for click engagement
-        score += min(meetings * 15, 30)     # Max 30 points for meetings
+        score += min(counts['email_opens'] * 2, 20)  # Max 20 points for email engagement
+        score += min(counts['email_clicks'] * 5, 25)  # Max 25 points for click engagement
+        score += min(counts['meetings'] * 15, 30)     # Max 30 points for meetings
         
         # Recency boost
         if self.last_activity_at:
-            days_since_activity = (datetime.now() - self.last_activity_at).days
+            days_since_activity = (timezone.now() - self.last_activity_at).days
             if days_since_activity < 7:
                 score += 10
             elif days_since_activity < 30:
@@ -579,22 +583,20 @@ class ContactList(PlatformModel, TimestampedModel, UUIDModel):
         return f"{self.name} ({list_type})"
     
     def get_contact_count(self) -> int:
-        """Get the current number of contacts in this list."""
-        if self.is_dynamic:
-            # TODO: Implement dynamic query based on filter_criteria
-            # For now, return 0 as placeholder
-            return 0
+        """
+        Get the current number of contacts in this list.
+        
+        Dynamic lists count their materialized membership, as of the last refresh.
+        """
         return self.contacts.count()
     
-    def refresh_dynamic_list(self) -> None:
+    def refresh_dynamic_list(self) -> Optional[Dict[str, Any]]:
         """Refresh the dynamic list based on current filter criteria."""
         if not self.is_dynamic:
-            return
+            return None
         
-        # TODO: Implement dynamic list refresh logic
-        # This would query Contact model based on filter_criteria
-        # and update the contacts relationship
-        pass
+        from .services.contact_lists import ContactListService
+        return ContactListService().refresh(self)
 
 
 # Email Campaign Models
@@ -869,6 +871,30 @@ class EmailMessage(PlatformModel, TimestampedModel, UUIDModel):
         on_delete=models.SET_NULL,
         null=True
     )
+    
+    # Outreach sequence linkage (set for sequence emails)
+    sequence = models.ForeignKey(
+        'contacts.OutreachSequence',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='email_messages'
+    )
+    enrollment = models.ForeignKey(
+        'contacts.SequenceEnrollment',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='email_messages'
+    )
+    sequence_step = models.ForeignKey(
+        'contacts.SequenceStep',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='email_messages'
+    )
+    
     subject = models.CharField(max_length=200)
     from_email = models.EmailField()
     to_email = models.EmailField()
@@ -977,12 +1003,61 @@ class EmailEvent(TimestampedModel, UUIDModel):
         indexes = [
             models.Index(fields=['message', 'event_type']),
             models.Index(fields=['timestamp']),
+            models.Index(fields=['created_at']),
         ]
     
     def __str__(self):
         return f"{self.get_event_type_display()} - {self.message.to_email} at {self.timestamp}"
 
 
+class EmailEngagementRollup(PlatformModel, TimestampedModel, UUIDModel):
+    """
+    Hourly email counters per campaign and template.
+    
+    Maintained incrementally as emails are sent and ESP events arrive, so
+    analytics read a few rows per hour instead of scanning messages and
+    events. Rebuild with the ``backfill_email_rollups`` command.
+    """
+    
+    campaign = models.ForeignKey(
+        EmailCampaign,
+        on_delete=models.CASCADE,
+        related_name='engagement_rollups'
+    )
+    template = models.ForeignKey(
+        EmailTemplate,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='engagement_rollups'
+    )
+    hour = models.DateTimeField(help_text="Start of the hour (UTC) the counts cover")
+    
+    # Counters
+    sent = models.PositiveIntegerField(default=0)
+    delivered = models.PositiveIntegerField(default=0)
+    opens = models.PositiveIntegerField(default=0)
+    unique_opens = models.PositiveIntegerField(default=0)
+    clicks = models.PositiveIntegerField(default=0)
+    unique_clicks = models.PositiveIntegerField(default=0)
+    bounced = models.PositiveIntegerField(default=0)
+    unsubscribed = models.PositiveIntegerField(default=0)
+    complained = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'email_engagement_rollups'
+        verbose_name = 'Email Engagement Rollup'
+        verbose_name_plural = 'Email Engagement Rollups'
+        ordering = ['hour']
+        unique_together = [['campaign', 'template', 'hour']]
+        indexes = [
+            models.Index(fields=['group', 'hour']),
+            models.Index(fields=['template', 'hour']),
+        ]
+    
+    def __str__(self):
+        return f"{self.campaign_id} @ {self.hour:%Y-%m-%d %H:00}"
+
+
 # Import outreach sequence models
 from .models_outreach import (
     OutreachSequence,
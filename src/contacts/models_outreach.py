@@ -18,7 +18,7 @@ from django_fsm import FSMField, transition
 
 from ..assessments.base_models import GroupFilteredModel, TimestampedModel, UUIDModel
 from accounts.models import User
-from .models import Contact, ContactList, EmailTemplate
+from .models import Contact, ContactList, EmailCampaign, EmailTemplate
 
 
 class OutreachSequence(GroupFilteredModel, TimestampedModel, UUIDModel):
@@ -229,6 +229,14 @@ class SequenceStep(GroupFilteredModel, TimestampedModel, UUIDModel):
         blank=True,
         help_text="Override template subject (supports variables)"
     )
+    email_campaign = models.ForeignKey(
+        EmailCampaign,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='sequence_steps',
+        help_text="Campaign the step's emails are sent and tracked under (created on first send)"
+    )
     
     # Conditions
     condition_type = models.CharField(
@@ -443,6 +451,7 @@ class SequenceStepExecution(GroupFilteredModel, TimestampedModel, UUIDModel):
     
     class Status(models.TextChoices):
         SCHEDULED = 'scheduled', 'Scheduled'
+        QUEUED = 'queued', 'Queued'
         EXECUTING = 'executing', 'Executing'
         COMPLETED = 'completed', 'Completed'
         FAILED = 'failed', 'Failed'
@@ -491,6 +500,8 @@ class SequenceStepExecution(GroupFilteredModel, TimestampedModel, UUIDModel):
         indexes = [
             models.Index(fields=['group', 'status', 'scheduled_at']),
             models.Index(fields=['enrollment', 'step']),
+            # Due-step sweeper scans across groups
+            models.Index(fields=['status', 'scheduled_at']),
         ]
     
     def __str__(self):
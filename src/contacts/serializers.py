@@ -16,6 +16,7 @@ from .models import (
     ContactStatus, ContactType, RelationshipType, ActivityType,
     EmailTemplate, EmailCampaign, EmailMessage, EmailEvent
 )
+from .services.contact_import import BulkContactImporter, contact_type_errors
 from assessments.models import DevelopmentPartner
 from platform_core.accounts.serializers import UserSerializer
 from accounts.models import GroupMembership
@@ -265,13 +266,7 @@ class ContactImportSerializer(serializers.Serializer):
                     contact_errors[field] = "This field is required."
             
             # Validate contact type specific fields
-            contact_type = contact.get('contact_type', ContactType.INDIVIDUAL)
-            if contact_type == ContactType.INDIVIDUAL:
-                if not contact.get('first_name') and not contact.get('last_name'):
-                    contact_errors['name'] = "Individual contacts need first or last name."
-            elif contact_type == ContactType.COMPANY:
-                if not contact.get('company_name'):
-                    contact_errors['company_name'] = "Company contacts need company name."
+            contact_errors.update(contact_type_errors(contact))
             
             if contact_errors:
                 errors.append({f"contact_{idx}": contact_errors})
@@ -283,57 +278,45 @@ class ContactImportSerializer(serializers.Serializer):
     
     def create(self, validated_data):
         """Bulk create or update contacts."""
-        contacts_data = validated_data['contacts']
-        list_id = validated_data.get('list_id')
-        update_existing = validated_data['update_existing']
-        
         group = get_user_group(self.context['request'].user)
-        created_contacts = []
-        updated_contacts = []
-        skipped_contacts = []
+        contact_list = None
+        if validated_data.get('list_id'):
+            contact_list = ContactList.objects.filter(id=validated_data['list_id'], group=group).first()
         
+        importer = BulkContactImporter(
+            group,
+            update_existing=validated_data['update_existing'],
+            contact_list=contact_list
+        )
         with transaction.atomic():
-            for contact_data in contacts_data:
-                email = contact_data['email']
-                
-                try:
-                    existing_contact = Contact.objects.get(group=group, email=email)
-                    
-                    if update_existing:
-                        # Update existing contact
-                        for key, value in contact_data.items():
-                            if key != 'email' and value is not None:
-                                setattr(existing_contact, key, value)
-                        existing_contact.save()
-                        updated_contacts.append(existing_contact)
-                    else:
-                        skipped_contacts.append(email)
-                    
-                except Contact.DoesNotExist:
-                    # Create new contact
-                    contact_data['group'] = group
-                    contact = Contact.objects.create(**contact_data)
-                    created_contacts.append(contact)
-            
-            # Add to list if specified
-            if list_id and (created_contacts or updated_contacts):
-                try:
-                    contact_list = ContactList.objects.get(
-                        id=list_id,
-                        group=group
-                    )
-                    contact_list.contacts.add(*(created_contacts + updated_contacts))
-                except ContactList.DoesNotExist:
-                    pass
+            result = importer.import_rows(validated_data['contacts'])
         
         return {
-            'created': len(created_contacts),
-            'updated': len(updated_contacts),
-            'skipped': len(skipped_contacts),
-            'skipped_emails': skipped_contacts
+            'created': result['created'],
+            'updated': result['updated'],
+            'skipped': result['skipped'],
+            'skipped_emails': result['skipped_emails'],
+            'errors': result['errors']
         }
 
 
+class ContactImportFileSerializer(serializers.Serializer):
+    """Serializer for a background contact import from an uploaded file."""
+    
+    file = serializers.FileField(help_text="CSV or XLSX file with a header row of contact field names")
+    list_id = serializers.UUIDField(required=False, help_text="Optional list to add contacts to")
+    update_existing = serializers.BooleanField(
+        default=False,
+        help_text="Update existing contacts instead of skipping"
+    )
+    
+    def validate_file(self, value):
+        """Only CSV and XLSX files can be imported."""
+        if not value.name.lower().endswith(('.csv', '.xlsx')):
+            raise serializers.ValidationError("File must be a .csv or .xlsx file.")
+        return value
+
+
 class ContactExportSerializer(serializers.Serializer):
     """Serializer for contact export parameters."""
     
@@ -351,6 +334,10 @@ class ContactExportSerializer(serializers.Serializer):
         required=False,
         help_text="Additional filters to apply"
     )
+    background = serializers.BooleanField(
+        default=False,
+        help_text="Build the file in a background task and download it when complete"
+    )
 
 
 # Email Campaign Serializers
@@ -0,0 +1,150 @@
+"""
+Streaming contact export.
+
+Rows are read with ``values_list().iterator()`` so only one fetch chunk is
+held at a time. CSV is yielded to the client as it is written; XLSX goes
+through a write-only openpyxl workbook into a spooled temporary file.
+Exports too large to wait for run in the background
+(``tasks_export.export_contacts``), with progress kept in the cache and the
+finished file written to default storage.
+"""
+
+import csv
+import io
+import tempfile
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from openpyxl import Workbook
+
+DEFAULT_EXPORT_FIELDS = [
+    'email', 'first_name', 'last_name', 'company_name',
+    'contact_type', 'status', 'current_score', 'city', 'country',
+    'created_at'
+]
+
+EXPORT_FORMATS = {
+    'csv': ('csv', 'text/csv'),
+    'excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+# XLSX files up to this size stay in memory; larger ones spill to disk
+DEFAULT_EXPORT_SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+EXPORT_STATE_TTL = 24 * 60 * 60
+
+
+def export_filename(export_format: str) -> str:
+    """Download file name for an export started now."""
+    extension = EXPORT_FORMATS[export_format][0]
+    return f'contacts_{timezone.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+
+
+def _excel_value(value: Any) -> Any:
+    """Cell value openpyxl can write; datetimes are exported as text."""
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if value is None or isinstance(value, (str, int, float, Decimal, bool)):
+        return value
+    return str(value)
+
+
+class ContactExporter:
+    """
+    Writes a contact queryset as CSV or XLSX without materialising it.
+
+    Unknown ``fields`` raise ``FieldError`` on construction, before any
+    response has started.
+    """
+
+    FETCH_CHUNK_SIZE = 2000
+    CSV_FLUSH_ROWS = 500
+
+    def __init__(self, queryset: QuerySet, fields: Optional[List[str]] = None):
+        self.fields = list(fields or DEFAULT_EXPORT_FIELDS)
+        self.rows = queryset.values_list(*self.fields)
+
+    def iter_rows(self) -> Iterator[tuple]:
+        return self.rows.iterator(chunk_size=self.FETCH_CHUNK_SIZE)
+
+    def iter_csv(self, progress: Callable[[int], None] = None) -> Iterator[str]:
+        """CSV text in blocks of ``CSV_FLUSH_ROWS`` rows, header first."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.fields)
+
+        count = 0
+        for count, row in enumerate(self.iter_rows(), 1):
+            writer.writerow(row)
+            if count % self.CSV_FLUSH_ROWS == 0:
+                yield self._drain(buffer)
+                if progress:
+                    progress(count)
+
+        yield self._drain(buffer)
+        if progress:
+            progress(count)
+
+    def write_excel(self, file_obj, progress: Callable[[int], None] = None) -> int:
+        """Write an XLSX workbook to ``file_obj``; returns the number of rows."""
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Contacts")
+        worksheet.append([field.replace('_', ' ').title() for field in self.fields])
+
+        count = 0
+        for count, row in enumerate(self.iter_rows(), 1):
+            worksheet.append([_excel_value(value) for value in row])
+            if progress and count % self.FETCH_CHUNK_SIZE == 0:
+                progress(count)
+
+        workbook.save(file_obj)
+        if progress:
+            progress(count)
+        return count
+
+    def csv_response(self) -> StreamingHttpResponse:
+        response = StreamingHttpResponse(self.iter_csv(), content_type=EXPORT_FORMATS['csv'][1])
+        response['Content-Disposition'] = f'attachment; filename="{export_filename("csv")}"'
+        return response
+
+    def excel_response(self) -> FileResponse:
+        spool = tempfile.SpooledTemporaryFile(
+            max_size=getattr(settings, 'CONTACT_EXPORT_SPOOL_MAX_BYTES', DEFAULT_EXPORT_SPOOL_MAX_BYTES)
+        )
+        self.write_excel(spool)
+        spool.seek(0)
+        return FileResponse(
+            spool,
+            as_attachment=True,
+            filename=export_filename('excel'),
+            content_type=EXPORT_FORMATS['excel'][1]
+        )
+
+    @staticmethod
+    def _drain(buffer: io.StringIO) -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+
+def _state_key(export_id: str) -> str:
+    return f"contact_export:{export_id}"
+
+
+def get_export_state(export_id: str) -> Optional[Dict[str, Any]]:
+    """Status and progress of a background export, or None if unknown or expired."""
+    return cache.get(_state_key(export_id))
+
+
+def update_export_state(export_id: str, **changes) -> Dict[str, Any]:
+    """Merge ``changes`` into a background export's state."""
+    state = cache.get(_state_key(export_id)) or {}
+    state.update(changes)
+    cache.set(_state_key(export_id), state, timeout=EXPORT_STATE_TTL)
+    return state
@@ -0,0 +1,279 @@
+"""
+Bulk contact import.
+
+Rows are processed in chunks: existing contacts for a chunk are loaded with
+one ``email__in`` query, new contacts are written with ``bulk_create`` and
+changed ones with ``bulk_update``. Invalid rows are reported with their row
+number instead of failing the import. Files too large for a request are
+parsed as a stream by ``tasks_import.import_contacts_file``, with progress
+kept in the cache.
+"""
+
+import csv
+import io
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from ..models import Contact, ContactList, ContactType
+from .contact_lists import ContactListService
+
+logger = logging.getLogger(__name__)
+
+# Editable, non-relational contact fields an import row may set
+IMPORT_FIELDS = frozenset(
+    field.name for field in Contact._meta.concrete_fields
+    if field.editable and not field.is_relation and not field.primary_key
+)
+
+IMPORT_STATE_TTL = 24 * 60 * 60
+
+CONTACT_TYPE_FIELDS = ('contact_type', 'first_name', 'last_name', 'company_name')
+
+
+def contact_type_errors(values: Dict[str, Any]) -> Dict[str, str]:
+    """Errors for the name fields a contact's type requires (individual if unset)."""
+    contact_type = values.get('contact_type') or ContactType.INDIVIDUAL
+    if contact_type == ContactType.INDIVIDUAL:
+        if not values.get('first_name') and not values.get('last_name'):
+            return {'name': "Individual contacts need first or last name."}
+    elif contact_type == ContactType.COMPANY:
+        if not values.get('company_name'):
+            return {'company_name': "Company contacts need company name."}
+    return {}
+
+
+class BulkContactImporter:
+    """
+    Creates and updates a group's contacts from import rows.
+
+    Rows are dicts of contact field values keyed by field name; ``None``
+    values are ignored. An email seen earlier in the same import is
+    reported as a duplicate. Existing contacts are updated only with
+    ``update_existing``, otherwise they are skipped.
+    """
+
+    DEFAULT_CHUNK_SIZE = 1000
+
+    def __init__(self, group, update_existing: bool = False, contact_list: ContactList = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, max_reported: int = None):
+        self.group = group
+        self.update_existing = update_existing
+        self.contact_list = contact_list
+        self.chunk_size = max(int(chunk_size), 1)
+        self.max_reported = max_reported
+        self._seen_emails: Dict[str, int] = {}
+        self.summary = {
+            'processed': 0,
+            'created': 0,
+            'updated': 0,
+            'skipped': 0,
+            'skipped_emails': [],
+            'error_count': 0,
+            'errors': [],
+        }
+
+    def import_rows(self, rows: Iterable[Dict[str, Any]],
+                    progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """
+        Import every row, one chunk at a time, then refresh dynamic lists.
+
+        Row numbers in errors start at 1.
+        """
+        started = time.perf_counter()
+        chunk = []
+        for row_number, row in enumerate(rows, 1):
+            chunk.append((row_number, row))
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+                if progress:
+                    progress(self.summary)
+        if chunk:
+            self.import_chunk(chunk)
+        self.finish()
+        if progress:
+            progress(self.summary)
+
+        self.summary['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"Imported {self.summary['processed']} contact rows for group {self.group.pk}: "
+            f"{self.summary['created']} created, {self.summary['updated']} updated, "
+            f"{self.summary['skipped']} skipped, {self.summary['error_count']} errors "
+            f"in {self.summary['elapsed_seconds']}s"
+        )
+        return self.summary
+
+    def import_chunk(self, rows: List[Tuple[int, Dict[str, Any]]]):
+        """Validate and write one chunk of ``(row_number, row)`` pairs."""
+        cleaned = []
+        for row_number, row in rows:
+            self.summary['processed'] += 1
+            values = self._clean_row(row_number, row)
+            if values is not None:
+                cleaned.append((row_number, values))
+
+        existing = {
+            contact.email: contact
+            for contact in Contact.objects.filter(
+                group=self.group, email__in=[values['email'] for _, values in cleaned]
+            )
+        }
+
+        to_create = []
+        to_update = []
+        update_fields = set()
+        for row_number, values in cleaned:
+            contact = existing.get(values['email'])
+            if contact is None:
+                contact = Contact(group=self.group, **values)
+                if self._validate(row_number, contact, values):
+                    to_create.append(contact)
+            elif not self.update_existing:
+                self.summary['skipped'] += 1
+                self._report('skipped_emails', values['email'])
+            else:
+                for field, value in values.items():
+                    setattr(contact, field, value)
+                if self._validate(row_number, contact, values):
+                    update_fields.update(field for field in values if field != 'email')
+                    to_update.append(contact)
+
+        with transaction.atomic():
+            Contact.objects.bulk_create(to_create, batch_size=self.chunk_size)
+            if to_update and update_fields:
+                now = timezone.now()
+                for contact in to_update:
+                    contact.updated_at = now
+                Contact.objects.bulk_update(
+                    to_update, sorted(update_fields) + ['updated_at'], batch_size=self.chunk_size
+                )
+            if self.contact_list is not None:
+                Membership = ContactList.contacts.through
+                Membership.objects.bulk_create(
+                    [
+                        Membership(contactlist_id=self.contact_list.pk, contact_id=contact.pk)
+                        for contact in to_create + to_update
+                    ],
+                    ignore_conflicts=True
+                )
+
+        self.summary['created'] += len(to_create)
+        self.summary['updated'] += len(to_update)
+
+    def finish(self):
+        """Bring the group's dynamic lists up to date; bulk writes skip the per-contact signal."""
+        if not (self.summary['created'] or self.summary['updated']):
+            return
+
+        service = ContactListService()
+        for contact_list in ContactList.objects.filter(group=self.group, is_dynamic=True):
+            try:
+                service.refresh(contact_list)
+            except ValidationError as e:
+                logger.warning(f"Skipping dynamic list {contact_list.id} with invalid criteria: {str(e)}")
+
+    def _clean_row(self, row_number: int, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        values = {key: value for key, value in row.items() if value is not None}
+
+        unknown = set(values) - IMPORT_FIELDS
+        if unknown:
+            self._error(row_number, values.get('email'), {
+                field: "Unknown contact field." for field in sorted(unknown)
+            })
+            return None
+
+        email = str(values.get('email') or '').strip()
+        if not email:
+            self._error(row_number, None, {'email': "This field is required."})
+            return None
+        values['email'] = email
+
+        first_row = self._seen_emails.setdefault(email, row_number)
+        if first_row != row_number:
+            self._error(row_number, email, {'email': f"Duplicate of row {first_row}."})
+            return None
+        return values
+
+    def _validate(self, row_number: int, contact: Contact, values: Dict[str, Any]) -> bool:
+        """Run the field validators for the values the row supplied and the contact type rules."""
+        errors = contact_type_errors({field: getattr(contact, field) for field in CONTACT_TYPE_FIELDS})
+        try:
+            contact.clean_fields(exclude=[
+                field.name for field in Contact._meta.fields if field.name not in values
+            ])
+        except ValidationError as e:
+            errors.update({
+                field: ' '.join(messages) for field, messages in e.message_dict.items()
+            })
+        if errors:
+            self._error(row_number, values['email'], errors)
+            return False
+        return True
+
+    def _error(self, row_number: int, email: Optional[str], errors: Dict[str, str]):
+        self.summary['error_count'] += 1
+        self._report('errors', {'row': row_number, 'email': email, 'errors': errors})
+
+    def _report(self, key: str, item: Any):
+        if self.max_reported is None or len(self.summary[key]) < self.max_reported:
+            self.summary[key].append(item)
+
+
+def _column_name(header: Any) -> str:
+    """Field name for a file header; exported headers such as "First Name" map back."""
+    return str(header or '').strip().lower().replace(' ', '_')
+
+
+def iter_import_file(file_obj, file_format: str) -> Iterator[Dict[str, Any]]:
+    """
+    Rows of a CSV or XLSX file as dicts keyed by field name, read as a stream.
+
+    Blank cells are returned as ``None`` so they leave existing values alone.
+    """
+    workbook = None
+    if file_format == 'csv':
+        reader = csv.reader(io.TextIOWrapper(file_obj, encoding='utf-8-sig', newline=''))
+    else:
+        workbook = load_workbook(file_obj, read_only=True)
+        reader = workbook.active.iter_rows(values_only=True)
+
+    try:
+        columns = None
+        for values in reader:
+            if columns is None:
+                columns = [_column_name(header) for header in values]
+                continue
+            if not any(value not in (None, '') for value in values):
+                continue
+            yield {
+                column: (None if value == '' else value)
+                for column, value in zip(columns, values)
+                if column
+            }
+    finally:
+        if workbook is not None:
+            workbook.close()
+
+
+def _state_key(import_id: str) -> str:
+    return f"contact_import:{import_id}"
+
+
+def get_import_state(import_id: str) -> Optional[Dict[str, Any]]:
+    """Status and progress counters of a background import, or None if unknown or expired."""
+    return cache.get(_state_key(import_id))
+
+
+def update_import_state(import_id: str, **changes) -> Dict[str, Any]:
+    """Merge ``changes`` into a background import's state."""
+    state = cache.get(_state_key(import_id)) or {}
+    state.update(changes)
+    cache.set(_state_key(import_id), state, timeout=IMPORT_STATE_TTL)
+    return state
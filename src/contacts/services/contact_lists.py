@@ -0,0 +1,175 @@
+"""
+Contact list membership service.
+
+Compiles dynamic list ``filter_criteria`` into Contact querysets using the
+same filters as the contacts API, and keeps each dynamic list's materialized
+membership (its ``contacts`` relation) in step with those criteria.
+"""
+import logging
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+import django_filters
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import QuerySet
+
+from ..filters import ContactFilter
+from ..models import Contact, ContactList
+
+logger = logging.getLogger(__name__)
+
+# Contact fields each ContactFilter criterion reads; keep in step with ContactFilter
+CRITERIA_FIELDS = {
+    'search': {'email', 'first_name', 'last_name', 'company_name', 'notes'},
+    'status': {'status'},
+    'contact_type': {'contact_type'},
+    'score_min': {'current_score'},
+    'score_max': {'current_score'},
+    'city': {'city'},
+    'country': {'country'},
+    'source': {'source'},
+    'assigned_to': {'assigned_to'},
+    'unassigned': {'assigned_to'},
+    'has_activity': {'last_activity_at'},
+    'last_activity_days': {'last_activity_at'},
+    'created_after': {'created_at'},
+    'created_before': {'created_at'},
+    'email_opt_in': {'email_opt_in'},
+    'sms_opt_in': {'sms_opt_in'},
+    'tags': {'tags'},
+    # Reads ContactPartner rows, which do not save the contact
+    'partner': set(),
+}
+# Every list is scoped to the contact's group
+LIST_SCOPE_FIELDS = {'group'}
+# Saves touching none of these cannot change any list's membership
+MEMBERSHIP_FIELDS = frozenset(LIST_SCOPE_FIELDS.union(*CRITERIA_FIELDS.values()))
+
+
+class ContactListService:
+    """
+    Service for dynamic contact list membership.
+
+    Membership is refreshed incrementally: only contacts that started or
+    stopped matching are inserted or deleted, and all set arithmetic happens
+    in the database.
+    """
+
+    INSERT_BATCH_SIZE = 1000
+
+    def compile_criteria(self, contact_list: ContactList) -> QuerySet:
+        """
+        Contacts in the list's group matching its ``filter_criteria``.
+
+        Criteria keys are the ``ContactFilter`` parameters accepted by the
+        contacts API, e.g. ``{"status": ["lead", "qualified"], "city": "Leeds"}``.
+
+        Raises:
+            ValidationError: If the criteria contain unknown keys or invalid values
+        """
+        criteria = dict(contact_list.filter_criteria or {})
+        queryset = Contact.objects.filter(group_id=contact_list.group_id)
+
+        unknown = set(criteria) - set(ContactFilter.base_filters)
+        if unknown:
+            raise ValidationError(f"Unknown filter criteria: {', '.join(sorted(unknown))}")
+
+        # Multiple-choice filters expect lists; allow a single value as well
+        for name, value in criteria.items():
+            multiple = isinstance(ContactFilter.base_filters[name], django_filters.MultipleChoiceFilter)
+            if multiple and not isinstance(value, (list, tuple)):
+                criteria[name] = [value]
+
+        filterset = ContactFilter(data=criteria, queryset=queryset)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        return filterset.qs
+
+    def refresh(self, contact_list: ContactList) -> Dict[str, Any]:
+        """
+        Bring a dynamic list's membership in line with its criteria.
+
+        Returns:
+            Summary with the number of contacts added and removed and the new total
+        """
+        if not contact_list.is_dynamic:
+            return {'added': 0, 'removed': 0, 'total': contact_list.contacts.count()}
+
+        Membership = ContactList.contacts.through
+        matching = self.compile_criteria(contact_list)
+
+        added = 0
+        with transaction.atomic():
+            removed, _ = Membership.objects.filter(
+                contactlist=contact_list
+            ).exclude(
+                contact_id__in=matching.values('id')
+            ).delete()
+
+            new_ids = matching.exclude(
+                contact_lists=contact_list
+            ).values_list('id', flat=True).iterator(chunk_size=self.INSERT_BATCH_SIZE)
+
+            batch = []
+            for contact_id in new_ids:
+                batch.append(Membership(contactlist_id=contact_list.pk, contact_id=contact_id))
+                if len(batch) >= self.INSERT_BATCH_SIZE:
+                    Membership.objects.bulk_create(batch, ignore_conflicts=True)
+                    added += len(batch)
+                    batch = []
+            if batch:
+                Membership.objects.bulk_create(batch, ignore_conflicts=True)
+                added += len(batch)
+
+        total = contact_list.contacts.count()
+        logger.info(
+            f"Refreshed dynamic list {contact_list.id}: +{added} -{removed} ({total} contacts)"
+        )
+        return {'added': added, 'removed': removed, 'total': total}
+
+    def criteria_fields(self, contact_list: ContactList) -> Optional[FrozenSet[str]]:
+        """Contact fields the list's criteria read, or ``None`` if that is not known."""
+        criteria = contact_list.filter_criteria or {}
+        if not set(criteria) <= set(CRITERIA_FIELDS):
+            return None
+        return frozenset(LIST_SCOPE_FIELDS.union(*(CRITERIA_FIELDS[name] for name in criteria)))
+
+    def refresh_contact(self, contact: Contact,
+                        changed_fields: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Update one contact's membership across its group's dynamic lists.
+
+        With ``changed_fields``, lists whose criteria read none of those
+        fields are left alone.
+
+        Returns:
+            Number of lists the contact joined and left
+        """
+        Membership = ContactList.contacts.through
+        summary = {'joined': 0, 'left': 0}
+        changed_fields = set(changed_fields) if changed_fields is not None else None
+
+        dynamic_lists = ContactList.objects.filter(group_id=contact.group_id, is_dynamic=True)
+        for contact_list in dynamic_lists:
+            if changed_fields is not None:
+                fields = self.criteria_fields(contact_list)
+                if fields is not None and not fields & changed_fields:
+                    continue
+            try:
+                matches = self.compile_criteria(contact_list).filter(pk=contact.pk).exists()
+            except ValidationError as e:
+                logger.warning(f"Skipping dynamic list {contact_list.id} with invalid criteria: {str(e)}")
+                continue
+
+            if matches:
+                _, created = Membership.objects.get_or_create(
+                    contactlist_id=contact_list.pk, contact_id=contact.pk
+                )
+                summary['joined'] += int(created)
+            else:
+                deleted, _ = Membership.objects.filter(
+                    contactlist=contact_list, contact_id=contact.pk
+                ).delete()
+                summary['left'] += deleted
+
+        return summary
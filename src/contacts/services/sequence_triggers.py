@@ -0,0 +1,186 @@
+"""
+Automatic enrollment for outreach sequence triggers.
+
+Each active sequence with an automatic trigger keeps a cursor in the cache:
+the time up to which contact changes (or contact activities, for form and
+custom event triggers) have been evaluated. The cursor trails the clock by
+``OUTREACH_TRIGGER_SETTLE_SECONDS`` so rows committed late by transactions
+that started before a run are not skipped. A run selects, in one query,
+the contacts changed since the cursor that match the trigger conditions
+and are not enrolled yet, and inserts their enrollments with
+``bulk_create``. The unique (sequence, contact) constraint settles races
+with manual enrollment, so a run's cost follows the rows changed since the
+previous run rather than the size of the contact table.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.utils import timezone
+
+from ..models import ActivityType, Contact, ContactActivity
+from ..models_outreach import OutreachSequence, SequenceEnrollment
+
+logger = logging.getLogger(__name__)
+
+TRIGGER_CURSOR_PREFIX = 'outreach:sequence_trigger'
+# Changes from the last this many seconds are left for the next run
+DEFAULT_TRIGGER_SETTLE_SECONDS = 60
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value in (None, '', []):
+        return []
+    return value if isinstance(value, (list, tuple)) else [value]
+
+
+class SequenceTriggerEngine:
+    """
+    Enrolls contacts that meet a sequence's automatic trigger.
+
+    ``trigger_conditions`` keys by trigger type:
+
+    - ``lead_created``: optional ``status``, ``source`` and ``tags`` (all
+      required) of the new contact
+    - ``lead_scored``: ``min_score`` and/or ``max_score`` of ``current_score``
+    - ``tag_added``: ``tag`` or ``tags`` (any of them)
+    - ``form_submitted``: optional ``form_id`` of the form activity
+    - ``custom_event``: ``activity_type`` and optional ``metadata`` the
+      activity's metadata must contain
+    """
+
+    INSERT_BATCH_SIZE = 1000
+
+    def get_cursor(self, sequence: OutreachSequence) -> datetime:
+        """Time up to which the sequence's trigger has been evaluated; its creation time at first."""
+        return cache.get(self._cursor_key(sequence)) or sequence.created_at
+
+    def set_cursor(self, sequence: OutreachSequence, cursor: datetime):
+        cache.set(self._cursor_key(sequence), cursor, timeout=None)
+
+    def matching_contacts(self, sequence: OutreachSequence, since: datetime, until: datetime) -> QuerySet:
+        """
+        Contacts that met the sequence's trigger in ``(since, until]`` and are not enrolled.
+
+        Raises:
+            ValidationError: If the trigger type or its conditions are not supported
+        """
+        conditions = sequence.trigger_conditions or {}
+        trigger_type = sequence.trigger_type
+        TriggerType = OutreachSequence.TriggerType
+        changed = Q(updated_at__gt=since, updated_at__lte=until)
+
+        contacts = Contact.objects.filter(group_id=sequence.group_id, email_opt_in=True)
+
+        if trigger_type == TriggerType.LEAD_CREATED:
+            contacts = contacts.filter(changed, created_at__gt=since)
+            if conditions.get('status'):
+                contacts = contacts.filter(status__in=_as_list(conditions['status']))
+            if conditions.get('source'):
+                contacts = contacts.filter(source=conditions['source'])
+            for tag in _as_list(conditions.get('tags')):
+                contacts = contacts.filter(tags__contains=[tag])
+
+        elif trigger_type == TriggerType.LEAD_SCORED:
+            if conditions.get('min_score') is None and conditions.get('max_score') is None:
+                raise ValidationError("Lead score triggers need 'min_score' or 'max_score'.")
+            contacts = contacts.filter(changed)
+            if conditions.get('min_score') is not None:
+                contacts = contacts.filter(current_score__gte=conditions['min_score'])
+            if conditions.get('max_score') is not None:
+                contacts = contacts.filter(current_score__lte=conditions['max_score'])
+
+        elif trigger_type == TriggerType.TAG_ADDED:
+            tags = _as_list(conditions.get('tag')) + _as_list(conditions.get('tags'))
+            if not tags:
+                raise ValidationError("Tag triggers need a 'tag' or 'tags' condition.")
+            has_tag = Q()
+            for tag in tags:
+                has_tag |= Q(tags__contains=[tag])
+            contacts = contacts.filter(changed).filter(has_tag)
+
+        elif trigger_type in (TriggerType.FORM_SUBMITTED, TriggerType.CUSTOM_EVENT):
+            if trigger_type == TriggerType.FORM_SUBMITTED:
+                activity_type = ActivityType.FORM_SUBMITTED
+            else:
+                activity_type = conditions.get('activity_type')
+                if activity_type not in ActivityType.values:
+                    raise ValidationError("Custom event triggers need a valid 'activity_type'.")
+
+            activities = ContactActivity.objects.filter(
+                group_id=sequence.group_id,
+                activity_type=activity_type,
+                created_at__gt=since,
+                created_at__lte=until
+            )
+            if conditions.get('form_id'):
+                activities = activities.filter(metadata__form_id=conditions['form_id'])
+            if conditions.get('metadata'):
+                activities = activities.filter(metadata__contains=conditions['metadata'])
+            contacts = contacts.filter(pk__in=activities.values('contact_id'))
+
+        else:
+            raise ValidationError(f"Unsupported trigger type: {trigger_type}")
+
+        return contacts.filter(~Exists(
+            SequenceEnrollment.objects.filter(sequence_id=sequence.id, contact_id=OuterRef('pk'))
+        ))
+
+    def enroll(self, sequence: OutreachSequence) -> List[Any]:
+        """
+        Enroll the contacts that met the trigger since the cursor, then move the cursor.
+
+        Returns:
+            IDs of the enrollments created
+        """
+        settle_seconds = getattr(
+            settings, 'OUTREACH_TRIGGER_SETTLE_SECONDS', DEFAULT_TRIGGER_SETTLE_SECONDS
+        )
+        until = timezone.now() - timedelta(seconds=settle_seconds)
+        since = self.get_cursor(sequence)
+        if since >= until:
+            return []
+        contact_ids = list(
+            self.matching_contacts(sequence, since, until).values_list('id', flat=True)
+        )
+
+        created = []
+        if contact_ids:
+            context = {
+                'enrolled_at': until.isoformat(),
+                'enrollment_method': 'trigger',
+                'trigger_type': sequence.trigger_type
+            }
+            enrollments = [
+                SequenceEnrollment(
+                    group_id=sequence.group_id,
+                    sequence=sequence,
+                    contact_id=contact_id,
+                    enrollment_context=context
+                )
+                for contact_id in contact_ids
+            ]
+            with transaction.atomic():
+                SequenceEnrollment.objects.bulk_create(
+                    enrollments, batch_size=self.INSERT_BATCH_SIZE, ignore_conflicts=True
+                )
+            # Rows skipped as conflicts were enrolled concurrently
+            created = list(SequenceEnrollment.objects.filter(
+                id__in=[enrollment.id for enrollment in enrollments]
+            ).values_list('id', flat=True))
+
+        self.set_cursor(sequence, until)
+        if created:
+            logger.info(
+                f"Enrolled {len(created)} contacts in sequence {sequence.id} "
+                f"from {sequence.trigger_type} trigger"
+            )
+        return created
+
+    def _cursor_key(self, sequence: OutreachSequence) -> str:
+        return f"{TRIGGER_CURSOR_PREFIX}:{sequence.id}"
@@ -0,0 +1,53 @@
+"""
+Signal handlers for contacts.
+
+Frees compiled email templates from the process-wide template cache when
+their ``EmailTemplate`` changes (building the new HTML body's link rewrite
+plan on save), and keeps a saved contact's dynamic list memberships current.
+"""
+
+import logging
+import os
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .email_utils import email_template_cache
+from .models import Contact, EmailTemplate
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=EmailTemplate)
+@receiver(post_delete, sender=EmailTemplate)
+def email_template_changed(sender, instance, **kwargs):
+    """Drop the compiled parts of a saved or deleted template."""
+    email_template_cache.invalidate_template(instance.pk)
+
+
+@receiver(post_save, sender=EmailTemplate)
+def email_template_saved(sender, instance, raw=False, **kwargs):
+    """Find the saved HTML body's tracking rewrite points once, ahead of any send."""
+    if raw or not instance.html_content:
+        return
+    
+    email_template_cache.plan_links(instance)
+
+
+@receiver(post_save, sender=Contact)
+def contact_post_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Re-evaluate the contact against the dynamic lists its saved fields can affect."""
+    if raw or os.environ.get('DISABLE_SIGNALS'):
+        return
+    
+    from .services.contact_lists import MEMBERSHIP_FIELDS, ContactListService
+    
+    # e.g. last_email_opened_at bookkeeping cannot change membership
+    if update_fields is not None and not MEMBERSHIP_FIELDS & set(update_fields):
+        return
+    
+    try:
+        ContactListService().refresh_contact(instance, changed_fields=update_fields)
+    except Exception as e:
+        # Membership is corrected by the next full refresh
+        logger.error(f"Error refreshing dynamic lists for contact {instance.id}: {str(e)}")
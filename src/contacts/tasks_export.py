@@ -0,0 +1,70 @@
+"""
+Celery tasks for background contact export.
+
+Writes the export to a temporary file, stores it in default storage and
+reports progress through ``services.contact_export.update_export_state``.
+"""
+
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from celery import shared_task
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from .filters import ContactFilter
+from .models import Contact
+from .services.contact_export import EXPORT_FORMATS, ContactExporter, update_export_state
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def export_contacts(
+    self,
+    export_id: str,
+    group_ids: List[str],
+    fields: List[str],
+    export_format: str = 'csv',
+    filter_params: Optional[Dict[str, Any]] = None,
+    list_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Export a group's contacts to a file in default storage.
+
+    ``filter_params`` are ``ContactFilter`` query parameters, as accepted
+    by the contact list endpoint.
+    """
+    queryset = Contact.objects.filter(group_id__in=group_ids)
+    if filter_params:
+        queryset = ContactFilter(filter_params, queryset=queryset).qs
+    if list_id:
+        queryset = queryset.filter(contact_lists__id=list_id)
+    queryset = queryset.order_by('pk')
+
+    try:
+        exporter = ContactExporter(queryset, fields)
+        update_export_state(export_id, status='running', total=queryset.count(), processed=0)
+
+        def progress(processed):
+            update_export_state(export_id, processed=processed)
+
+        extension = EXPORT_FORMATS[export_format][0]
+        with tempfile.TemporaryFile() as export_file:
+            if export_format == 'csv':
+                for block in exporter.iter_csv(progress):
+                    export_file.write(block.encode('utf-8'))
+            else:
+                exporter.write_excel(export_file, progress)
+            export_file.seek(0)
+            file_name = f"{export_id}.{extension}"
+            path = default_storage.save(f"exports/contacts/{file_name}", File(export_file, name=file_name))
+    except Exception as e:
+        logger.error(f"Error exporting contacts for export {export_id}: {str(e)}")
+        update_export_state(export_id, status='failed', error=str(e))
+        raise
+
+    state = update_export_state(export_id, status='completed', path=path)
+    logger.info(f"Exported {state.get('processed', 0)} contacts to {path}")
+    return {'status': 'completed', 'export_id': export_id, 'processed': state.get('processed', 0)}
@@ -0,0 +1,69 @@
+"""
+Celery tasks for background contact import.
+
+Parses an uploaded CSV or XLSX file from default storage as a stream,
+imports it in chunks and reports progress through
+``services.contact_import.update_import_state``.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from celery import shared_task
+from django.core.files.storage import default_storage
+
+from accounts.models import Group
+from .models import ContactList
+from .services.contact_import import BulkContactImporter, iter_import_file, update_import_state
+
+logger = logging.getLogger(__name__)
+
+# Per-row details kept in the import state; counts are always complete
+MAX_REPORTED_IMPORT_ROWS = 1000
+
+
+@shared_task(bind=True)
+def import_contacts_file(
+    self,
+    import_id: str,
+    group_id: str,
+    path: str,
+    update_existing: bool = False,
+    list_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Import contacts from a stored CSV or XLSX file into a group."""
+    group = Group.objects.get(pk=group_id)
+    contact_list = None
+    if list_id:
+        contact_list = ContactList.objects.filter(id=list_id, group=group).first()
+
+    importer = BulkContactImporter(
+        group,
+        update_existing=update_existing,
+        contact_list=contact_list,
+        max_reported=MAX_REPORTED_IMPORT_ROWS
+    )
+
+    def progress(summary):
+        update_import_state(import_id, status='running', **summary)
+
+    file_format = 'xlsx' if path.lower().endswith('.xlsx') else 'csv'
+    try:
+        with default_storage.open(path, 'rb') as import_file:
+            summary = importer.import_rows(iter_import_file(import_file, file_format), progress)
+    except Exception as e:
+        logger.error(f"Error importing contacts for import {import_id}: {str(e)}")
+        update_import_state(import_id, status='failed', error=str(e), **importer.summary)
+        raise
+    finally:
+        default_storage.delete(path)
+
+    update_import_state(import_id, status='completed', **summary)
+    return {
+        'status': 'completed',
+        'import_id': import_id,
+        'processed': summary['processed'],
+        'created': summary['created'],
+        'updated': summary['updated'],
+        'error_count': summary['error_count'],
+    }
@@ -2,7 +2,7 @@
 Celery tasks for outreach sequence execution.
 
 This module handles the asynchronous execution of outreach sequences including:
-- Step scheduling and execution
+- Step scheduling and execution (a periodic sweeper dispatches due steps)
 - Email sending through templates
 - Condition evaluation
 - Exit criteria checking
@@ -10,12 +10,19 @@ This module handles the asynchronous execution of outreach sequences including:
 """
 
 import logging
+import re
+import time
+import uuid
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import Count, F, Q
 from django.utils import timezone
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ValidationError
 
 from .models_outreach import (
     OutreachSequence,
@@ -23,116 +30,255 @@ from .models_outreach import (
     SequenceEnrollment,
     SequenceStepExecution
 )
-from .models import EmailMessage, EmailTemplate
+from .models import EmailCampaign, EmailEvent, EmailMessage, EmailTemplate
+from .services.send_schedule import SendTimeScheduler
+from .services.sequence_triggers import SequenceTriggerEngine
 from integrations.services.email import email_service
 from asgiref.sync import async_to_sync
 
 logger = logging.getLogger(__name__)
 
+# {{variable}} placeholders in step subjects
+VARIABLE_PATTERN = re.compile(r'\{\{([^}]+)\}\}')
+
+# Due-step sweeper; sweep_due_sequence_steps runs every minute from Celery beat
+DEFAULT_STEP_SWEEP_BATCH_SIZE = 500
+DEFAULT_STEP_SWEEP_MAX_BATCHES = 20
+# Queued executions no worker has started within this long are dispatched again
+DEFAULT_STEP_QUEUE_TIMEOUT_SECONDS = 15 * 60
+# Executions of one sequence handled by a single execute_step_batch task
+DEFAULT_STEP_EXECUTION_BATCH_SIZE = 50
+STEP_SWEEPER_METRICS_KEY = 'outreach:step_sweeper:metrics'
+
+# update_sequence_analytics counts events ingested up to this many seconds
+# ago, so events still being written are left for the next run
+DEFAULT_ANALYTICS_SETTLE_SECONDS = 60
+SEQUENCE_ANALYTICS_HIGH_WATER_KEY = 'outreach:sequence_analytics:high_water'
+# Held while a run reads and moves the mark; expires if a worker dies
+SEQUENCE_ANALYTICS_LOCK_KEY = 'outreach:sequence_analytics:lock'
+SEQUENCE_ANALYTICS_LOCK_TIMEOUT = 10 * 60
+
 
 @shared_task(bind=True, max_retries=3)
 def execute_sequence_step(self, execution_id: str):
     """
     Execute a single sequence step.
     
-    This task handles the execution of any step type including:
-    - Sending emails
-    - Checking conditions
-    - Waiting periods
-    - Performing actions
+    Runs through ``run_step_executions``, the same path as batches; see
+    ``execute_step_batch``.
     """
     try:
-        with transaction.atomic():
-            execution = SequenceStepExecution.objects.select_for_update().get(
-                id=execution_id
-            )
-            
-            # Skip if already executed
-            if execution.status in [
-                SequenceStepExecution.Status.COMPLETED,
-                SequenceStepExecution.Status.FAILED,
-                SequenceStepExecution.Status.SKIPPED
-            ]:
-                logger.info(
-                    f"Step execution {execution_id} already processed with status: {execution.status}"
-                )
-                return
-            
-            # Update status to executing
-            execution.status = SequenceStepExecution.Status.EXECUTING
-            execution.save()
+        return run_step_executions([execution_id])
+    except Exception as e:
+        logger.error(
+            f"Error executing step {execution_id}: {str(e)}",
+            exc_info=True
+        )
         
-        # Get related objects
+        # Retry if applicable
+        if self.request.retries < self.max_retries:
+            self.retry(countdown=60 * (self.request.retries + 1))
+
+
+@shared_task(bind=True, max_retries=3)
+def execute_step_batch(self, execution_ids: List[str]):
+    """
+    Execute a batch of due step executions, normally of one sequence.
+    
+    Handles any step type, as ``execute_sequence_step`` does.
+    """
+    try:
+        return run_step_executions(execution_ids)
+    except Exception as e:
+        logger.error(
+            f"Error executing batch of {len(execution_ids)} steps: {str(e)}",
+            exc_info=True
+        )
+        
+        # Retry if applicable
+        if self.request.retries < self.max_retries:
+            self.retry(countdown=60 * (self.request.retries + 1))
+
+
+def run_step_executions(execution_ids: Iterable[Any]) -> Dict[str, int]:
+    """
+    Execute step executions together.
+    
+    Executions that are still SCHEDULED or QUEUED are claimed with their
+    enrollment, contact, sequence and step in one query. Each sequence's
+    ordered steps are loaded once and exit conditions are evaluated for
+    the whole batch at once. Execution results, enrollment progress and
+    the next executions are then written with bulk operations.
+    
+    Returns:
+        Counts of executions completed, skipped and failed
+    """
+    summary = {'completed': 0, 'skipped': 0, 'failed': 0}
+    now = timezone.now()
+    
+    with transaction.atomic():
+        executions = list(
+            SequenceStepExecution.objects.select_for_update(skip_locked=True, of=('self',)).filter(
+                id__in=list(execution_ids),
+                status__in=[
+                    SequenceStepExecution.Status.SCHEDULED,
+                    SequenceStepExecution.Status.QUEUED
+                ]
+            ).select_related('enrollment__contact', 'enrollment__sequence', 'step')
+        )
+        if not executions:
+            return summary
+        SequenceStepExecution.objects.filter(
+            id__in=[execution.id for execution in executions]
+        ).update(status=SequenceStepExecution.Status.EXECUTING, updated_at=now)
+    
+    by_sequence = defaultdict(list)
+    for execution in executions:
+        by_sequence[execution.enrollment.sequence_id].append(execution)
+    
+    for sequence_executions in by_sequence.values():
+        try:
+            _run_sequence_executions(sequence_executions, now, summary)
+        except Exception as e:
+            logger.error(
+                f"Error executing {len(sequence_executions)} steps of sequence "
+                f"{sequence_executions[0].enrollment.sequence_id}: {str(e)}",
+                exc_info=True
+            )
+            SequenceStepExecution.objects.filter(
+                id__in=[execution.id for execution in sequence_executions],
+                status=SequenceStepExecution.Status.EXECUTING
+            ).update(status=SequenceStepExecution.Status.FAILED, error_message=str(e))
+            summary['failed'] += len(sequence_executions)
+    
+    return summary
+
+
+def _run_sequence_executions(
+    executions: List[SequenceStepExecution],
+    now: datetime,
+    summary: Dict[str, int]
+):
+    """Execute claimed executions of one sequence and persist the outcome in bulk."""
+    sequence = executions[0].enrollment.sequence
+    steps = ordered_steps(sequence.id)
+    exits = evaluate_exit_conditions([execution.enrollment for execution in executions])
+    finished = [
+        SequenceEnrollment.Status.COMPLETED,
+        SequenceEnrollment.Status.EXITED,
+        SequenceEnrollment.Status.FAILED
+    ]
+    
+    advancing = []
+    sent_by_step = Counter()
+    
+    for execution in executions:
         enrollment = execution.enrollment
         step = execution.step
-        contact = enrollment.contact
+        
+        if enrollment.status in finished:
+            execution.status = SequenceStepExecution.Status.SKIPPED
+            execution.result = {"reason": f"Enrollment {enrollment.status}"}
+            summary['skipped'] += 1
+            continue
         
         # Check exit conditions before executing
-        if should_exit_sequence(enrollment):
+        if enrollment.id in exits:
             logger.info(
                 f"Exit conditions met for enrollment {enrollment.id}, skipping step"
             )
             execution.status = SequenceStepExecution.Status.SKIPPED
             execution.result = {"reason": "Exit conditions met"}
-            execution.save()
-            
-            # Exit the enrollment
             enrollment.exit(
-                reason=SequenceEnrollment.ExitReason.CONDITION_MET,
+                reason=exits[enrollment.id],
                 details="Exit conditions met during step execution"
             )
-            enrollment.save()
-            return
+            summary['skipped'] += 1
+            continue
         
-        # Execute based on step type
-        result = None
-        if step.step_type == SequenceStep.StepType.EMAIL:
-            result = execute_email_step(execution, enrollment, step, contact)
-        elif step.step_type == SequenceStep.StepType.WAIT:
-            result = execute_wait_step(execution, enrollment, step)
-        elif step.step_type == SequenceStep.StepType.CONDITION:
-            result = execute_condition_step(execution, enrollment, step, contact)
-        elif step.step_type == SequenceStep.StepType.ACTION:
-            result = execute_action_step(execution, enrollment, step, contact)
-        elif step.step_type == SequenceStep.StepType.AB_TEST:
-            result = execute_ab_test_step(execution, enrollment, step, contact)
-        else:
-            raise ValueError(f"Unknown step type: {step.step_type}")
+        try:
+            result = execute_step(execution, enrollment, step, enrollment.contact)
+        except Exception as e:
+            logger.error(
+                f"Error executing step {execution.id}: {str(e)}",
+                exc_info=True
+            )
+            execution.status = SequenceStepExecution.Status.FAILED
+            execution.error_message = str(e)
+            summary['failed'] += 1
+            continue
         
-        # Update execution with result
         execution.status = SequenceStepExecution.Status.COMPLETED
         execution.executed_at = timezone.now()
         execution.result = result
-        execution.save()
+        summary['completed'] += 1
         
-        # Update step analytics
         if step.step_type == SequenceStep.StepType.EMAIL and result.get("sent"):
-            step.total_sent += 1
-            step.save()
-        
-        # Schedule next step
-        schedule_next_step(enrollment)
+            sent_by_step[step.id] += 1
         
-    except ObjectDoesNotExist:
-        logger.error(f"Step execution {execution_id} not found")
-    except Exception as e:
-        logger.error(
-            f"Error executing step {execution_id}: {str(e)}",
-            exc_info=True
+        advancing.append(enrollment)
+    
+    next_executions = []
+    completed = converted = 0
+    for enrollment, next_execution in zip(advancing, advance_enrollments(advancing, steps)):
+        if next_execution is None:
+            completed += 1
+            converted += int(enrollment.converted)
+        else:
+            next_executions.append(next_execution)
+    
+    for execution in executions:
+        execution.updated_at = now
+        execution.enrollment.updated_at = now
+    
+    with transaction.atomic():
+        SequenceStepExecution.objects.bulk_update(
+            executions,
+            ['status', 'executed_at', 'result', 'error_message', 'email_message_id', 'updated_at']
+        )
+        SequenceEnrollment.objects.bulk_update(
+            [execution.enrollment for execution in executions],
+            [
+                'status', 'current_step', 'current_step_index', 'next_step_at',
+                'exit_reason', 'exit_details', 'exited_at', 'updated_at'
+            ]
         )
+        SequenceStepExecution.objects.bulk_create(next_executions)
         
-        # Update execution as failed
-        try:
-            execution = SequenceStepExecution.objects.get(id=execution_id)
-            execution.status = SequenceStepExecution.Status.FAILED
-            execution.error_message = str(e)
-            execution.save()
-        except:
-            pass
+        for step_id, sent in sent_by_step.items():
+            SequenceStep.objects.filter(pk=step_id).update(total_sent=F('total_sent') + sent)
+        if completed:
+            OutreachSequence.objects.filter(pk=sequence.pk).update(
+                total_completed=F('total_completed') + completed,
+                total_converted=F('total_converted') + converted
+            )
         
-        # Retry if applicable
-        if self.request.retries < self.max_retries:
-            self.retry(countdown=60 * (self.request.retries + 1))
+        due_now = [
+            execution.id for execution in next_executions
+            if execution.status == SequenceStepExecution.Status.QUEUED
+        ]
+        if due_now:
+            transaction.on_commit(lambda: dispatch_step_executions(due_now))
+
+
+def execute_step(
+    execution: SequenceStepExecution,
+    enrollment: SequenceEnrollment,
+    step: SequenceStep,
+    contact
+) -> Dict[str, Any]:
+    """Execute one step based on its type."""
+    if step.step_type == SequenceStep.StepType.EMAIL:
+        return execute_email_step(execution, enrollment, step, contact)
+    elif step.step_type == SequenceStep.StepType.WAIT:
+        return execute_wait_step(execution, enrollment, step)
+    elif step.step_type == SequenceStep.StepType.CONDITION:
+        return execute_condition_step(execution, enrollment, step, contact)
+    elif step.step_type == SequenceStep.StepType.ACTION:
+        return execute_action_step(execution, enrollment, step, contact)
+    elif step.step_type == SequenceStep.StepType.AB_TEST:
+        return execute_ab_test_step(execution, enrollment, step, contact)
+    raise ValueError(f"Unknown step type: {step.step_type}")
 
 
 def execute_email_step(
@@ -160,18 +306,15 @@ def execute_email_step(
         # Create email message record
         email_message = EmailMessage.objects.create(
             group=contact.group,
+            campaign=step_email_campaign(step),
             from_email=template.from_email or "noreply@enterpriseland.com",
             to_email=contact.email,
             subject=subject or template.subject,
-            template=template,
-            template_data=template_data,
+            template_used=template,
             contact=contact,
-            metadata={
-                "sequence_id": str(enrollment.sequence.id),
-                "enrollment_id": str(enrollment.id),
-                "step_id": str(step.id),
-                "execution_id": str(execution.id)
-            }
+            sequence=enrollment.sequence,
+            enrollment=enrollment,
+            sequence_step=step
         )
         
         # Send email through service
@@ -190,13 +333,12 @@ def execute_email_step(
         
         # Update email message with result
         if result.success:
-            email_message.status = EmailMessage.Status.SENT
+            email_message.status = EmailMessage.MessageStatus.SENT
             email_message.sent_at = result.timestamp
-            email_message.provider_message_id = result.message_id
-            email_message.provider_used = result.provider
+            email_message.message_id = result.message_id or ''
         else:
-            email_message.status = EmailMessage.Status.FAILED
-            email_message.error_message = result.error_message
+            email_message.status = EmailMessage.MessageStatus.FAILED
+            email_message.failed_reason = result.error_message or ''
         
         email_message.save()
         
@@ -221,6 +363,35 @@ def execute_email_step(
         }
 
 
+def step_email_campaign(step: SequenceStep) -> EmailCampaign:
+    """
+    The campaign an EMAIL step's messages belong to, created on first send.
+    
+    Messages need a campaign; one per step keeps a contact to one message
+    per campaign and gives each step campaign-level delivery and
+    engagement tracking.
+    """
+    if step.email_campaign_id:
+        return step.email_campaign
+    
+    with transaction.atomic():
+        locked = SequenceStep.objects.select_for_update().select_related('sequence').get(pk=step.pk)
+        if locked.email_campaign_id is None:
+            locked.email_campaign = EmailCampaign.objects.create(
+                group_id=locked.group_id,
+                name=f"{locked.sequence.name}: {locked.name}"[:200],
+                description=f"Emails sent by step {locked.order} of outreach sequence {locked.sequence.name}",
+                template=step.email_template,
+                status=EmailCampaign.CampaignStatus.SENDING,
+                sending_strategy=EmailCampaign.SendingStrategy.DRIP,
+                created_by=locked.sequence.created_by
+            )
+            SequenceStep.objects.filter(pk=locked.pk).update(email_campaign=locked.email_campaign)
+    
+    step.email_campaign = locked.email_campaign
+    return step.email_campaign
+
+
 def execute_wait_step(
     execution: SequenceStepExecution,
     enrollment: SequenceEnrollment,
@@ -381,39 +552,53 @@ def execute_ab_test_step(
 
 def should_exit_sequence(enrollment: SequenceEnrollment) -> bool:
     """Check if enrollment should exit based on sequence exit conditions."""
-    sequence = enrollment.sequence
-    contact = enrollment.contact
-    
-    # Check unsubscribed
-    if contact.email_preferences.get("unsubscribed", False):
-        return True
-    
-    # Check exit tags
-    if sequence.exit_tags:
-        for tag in sequence.exit_tags:
-            if tag in contact.tags:
-                return True
-    
-    # Check reply (would need email tracking integration)
-    if sequence.exit_on_reply:
-        # Check if contact has replied to any sequence emails
-        pass
-    
-    # Check click
-    if sequence.exit_on_click:
-        from .models import EmailEvent
+    return enrollment.id in evaluate_exit_conditions([enrollment])
+
+
+def evaluate_exit_conditions(enrollments: List[SequenceEnrollment]) -> Dict[Any, str]:
+    """
+    Enrollments that meet their sequence's exit conditions.
+    
+    Contact and enrollment conditions are checked in memory; clicks on the
+    enrollments' sequence emails are found with one indexed query.
+    
+    Returns:
+        ``ExitReason`` keyed by the ID of each enrollment that should exit
+    """
+    exits = {}
+    click_exit_ids = []
+    
+    for enrollment in enrollments:
+        sequence = enrollment.sequence
+        contact = enrollment.contact
+        
+        # Check unsubscribed
+        if not contact.email_opt_in:
+            exits[enrollment.id] = SequenceEnrollment.ExitReason.UNSUBSCRIBED
+        
+        # Check exit tags
+        elif sequence.exit_tags and set(sequence.exit_tags) & set(contact.tags or []):
+            exits[enrollment.id] = SequenceEnrollment.ExitReason.CONDITION_MET
+        
+        # Check conversion
+        elif sequence.exit_on_conversion and enrollment.converted:
+            exits[enrollment.id] = SequenceEnrollment.ExitReason.CONVERTED
+        
+        # Check click
+        elif sequence.exit_on_click:
+            click_exit_ids.append(enrollment.id)
+        
+        # Reply exits need inbound email tracking, which is not available yet
+    
+    if click_exit_ids:
         clicked = EmailEvent.objects.filter(
-            message__metadata__enrollment_id=str(enrollment.id),
+            message__enrollment_id__in=click_exit_ids,
             event_type=EmailEvent.EventType.CLICKED
-        ).exists()
-        if clicked:
-            return True
+        ).order_by().values_list('message__enrollment_id', flat=True).distinct()
+        for enrollment_id in clicked:
+            exits[enrollment_id] = SequenceEnrollment.ExitReason.CLICKED
     
-    # Check conversion
-    if sequence.exit_on_conversion and enrollment.converted:
-        return True
-    
-    return False
+    return exits
 
 
 def build_template_data(
@@ -426,8 +611,8 @@ def build_template_data(
         "first_name": contact.first_name,
         "last_name": contact.last_name,
         "email": contact.email,
-        "company": contact.company,
-        "title": contact.title,
+        "company": contact.company_name,
+        "title": contact.job_title,
         
         # Custom variables from enrollment
         **enrollment.custom_variables,
@@ -451,74 +636,106 @@ def build_template_data(
 
 def replace_variables(text: str, variables: Dict[str, Any]) -> str:
     """Replace {{variable}} placeholders in text."""
-    import re
-    
     def replacer(match):
         var_name = match.group(1).strip()
         return str(variables.get(var_name, match.group(0)))
     
-    return re.sub(r'\{\{([^}]+)\}\}', replacer, text)
+    return VARIABLE_PATTERN.sub(replacer, text)
 
 
-def schedule_next_step(enrollment: SequenceEnrollment):
-    """Schedule the next step in the sequence."""
-    try:
-        # Get current sequence steps
-        steps = enrollment.sequence.steps.order_by('order')
-        
-        # Find next step
-        current_index = enrollment.current_step_index
-        next_step = None
-        
-        for i, step in enumerate(steps):
-            if i > current_index:
-                next_step = step
-                break
+def ordered_steps(sequence_id) -> List[SequenceStep]:
+    """A sequence's steps in execution order."""
+    return list(
+        SequenceStep.objects.filter(sequence_id=sequence_id).select_related('email_template').order_by('order')
+    )
+
+
+def advance_enrollment(
+    enrollment: SequenceEnrollment,
+    steps: List[SequenceStep]
+) -> Optional[SequenceStepExecution]:
+    """Move ``enrollment`` on to its next step, in memory; see ``advance_enrollments``."""
+    return advance_enrollments([enrollment], steps)[0]
+
+
+def advance_enrollments(
+    enrollments: List[SequenceEnrollment],
+    steps: List[SequenceStep],
+    scheduler: Optional[SendTimeScheduler] = None
+) -> List[Optional[SequenceStepExecution]]:
+    """
+    Move enrollments of one sequence on to their next steps, in memory.
+    
+    An enrollment that has not started yet (no current step at index 0)
+    starts with the first step. Execution times for all enrollments are
+    computed in one ``SendTimeScheduler`` call.
+    
+    Returns:
+        For each enrollment, the unsaved execution of its next step, QUEUED
+        if it is due already, or None if the enrollment completed
+    """
+    advancing = []
+    for enrollment in enrollments:
+        if enrollment.current_step_id is None and enrollment.current_step_index == 0:
+            next_index = 0
+        else:
+            next_index = enrollment.current_step_index + 1
         
-        if not next_step:
-            # No more steps - complete enrollment
+        if next_index >= len(steps):
             enrollment.complete()
-            enrollment.save()
-            
-            # Update sequence analytics
-            sequence = enrollment.sequence
-            sequence.total_completed += 1
-            if enrollment.converted:
-                sequence.total_converted += 1
-            sequence.save()
-            
-            logger.info(f"Enrollment {enrollment.id} completed")
-            return
-        
-        # Calculate next execution time
-        next_execution_time = calculate_next_execution_time(
-            enrollment,
-            next_step
-        )
-        
-        # Update enrollment
+        else:
+            advancing.append((enrollment, next_index))
+    
+    next_execution_times = (scheduler or SendTimeScheduler()).schedule(
+        [(enrollment, steps[next_index]) for enrollment, next_index in advancing]
+    )
+    
+    executions = {}
+    now = timezone.now()
+    for (enrollment, next_index), next_execution_time in zip(advancing, next_execution_times):
+        next_step = steps[next_index]
         enrollment.current_step = next_step
-        enrollment.current_step_index += 1
+        enrollment.current_step_index = next_index
         enrollment.next_step_at = next_execution_time
-        enrollment.save()
         
-        # Create step execution record
-        execution = SequenceStepExecution.objects.create(
+        executions[id(enrollment)] = SequenceStepExecution(
+            group_id=enrollment.group_id,
             enrollment=enrollment,
             step=next_step,
             scheduled_at=next_execution_time,
-            status=SequenceStepExecution.Status.SCHEDULED
+            status=(
+                SequenceStepExecution.Status.QUEUED if next_execution_time <= now
+                else SequenceStepExecution.Status.SCHEDULED
+            )
         )
+    
+    return [executions.get(id(enrollment)) for enrollment in enrollments]
+
+
+def schedule_next_step(enrollment: SequenceEnrollment):
+    """Schedule the next step in the sequence."""
+    try:
+        execution = advance_enrollment(enrollment, ordered_steps(enrollment.sequence_id))
+        enrollment.save()
         
-        # Schedule execution task
-        execute_sequence_step.apply_async(
-            args=[str(execution.id)],
-            eta=next_execution_time
-        )
+        if execution is None:
+            # No more steps - update sequence analytics
+            OutreachSequence.objects.filter(pk=enrollment.sequence_id).update(
+                total_completed=F('total_completed') + 1,
+                total_converted=F('total_converted') + int(enrollment.converted)
+            )
+            logger.info(f"Enrollment {enrollment.id} completed")
+            return
+        
+        # sweep_due_sequence_steps dispatches the execution when due,
+        # unless it is due already
+        execution.save()
+        if execution.status == SequenceStepExecution.Status.QUEUED:
+            transaction.on_commit(lambda: dispatch_step_executions([execution.id]))
         
         logger.info(
-            f"Scheduled next step {next_step.id} for enrollment {enrollment.id} "
-            f"at {next_execution_time}"
+            f"Scheduled next step {execution.step_id} for enrollment {enrollment.id} "
+            f"at {execution.scheduled_at}"
         )
         
     except Exception as e:
@@ -533,67 +750,189 @@ def calculate_next_execution_time(
     step: SequenceStep
 ) -> datetime:
     """Calculate when to execute the next step."""
-    sequence = enrollment.sequence
-    
-    # Start with current time
-    next_time = timezone.now()
-    
-    # Add step delay
-    if step.day_type == SequenceStep.DayType.BUSINESS:
-        # Calculate business days
-        days_added = 0
-        while days_added < step.delay_days:
-            next_time += timedelta(days=1)
-            # Skip weekends if configured
-            if sequence.skip_weekends and next_time.weekday() in [5, 6]:
-                continue
-            days_added += 1
-    else:
-        # Calendar days
-        next_time += timedelta(days=step.delay_days)
-    
-    # Add hours
-    next_time += timedelta(hours=step.delay_hours)
-    
-    # Optimize for timezone if configured
-    if sequence.timezone_optimized:
-        # Set to optimal hour in recipient timezone
-        # This would require timezone detection for the contact
-        next_time = next_time.replace(
-            hour=sequence.optimal_send_hour,
-            minute=0,
-            second=0,
-            microsecond=0
+    return SendTimeScheduler().schedule([(enrollment, step)])[0]
+
+
+def claim_due_step_executions(limit: int, now: datetime = None) -> List[Tuple[Any, datetime]]:
+    """
+    Claim up to ``limit`` due executions, oldest first, by moving them to QUEUED.
+    
+    Rows locked by a concurrent sweeper are skipped rather than waited on,
+    so overlapping sweeps never claim the same execution.
+    
+    Returns:
+        ``(id, scheduled_at)`` of each claimed execution
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = list(
+            SequenceStepExecution.objects.select_for_update(skip_locked=True).filter(
+                status=SequenceStepExecution.Status.SCHEDULED,
+                scheduled_at__lte=now
+            ).order_by('scheduled_at').values_list('id', 'scheduled_at')[:limit]
         )
+        if due:
+            SequenceStepExecution.objects.filter(
+                id__in=[execution_id for execution_id, _ in due]
+            ).update(status=SequenceStepExecution.Status.QUEUED, updated_at=now)
+    return due
+
+
+def requeue_stale_step_executions(limit: int, now: datetime = None) -> List[Any]:
+    """
+    Claim QUEUED executions whose task was lost before a worker started it.
+    
+    Returns:
+        IDs of the executions to dispatch again
+    """
+    now = now or timezone.now()
+    timeout = getattr(
+        settings, 'OUTREACH_STEP_QUEUE_TIMEOUT_SECONDS', DEFAULT_STEP_QUEUE_TIMEOUT_SECONDS
+    )
+    with transaction.atomic():
+        stale = list(
+            SequenceStepExecution.objects.select_for_update(skip_locked=True).filter(
+                status=SequenceStepExecution.Status.QUEUED,
+                updated_at__lt=now - timedelta(seconds=timeout)
+            ).order_by('scheduled_at').values_list('id', flat=True)[:limit]
+        )
+        if stale:
+            SequenceStepExecution.objects.filter(id__in=stale).update(updated_at=now)
+    return stale
+
+
+def dispatch_step_executions(execution_ids: Iterable[Any]):
+    """
+    Hand claimed executions to workers.
+    
+    Executions are grouped by sequence and sent as ``execute_step_batch``
+    tasks of up to ``OUTREACH_STEP_EXECUTION_BATCH_SIZE``.
+    """
+    execution_ids = list(execution_ids)
+    if not execution_ids:
+        return
+    
+    batch_size = getattr(
+        settings, 'OUTREACH_STEP_EXECUTION_BATCH_SIZE', DEFAULT_STEP_EXECUTION_BATCH_SIZE
+    )
+    by_sequence = defaultdict(list)
+    for execution_id, sequence_id in SequenceStepExecution.objects.filter(
+        id__in=execution_ids
+    ).order_by('scheduled_at').values_list('id', 'enrollment__sequence_id'):
+        by_sequence[sequence_id].append(str(execution_id))
+    
+    for sequence_execution_ids in by_sequence.values():
+        for start in range(0, len(sequence_execution_ids), batch_size):
+            execute_step_batch.delay(sequence_execution_ids[start:start + batch_size])
+
+
+@shared_task
+def sweep_due_sequence_steps() -> Dict[str, Any]:
+    """
+    Dispatch every sequence step execution that has fallen due.
+    
+    Replaces one long-ETA broker message per step: executions wait in the
+    database as SCHEDULED and only due ones are sent to workers. Claims are
+    made in batches of ``OUTREACH_STEP_SWEEP_BATCH_SIZE``, up to
+    ``OUTREACH_STEP_SWEEP_MAX_BATCHES`` per run; anything left is picked up
+    by the next run.
+    """
+    started = time.perf_counter()
+    now = timezone.now()
+    batch_size = getattr(settings, 'OUTREACH_STEP_SWEEP_BATCH_SIZE', DEFAULT_STEP_SWEEP_BATCH_SIZE)
+    max_batches = getattr(settings, 'OUTREACH_STEP_SWEEP_MAX_BATCHES', DEFAULT_STEP_SWEEP_MAX_BATCHES)
+    
+    requeued = requeue_stale_step_executions(batch_size, now)
+    dispatch_step_executions(requeued)
+    
+    claimed = 0
+    lag_seconds = 0.0
+    for _ in range(max_batches):
+        due = claim_due_step_executions(batch_size, now)
+        if not due:
+            break
         
-        # If time has passed today, move to tomorrow
-        if next_time <= timezone.now():
-            next_time += timedelta(days=1)
-            
-            # Skip weekend if needed
-            if sequence.skip_weekends and next_time.weekday() in [5, 6]:
-                days_to_monday = 7 - next_time.weekday()
-                next_time += timedelta(days=days_to_monday)
+        claimed += len(due)
+        lag_seconds = max(lag_seconds, (now - due[0][1]).total_seconds())
+        dispatch_step_executions(execution_id for execution_id, _ in due)
+        
+        if len(due) < batch_size:
+            break
+    
+    backlog = SequenceStepExecution.objects.filter(
+        status=SequenceStepExecution.Status.SCHEDULED,
+        scheduled_at__lte=now
+    ).count()
     
-    return next_time
+    metrics = _record_sweep_metrics(
+        now,
+        claimed=claimed,
+        requeued=len(requeued),
+        lag_seconds=round(lag_seconds, 3),
+        backlog=backlog,
+        elapsed_seconds=round(time.perf_counter() - started, 3)
+    )
+    if claimed or requeued:
+        logger.info(
+            f"Dispatched {claimed} due sequence steps ({len(requeued)} re-queued), "
+            f"max lag {metrics['lag_seconds']}s, {backlog} still due"
+        )
+    return metrics
+
+
+def _record_sweep_metrics(now: datetime, **run) -> Dict[str, Any]:
+    """Store the latest sweep's counts with running totals and throughput."""
+    previous = cache.get(STEP_SWEEPER_METRICS_KEY) or {}
+    
+    throughput = None
+    if previous.get('last_run_at'):
+        interval = (now - previous['last_run_at']).total_seconds()
+        if interval > 0:
+            throughput = round(run['claimed'] / interval * 60, 2)
+    
+    metrics = dict(
+        run,
+        last_run_at=now,
+        throughput_per_minute=throughput,
+        total_claimed=previous.get('total_claimed', 0) + run['claimed'],
+        total_requeued=previous.get('total_requeued', 0) + run['requeued'],
+    )
+    cache.set(STEP_SWEEPER_METRICS_KEY, metrics, timeout=None)
+    return metrics
+
+
+def get_step_sweeper_metrics() -> Dict[str, Any]:
+    """
+    Latest sweep metrics plus the live due backlog and its lag.
+    
+    ``oldest_due_lag_seconds`` is how long the oldest undispatched due
+    step has been waiting.
+    """
+    now = timezone.now()
+    due = SequenceStepExecution.objects.filter(
+        status=SequenceStepExecution.Status.SCHEDULED,
+        scheduled_at__lte=now
+    )
+    oldest = due.order_by('scheduled_at').values_list('scheduled_at', flat=True).first()
+    
+    metrics = dict(cache.get(STEP_SWEEPER_METRICS_KEY) or {})
+    metrics.update({
+        'due_backlog': due.count(),
+        'oldest_due_lag_seconds': round((now - oldest).total_seconds(), 3) if oldest else 0.0,
+        'queued': SequenceStepExecution.objects.filter(
+            status=SequenceStepExecution.Status.QUEUED
+        ).count(),
+    })
+    return metrics
 
 
 @shared_task
 def start_sequence_enrollment(enrollment_id: str):
     """Start a sequence enrollment by scheduling the first step."""
     try:
-        enrollment = SequenceEnrollment.objects.get(id=enrollment_id)
-        
-        # Update enrollment count
-        sequence = enrollment.sequence
-        sequence.total_enrolled += 1
-        sequence.save()
-        
-        # Schedule first step
-        schedule_next_step(enrollment)
+        if not start_sequence_enrollments([enrollment_id]):
+            logger.error(f"Enrollment {enrollment_id} not found or already started")
         
-    except ObjectDoesNotExist:
-        logger.error(f"Enrollment {enrollment_id} not found")
     except Exception as e:
         logger.error(
             f"Error starting enrollment {enrollment_id}: {str(e)}",
@@ -601,13 +940,69 @@ def start_sequence_enrollment(enrollment_id: str):
         )
 
 
+def start_sequence_enrollments(enrollment_ids: Iterable[Any]) -> int:
+    """
+    Start enrollments by scheduling their first steps.
+    
+    Each sequence's steps are loaded once; enrollments, first executions
+    and sequence counters are written in bulk. Enrollments that are no
+    longer active or have started already are left alone.
+    
+    Returns:
+        Number of enrollments started
+    """
+    enrollments = list(
+        SequenceEnrollment.objects.filter(
+            id__in=list(enrollment_ids),
+            status=SequenceEnrollment.Status.ACTIVE,
+            current_step__isnull=True,
+            current_step_index=0
+        ).select_related('sequence', 'contact')
+    )
+    
+    by_sequence = defaultdict(list)
+    for enrollment in enrollments:
+        by_sequence[enrollment.sequence_id].append(enrollment)
+    
+    for sequence_id, sequence_enrollments in by_sequence.items():
+        next_executions = advance_enrollments(sequence_enrollments, ordered_steps(sequence_id))
+        executions = [execution for execution in next_executions if execution is not None]
+        completed = len(next_executions) - len(executions)
+        now = timezone.now()
+        for enrollment in sequence_enrollments:
+            enrollment.updated_at = now
+        
+        with transaction.atomic():
+            SequenceEnrollment.objects.bulk_update(
+                sequence_enrollments,
+                [
+                    'status', 'current_step', 'current_step_index', 'next_step_at',
+                    'exit_reason', 'exited_at', 'updated_at'
+                ]
+            )
+            SequenceStepExecution.objects.bulk_create(executions)
+            OutreachSequence.objects.filter(pk=sequence_id).update(
+                total_enrolled=F('total_enrolled') + len(sequence_enrollments),
+                total_completed=F('total_completed') + completed
+            )
+            
+            due_now = [
+                execution.id for execution in executions
+                if execution.status == SequenceStepExecution.Status.QUEUED
+            ]
+            if due_now:
+                transaction.on_commit(lambda due_now=due_now: dispatch_step_executions(due_now))
+    
+    return len(enrollments)
+
+
 @shared_task
 def process_sequence_triggers():
     """
     Process automatic sequence triggers.
     
-    This task runs periodically to check for contacts that should be
-    automatically enrolled in sequences based on trigger conditions.
+    This task runs periodically to enroll contacts that met a sequence's
+    trigger conditions since the previous run; see ``SequenceTriggerEngine``.
     """
     try:
         # Get active sequences with automatic triggers
@@ -617,9 +1012,18 @@ def process_sequence_triggers():
             trigger_type=OutreachSequence.TriggerType.MANUAL
         )
         
+        engine = SequenceTriggerEngine()
+        enrolled = 0
         for sequence in sequences:
-            process_sequence_trigger(sequence)
-            
+            try:
+                enrolled += process_sequence_trigger(sequence, engine)
+            except ValidationError as e:
+                logger.warning(
+                    f"Skipping trigger of sequence {sequence.id} with invalid conditions: {str(e)}"
+                )
+        
+        return enrolled
+        
     except Exception as e:
         logger.error(
             f"Error processing sequence triggers: {str(e)}",
@@ -627,59 +1031,110 @@ def process_sequence_triggers():
         )
 
 
-def process_sequence_trigger(sequence: OutreachSequence):
-    """Process triggers for a single sequence."""
-    # Implementation would depend on trigger type and conditions
-    # This is a placeholder for the trigger processing logic
-    pass
+def process_sequence_trigger(
+    sequence: OutreachSequence,
+    engine: Optional[SequenceTriggerEngine] = None
+) -> int:
+    """
+    Process triggers for a single sequence.
+    
+    Returns:
+        Number of contacts enrolled and started
+    """
+    enrollment_ids = (engine or SequenceTriggerEngine()).enroll(sequence)
+    if not enrollment_ids:
+        return 0
+    return start_sequence_enrollments(enrollment_ids)
 
 
 @shared_task
-def update_sequence_analytics():
+def update_sequence_analytics() -> Dict[str, int]:
     """
-    Update sequence analytics from email events.
+    Add new open and click events to sequence step counters.
     
-    This task runs periodically to update open/click rates for sequence steps.
+    Each run counts the events ingested after the high-water mark left by
+    the previous one. The mark follows ``created_at`` (ingestion time)
+    rather than the provider's event ``timestamp``, so late webhooks and
+    retried batches are still counted. Counts are aggregated per step in
+    the database and applied as ``F()`` increments. Runs are serialized by
+    a cache lock; a run that finds it held does nothing. Without a mark
+    (first run, or the cache was cleared) counting starts from now;
+    ``rebuild_sequence_analytics`` recounts totals from scratch.
     """
+    token = uuid.uuid4().hex
+    if not cache.add(SEQUENCE_ANALYTICS_LOCK_KEY, token, timeout=SEQUENCE_ANALYTICS_LOCK_TIMEOUT):
+        logger.info("Sequence analytics update already running, skipping")
+        return {'steps': 0, 'events': 0}
+    
     try:
-        from .models import EmailEvent
-        
-        # Get recent email events for sequence emails
-        recent_events = EmailEvent.objects.filter(
-            message__metadata__has_key='sequence_id',
-            timestamp__gte=timezone.now() - timedelta(hours=24)
-        ).select_related('message')
-        
-        # Group by step and update counts
-        step_stats = {}
-        for event in recent_events:
-            step_id = event.message.metadata.get('step_id')
-            if not step_id:
-                continue
-                
-            if step_id not in step_stats:
-                step_stats[step_id] = {
-                    'opened': 0,
-                    'clicked': 0
-                }
-            
-            if event.event_type == EmailEvent.EventType.OPENED:
-                step_stats[step_id]['opened'] += 1
-            elif event.event_type == EmailEvent.EventType.CLICKED:
-                step_stats[step_id]['clicked'] += 1
+        settle_seconds = getattr(
+            settings, 'OUTREACH_ANALYTICS_SETTLE_SECONDS', DEFAULT_ANALYTICS_SETTLE_SECONDS
+        )
+        until = timezone.now() - timedelta(seconds=settle_seconds)
+        since = cache.get(SEQUENCE_ANALYTICS_HIGH_WATER_KEY)
+        if since is None or since >= until:
+            if since is None:
+                cache.set(SEQUENCE_ANALYTICS_HIGH_WATER_KEY, until, timeout=None)
+            return {'steps': 0, 'events': 0}
+        
+        counts = list(step_event_counts(created_at__gt=since, created_at__lte=until))
+        with transaction.atomic():
+            for row in counts:
+                SequenceStep.objects.filter(pk=row['message__sequence_step']).update(
+                    total_opened=F('total_opened') + row['opened'],
+                    total_clicked=F('total_clicked') + row['clicked']
+                )
+        cache.set(SEQUENCE_ANALYTICS_HIGH_WATER_KEY, until, timeout=None)
+        
+        return {
+            'steps': len(counts),
+            'events': sum(row['opened'] + row['clicked'] for row in counts)
+        }
         
-        # Update step statistics
-        for step_id, stats in step_stats.items():
-            try:
-                step = SequenceStep.objects.get(id=step_id)
-                step.total_opened += stats['opened']
-                step.total_clicked += stats['clicked']
-                step.save()
-            except SequenceStep.DoesNotExist:
-                pass
-                
     except Exception as e:
         logger.error(
             f"Error updating sequence analytics: {str(e)}",
             exc_info=True
-        )
\ No newline at end of file
+        )
+    finally:
+        if cache.get(SEQUENCE_ANALYTICS_LOCK_KEY) == token:
+            cache.delete(SEQUENCE_ANALYTICS_LOCK_KEY)
+
+
+def rebuild_sequence_analytics() -> int:
+    """
+    Recount every step's open and click totals from its email events.
+    
+    Resets the high-water mark so ``update_sequence_analytics`` carries on
+    from the recount.
+    
+    Returns:
+        Number of steps with events
+    """
+    settle_seconds = getattr(
+        settings, 'OUTREACH_ANALYTICS_SETTLE_SECONDS', DEFAULT_ANALYTICS_SETTLE_SECONDS
+    )
+    until = timezone.now() - timedelta(seconds=settle_seconds)
+    counts = list(step_event_counts(created_at__lte=until))
+    
+    with transaction.atomic():
+        SequenceStep.objects.update(total_opened=0, total_clicked=0)
+        for row in counts:
+            SequenceStep.objects.filter(pk=row['message__sequence_step']).update(
+                total_opened=row['opened'],
+                total_clicked=row['clicked']
+            )
+    cache.set(SEQUENCE_ANALYTICS_HIGH_WATER_KEY, until, timeout=None)
+    return len(counts)
+
+
+def step_event_counts(**event_filters):
+    """Open and click event counts of sequence emails, one row per step."""
+    return EmailEvent.objects.filter(
+        message__sequence_step__isnull=False,
+        event_type__in=[EmailEvent.EventType.OPENED, EmailEvent.EventType.CLICKED],
+        **event_filters
+    ).values('message__sequence_step').annotate(
+        opened=Count('id', filter=Q(event_type=EmailEvent.EventType.OPENED)),
+        clicked=Count('id', filter=Q(event_type=EmailEvent.EventType.CLICKED))
+    ).order_by()
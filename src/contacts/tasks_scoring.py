@@ -0,0 +1,64 @@
+"""
+Celery tasks for bulk contact scoring.
+
+Scores a group's contacts one chunk per task run, re-queueing itself for
+the next chunk so a large group never ties up a worker for long.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from celery import shared_task
+
+from .models import Contact
+from .services.contact_scoring import BulkContactScoringEngine
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def score_group_contacts(
+    self,
+    group_id: str,
+    after: Optional[str] = None,
+    chunk_size: int = BulkContactScoringEngine.DEFAULT_CHUNK_SIZE,
+    totals: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """
+    Recompute ``current_score`` for a group's contacts, one chunk per run.
+
+    ``after`` is the primary key the previous chunk ended on; ``totals``
+    carries the running counts between runs. The run that completes the
+    group refreshes its score-based dynamic lists if any score changed.
+    """
+    totals = totals or {'total_scored': 0, 'updated': 0, 'chunks': 0}
+    engine = BulkContactScoringEngine(chunk_size=chunk_size)
+
+    try:
+        result = engine.score_chunk(Contact.objects.filter(group_id=group_id), after=after)
+    except Exception as e:
+        logger.error(f"Error scoring contacts for group {group_id}: {str(e)}")
+        raise self.retry(exc=e)
+
+    if not result['total_scored']:
+        if totals['updated']:
+            engine.refresh_score_lists([group_id])
+        return dict(totals, status='completed', group_id=group_id)
+
+    totals = {
+        'total_scored': totals['total_scored'] + result['total_scored'],
+        'updated': totals['updated'] + result['updated'],
+        'chunks': totals['chunks'] + 1,
+    }
+
+    if result['total_scored'] < engine.chunk_size:
+        if totals['updated']:
+            engine.refresh_score_lists([group_id])
+        logger.info(
+            f"Scored {totals['total_scored']} contacts for group {group_id} "
+            f"({totals['updated']} changed)"
+        )
+        return dict(totals, status='completed', group_id=group_id)
+
+    score_group_contacts.delay(group_id, str(result['last_id']), chunk_size, totals)
+    return dict(totals, status='continuing', group_id=group_id)
@@ -0,0 +1,360 @@
+"""
+Tests for rate-limited campaign dispatch.
+
+Covers the shared token bucket, message pre-creation in
+send_campaign_emails, the dispatch_campaign_emails tick and batched sending
+with send_email_batch.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.test import TestCase, SimpleTestCase
+
+from accounts.models import Group
+from contacts.email_rate_limit import TokenBucket
+from contacts.email_tasks import (
+    send_campaign_emails, dispatch_campaign_emails, send_single_email,
+    send_email_batch, _dispatch_token_key, _group_sends
+)
+from contacts.models import (
+    Contact, ContactList, EmailTemplate, EmailCampaign, EmailMessage,
+    EmailEvent, ContactActivity, ActivityType
+)
+
+User = get_user_model()
+
+
+class TokenBucketTests(SimpleTestCase):
+    """Test cases for the cache-backed token bucket."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_burst_is_immediate_then_paced(self):
+        """The burst is available now; later tokens follow at the send rate."""
+        bucket = TokenBucket('test', rate_per_hour=3600, capacity=2)
+
+        delays = bucket.reserve(5, within_seconds=60)
+
+        self.assertEqual(len(delays), 5)
+        self.assertEqual(delays[:2], [0.0, 0.0])
+        self.assertAlmostEqual(delays[2], 1.0, places=1)
+        self.assertAlmostEqual(delays[4], 3.0, places=1)
+
+    def test_reservations_share_state(self):
+        """A second bucket on the same key sees the first one's reservations."""
+        TokenBucket('shared', rate_per_hour=60, capacity=1).reserve(10, within_seconds=60)
+
+        delays = TokenBucket('shared', rate_per_hour=60, capacity=1).reserve(10, within_seconds=60)
+
+        self.assertEqual(delays, [])
+
+    def test_window_limits_reservation(self):
+        """Only tokens that become available within the window are reserved."""
+        bucket = TokenBucket('window', rate_per_hour=60, capacity=1)
+
+        delays = bucket.reserve(100, within_seconds=120)
+
+        self.assertEqual(len(delays), 3)
+        self.assertAlmostEqual(delays[-1], 120.0, places=0)
+
+    def test_refund_returns_tokens(self):
+        """Refunded tokens can be reserved again."""
+        bucket = TokenBucket('refund', rate_per_hour=60, capacity=2)
+        bucket.reserve(2, within_seconds=0)
+
+        bucket.refund(2)
+
+        self.assertEqual(bucket.reserve(2, within_seconds=0), [0.0, 0.0])
+
+
+class CampaignTestDataMixin:
+    """A sending campaign with five opted-in recipients."""
+
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name="Dispatch Test Company")
+        self.user = User.objects.create_user(
+            username="dispatch@test.com",
+            email="dispatch@test.com",
+            password="testpass123"
+        )
+        self.template = EmailTemplate.objects.create(
+            group=self.group,
+            name="Dispatch Template",
+            template_type=EmailTemplate.TemplateType.MARKETING,
+            subject="Hello {{ first_name }}",
+            html_content="<p>Hello {{ first_name }}</p>",
+            text_content="Hello {{ first_name }}",
+            from_name="Test Sender",
+            from_email="noreply@test.com",
+            created_by=self.user
+        )
+        self.campaign = EmailCampaign.objects.create(
+            group=self.group,
+            name="Dispatch Campaign",
+            template=self.template,
+            status=EmailCampaign.CampaignStatus.SENDING,
+            send_rate_per_hour=3600,
+            created_by=self.user
+        )
+        self.contact_list = ContactList.objects.create(
+            group=self.group,
+            name="Dispatch List",
+            created_by=self.user
+        )
+        self.contacts = [
+            Contact.objects.create(
+                group=self.group,
+                email=f"recipient{i}@example.com",
+                first_name=f"Recipient{i}",
+                email_opt_in=True,
+                status=Contact.ContactStatus.LEAD
+            )
+            for i in range(5)
+        ]
+        self.contact_list.contacts.add(*self.contacts)
+        self.campaign.contact_lists.add(self.contact_list)
+
+    def _start(self):
+        with patch('contacts.email_tasks.dispatch_campaign_emails.delay') as mock_dispatch:
+            result = send_campaign_emails(str(self.campaign.id))
+        return result, mock_dispatch
+
+
+class CampaignDispatchTests(CampaignTestDataMixin, TestCase):
+    """Test cases for send_campaign_emails and dispatch_campaign_emails."""
+
+    def test_send_campaign_creates_messages_and_hands_off(self):
+        """Messages are pre-created and dispatch is queued without sending."""
+        result, mock_dispatch = self._start()
+
+        self.assertEqual(result['status'], 'dispatching')
+        self.assertEqual(result['total'], 5)
+        self.assertEqual(
+            EmailMessage.objects.filter(
+                campaign=self.campaign, status=EmailMessage.MessageStatus.PENDING
+            ).count(),
+            5
+        )
+        token = cache.get(_dispatch_token_key(self.campaign.id))
+        mock_dispatch.assert_called_once_with(str(self.campaign.id), token)
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.total_recipients, 5)
+
+    def test_send_campaign_is_idempotent(self):
+        """Restarting a campaign doesn't duplicate its messages."""
+        self._start()
+        self._start()
+
+        self.assertEqual(EmailMessage.objects.filter(campaign=self.campaign).count(), 5)
+
+    @patch('contacts.email_tasks.dispatch_campaign_emails.apply_async')
+    @patch('contacts.email_tasks.send_email_batch.apply_async')
+    def test_dispatch_queues_batches_with_countdowns(self, mock_send, mock_reschedule):
+        """Pending messages are queued with rate-limited countdowns and the tick reschedules."""
+        self._start()
+        token = cache.get(_dispatch_token_key(self.campaign.id))
+
+        result = dispatch_campaign_emails(str(self.campaign.id), token)
+
+        # All five slots fall in the burst, so they go out as one batch
+        self.assertEqual(result['queued'], 5)
+        mock_send.assert_called_once()
+        self.assertEqual(len(mock_send.call_args.kwargs['args'][0]), 5)
+        self.assertEqual(mock_send.call_args.kwargs['countdown'], 0.0)
+        self.assertEqual(
+            EmailMessage.objects.filter(
+                campaign=self.campaign, status=EmailMessage.MessageStatus.QUEUED
+            ).count(),
+            5
+        )
+        mock_reschedule.assert_called_once()
+
+    @patch('contacts.email_tasks.dispatch_campaign_emails.apply_async')
+    @patch('contacts.email_tasks.send_email_batch.apply_async')
+    def test_dispatch_respects_send_rate(self, mock_send, mock_reschedule):
+        """A slow campaign releases only the window's worth of sends."""
+        EmailCampaign.objects.filter(pk=self.campaign.pk).update(send_rate_per_hour=60)
+        self._start()
+        token = cache.get(_dispatch_token_key(self.campaign.id))
+
+        result = dispatch_campaign_emails(str(self.campaign.id), token)
+
+        # One token of burst plus one accrued over the 60 second window
+        self.assertEqual(result['queued'], 2)
+        self.assertEqual(
+            EmailMessage.objects.filter(
+                campaign=self.campaign, status=EmailMessage.MessageStatus.PENDING
+            ).count(),
+            3
+        )
+
+    @patch('contacts.email_tasks.send_email_batch.apply_async')
+    def test_dispatch_stops_when_paused(self, mock_send):
+        """A paused campaign releases nothing and the tick chain ends."""
+        self._start()
+        token = cache.get(_dispatch_token_key(self.campaign.id))
+        EmailCampaign.objects.filter(pk=self.campaign.pk).update(
+            status=EmailCampaign.CampaignStatus.PAUSED
+        )
+
+        with patch('contacts.email_tasks.dispatch_campaign_emails.apply_async') as mock_reschedule:
+            result = dispatch_campaign_emails(str(self.campaign.id), token)
+
+        self.assertEqual(result['status'], 'paused')
+        mock_send.assert_not_called()
+        mock_reschedule.assert_not_called()
+
+    @patch('contacts.email_tasks.send_email_batch.apply_async')
+    def test_dispatch_superseded_by_restart(self, mock_send):
+        """A dispatcher from an earlier start stops once the campaign is restarted."""
+        self._start()
+        old_token = cache.get(_dispatch_token_key(self.campaign.id))
+        self._start()
+
+        result = dispatch_campaign_emails(str(self.campaign.id), old_token)
+
+        self.assertEqual(result['status'], 'superseded')
+        mock_send.assert_not_called()
+
+    @patch('contacts.email_tasks._send_campaign_completion_notification')
+    def test_dispatch_completes_campaign(self, mock_notify):
+        """Once every message has been sent the campaign is marked sent."""
+        self._start()
+        token = cache.get(_dispatch_token_key(self.campaign.id))
+        EmailMessage.objects.filter(campaign=self.campaign).update(
+            status=EmailMessage.MessageStatus.SENT
+        )
+
+        result = dispatch_campaign_emails(str(self.campaign.id), token)
+
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual(result['sent'], 5)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, EmailCampaign.CampaignStatus.SENT)
+        self.assertIsNotNone(self.campaign.completed_at)
+        mock_notify.assert_called_once()
+
+    @patch('contacts.email_tasks.get_email_backend')
+    def test_queued_send_returned_when_paused(self, mock_backend):
+        """A send that fires after a pause puts its message back to pending."""
+        self._start()
+        message = EmailMessage.objects.filter(campaign=self.campaign).first()
+        EmailMessage.objects.filter(pk=message.pk).update(status=EmailMessage.MessageStatus.QUEUED)
+        EmailCampaign.objects.filter(pk=self.campaign.pk).update(
+            status=EmailCampaign.CampaignStatus.PAUSED
+        )
+
+        result = send_single_email(str(message.id))
+
+        self.assertEqual(result['status'], 'skipped')
+        mock_backend.assert_not_called()
+        message.refresh_from_db()
+        self.assertEqual(message.status, EmailMessage.MessageStatus.PENDING)
+
+
+class RejectingEmailBackend(LocmemEmailBackend):
+    """Locmem backend that rejects one recipient."""
+
+    rejected = "recipient2@example.com"
+
+    def send_messages(self, messages):
+        if any(self.rejected in message.to for message in messages):
+            raise ConnectionError("Recipient refused")
+        return super().send_messages(messages)
+
+
+class SendEmailBatchTests(CampaignTestDataMixin, TestCase):
+    """Test cases for send_email_batch."""
+
+    def _message_ids(self):
+        self._start()
+        return [
+            str(message_id) for message_id in
+            EmailMessage.objects.filter(campaign=self.campaign).values_list('id', flat=True)
+        ]
+
+    def test_group_sends_by_second(self):
+        """Slots in the same second share a batch that waits for the latest one."""
+        batches = _group_sends(['a', 'b', 'c', 'd'], [0.0, 0.4, 1.2, 2.5])
+
+        self.assertEqual(batches, [(['a', 'b'], 0.4), (['c'], 1.2), (['d'], 2.5)])
+
+    def test_batch_sends_and_records_in_bulk(self):
+        """Every message is sent and its status, activity and event recorded."""
+        result = send_email_batch(self._message_ids())
+
+        self.assertEqual(result['sent'], 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(
+            EmailMessage.objects.filter(
+                campaign=self.campaign, status=EmailMessage.MessageStatus.SENT
+            ).count(),
+            5
+        )
+        self.assertEqual(
+            EmailEvent.objects.filter(
+                message__campaign=self.campaign, event_type=EmailEvent.EventType.SENT
+            ).count(),
+            5
+        )
+        self.assertEqual(
+            ContactActivity.objects.filter(
+                contact__in=self.contacts, activity_type=ActivityType.EMAIL_SENT
+            ).count(),
+            5
+        )
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.emails_sent, 5)
+        self.assertFalse(Contact.objects.filter(
+            id__in=[contact.id for contact in self.contacts], last_email_sent_at__isnull=True
+        ).exists())
+        self.assertFalse(Contact.objects.filter(
+            id__in=[contact.id for contact in self.contacts], last_activity_at__isnull=True
+        ).exists())
+
+    @patch('contacts.email_tasks.send_single_email.apply_async')
+    def test_opted_out_contact_fails_without_retry(self, mock_retry):
+        """Permanent failures are recorded as in send_single_email and not retried."""
+        message_ids = self._message_ids()
+        Contact.objects.filter(pk=self.contacts[0].pk).update(email_opt_in=False)
+
+        result = send_email_batch(message_ids)
+
+        self.assertEqual(result['sent'], 4)
+        self.assertEqual(result['failed'], 1)
+        message = EmailMessage.objects.get(campaign=self.campaign, contact=self.contacts[0])
+        self.assertEqual(message.status, EmailMessage.MessageStatus.FAILED)
+        self.assertEqual(message.failed_reason, "Contact opted out")
+        mock_retry.assert_not_called()
+
+    @patch('contacts.email_tasks.send_single_email.apply_async')
+    @patch('contacts.email_tasks.get_email_backend', lambda: RejectingEmailBackend())
+    def test_rejected_send_fails_alone_and_is_retried(self, mock_retry):
+        """A send error affects only its own message, which stays in flight for its retries."""
+        result = send_email_batch(self._message_ids())
+
+        self.assertEqual(result['sent'], 4)
+        self.assertEqual((result['failed'], result['retrying']), (0, 1))
+        self.assertEqual(len(mail.outbox), 4)
+
+        message = EmailMessage.objects.get(campaign=self.campaign, to_email=RejectingEmailBackend.rejected)
+        self.assertEqual(message.status, EmailMessage.MessageStatus.QUEUED)
+        self.assertEqual(message.failed_reason, "Recipient refused")
+        self.assertTrue(EmailEvent.objects.filter(
+            message=message, event_type=EmailEvent.EventType.FAILED
+        ).exists())
+        mock_retry.assert_called_once_with(args=[str(message.id)], countdown=send_email_batch.default_retry_delay)
+
+        # The campaign is not completed while the retry is pending
+        token = cache.get(_dispatch_token_key(self.campaign.id))
+        with patch('contacts.email_tasks.dispatch_campaign_emails.apply_async'):
+            self.assertEqual(dispatch_campaign_emails(str(self.campaign.id), token)['status'], 'dispatching')
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, EmailCampaign.CampaignStatus.SENDING)
@@ -0,0 +1,91 @@
+"""
+Tests for streaming and background contact export.
+"""
+
+import csv
+import io
+import shutil
+import tempfile
+
+from django.core.exceptions import FieldError
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from openpyxl import load_workbook
+
+from accounts.models import Group
+from contacts.models import Contact
+from contacts.services.contact_export import ContactExporter, get_export_state, update_export_state
+from contacts.tasks_export import export_contacts
+
+
+class ContactExporterTests(TestCase):
+    """Test cases for ContactExporter and the background export task."""
+
+    def setUp(self):
+        self.group = Group.objects.create(name="Export Test Company")
+        for i in range(5):
+            Contact.objects.create(
+                group=self.group,
+                email=f"export{i}@example.com",
+                first_name=f"Export{i}",
+                company_name="Acme, Ltd" if i % 2 else "Initech",
+            )
+        self.queryset = Contact.objects.filter(group=self.group).order_by('email')
+        self.fields = ['email', 'first_name', 'company_name', 'created_at']
+
+    def test_csv_is_streamed_in_blocks(self):
+        """CSV is yielded a few rows at a time and parses back to every contact."""
+        exporter = ContactExporter(self.queryset, self.fields)
+        exporter.CSV_FLUSH_ROWS = 2
+        progress = []
+
+        blocks = list(exporter.iter_csv(progress.append))
+
+        self.assertEqual(len(blocks), 3)
+        self.assertEqual(progress, [2, 4, 5])
+        rows = list(csv.reader(io.StringIO(''.join(blocks))))
+        self.assertEqual(rows[0], self.fields)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[2][:3], ['export1@example.com', 'Export1', 'Acme, Ltd'])
+
+    def test_csv_response_is_streaming(self):
+        """The CSV response streams instead of buffering the whole file."""
+        response = ContactExporter(self.queryset, self.fields).csv_response()
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertIn('export4@example.com', content)
+
+    def test_excel_write_only_workbook(self):
+        """XLSX rows are written with title-cased headers and text datetimes."""
+        output = io.BytesIO()
+        count = ContactExporter(self.queryset, self.fields).write_excel(output)
+
+        self.assertEqual(count, 5)
+        output.seek(0)
+        rows = list(load_workbook(output).active.iter_rows(values_only=True))
+        self.assertEqual(rows[0], ('Email', 'First Name', 'Company Name', 'Created At'))
+        self.assertEqual(rows[1][:3], ('export0@example.com', 'Export0', 'Initech'))
+        self.assertIsInstance(rows[1][3], str)
+
+    def test_unknown_field_rejected_up_front(self):
+        """A bad field fails before any response starts."""
+        with self.assertRaises(FieldError):
+            ContactExporter(self.queryset, ['email', 'no_such_field'])
+
+    def test_background_export_writes_file(self):
+        """The task reports progress and stores the finished file."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        update_export_state('export-1', status='queued', processed=0)
+
+        with override_settings(MEDIA_ROOT=media_root):
+            result = export_contacts('export-1', [str(self.group.id)], self.fields, 'csv')
+
+            state = get_export_state('export-1')
+            self.assertEqual(result['processed'], 5)
+            self.assertEqual((state['status'], state['total'], state['processed']), ('completed', 5, 5))
+            with default_storage.open(state['path']) as export_file:
+                rows = list(csv.reader(io.StringIO(export_file.read().decode('utf-8'))))
+        self.assertEqual(len(rows), 6)
@@ -0,0 +1,97 @@
+"""
+Tests for bulk and background contact import.
+"""
+
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from accounts.models import Group
+from contacts.models import Contact, ContactList
+from contacts.services.contact_import import BulkContactImporter, get_import_state, update_import_state
+from contacts.tasks_import import import_contacts_file
+
+
+class BulkContactImporterTests(TestCase):
+    """Test cases for BulkContactImporter and the background import task."""
+
+    def setUp(self):
+        self.group = Group.objects.create(name="Import Test Company")
+        self.existing = Contact.objects.create(
+            group=self.group, email="existing@example.com", first_name="Old", city="Leeds"
+        )
+        self.contact_list = ContactList.objects.create(group=self.group, name="Imported")
+
+    def test_chunk_queries_do_not_grow_with_rows(self):
+        """A chunk costs the same handful of queries whatever its size."""
+        rows = [{'email': f"new{i}@example.com", 'first_name': f"New{i}"} for i in range(50)]
+        rows.append({'email': "existing@example.com", 'last_name': "Updated"})
+        importer = BulkContactImporter(self.group, update_existing=True, contact_list=self.contact_list)
+
+        # lookup, insert, update, list membership (plus the savepoint pair)
+        with self.assertNumQueries(6):
+            importer.import_chunk(list(enumerate(rows, 1)))
+
+        self.assertEqual((importer.summary['created'], importer.summary['updated']), (50, 1))
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.first_name, self.existing.last_name), ("Old", "Updated"))
+        self.assertEqual(self.contact_list.contacts.count(), 51)
+
+    def test_rows_are_reported_not_raised(self):
+        """Invalid, unknown and duplicate rows are reported by row number."""
+        summary = BulkContactImporter(self.group, chunk_size=2).import_rows([
+            {'email': "ok@example.com", 'first_name': "Ok"},
+            {'email': "not-an-email"},
+            {'email': "bad@example.com", 'favourite_colour': "blue"},
+            {'email': "ok@example.com", 'first_name': "Again"},
+            {'email': "existing@example.com", 'first_name': "Skipped"},
+        ])
+
+        self.assertEqual((summary['processed'], summary['created'], summary['skipped']), (5, 1, 1))
+        self.assertEqual(summary['skipped_emails'], ["existing@example.com"])
+        self.assertEqual([error['row'] for error in summary['errors']], [2, 3, 4])
+        self.assertIn('email', summary['errors'][0]['errors'])
+        self.assertIn('favourite_colour', summary['errors'][1]['errors'])
+        self.assertEqual(summary['errors'][2]['errors']['email'], "Duplicate of row 1.")
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.first_name, "Old")
+
+    def test_contact_type_rules(self):
+        """Individuals need a name and companies a company name, as in the API."""
+        summary = BulkContactImporter(self.group).import_rows([
+            {'email': "nameless@example.com"},
+            {'email': "acme@example.com", 'contact_type': 'company', 'first_name': "Ann"},
+            {'email': "globex@example.com", 'contact_type': 'company', 'company_name': "Globex"},
+        ])
+
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual([error['row'] for error in summary['errors']], [1, 2])
+        self.assertIn('name', summary['errors'][0]['errors'])
+        self.assertIn('company_name', summary['errors'][1]['errors'])
+
+    def test_background_file_import(self):
+        """The task parses the stored CSV, reports counters and removes the upload."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        update_import_state('import-1', status='queued', processed=0)
+
+        with override_settings(MEDIA_ROOT=media_root):
+            path = default_storage.save('imports/contacts/import-1.csv', ContentFile(
+                "Email,First Name,Email Opt In,City\n"
+                "file1@example.com,File,false,\n"
+                "existing@example.com,,,York\n"
+                "\n"
+            ))
+            result = import_contacts_file('import-1', str(self.group.id), path, update_existing=True)
+            self.assertFalse(default_storage.exists(path))
+
+        state = get_import_state('import-1')
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual((state['status'], state['processed'], state['created'], state['updated']),
+                         ('completed', 2, 1, 1))
+        self.assertFalse(Contact.objects.get(email="file1@example.com").email_opt_in)
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.first_name, self.existing.city), ("Old", "York"))
@@ -0,0 +1,155 @@
+"""
+Tests for dynamic contact list membership and campaign recipient resolution.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import Group
+from contacts.email_tasks import _get_campaign_recipients
+from contacts.models import Contact, ContactList, EmailTemplate, EmailCampaign
+from contacts.services.contact_lists import ContactListService
+
+User = get_user_model()
+
+
+class ContactListServiceTests(TestCase):
+    """Test cases for ContactListService."""
+
+    def setUp(self):
+        self.group = Group.objects.create(name="Lists Test Company")
+        self.other_group = Group.objects.create(name="Other Lists Company")
+        self.user = User.objects.create_user(
+            username="lists@test.com",
+            email="lists@test.com",
+            password="testpass123"
+        )
+        self.leeds_lead = self._contact("leeds.lead@example.com", Contact.ContactStatus.LEAD, "Leeds")
+        self.leeds_customer = self._contact("leeds.customer@example.com", Contact.ContactStatus.CUSTOMER, "Leeds")
+        self.york_lead = self._contact("york.lead@example.com", Contact.ContactStatus.LEAD, "York")
+        self.other_lead = self._contact(
+            "other.lead@example.com", Contact.ContactStatus.LEAD, "Leeds", group=self.other_group
+        )
+        self.service = ContactListService()
+
+    def _contact(self, email, status, city, group=None):
+        return Contact.objects.create(
+            group=group or self.group,
+            email=email,
+            first_name=email.split('@')[0],
+            status=status,
+            city=city,
+            email_opt_in=True
+        )
+
+    def _dynamic_list(self, name, criteria):
+        return ContactList.objects.create(
+            group=self.group,
+            name=name,
+            is_dynamic=True,
+            filter_criteria=criteria,
+            created_by=self.user
+        )
+
+    def test_compile_criteria(self):
+        """Criteria compile to a group-scoped Contact queryset."""
+        contact_list = self._dynamic_list("Leeds leads", {'status': 'lead', 'city': 'Leeds'})
+
+        matching = self.service.compile_criteria(contact_list)
+
+        self.assertEqual(list(matching), [self.leeds_lead])
+
+    def test_compile_rejects_unknown_criteria(self):
+        """Unknown criteria keys are reported rather than ignored."""
+        contact_list = self._dynamic_list("Broken", {'favourite_colour': 'blue'})
+
+        with self.assertRaises(ValidationError):
+            self.service.compile_criteria(contact_list)
+
+    def test_refresh_is_incremental(self):
+        """Refresh adds new matches and removes contacts that stopped matching."""
+        contact_list = self._dynamic_list("Leeds", {'city': 'Leeds'})
+
+        summary = self.service.refresh(contact_list)
+        self.assertEqual(summary, {'added': 2, 'removed': 0, 'total': 2})
+
+        contact_list.filter_criteria = {'status': ['lead']}
+        contact_list.save()
+        summary = self.service.refresh(contact_list)
+
+        # leeds_lead stays, leeds_customer leaves, york_lead joins
+        self.assertEqual(summary, {'added': 1, 'removed': 1, 'total': 2})
+        self.assertEqual(
+            set(contact_list.contacts.all()),
+            {self.leeds_lead, self.york_lead}
+        )
+
+    def test_saved_contact_updates_membership(self):
+        """Saving a contact moves it in or out of matching dynamic lists."""
+        contact_list = self._dynamic_list("York", {'city': 'York'})
+        self.service.refresh(contact_list)
+
+        self.leeds_lead.city = 'York'
+        self.leeds_lead.save()
+        self.york_lead.city = 'Leeds'
+        self.york_lead.save()
+
+        self.assertEqual(list(contact_list.contacts.all()), [self.leeds_lead])
+        self.assertEqual(contact_list.get_contact_count(), 1)
+
+    def test_partial_saves_refresh_only_affected_lists(self):
+        """Saves with update_fields skip lists whose criteria read none of them."""
+        york = self._dynamic_list("York", {'city': 'York'})
+        active = self._dynamic_list("Active", {'has_activity': True})
+
+        # Fields no criteria read: no queries beyond the update itself
+        self.york_lead.last_email_opened_at = timezone.now()
+        with self.assertNumQueries(1):
+            self.york_lead.save(update_fields=['last_email_opened_at'])
+
+        # Only the activity list is evaluated
+        with patch.object(
+            ContactListService, 'compile_criteria', wraps=self.service.compile_criteria
+        ) as compile_criteria:
+            self.york_lead.update_last_activity(timezone.now())
+
+        self.assertEqual([call.args[0] for call in compile_criteria.call_args_list], [active])
+        self.assertEqual(list(active.contacts.all()), [self.york_lead])
+        self.assertEqual(york.contacts.count(), 0)
+
+    def test_campaign_recipients_single_query(self):
+        """Recipients combine static and dynamic lists minus exclusions in one query."""
+        template = EmailTemplate.objects.create(
+            group=self.group,
+            name="Recipients Template",
+            template_type=EmailTemplate.TemplateType.MARKETING,
+            subject="Hello",
+            html_content="<p>Hello</p>",
+            text_content="Hello",
+            from_name="Test Sender",
+            from_email="noreply@test.com",
+            created_by=self.user
+        )
+        campaign = EmailCampaign.objects.create(
+            group=self.group,
+            name="Recipients Campaign",
+            template=template,
+            created_by=self.user
+        )
+        static_list = ContactList.objects.create(
+            group=self.group, name="Static", created_by=self.user
+        )
+        static_list.contacts.add(self.york_lead, self.leeds_lead)
+        dynamic_list = self._dynamic_list("Leeds", {'city': 'Leeds'})
+        self.service.refresh(dynamic_list)
+        campaign.contact_lists.add(static_list, dynamic_list)
+        campaign.excluded_contacts.add(self.leeds_customer)
+
+        with self.assertNumQueries(1):
+            recipients = list(_get_campaign_recipients(campaign))
+
+        self.assertEqual(recipients, [self.leeds_lead, self.york_lead])
@@ -0,0 +1,197 @@
+"""
+Tests for bulk contact scoring.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import Group
+from contacts.email_analytics import EmailAnalytics
+from contacts.models import (
+    Contact, ContactActivity, ContactList, ActivityType, EmailTemplate, EmailCampaign, EmailMessage
+)
+from contacts.services.contact_scoring import BulkContactScoringEngine
+from contacts.tasks_scoring import score_group_contacts
+
+User = get_user_model()
+
+
+class BulkContactScoringTests(TestCase):
+    """Test cases for BulkContactScoringEngine."""
+
+    def setUp(self):
+        self.group = Group.objects.create(name="Scoring Test Company")
+        self.user = User.objects.create_user(
+            username="scoring@test.com",
+            email="scoring@test.com",
+            password="testpass123"
+        )
+        template = EmailTemplate.objects.create(
+            group=self.group,
+            name="Scoring Template",
+            template_type=EmailTemplate.TemplateType.MARKETING,
+            subject="Hello",
+            html_content="<p>Hello</p>",
+            text_content="Hello",
+            from_name="Test Sender",
+            from_email="noreply@test.com",
+            created_by=self.user
+        )
+        self.campaign = EmailCampaign.objects.create(
+            group=self.group,
+            name="Scoring Campaign",
+            template=template,
+            created_by=self.user
+        )
+        now = timezone.now()
+
+        self.engaged = Contact.objects.create(
+            group=self.group, email="engaged@example.com",
+            first_name="Eve", last_name="Engaged", company_name="Acme",
+            phone_primary="0113 000 0000", job_title="Director"
+        )
+        self.lukewarm = Contact.objects.create(
+            group=self.group, email="lukewarm@example.com",
+            first_name="Luke"
+        )
+        self.cold = Contact.objects.create(group=self.group, email="cold@example.com")
+        self.contacts = [self.engaged, self.lukewarm, self.cold]
+
+        for activity_type, count in [
+            (ActivityType.EMAIL_OPENED, 12),
+            (ActivityType.EMAIL_CLICKED, 2),
+            (ActivityType.MEETING_COMPLETED, 1),
+        ]:
+            for _ in range(count):
+                self._activity(self.engaged, activity_type)
+        self._activity(self.lukewarm, ActivityType.EMAIL_OPENED)
+
+        # Logging activities touches last_activity_at; set it afterwards
+        Contact.objects.filter(pk=self.engaged.pk).update(last_activity_at=now - timedelta(days=2))
+        Contact.objects.filter(pk=self.lukewarm.pk).update(last_activity_at=now - timedelta(days=20))
+        for contact in self.contacts:
+            contact.refresh_from_db()
+
+        self._message(self.engaged, sent_at=now - timedelta(days=3), open_count=2, click_count=1,
+                      last_opened_at=now - timedelta(days=1))
+        self._message(self.lukewarm, sent_at=now - timedelta(days=10),
+                      status=EmailMessage.MessageStatus.BOUNCED)
+        # Outside the 90-day window
+        self._message(self.cold, sent_at=now - timedelta(days=120), open_count=1,
+                      last_opened_at=now - timedelta(days=119))
+
+        self.engine = BulkContactScoringEngine()
+
+    def _activity(self, contact, activity_type):
+        ContactActivity.objects.create(
+            group=self.group, contact=contact, activity_type=activity_type, subject="Activity"
+        )
+
+    def _message(self, contact, **fields):
+        EmailMessage.objects.create(
+            group=self.group,
+            campaign=self.campaign,
+            contact=contact,
+            template_used=self.campaign.template,
+            subject="Hello",
+            from_email="noreply@test.com",
+            to_email=contact.email,
+            status=fields.pop('status', EmailMessage.MessageStatus.SENT),
+            **fields
+        )
+
+    def _queryset(self):
+        return Contact.objects.filter(pk__in=[contact.pk for contact in self.contacts]).order_by('pk')
+
+    def test_feature_rows_single_query(self):
+        """All scoring inputs for a chunk come from one query."""
+        with self.assertNumQueries(1):
+            rows = self.engine.feature_rows(self._queryset())
+
+        by_id = {row['id']: row for row in rows}
+        engaged = by_id[self.engaged.pk]
+        self.assertEqual((engaged['email_opens'], engaged['email_clicks'], engaged['meetings']), (12, 2, 1))
+        self.assertEqual((engaged['emails_sent'], engaged['emails_opened']), (1, 1))
+        self.assertEqual(by_id[self.cold.pk]['emails_sent'], 0)
+
+    def test_lead_scores_match_calculate_score(self):
+        """Vectorized lead scores equal Contact.calculate_score."""
+        rows = self.engine.feature_rows(self._queryset())
+        scores = dict(zip((row['id'] for row in rows), self.engine.lead_scores(rows)))
+
+        for contact in self.contacts:
+            self.assertEqual(scores[contact.pk], contact.calculate_score())
+        # 30 completeness + 20 opens (capped) + 10 clicks + 15 meeting + 10 recency
+        self.assertEqual(scores[self.engaged.pk], 85)
+
+    def test_engagement_scores_match_single_contact(self):
+        """Bulk engagement scores equal the per-contact EmailAnalytics result."""
+        analytics = EmailAnalytics(group=self.group)
+
+        bulk = {
+            result['contact_id']: result
+            for result in analytics.get_contact_engagement_scores(self._queryset())
+        }
+
+        for contact in self.contacts:
+            single = analytics.get_contact_engagement_score(contact)
+            self.assertEqual(bulk[str(contact.pk)]['engagement_score'], single['engagement_score'])
+        self.assertEqual(bulk[str(self.engaged.pk)]['engagement_score'], 100.0)
+        self.assertEqual(bulk[str(self.cold.pk)]['metrics'], {})
+
+    def test_score_queryset_persists_in_chunks(self):
+        """Scores are written in chunks and only for changed contacts."""
+        engine = BulkContactScoringEngine(chunk_size=2)
+
+        summary = engine.score_queryset(self._queryset())
+
+        self.assertEqual(summary['total_scored'], 3)
+        self.assertEqual(summary['chunks'], 2)
+        for contact in self.contacts:
+            contact.refresh_from_db()
+            self.assertEqual(contact.current_score, contact.calculate_score())
+
+        summary = engine.score_queryset(self._queryset())
+        self.assertEqual(summary['updated'], 0)
+
+    def test_score_queryset_refreshes_score_lists(self):
+        """Dynamic lists on the score are refreshed; other dynamic lists are not."""
+        score_list = ContactList.objects.create(
+            group=self.group, name="Scored", is_dynamic=True,
+            filter_criteria={'score_min': 1}, created_by=self.user
+        )
+        city_list = ContactList.objects.create(
+            group=self.group, name="Leeds", is_dynamic=True,
+            filter_criteria={'city': 'Leeds'}, created_by=self.user
+        )
+        city_list.contacts.add(self.cold)
+
+        BulkContactScoringEngine(chunk_size=2).score_queryset(self._queryset())
+
+        expected = set()
+        for contact in self.contacts:
+            contact.refresh_from_db()
+            if contact.current_score >= 1:
+                expected.add(contact.pk)
+        self.assertTrue(expected)
+        self.assertEqual(set(score_list.contacts.values_list('pk', flat=True)), expected)
+        self.assertEqual(list(city_list.contacts.all()), [self.cold])
+
+    @patch('contacts.tasks_scoring.score_group_contacts.delay')
+    def test_task_continues_with_next_chunk(self, mock_delay):
+        """The task scores one chunk and queues the next."""
+        result = score_group_contacts(str(self.group.id), chunk_size=2)
+
+        self.assertEqual(result['status'], 'continuing')
+        self.assertEqual(result['total_scored'], 2)
+        args = mock_delay.call_args[0]
+        self.assertEqual(args[0], str(self.group.id))
+        self.assertEqual(args[3]['chunks'], 1)
+
+        final = score_group_contacts(*args)
+        self.assertEqual(final['status'], 'completed')
+        self.assertEqual(final['total_scored'], 3)
@@ -0,0 +1,234 @@
+"""
+Tests for batched ESP webhook event ingestion.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import Group
+from contacts.email_events import EmailEventIngestor, email_event_buffer
+from contacts.email_rollups import rollup_hour
+from contacts.email_tasks import enqueue_email_events, flush_email_event_buffer
+from contacts.models import (
+    Contact, EmailTemplate, EmailCampaign, EmailMessage, EmailEvent,
+    ContactActivity, ActivityType
+)
+
+User = get_user_model()
+
+
+class EmailEventIngestorTests(TestCase):
+    """Test cases for EmailEventIngestor."""
+
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name="Events Test Company")
+        self.user = User.objects.create_user(
+            username="events@test.com",
+            email="events@test.com",
+            password="testpass123"
+        )
+        self.template = EmailTemplate.objects.create(
+            group=self.group,
+            name="Events Template",
+            template_type=EmailTemplate.TemplateType.MARKETING,
+            subject="Hello",
+            html_content="<p>Hello</p>",
+            text_content="Hello",
+            from_name="Test Sender",
+            from_email="noreply@test.com",
+            created_by=self.user
+        )
+        self.campaign = EmailCampaign.objects.create(
+            group=self.group,
+            name="Events Campaign",
+            template=self.template,
+            status=EmailCampaign.CampaignStatus.SENDING,
+            created_by=self.user
+        )
+        self.messages = [self._message(i) for i in range(10)]
+        self.ingestor = EmailEventIngestor()
+        self.now = int(timezone.now().timestamp())
+
+    def _message(self, index):
+        contact = Contact.objects.create(
+            group=self.group,
+            email=f"reader{index}@example.com",
+            first_name=f"Reader{index}",
+            email_opt_in=True
+        )
+        return EmailMessage.objects.create(
+            group=self.group,
+            campaign=self.campaign,
+            contact=contact,
+            template_used=self.template,
+            subject="Hello",
+            from_email="noreply@test.com",
+            to_email=contact.email,
+            status=EmailMessage.MessageStatus.SENT,
+            message_id=f"esp-{index}"
+        )
+
+    def _event(self, message, event, offset=0, **extra):
+        return dict({
+            'message_id': message.message_id,
+            'event': event,
+            'timestamp': self.now + offset,
+            'ip': '10.0.0.1',
+            'user_agent': 'Mail/1.0',
+        }, **extra)
+
+    def test_batch_applies_aggregated_changes(self):
+        """Delivery, repeat opens and a click update message and campaign once each."""
+        message = self.messages[0]
+        events = [
+            self._event(message, 'delivered'),
+            self._event(message, 'open', 10),
+            self._event(message, 'open', 120),
+            self._event(message, 'click', 130, url='https://example.com/offer'),
+        ]
+
+        summary = self.ingestor.ingest(events)
+
+        self.assertEqual(summary['processed'], 4)
+        message.refresh_from_db()
+        self.assertEqual(message.status, EmailMessage.MessageStatus.CLICKED)
+        self.assertEqual(message.open_count, 2)
+        self.assertEqual(message.click_count, 1)
+        self.assertEqual(int(message.first_opened_at.timestamp()), self.now + 10)
+        self.assertEqual(int(message.last_opened_at.timestamp()), self.now + 120)
+        self.assertIsNotNone(message.delivered_at)
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.emails_delivered, 1)
+        self.assertEqual(self.campaign.emails_opened, 1)
+        self.assertEqual(self.campaign.emails_clicked, 1)
+
+        self.assertEqual(EmailEvent.objects.filter(message=message).count(), 4)
+        self.assertEqual(
+            set(ContactActivity.objects.filter(contact=message.contact).values_list('activity_type', flat=True)),
+            {ActivityType.EMAIL_OPENED, ActivityType.EMAIL_CLICKED}
+        )
+        message.contact.refresh_from_db()
+        self.assertIsNotNone(message.contact.last_activity_at)
+        self.assertFalse(Contact.objects.filter(
+            email="reader1@example.com", last_activity_at__isnull=False
+        ).exists())
+
+    def test_repeats_are_deduplicated(self):
+        """Redelivered events and rapid repeat opens from one client count once."""
+        message = self.messages[0]
+        events = [
+            self._event(message, 'open', 0, sg_event_id='evt-1'),
+            self._event(message, 'open', 0, sg_event_id='evt-1'),
+            self._event(message, 'open', 5, sg_event_id='evt-2'),
+            self._event(message, 'open', 5, sg_event_id='evt-3', ip='10.0.0.2'),
+        ]
+
+        summary = self.ingestor.ingest(events)
+
+        self.assertEqual(summary['processed'], 2)
+        self.assertEqual(summary['skipped'], 2)
+        message.refresh_from_db()
+        self.assertEqual(message.open_count, 2)
+
+    def test_unique_open_counted_across_batches(self):
+        """A message already opened doesn't count as a unique open again."""
+        self.ingestor.ingest([self._event(self.messages[0], 'open')])
+        self.ingestor.ingest([self._event(self.messages[0], 'open', 300)])
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.emails_opened, 1)
+
+    def test_resolves_internal_ids_and_reports_missing(self):
+        """Events may reference our own message id; unknown ids are reported."""
+        summary = self.ingestor.ingest([
+            {'message_id': str(self.messages[1].id), 'event': 'delivered', 'timestamp': self.now},
+            {'message_id': 'esp-unknown', 'event': 'delivered', 'timestamp': self.now},
+            {'event': 'delivered'},
+        ])
+
+        self.assertEqual(
+            [result['status'] for result in summary['results']],
+            ['processed', 'error', 'skipped']
+        )
+        self.messages[1].refresh_from_db()
+        self.assertEqual(self.messages[1].status, EmailMessage.MessageStatus.DELIVERED)
+
+    def test_hard_bounce_and_unsubscribe_opt_out(self):
+        """Hard bounces opt the contact out; unsubscribes also drop SMS."""
+        self.ingestor.ingest([
+            self._event(self.messages[0], 'bounce', bounce_type='hard', reason='No such user'),
+            self._event(self.messages[1], 'unsubscribe'),
+        ])
+
+        bounced = Contact.objects.get(pk=self.messages[0].contact_id)
+        unsubscribed = Contact.objects.get(pk=self.messages[1].contact_id)
+        self.assertFalse(bounced.email_opt_in)
+        self.assertFalse(unsubscribed.email_opt_in)
+        self.assertFalse(unsubscribed.sms_opt_in)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.emails_bounced, 1)
+        self.assertEqual(self.campaign.emails_unsubscribed, 1)
+
+    def test_query_count_independent_of_events_per_message(self):
+        """Five opens per message cost the same queries as one."""
+        # Keep every event in one rollup hour
+        self.now = int(rollup_hour(timezone.now()).timestamp())
+
+        def count_queries(opens_per_message):
+            events = [
+                self._event(message, 'open', repeat, ip=f"10.0.1.{repeat}")
+                for message in self.messages
+                for repeat in range(opens_per_message)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                self.ingestor.ingest(events)
+            return len(queries)
+
+        single = count_queries(1)
+        EmailMessage.objects.filter(campaign=self.campaign).update(first_opened_at=None)
+        repeated = count_queries(5)
+
+        self.assertEqual(single, repeated)
+
+    @override_settings(EMAIL_EVENT_BUFFER_SECONDS=2)
+    @patch('contacts.email_tasks.flush_email_event_buffer.apply_async')
+    def test_buffered_events_flush_together(self, mock_flush):
+        """Buffered requests schedule one flush, which ingests them all."""
+        enqueue_email_events([self._event(self.messages[0], 'delivered')])
+        enqueue_email_events([self._event(self.messages[1], 'delivered')])
+
+        mock_flush.assert_called_once_with(countdown=2)
+
+        with patch('contacts.email_tasks.process_email_events.delay') as mock_process:
+            summary = flush_email_event_buffer()
+
+        self.assertEqual(summary, {'received': 2, 'batches': 1})
+        mock_process.assert_called_once_with([
+            self._event(self.messages[0], 'delivered'),
+            self._event(self.messages[1], 'delivered'),
+        ])
+        self.assertEqual(email_event_buffer.drain(), [])
+
+    @override_settings(EMAIL_EVENT_BUFFER_SECONDS=2)
+    @patch('contacts.email_tasks.EVENT_INGEST_BATCH_SIZE', 1)
+    @patch('contacts.email_tasks.flush_email_event_buffer.apply_async')
+    def test_failed_flush_keeps_unqueued_events(self, mock_flush):
+        """Events that could not be queued go back into the buffer."""
+        events = [self._event(message, 'delivered') for message in self.messages[:3]]
+        enqueue_email_events(events)
+
+        with patch('contacts.email_tasks.process_email_events.delay') as mock_process:
+            mock_process.side_effect = [None, ConnectionError("broker unavailable")]
+            with self.assertRaises(ConnectionError):
+                flush_email_event_buffer()
+
+        mock_process.assert_any_call(events[:1])
+        self.assertEqual(email_event_buffer.drain(), events[1:])
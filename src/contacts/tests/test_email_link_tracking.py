@@ -0,0 +1,161 @@
+"""
+Tests for single-pass click and open tracking.
+
+Covers LinkRewritePlan marking and splicing, deterministic tracking ids,
+building the plan on template save and equivalence with rewriting each
+message with BeautifulSoup. The ``benchmark_link_tracking`` management
+command times the two.
+"""
+
+import uuid
+
+from bs4 import BeautifulSoup
+from django.contrib.auth import get_user_model
+from django.test import TestCase, SimpleTestCase
+
+from accounts.models import Group
+from contacts.email_utils import (
+    LinkRewritePlan, _create_tracking_url, email_template_cache, generate_tracking_pixel,
+    render_email_template, track_email_links
+)
+from contacts.models import EmailMessage, EmailTemplate
+
+User = get_user_model()
+
+
+LINKS = """
+    <p>Hello {{ first_name }}, see <a class="btn" href="https://example.com/offer?a=1&amp;b=2">the offer</a>.</p>
+    <p><a href='{{ profile_url }}' target="_blank">Your profile</a></p>
+    <p><a href="mailto:support@example.com">Email us</a> or <a href="#top">back to top</a></p>
+    <p><a href="{{ unsubscribe_url }}">Unsubscribe</a></p>
+"""
+HTML_CONTENT = "\n<html>\n<BODY>" + LINKS + "</BODY>\n</html>\n"
+
+
+class LinkRewritePlanTests(SimpleTestCase):
+    """Test cases for LinkRewritePlan."""
+
+    def setUp(self):
+        self.plan = LinkRewritePlan(HTML_CONTENT)
+        self.message = EmailMessage(id=uuid.uuid4())
+        self.context = {
+            'first_name': 'Jane',
+            'profile_url': 'https://example.com/profile/7',
+            'unsubscribe_url': 'https://example.com/unsubscribe/7',
+        }
+
+    def _render(self, **tracking):
+        rendered = render_email_template(self.plan.source, self.context)
+        return self.plan.apply(rendered, self.message, **tracking)
+
+    def test_static_untracked_links_are_not_marked(self):
+        """Only the offer link and the two template-built hrefs are rewrite points."""
+        self.assertEqual(self.plan.link_count, 3)
+
+    def test_links_and_pixel_spliced(self):
+        """Trackable links point at the click endpoint and the pixel precedes </BODY>."""
+        tracked = self._render()
+
+        offer = _create_tracking_url('https://example.com/offer?a=1&b=2', self.message)
+        profile = _create_tracking_url('https://example.com/profile/7', self.message)
+        self.assertIn(f'href="{offer.replace("&", "&amp;")}"', tracked)
+        self.assertIn(f"href='{profile.replace('&', '&amp;')}'", tracked)
+        self.assertIn('href="https://example.com/unsubscribe/7"', tracked)
+        self.assertIn('href="mailto:support@example.com"', tracked)
+        self.assertIn('class="btn"', tracked)
+        self.assertIn(f'{generate_tracking_pixel(self.message)}</BODY>', tracked)
+
+    def test_tracking_disabled_matches_plain_render(self):
+        """With tracking off the output is exactly the unmarked template's render."""
+        self.assertEqual(
+            self._render(track_clicks=False, track_opens=False),
+            render_email_template(HTML_CONTENT, self.context)
+        )
+
+    def test_tracking_ids_are_deterministic(self):
+        """Rewriting the same message twice gives the same ids; another message differs."""
+        self.assertEqual(self._render(), self._render())
+
+        other = EmailMessage(id=uuid.uuid4())
+        self.assertNotEqual(
+            generate_tracking_pixel(self.message), generate_tracking_pixel(other)
+        )
+
+    def test_track_email_links_uses_plan(self):
+        """track_email_links rewrites HTML links without adding a pixel."""
+        tracked = track_email_links(
+            '<p><a href="https://example.com/">Home</a></p>', self.message
+        )
+
+        self.assertEqual(tracked.count('/track/click/'), 1)
+        self.assertNotIn('/track/open/', tracked)
+
+
+class LinkPlanOnSaveTests(TestCase):
+    """Test cases for building the link plan when a template is saved."""
+
+    def setUp(self):
+        email_template_cache.clear()
+        self.group = Group.objects.create(name="Link Tracking Test Company")
+        self.user = User.objects.create_user(
+            username="links@test.com",
+            email="links@test.com",
+            password="testpass123"
+        )
+
+    def test_save_builds_plan(self):
+        """Saving a template parses its HTML so sends only hit the cache."""
+        template = EmailTemplate.objects.create(
+            group=self.group,
+            name="Tracked Template",
+            template_type=EmailTemplate.TemplateType.MARKETING,
+            subject="Hello",
+            html_content=HTML_CONTENT,
+            text_content="Hello",
+            from_name="Test Sender",
+            from_email="noreply@test.com",
+            created_by=self.user
+        )
+        self.assertEqual(email_template_cache.stats()['misses'], 1)
+
+        email_template_cache.plan_links(template)
+        self.assertEqual(email_template_cache.stats()['hits'], 1)
+
+
+class LinkTrackingEquivalenceTests(SimpleTestCase):
+    """Splicing matches rewriting each rendered message with BeautifulSoup."""
+
+    def _soup_rewrite(self, rendered, message):
+        """The per-message BeautifulSoup rewrite that tracking used before plans."""
+        soup = BeautifulSoup(rendered, 'html.parser')
+        for link in soup.find_all('a', href=True):
+            href = link['href']
+            if href.startswith(('mailto:', 'tel:', '#')) or 'unsubscribe' in href.lower():
+                continue
+            link['href'] = _create_tracking_url(href, message)
+        return str(soup).replace('</body>', f'{generate_tracking_pixel(message)}</body>')
+
+    def _hrefs(self, html):
+        return [link['href'] for link in BeautifulSoup(html, 'html.parser').find_all('a', href=True)]
+
+    def test_splice_matches_soup_rewrite(self):
+        """Both rewrites track the same hrefs and put the pixel before </body>."""
+        body = ''.join(
+            f'<tr><td><p>Item {i}</p><a href="https://example.com/items/{i}?ref=email">View</a></td></tr>'
+            for i in range(3)
+        )
+        template_string = f'<html><body><table>{body}</table>{LINKS}</body></html>'
+        context = {
+            'first_name': 'Jane',
+            'profile_url': 'https://example.com/profile/7',
+            'unsubscribe_url': 'https://example.com/unsubscribe/7',
+        }
+        message = EmailMessage(id=uuid.uuid4())
+        plan = LinkRewritePlan(template_string)
+
+        spliced = plan.apply(render_email_template(plan.source, context), message)
+        parsed = self._soup_rewrite(render_email_template(template_string, context), message)
+
+        self.assertEqual(self._hrefs(spliced), self._hrefs(parsed))
+        self.assertEqual(sum('/track/click/' in href for href in self._hrefs(spliced)), 5)
+        self.assertTrue(spliced.rstrip().endswith(f'{generate_tracking_pixel(message)}</body></html>'))
@@ -0,0 +1,179 @@
+"""
+Tests for hourly email engagement rollups.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import Group
+from contacts.email_analytics import EmailAnalytics
+from contacts.email_events import EmailEventIngestor
+from contacts.email_rollups import RollupRecorder, rebuild_rollups, rollup_hour
+from contacts.email_tasks import update_campaign_analytics
+from contacts.models import (
+    Contact, EmailTemplate, EmailCampaign, EmailMessage, EmailEngagementRollup
+)
+
+User = get_user_model()
+
+
+class EmailRollupTests(TestCase):
+    """Test cases for incremental rollups and their readers."""
+
+    def setUp(self):
+        self.group = Group.objects.create(name="Rollups Test Company")
+        self.user = User.objects.create_user(
+            username="rollups@test.com",
+            email="rollups@test.com",
+            password="testpass123"
+        )
+        self.template = EmailTemplate.objects.create(
+            group=self.group,
+            name="Rollups Template",
+            template_type=EmailTemplate.TemplateType.MARKETING,
+            subject="Hello",
+            html_content="<p>Hello</p>",
+            text_content="Hello",
+            from_name="Test Sender",
+            from_email="noreply@test.com",
+            created_by=self.user
+        )
+        self.hour = rollup_hour(timezone.now()) - timedelta(hours=3)
+        self.campaign = EmailCampaign.objects.create(
+            group=self.group,
+            name="Rollups Campaign",
+            template=self.template,
+            status=EmailCampaign.CampaignStatus.SENT,
+            started_at=self.hour,
+            created_by=self.user
+        )
+        self.messages = [self._message(i) for i in range(3)]
+
+    def _message(self, index):
+        contact = Contact.objects.create(
+            group=self.group,
+            email=f"rollup{index}@example.com",
+            first_name=f"Rollup{index}",
+            email_opt_in=True
+        )
+        return EmailMessage.objects.create(
+            group=self.group,
+            campaign=self.campaign,
+            contact=contact,
+            template_used=self.template,
+            subject="Hello",
+            from_email="noreply@test.com",
+            to_email=contact.email,
+            status=EmailMessage.MessageStatus.SENT,
+            sent_at=self.hour,
+            message_id=f"rollup-{index}"
+        )
+
+    def _event(self, message, event, timestamp, **extra):
+        return dict({
+            'message_id': message.message_id,
+            'event': event,
+            'timestamp': int(timestamp.timestamp()),
+        }, **extra)
+
+    def test_ingested_events_update_hourly_rows(self):
+        """Events are counted in the rollup row for their hour."""
+        first_hour = self.hour + timedelta(minutes=10)
+        second_hour = self.hour + timedelta(hours=1, minutes=5)
+        EmailEventIngestor().ingest([
+            self._event(self.messages[0], 'delivered', first_hour),
+            self._event(self.messages[0], 'open', first_hour, ip='10.0.0.1'),
+            self._event(self.messages[0], 'open', second_hour, ip='10.0.0.1'),
+            self._event(self.messages[1], 'click', second_hour, url='https://example.com'),
+        ])
+
+        rows = {
+            row.hour: row for row in
+            EmailEngagementRollup.objects.filter(campaign=self.campaign)
+        }
+        self.assertEqual(set(rows), {self.hour, self.hour + timedelta(hours=1)})
+        self.assertEqual(rows[self.hour].delivered, 1)
+        self.assertEqual(rows[self.hour].opens, 1)
+        self.assertEqual(rows[self.hour].unique_opens, 1)
+        later = rows[self.hour + timedelta(hours=1)]
+        self.assertEqual((later.opens, later.unique_opens), (1, 0))
+        self.assertEqual((later.clicks, later.unique_clicks), (1, 1))
+        self.assertEqual(later.template, self.template)
+
+    def test_recorder_accumulates_into_existing_rows(self):
+        """Repeated saves add to the same row."""
+        for _ in range(2):
+            recorder = RollupRecorder()
+            recorder.record(self.messages[0], 'sent', self.hour + timedelta(minutes=1))
+            recorder.record(self.messages[1], 'sent', self.hour + timedelta(minutes=59))
+            recorder.save()
+
+        row = EmailEngagementRollup.objects.get(campaign=self.campaign)
+        self.assertEqual(row.sent, 4)
+
+    def test_rebuild_matches_source_data(self):
+        """Backfill derives sends and unique engagement from messages."""
+        EmailMessage.objects.filter(pk=self.messages[0].pk).update(
+            first_opened_at=self.hour + timedelta(hours=2),
+            first_clicked_at=self.hour + timedelta(hours=2)
+        )
+        EmailEngagementRollup.objects.create(
+            group=self.group, campaign=self.campaign, template=self.template,
+            hour=self.hour, sent=99
+        )
+
+        rebuild_rollups(campaign_ids=[self.campaign.id])
+
+        rows = {
+            row.hour: row for row in
+            EmailEngagementRollup.objects.filter(campaign=self.campaign)
+        }
+        self.assertEqual(rows[self.hour].sent, 3)
+        later = rows[self.hour + timedelta(hours=2)]
+        self.assertEqual((later.unique_opens, later.unique_clicks), (1, 1))
+
+    def test_campaign_analytics_read_rollups(self):
+        """Campaign counters and the engagement timeline come from rollups."""
+        EmailEngagementRollup.objects.create(
+            group=self.group, campaign=self.campaign, template=self.template,
+            hour=self.hour, sent=3, delivered=3, opens=4, unique_opens=2
+        )
+        EmailEngagementRollup.objects.create(
+            group=self.group, campaign=self.campaign, template=self.template,
+            hour=self.hour + timedelta(hours=2), opens=1, clicks=2, unique_clicks=1
+        )
+
+        result = update_campaign_analytics(str(self.campaign.id))
+
+        self.assertEqual(result['stats']['opened'], 2)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.emails_sent, 3)
+        self.assertEqual(self.campaign.emails_clicked, 1)
+
+        analytics = EmailAnalytics(group=self.group)
+        with self.assertNumQueries(1):
+            timeline = analytics._get_engagement_timeline(self.campaign)
+        self.assertEqual(timeline, [
+            {'hours_after_send': 0, 'opens': 4, 'clicks': 0},
+            {'hours_after_send': 2, 'opens': 1, 'clicks': 2},
+        ])
+
+        pattern = analytics._get_hourly_pattern()
+        self.assertEqual(sum(item['opens'] for item in pattern), 5)
+        self.assertEqual(sum(item['clicks'] for item in pattern), 2)
+
+    def test_campaign_analytics_without_rollups_count_messages(self):
+        """Campaigns sent before rollups existed keep counters from their messages."""
+        EmailMessage.objects.filter(pk=self.messages[0].pk).update(
+            status=EmailMessage.MessageStatus.OPENED, open_count=2
+        )
+
+        result = update_campaign_analytics(str(self.campaign.id))
+
+        self.assertEqual(result['stats']['sent'], 3)
+        self.assertEqual(result['stats']['opened'], 1)
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.emails_sent, self.campaign.emails_opened), (3, 1))
@@ -0,0 +1,147 @@
+"""
+Tests for the compiled email template cache.
+
+Covers cache hits, LRU eviction, invalidation on EmailTemplate changes and
+cached rendering of personalized messages. The ``benchmark_email_templates``
+management command times rendering with and without the cache.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, SimpleTestCase
+
+from accounts.models import Group
+from contacts.email_utils import (
+    CompiledTemplateCache, email_template_cache, render_email_template
+)
+from contacts.models import EmailTemplate
+
+User = get_user_model()
+
+
+SUBJECT = "{{ first_name }}, your {{ city }} update"
+HTML_CONTENT = """
+<html>
+<body>
+    <h1>Hello {{ first_name }} {{ last_name }}!</h1>
+    <p>Here is what is new for {{ company_name }} in {{ city }}.</p>
+    {% if job_title %}<p>As {{ job_title }} you may be interested in:</p>{% endif %}
+    <ul>
+    {% for item in items %}
+        <li>{{ item.name }} - {{ item.price|round(2) }}</li>
+    {% endfor %}
+    </ul>
+    <a href="{{ unsubscribe_url }}">Unsubscribe</a>
+</body>
+</html>
+"""
+TEXT_CONTENT = "Hello {{ first_name }}! News for {{ company_name }}. Unsubscribe: {{ unsubscribe_url }}"
+
+
+class CompiledTemplateCacheTests(SimpleTestCase):
+    """Test cases for CompiledTemplateCache."""
+
+    def setUp(self):
+        self.cache = CompiledTemplateCache(max_entries=2)
+
+    def test_repeat_lookup_hits(self):
+        """The same source compiles once and is then served from the cache."""
+        first = self.cache.get_jinja("Hello {{ name }}")
+        second = self.cache.get_jinja("Hello {{ name }}")
+
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_least_recently_used_is_evicted(self):
+        """Entries beyond max_entries are evicted oldest-first."""
+        self.cache.get_jinja("a {{ x }}")
+        self.cache.get_jinja("b {{ x }}")
+        self.cache.get_jinja("a {{ x }}")
+        self.cache.get_jinja("c {{ x }}")
+
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.cache.get_jinja("a {{ x }}")
+        self.assertEqual(self.cache.stats()['hits'], 2)
+
+    def test_rendering_matches_uncached(self):
+        """Cached and uncached rendering produce identical output."""
+        context = {'first_name': 'Jane', 'city': 'Leeds'}
+
+        self.assertEqual(
+            render_email_template(SUBJECT, context),
+            render_email_template(SUBJECT, context, use_cache=False)
+        )
+
+    def test_personalized_messages_render_from_the_cache(self):
+        """Repeat renders reuse compiled templates and match uncached output."""
+        email_template_cache.clear()
+        contexts = [
+            {
+                'first_name': f"Contact{i}",
+                'last_name': 'Test',
+                'company_name': f"Company {i}",
+                'city': 'London',
+                'job_title': 'Director' if i % 2 else '',
+                'items': [{'name': 'Report', 'price': 10.5}],
+                'unsubscribe_url': f"https://example.com/unsubscribe/{i}",
+            }
+            for i in range(3)
+        ]
+
+        for context in contexts:
+            for source in (SUBJECT, HTML_CONTENT, TEXT_CONTENT):
+                self.assertEqual(
+                    render_email_template(source, context),
+                    render_email_template(source, context, use_cache=False)
+                )
+
+        stats = email_template_cache.stats()
+        self.assertEqual((stats['misses'], stats['hits']), (3, 6))
+
+
+class TemplateCacheInvalidationTests(TestCase):
+    """Test cases for invalidating compiled templates on EmailTemplate changes."""
+
+    def setUp(self):
+        email_template_cache.clear()
+        self.group = Group.objects.create(name="Template Cache Test Company")
+        self.user = User.objects.create_user(
+            username="templates@test.com",
+            email="templates@test.com",
+            password="testpass123"
+        )
+        self.template = EmailTemplate.objects.create(
+            group=self.group,
+            name="Cached Template",
+            template_type=EmailTemplate.TemplateType.MARKETING,
+            subject=SUBJECT,
+            html_content=HTML_CONTENT,
+            text_content=TEXT_CONTENT,
+            from_name="Test Sender",
+            from_email="noreply@test.com",
+            created_by=self.user
+        )
+
+    def test_warm_compiles_every_part(self):
+        """Warming compiles subject, HTML and text up front."""
+        self.assertEqual(email_template_cache.warm(self.template), 3)
+        # The three parts plus the HTML link plan built when the template was saved
+        self.assertEqual(email_template_cache.stats()['entries'], 4)
+
+        hits = email_template_cache.stats()['hits']
+        render_email_template(SUBJECT, {'first_name': 'Jane', 'city': 'Leeds'})
+        self.assertEqual(email_template_cache.stats()['hits'], hits + 1)
+
+    def test_save_drops_compiled_parts(self):
+        """Saving a template frees its previously compiled content."""
+        email_template_cache.warm(self.template)
+
+        self.template.subject = "New subject for {{ first_name }}"
+        self.template.save()
+
+        # Only the link plan rebuilt on save remains
+        self.assertEqual(email_template_cache.stats()['entries'], 1)
+        self.assertEqual(
+            render_email_template(self.template.subject, {'first_name': 'Jane'}),
+            "New subject for Jane"
+        )
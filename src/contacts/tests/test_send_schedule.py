@@ -0,0 +1,118 @@
+"""
+Tests for vectorized send-time scheduling of sequence steps.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import product
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from contacts.models import Contact
+from contacts.models_outreach import OutreachSequence, SequenceEnrollment, SequenceStep
+from contacts.services.send_schedule import SendTimeScheduler, next_execution_times
+
+
+def loop_next_time(now, delay_days, delay_hours, business_days, skip_weekends, optimized, send_hour):
+    """The day-by-day loop calculate_next_execution_time ran before it was vectorized."""
+    next_time = now
+    if business_days:
+        days_added = 0
+        while days_added < delay_days:
+            next_time += timedelta(days=1)
+            if skip_weekends and next_time.weekday() in [5, 6]:
+                continue
+            days_added += 1
+    else:
+        next_time += timedelta(days=delay_days)
+    next_time += timedelta(hours=delay_hours)
+    if optimized:
+        next_time = next_time.replace(hour=send_hour, minute=0, second=0, microsecond=0)
+        if next_time <= now:
+            next_time += timedelta(days=1)
+            if skip_weekends and next_time.weekday() in [5, 6]:
+                next_time += timedelta(days=7 - next_time.weekday())
+    return next_time
+
+
+def as_datetimes(values):
+    return [value.replace(tzinfo=dt_timezone.utc) for value in values.astype(datetime)]
+
+
+class NextExecutionTimesTests(SimpleTestCase):
+    """Test cases for next_execution_times and SendTimeScheduler."""
+
+    def test_parity_with_day_by_day_loop(self):
+        """Every combination over a week of start times matches the old loop."""
+        cases = list(product(range(9), [0, 5, 30], [True, False], [True, False], [True, False], [0, 10, 23]))
+        columns = list(zip(*cases))
+        # Monday 2026-10-12 through Sunday, at various times of day
+        for day, hour in product(range(7), [0, 9, 10, 17]):
+            now = datetime(2026, 10, 12 + day, hour, 30, 15, tzinfo=dt_timezone.utc)
+            with self.subTest(now=now):
+                times = as_datetimes(next_execution_times(now, *columns))
+                expected = [loop_next_time(now, *case) for case in cases]
+                self.assertEqual(times, expected)
+
+    def test_holidays_are_not_business_days(self):
+        """Business days and the weekend roll skip holidays."""
+        now = datetime(2026, 12, 23, 12, 0, tzinfo=dt_timezone.utc)  # Wednesday
+        holidays = ['2026-12-24', '2026-12-25', '2026-12-28']
+
+        times = as_datetimes(next_execution_times(
+            now, [1, 2, 0], 0, True, True, [False, False, True], 9, holidays=holidays
+        ))
+
+        self.assertEqual(times, [
+            datetime(2026, 12, 29, 12, 0, tzinfo=dt_timezone.utc),
+            datetime(2026, 12, 30, 12, 0, tzinfo=dt_timezone.utc),
+            # 09:00 has passed, Thursday and Friday are holidays, Monday too
+            datetime(2026, 12, 29, 9, 0, tzinfo=dt_timezone.utc),
+        ])
+
+    def test_send_hour_is_local_to_the_contact(self):
+        """Optimized sends land on the send hour in each contact's time zone."""
+        now = datetime(2026, 10, 14, 6, 0, tzinfo=dt_timezone.utc)
+        sequence = OutreachSequence(skip_weekends=True, timezone_optimized=True, optimal_send_hour=10)
+        step = SequenceStep(delay_days=1, delay_hours=0, day_type=SequenceStep.DayType.BUSINESS)
+        pairs = [
+            (SequenceEnrollment(sequence=sequence, contact=Contact(email=f"{zone}@example.com", custom_fields=fields)), step)
+            for zone, fields in [
+                ('utc', {}),
+                ('new-york', {'timezone': 'America/New_York'}),
+                ('tokyo', {'timezone': 'Asia/Tokyo'}),
+                ('unknown', {'timezone': 'Mars/Olympus'}),
+            ]
+        ]
+
+        times = SendTimeScheduler(holiday_calendars={}).schedule(pairs, now=now)
+
+        self.assertEqual(times, [
+            datetime(2026, 10, 15, 10, 0, tzinfo=dt_timezone.utc),
+            datetime(2026, 10, 15, 14, 0, tzinfo=dt_timezone.utc),  # EDT, UTC-4
+            datetime(2026, 10, 15, 1, 0, tzinfo=dt_timezone.utc),   # JST, UTC+9
+            datetime(2026, 10, 15, 10, 0, tzinfo=dt_timezone.utc),
+        ])
+
+    def test_country_holiday_calendars(self):
+        """A contact's country calendar applies on top of the default one."""
+        now = datetime(2026, 12, 23, 12, 0, tzinfo=dt_timezone.utc)
+        sequence = OutreachSequence(skip_weekends=True, timezone_optimized=False)
+        step = SequenceStep(delay_days=1, delay_hours=0, day_type=SequenceStep.DayType.BUSINESS)
+        scheduler = SendTimeScheduler(holiday_calendars={
+            'default': ['2026-12-25'],
+            'DE': ['2026-12-24'],
+        })
+
+        times = scheduler.schedule([
+            (SequenceEnrollment(sequence=sequence, contact=Contact(country=country)), step)
+            for country in ['GB', 'DE']
+        ], now=now)
+
+        self.assertEqual(times, [
+            datetime(2026, 12, 24, 12, 0, tzinfo=dt_timezone.utc),
+            datetime(2026, 12, 28, 12, 0, tzinfo=dt_timezone.utc),
+        ])
+        self.assertEqual(scheduler.holidays('de').tolist(), np.array(
+            ['2026-12-24', '2026-12-25'], dtype='datetime64[D]'
+        ).tolist())
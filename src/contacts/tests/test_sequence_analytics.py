@@ -0,0 +1,167 @@
+"""
+Tests for sequence step analytics and the sequence email link backfill.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import Group
+from contacts.models import Contact, EmailCampaign, EmailEvent, EmailMessage, EmailTemplate
+from contacts.models_outreach import (
+    OutreachSequence, SequenceStep, SequenceEnrollment, SequenceStepExecution
+)
+from contacts.tasks_outreach import (
+    SEQUENCE_ANALYTICS_HIGH_WATER_KEY, SEQUENCE_ANALYTICS_LOCK_KEY, update_sequence_analytics
+)
+
+User = get_user_model()
+
+
+@override_settings(OUTREACH_ANALYTICS_SETTLE_SECONDS=0)
+class SequenceAnalyticsTests(TestCase):
+    """Test cases for update_sequence_analytics and backfill_sequence_email_links."""
+
+    def setUp(self):
+        cache.delete_many([SEQUENCE_ANALYTICS_HIGH_WATER_KEY, SEQUENCE_ANALYTICS_LOCK_KEY])
+        self.group = Group.objects.create(name="Analytics Test Company")
+        self.user = User.objects.create_user(
+            username="analytics@test.com",
+            email="analytics@test.com",
+            password="testpass123"
+        )
+        template = EmailTemplate.objects.create(
+            group=self.group,
+            name="Analytics Template",
+            template_type=EmailTemplate.TemplateType.MARKETING,
+            subject="Hello",
+            html_content="<p>Hello</p>",
+            text_content="Hello",
+            from_email="noreply@test.com",
+            created_by=self.user
+        )
+        self.campaign = EmailCampaign.objects.create(
+            group=self.group, name="Analytics Campaign", template=template, created_by=self.user
+        )
+        self.sequence = OutreachSequence.objects.create(
+            name="Analytics Sequence",
+            group=self.group,
+            created_by=self.user,
+            status=OutreachSequence.Status.ACTIVE
+        )
+        self.step = SequenceStep.objects.create(
+            sequence=self.sequence,
+            group=self.group,
+            step_type=SequenceStep.StepType.EMAIL,
+            order=0,
+            name="Intro"
+        )
+        contact = Contact.objects.create(group=self.group, email="reader@example.com")
+        self.enrollment = SequenceEnrollment.objects.create(
+            group=self.group, sequence=self.sequence, contact=contact
+        )
+        self.message = EmailMessage.objects.create(
+            group=self.group,
+            campaign=self.campaign,
+            contact=contact,
+            subject="Hello",
+            from_email="noreply@test.com",
+            to_email=contact.email,
+            status=EmailMessage.MessageStatus.SENT
+        )
+
+    def _events(self, *event_types):
+        for event_type in event_types:
+            EmailEvent.objects.create(message=self.message, event_type=event_type)
+
+    def _link(self):
+        EmailMessage.objects.filter(pk=self.message.pk).update(
+            sequence=self.sequence, enrollment=self.enrollment, sequence_step=self.step
+        )
+
+    def test_events_are_counted_once(self):
+        """Each run adds only the events after the previous run's mark."""
+        self._link()
+        cache.set(SEQUENCE_ANALYTICS_HIGH_WATER_KEY, timezone.now() - timedelta(hours=1), timeout=None)
+        E = EmailEvent.EventType
+        self._events(E.OPENED, E.OPENED, E.CLICKED, E.DELIVERED)
+
+        # aggregate, one update per step (plus the savepoint pair)
+        with self.assertNumQueries(4):
+            result = update_sequence_analytics()
+        self.assertEqual(result, {'steps': 1, 'events': 3})
+        self.assertEqual(update_sequence_analytics(), {'steps': 0, 'events': 0})
+
+        self._events(E.CLICKED)
+        update_sequence_analytics()
+
+        self.step.refresh_from_db()
+        self.assertEqual((self.step.total_opened, self.step.total_clicked), (2, 2))
+
+    def test_late_ingested_events_are_counted(self):
+        """Events are counted by ingestion time, not the provider's event time."""
+        self._link()
+        cache.set(SEQUENCE_ANALYTICS_HIGH_WATER_KEY, timezone.now() - timedelta(minutes=5), timeout=None)
+        self._events(EmailEvent.EventType.OPENED)
+        # Webhook delivered a day after the open
+        EmailEvent.objects.update(timestamp=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(update_sequence_analytics(), {'steps': 1, 'events': 1})
+
+        self.step.refresh_from_db()
+        self.assertEqual(self.step.total_opened, 1)
+
+    def test_overlapping_run_is_skipped(self):
+        """A run that finds the lock held leaves the counters and the mark alone."""
+        self._link()
+        mark = timezone.now() - timedelta(hours=1)
+        cache.set(SEQUENCE_ANALYTICS_HIGH_WATER_KEY, mark, timeout=None)
+        self._events(EmailEvent.EventType.OPENED)
+        cache.set(SEQUENCE_ANALYTICS_LOCK_KEY, 'other-worker')
+
+        self.assertEqual(update_sequence_analytics(), {'steps': 0, 'events': 0})
+
+        self.assertEqual(cache.get(SEQUENCE_ANALYTICS_HIGH_WATER_KEY), mark)
+        self.assertEqual(cache.get(SEQUENCE_ANALYTICS_LOCK_KEY), 'other-worker')
+        self.step.refresh_from_db()
+        self.assertEqual(self.step.total_opened, 0)
+
+    def test_first_run_only_sets_the_mark(self):
+        """Without a mark, earlier events are not counted again."""
+        self._link()
+        self._events(EmailEvent.EventType.OPENED)
+
+        self.assertEqual(update_sequence_analytics(), {'steps': 0, 'events': 0})
+
+        self.assertIsNotNone(cache.get(SEQUENCE_ANALYTICS_HIGH_WATER_KEY))
+        self.step.refresh_from_db()
+        self.assertEqual(self.step.total_opened, 0)
+
+    def test_backfill_links_messages_and_recounts(self):
+        """The backfill links messages through their executions and recounts totals."""
+        SequenceStepExecution.objects.create(
+            group=self.group,
+            enrollment=self.enrollment,
+            step=self.step,
+            scheduled_at=timezone.now(),
+            status=SequenceStepExecution.Status.COMPLETED,
+            email_message_id=self.message.id
+        )
+        self._events(EmailEvent.EventType.OPENED, EmailEvent.EventType.CLICKED)
+        SequenceStep.objects.filter(pk=self.step.pk).update(total_opened=9)
+
+        call_command('backfill_sequence_email_links', '--rebuild-analytics', stdout=StringIO())
+
+        self.message.refresh_from_db()
+        self.assertEqual(
+            (self.message.sequence_id, self.message.enrollment_id, self.message.sequence_step_id),
+            (self.sequence.id, self.enrollment.id, self.step.id)
+        )
+        self.step.refresh_from_db()
+        self.assertEqual((self.step.total_opened, self.step.total_clicked), (1, 1))
+        self.assertEqual(update_sequence_analytics(), {'steps': 0, 'events': 0})
@@ -0,0 +1,228 @@
+"""
+Tests for batched execution of outreach sequence steps.
+"""
+
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import Group
+from contacts.models import Contact, EmailCampaign, EmailEvent, EmailMessage, EmailTemplate
+from contacts.models_outreach import (
+    OutreachSequence, SequenceStep, SequenceEnrollment, SequenceStepExecution
+)
+from contacts.tasks_outreach import (
+    evaluate_exit_conditions, run_step_executions, schedule_next_step
+)
+
+User = get_user_model()
+
+
+class BatchStepExecutionTests(TestCase):
+    """Test cases for run_step_executions and exit-condition evaluation."""
+
+    def setUp(self):
+        self.group = Group.objects.create(name="Batch Test Company")
+        self.user = User.objects.create_user(
+            username="batch@test.com",
+            email="batch@test.com",
+            password="testpass123"
+        )
+        self.sequence = OutreachSequence.objects.create(
+            name="Batch Sequence",
+            group=self.group,
+            created_by=self.user,
+            status=OutreachSequence.Status.ACTIVE,
+            timezone_optimized=False,
+            exit_tags=["customer"]
+        )
+        self.steps = [
+            SequenceStep.objects.create(
+                sequence=self.sequence,
+                group=self.group,
+                step_type=SequenceStep.StepType.WAIT,
+                order=order,
+                name=f"Wait {order}",
+                delay_days=order
+            )
+            for order in range(2)
+        ]
+        self.enrollments = []
+        self.executions = []
+        for i in range(5):
+            contact = Contact.objects.create(
+                group=self.group, email=f"batch{i}@example.com", first_name=f"Batch{i}"
+            )
+            enrollment = SequenceEnrollment.objects.create(
+                group=self.group,
+                sequence=self.sequence,
+                contact=contact,
+                current_step=self.steps[0]
+            )
+            self.enrollments.append(enrollment)
+            self.executions.append(SequenceStepExecution.objects.create(
+                group=self.group,
+                enrollment=enrollment,
+                step=self.steps[0],
+                scheduled_at=timezone.now() - timedelta(minutes=1)
+            ))
+
+    def _run(self, executions):
+        with patch('contacts.tasks_outreach.dispatch_step_executions'):
+            return run_step_executions([execution.id for execution in executions])
+
+    def test_batch_queries_do_not_grow_with_executions(self):
+        """A batch costs the same queries for one execution as for many."""
+        with CaptureQueriesContext(connection) as single:
+            self._run(self.executions[:1])
+
+        with CaptureQueriesContext(connection) as batch:
+            summary = self._run(self.executions[1:])
+
+        self.assertEqual(len(batch), len(single))
+        self.assertEqual(summary, {'completed': 4, 'skipped': 0, 'failed': 0})
+        next_steps = SequenceStepExecution.objects.filter(step=self.steps[1])
+        self.assertEqual(next_steps.count(), 5)
+        self.assertTrue(all(
+            execution.status == SequenceStepExecution.Status.SCHEDULED for execution in next_steps
+        ))
+        enrollment = SequenceEnrollment.objects.get(pk=self.enrollments[0].pk)
+        self.assertEqual((enrollment.current_step_id, enrollment.current_step_index), (self.steps[1].id, 1))
+
+    def test_processed_executions_are_not_run_again(self):
+        """Executions already handled by another worker are left alone."""
+        self._run(self.executions)
+
+        self.assertEqual(self._run(self.executions), {'completed': 0, 'skipped': 0, 'failed': 0})
+        self.assertEqual(SequenceStepExecution.objects.filter(step=self.steps[1]).count(), 5)
+
+    def test_exit_conditions_evaluated_together(self):
+        """Opted-out, tagged and clicked contacts exit; the rest carry on."""
+        self.sequence.exit_on_click = True
+        self.sequence.save()
+        opted_out, tagged, clicked = (enrollment.contact for enrollment in self.enrollments[:3])
+        opted_out.email_opt_in = False
+        opted_out.save()
+        tagged.tags = ["customer"]
+        tagged.save()
+        template = EmailTemplate.objects.create(
+            group=self.group,
+            name="Batch Template",
+            template_type=EmailTemplate.TemplateType.MARKETING,
+            subject="Hello",
+            html_content="<p>Hello</p>",
+            text_content="Hello",
+            from_email="noreply@test.com",
+            created_by=self.user
+        )
+        campaign = EmailCampaign.objects.create(
+            group=self.group, name="Batch Campaign", template=template, created_by=self.user
+        )
+        message = EmailMessage.objects.create(
+            group=self.group,
+            campaign=campaign,
+            contact=clicked,
+            subject="Hello",
+            from_email="noreply@test.com",
+            to_email=clicked.email,
+            status=EmailMessage.MessageStatus.SENT,
+            sequence=self.sequence,
+            enrollment=self.enrollments[2],
+            sequence_step=self.steps[0]
+        )
+        EmailEvent.objects.create(message=message, event_type=EmailEvent.EventType.CLICKED)
+
+        enrollments = list(SequenceEnrollment.objects.filter(
+            pk__in=[enrollment.pk for enrollment in self.enrollments]
+        ).select_related('contact', 'sequence'))
+        with self.assertNumQueries(1):
+            exits = evaluate_exit_conditions(enrollments)
+
+        self.assertEqual(exits, {
+            self.enrollments[0].id: SequenceEnrollment.ExitReason.UNSUBSCRIBED,
+            self.enrollments[1].id: SequenceEnrollment.ExitReason.CONDITION_MET,
+            self.enrollments[2].id: SequenceEnrollment.ExitReason.CLICKED,
+        })
+
+        summary = self._run(self.executions)
+        self.assertEqual(summary, {'completed': 2, 'skipped': 3, 'failed': 0})
+        self.assertEqual(
+            SequenceEnrollment.objects.filter(status=SequenceEnrollment.Status.EXITED).count(), 3
+        )
+
+    def test_last_step_completes_enrollments(self):
+        """Finishing the last step completes enrollments and counts them once."""
+        self._run(self.executions)
+        self._run(SequenceStepExecution.objects.filter(step=self.steps[1]))
+
+        self.assertEqual(
+            SequenceEnrollment.objects.filter(status=SequenceEnrollment.Status.COMPLETED).count(), 5
+        )
+        self.sequence.refresh_from_db()
+        self.assertEqual(self.sequence.total_completed, 5)
+
+    def test_new_enrollment_starts_with_first_step(self):
+        """Scheduling a fresh enrollment schedules step 0 rather than skipping it."""
+        contact = Contact.objects.create(group=self.group, email="fresh@example.com")
+        enrollment = SequenceEnrollment.objects.create(
+            group=self.group, sequence=self.sequence, contact=contact
+        )
+
+        with patch('contacts.tasks_outreach.dispatch_step_executions'):
+            schedule_next_step(enrollment)
+
+        execution = SequenceStepExecution.objects.get(enrollment=enrollment)
+        self.assertEqual(execution.step_id, self.steps[0].id)
+        self.assertEqual(execution.status, SequenceStepExecution.Status.QUEUED)
+        enrollment.refresh_from_db()
+        self.assertEqual((enrollment.current_step_id, enrollment.current_step_index), (self.steps[0].id, 0))
+
+    def test_email_step_sends_and_links_message(self):
+        """An EMAIL step creates a linked message under the step's campaign and sends it."""
+        template = EmailTemplate.objects.create(
+            group=self.group,
+            name="Step Template",
+            slug="step-template",
+            template_type=EmailTemplate.TemplateType.MARKETING,
+            subject="Hello {{first_name}}",
+            html_content="<p>Hello</p>",
+            text_content="Hello",
+            from_email="sales@test.com",
+            created_by=self.user
+        )
+        SequenceStep.objects.filter(pk=self.steps[0].pk).update(
+            step_type=SequenceStep.StepType.EMAIL, email_template=template, email_subject="Hi {{first_name}}"
+        )
+        sent_at = timezone.now()
+        result = SimpleNamespace(
+            success=True, message_id="esp-123", provider="test", timestamp=sent_at, error_message=None
+        )
+
+        with patch('contacts.tasks_outreach.email_service') as email_service:
+            email_service.send_email = AsyncMock(return_value=result)
+            summary = self._run(self.executions[:2])
+
+        self.assertEqual(summary, {'completed': 2, 'skipped': 0, 'failed': 0})
+        self.assertEqual(email_service.send_email.await_count, 2)
+        message = EmailMessage.objects.get(contact=self.enrollments[0].contact)
+        self.assertEqual(
+            (message.sequence_id, message.enrollment_id, message.sequence_step_id, message.template_used_id),
+            (self.sequence.id, self.enrollments[0].id, self.steps[0].id, template.id)
+        )
+        self.assertEqual((message.status, message.message_id), (EmailMessage.MessageStatus.SENT, "esp-123"))
+        self.assertEqual(message.subject, "Hi Batch0")
+
+        step = SequenceStep.objects.get(pk=self.steps[0].pk)
+        self.assertEqual(step.total_sent, 2)
+        self.assertEqual(
+            set(EmailMessage.objects.filter(sequence_step=step).values_list('campaign_id', flat=True)),
+            {step.email_campaign_id}
+        )
+        execution = SequenceStepExecution.objects.get(pk=self.executions[0].pk)
+        self.assertEqual(execution.email_message_id, message.id)
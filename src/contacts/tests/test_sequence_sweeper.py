@@ -0,0 +1,133 @@
+"""
+Tests for the due-step sweeper that dispatches outreach sequence steps.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import Group
+from contacts.models import Contact
+from contacts.models_outreach import (
+    OutreachSequence, SequenceStep, SequenceEnrollment, SequenceStepExecution
+)
+from contacts.tasks_outreach import (
+    STEP_SWEEPER_METRICS_KEY, claim_due_step_executions, get_step_sweeper_metrics,
+    sweep_due_sequence_steps
+)
+
+User = get_user_model()
+
+
+class StepSweeperTests(TestCase):
+    """Test cases for claiming and dispatching due step executions."""
+
+    def setUp(self):
+        cache.delete(STEP_SWEEPER_METRICS_KEY)
+        self.group = Group.objects.create(name="Sweeper Test Company")
+        self.user = User.objects.create_user(
+            username="sweeper@test.com",
+            email="sweeper@test.com",
+            password="testpass123"
+        )
+        sequence = OutreachSequence.objects.create(
+            name="Sweeper Sequence",
+            group=self.group,
+            created_by=self.user,
+            status=OutreachSequence.Status.ACTIVE
+        )
+        self.step = SequenceStep.objects.create(
+            sequence=sequence,
+            group=self.group,
+            step_type=SequenceStep.StepType.WAIT,
+            order=0,
+            name="Wait"
+        )
+        now = timezone.now()
+        self.executions = {}
+        for name, offset in [('late', -600), ('due', -60), ('future', 3600)]:
+            contact = Contact.objects.create(
+                group=self.group, email=f"{name}@example.com", first_name=name.title()
+            )
+            enrollment = SequenceEnrollment.objects.create(
+                group=self.group, sequence=sequence, contact=contact
+            )
+            self.executions[name] = SequenceStepExecution.objects.create(
+                group=self.group,
+                enrollment=enrollment,
+                step=self.step,
+                scheduled_at=now + timedelta(seconds=offset)
+            )
+
+    def _status(self, name):
+        self.executions[name].refresh_from_db()
+        return self.executions[name].status
+
+    def test_claims_due_oldest_first(self):
+        """Only due executions are claimed, oldest first, and only once."""
+        claimed = claim_due_step_executions(limit=1)
+
+        self.assertEqual([pk for pk, _ in claimed], [self.executions['late'].pk])
+        self.assertEqual(self._status('late'), SequenceStepExecution.Status.QUEUED)
+        self.assertEqual(self._status('due'), SequenceStepExecution.Status.SCHEDULED)
+
+        claimed = claim_due_step_executions(limit=10)
+        self.assertEqual([pk for pk, _ in claimed], [self.executions['due'].pk])
+        self.assertEqual(claim_due_step_executions(limit=10), [])
+        self.assertEqual(self._status('future'), SequenceStepExecution.Status.SCHEDULED)
+
+    @override_settings(OUTREACH_STEP_SWEEP_BATCH_SIZE=1)
+    @patch('contacts.tasks_outreach.execute_step_batch.delay')
+    def test_sweep_dispatches_in_batches_and_records_metrics(self, mock_delay):
+        """A sweep dispatches every due step and reports lag and backlog."""
+        metrics = sweep_due_sequence_steps()
+
+        dispatched = [call.args[0] for call in mock_delay.call_args_list]
+        self.assertEqual(dispatched, [[str(self.executions['late'].pk)], [str(self.executions['due'].pk)]])
+        self.assertEqual((metrics['claimed'], metrics['backlog']), (2, 0))
+        self.assertGreaterEqual(metrics['lag_seconds'], 600)
+        self.assertIsNone(metrics['throughput_per_minute'])
+
+        live = get_step_sweeper_metrics()
+        self.assertEqual((live['due_backlog'], live['queued'], live['total_claimed']), (0, 2, 2))
+
+    @override_settings(OUTREACH_STEP_QUEUE_TIMEOUT_SECONDS=60)
+    @patch('contacts.tasks_outreach.execute_step_batch.delay')
+    def test_lost_queued_execution_is_dispatched_again(self, mock_delay):
+        """A queued execution no worker started is re-dispatched after the timeout."""
+        SequenceStepExecution.objects.filter(pk=self.executions['late'].pk).update(
+            status=SequenceStepExecution.Status.QUEUED,
+            updated_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        metrics = sweep_due_sequence_steps()
+
+        self.assertEqual(metrics['requeued'], 1)
+        self.assertEqual(
+            mock_delay.call_args_list[0].args[0],
+            [str(self.executions['late'].pk)]
+        )
+        self.assertEqual(mock_delay.call_count, 2)
+
+    def test_scheduler_metrics_are_staff_only(self):
+        """Sweeper metrics span every group, so only staff can read them."""
+        client = APIClient()
+        url = reverse('outreachsequence-scheduler-metrics')
+
+        client.force_authenticate(user=self.user)
+        self.assertEqual(client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        staff = User.objects.create_user(
+            username="staff@test.com", email="staff@test.com", password="testpass123", is_staff=True
+        )
+        client.force_authenticate(user=staff)
+        response = client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['due_backlog'], 2)
@@ -0,0 +1,145 @@
+"""
+Tests for automatic enrollment from outreach sequence triggers.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+
+from accounts.models import Group
+from contacts.models import ActivityType, Contact, ContactActivity
+from contacts.models_outreach import (
+    OutreachSequence, SequenceStep, SequenceEnrollment, SequenceStepExecution
+)
+from contacts.services.sequence_triggers import SequenceTriggerEngine
+from contacts.tasks_outreach import process_sequence_trigger
+
+User = get_user_model()
+
+
+@override_settings(OUTREACH_TRIGGER_SETTLE_SECONDS=0)
+class SequenceTriggerEngineTests(TestCase):
+    """Test cases for SequenceTriggerEngine and process_sequence_trigger."""
+
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name="Trigger Test Company")
+        self.user = User.objects.create_user(
+            username="trigger@test.com",
+            email="trigger@test.com",
+            password="testpass123"
+        )
+        self.engine = SequenceTriggerEngine()
+
+    def _sequence(self, trigger_type, **conditions):
+        sequence = OutreachSequence.objects.create(
+            name=f"{trigger_type} Sequence",
+            group=self.group,
+            created_by=self.user,
+            status=OutreachSequence.Status.ACTIVE,
+            timezone_optimized=False,
+            trigger_type=trigger_type,
+            trigger_conditions=conditions
+        )
+        SequenceStep.objects.create(
+            sequence=sequence,
+            group=self.group,
+            step_type=SequenceStep.StepType.WAIT,
+            order=0,
+            name="Wait"
+        )
+        return sequence
+
+    def _contact(self, email, **fields):
+        return Contact.objects.create(group=self.group, email=email, **fields)
+
+    def _enrolled(self, sequence):
+        return set(
+            SequenceEnrollment.objects.filter(sequence=sequence).values_list('contact__email', flat=True)
+        )
+
+    def test_lead_scored_enrolls_changed_contacts_once(self):
+        """Contacts scored into range are enrolled; later runs only see new changes."""
+        sequence = self._sequence(OutreachSequence.TriggerType.LEAD_SCORED, min_score=70, max_score=90)
+        self._contact("hot@example.com", current_score=80)
+        self._contact("cold@example.com", current_score=20)
+        self._contact("opted-out@example.com", current_score=75, email_opt_in=False)
+
+        # match, insert, read back inserted rows (plus the savepoint pair)
+        with self.assertNumQueries(5):
+            created = self.engine.enroll(sequence)
+
+        self.assertEqual(len(created), 1)
+        self.assertEqual(self._enrolled(sequence), {"hot@example.com"})
+
+        cold = Contact.objects.get(email="cold@example.com")
+        cold.current_score = 72
+        cold.save()
+        self.assertEqual(len(self.engine.enroll(sequence)), 1)
+        self.assertEqual(self.engine.enroll(sequence), [])
+        self.assertEqual(self._enrolled(sequence), {"hot@example.com", "cold@example.com"})
+
+    def test_enrolled_contacts_are_not_enrolled_again(self):
+        """A contact enrolled since the cursor, e.g. manually, is skipped."""
+        sequence = self._sequence(OutreachSequence.TriggerType.TAG_ADDED, tag="webinar")
+        contact = self._contact("tagged@example.com", tags=["webinar", "emea"])
+        self._contact("other@example.com", tags=["emea"])
+        SequenceEnrollment.objects.create(group=self.group, sequence=sequence, contact=contact)
+
+        self.assertEqual(self.engine.enroll(sequence), [])
+
+    def test_form_submitted_follows_activities(self):
+        """Form triggers enroll contacts with a matching form activity since the cursor."""
+        sequence = self._sequence(OutreachSequence.TriggerType.FORM_SUBMITTED, form_id="demo")
+        for email, form_id in [("demo@example.com", "demo"), ("newsletter@example.com", "newsletter")]:
+            ContactActivity.objects.create(
+                group=self.group,
+                contact=self._contact(email),
+                activity_type=ActivityType.FORM_SUBMITTED,
+                subject="Form",
+                metadata={'form_id': form_id}
+            )
+
+        self.engine.enroll(sequence)
+
+        self.assertEqual(self._enrolled(sequence), {"demo@example.com"})
+
+    @override_settings(OUTREACH_TRIGGER_SETTLE_SECONDS=60)
+    def test_recent_changes_wait_for_the_settle_window(self):
+        """Changes inside the settle window are left for a later run."""
+        sequence = self._sequence(OutreachSequence.TriggerType.TAG_ADDED, tag="webinar")
+        self._contact("tagged@example.com", tags=["webinar"])
+
+        self.assertEqual(self.engine.enroll(sequence), [])
+        self.assertEqual(self._enrolled(sequence), set())
+
+        with override_settings(OUTREACH_TRIGGER_SETTLE_SECONDS=0):
+            self.assertEqual(len(self.engine.enroll(sequence)), 1)
+
+    def test_invalid_conditions_rejected(self):
+        """Triggers without the conditions they need raise ValidationError."""
+        sequence = self._sequence(OutreachSequence.TriggerType.CUSTOM_EVENT, activity_type="nope")
+
+        with self.assertRaises(ValidationError):
+            self.engine.enroll(sequence)
+
+    def test_process_sequence_trigger_starts_enrollments(self):
+        """Triggered enrollments are started in bulk with their first step queued."""
+        sequence = self._sequence(OutreachSequence.TriggerType.LEAD_CREATED, source="website")
+        for i in range(3):
+            self._contact(f"web{i}@example.com", source="website")
+        self._contact("event@example.com", source="event")
+
+        with patch('contacts.tasks_outreach.dispatch_step_executions'):
+            self.assertEqual(process_sequence_trigger(sequence), 3)
+
+        executions = SequenceStepExecution.objects.filter(enrollment__sequence=sequence)
+        self.assertEqual(executions.count(), 3)
+        self.assertTrue(all(
+            execution.status == SequenceStepExecution.Status.QUEUED for execution in executions
+        ))
+        sequence.refresh_from_db()
+        self.assertEqual(sequence.total_enrolled, 3)
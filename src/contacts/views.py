@@ -5,28 +5,38 @@ Provides REST API endpoints for contacts, activities, and lists
 with cursor pagination, filtering, and bulk operations.
 """
 
+from django.core.exceptions import FieldError, ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
 from django.db.models import Q, Count, Prefetch
-from django.http import HttpResponse
-from django.utils import timezone
+from django.http import FileResponse
 from rest_framework import viewsets
 from platform_core.core.views import PlatformViewSet, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.pagination import CursorPagination
+from rest_framework.parsers import FormParser, MultiPartParser
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter
 
-import csv
-import io
-from openpyxl import Workbook
+import uuid
 
 from .models import Contact, ContactActivity, ContactList, ContactPartner, RelationshipType
 from .serializers import (
     ContactSerializer, ContactActivitySerializer, ContactListSerializer,
-    ContactListDetailSerializer, ContactImportSerializer, ContactExportSerializer,
-    ContactPartnerSerializer
+    ContactListDetailSerializer, ContactImportSerializer, ContactImportFileSerializer,
+    ContactExportSerializer, ContactPartnerSerializer, get_user_group
 )
 from .filters import ContactFilter, ContactActivityFilter, ContactListFilter
+from .services.contact_lists import ContactListService
+from .services.contact_export import (
+    DEFAULT_EXPORT_FIELDS, EXPORT_FORMATS, ContactExporter, export_filename,
+    get_export_state, update_export_state
+)
+from .services.contact_import import get_import_state, update_import_state
+from .services.contact_scoring import BulkContactScoringEngine
+from .tasks_export import export_contacts
+from .tasks_import import import_contacts_file
+from .tasks_scoring import score_group_contacts
 
 
 class GroupFilteredModelMixin:
@@ -83,6 +93,9 @@ class ContactViewSet(GroupFilteredModelMixin, PlatformViewSet):
     ordering_fields = ['created_at', 'updated_at', 'last_activity_at', 'current_score']
     ordering = ['-created_at']
     
+    # Largest contact_ids list calculate_scores scores inline
+    MAX_SYNC_SCORE_CONTACTS = 1000
+    
     def get_queryset(self):
         """Get contacts filtered by user's group with optimized queries."""
         queryset = super().get_queryset()
@@ -125,7 +138,63 @@ class ContactViewSet(GroupFilteredModelMixin, PlatformViewSet):
             'created': result['created'],
             'updated': result['updated'],
             'skipped': result['skipped'],
-            'skipped_emails': result['skipped_emails']
+            'skipped_emails': result['skipped_emails'],
+            'errors': result['errors']
+        })
+    
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, FormParser])
+    def bulk_import_file(self, request):
+        """
+        Import contacts from an uploaded CSV or XLSX file in the background.
+        
+        Returns an import id whose progress is reported by ``import_status``.
+        """
+        serializer = ContactImportFileSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        group = get_user_group(request.user)
+        if group is None:
+            return Response(
+                {'error': 'User does not belong to a group'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        upload = serializer.validated_data['file']
+        import_id = str(uuid.uuid4())
+        extension = 'xlsx' if upload.name.lower().endswith('.xlsx') else 'csv'
+        path = default_storage.save(f"imports/contacts/{import_id}.{extension}", upload)
+        
+        update_import_state(import_id, status='queued', user_id=str(request.user.pk), processed=0)
+        list_id = serializer.validated_data.get('list_id')
+        import_contacts_file.delay(
+            import_id,
+            str(group.pk),
+            path,
+            serializer.validated_data['update_existing'],
+            str(list_id) if list_id else None
+        )
+        return Response(
+            {'status': 'queued', 'import_id': import_id},
+            status=status.HTTP_202_ACCEPTED
+        )
+    
+    @action(detail=False, methods=['get'], url_path=r'bulk-import/(?P<import_id>[0-9a-f-]+)')
+    def import_status(self, request, import_id=None):
+        """Status and progress counters of a background import."""
+        state = get_import_state(import_id)
+        if state is None or state.get('user_id') != str(request.user.pk):
+            return Response({'error': 'Import not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({
+            'import_id': import_id,
+            'status': state['status'],
+            'processed': state.get('processed', 0),
+            'created': state.get('created', 0),
+            'updated': state.get('updated', 0),
+            'skipped': state.get('skipped', 0),
+            'error_count': state.get('error_count', 0),
+            'errors': state.get('errors', []),
+            'error': state.get('error'),
         })
     
     @action(detail=False, methods=['post'])
@@ -148,57 +217,86 @@ class ContactViewSet(GroupFilteredModelMixin, PlatformViewSet):
             )
         
         # Determine fields to export
-        fields = serializer.validated_data.get('fields', [
-            'email', 'first_name', 'last_name', 'company_name',
-            'contact_type', 'status', 'current_score', 'city', 'country',
-            'created_at'
-        ])
-        
-        if serializer.validated_data['format'] == 'csv':
-            return self._export_csv(queryset, fields)
+        fields = serializer.validated_data.get('fields', DEFAULT_EXPORT_FIELDS)
+        export_format = serializer.validated_data['format']
+        
+        try:
+            exporter = ContactExporter(queryset, fields)
+        except FieldError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if serializer.validated_data['background']:
+            return self._start_background_export(request, serializer.validated_data, fields)
+        
+        if export_format == 'csv':
+            return exporter.csv_response()
         else:
-            return self._export_excel(queryset, fields)
-    
-    def _export_csv(self, queryset, fields):
-        """Export contacts as CSV."""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="contacts_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.DictWriter(response, fieldnames=fields)
-        writer.writeheader()
-        
-        for contact in queryset.values(*fields):
-            writer.writerow(contact)
-        
-        return response
-    
-    def _export_excel(self, queryset, fields):
-        """Export contacts as Excel."""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Contacts"
-        
-        # Write headers
-        for col, field in enumerate(fields, 1):
-            ws.cell(row=1, column=col, value=field.replace('_', ' ').title())
-        
-        # Write data
-        for row, contact in enumerate(queryset.values(*fields), 2):
-            for col, field in enumerate(fields, 1):
-                value = contact.get(field, '')
-                # Convert datetime to string for Excel
-                if hasattr(value, 'strftime'):
-                    value = value.strftime('%Y-%m-%d %H:%M:%S')
-                ws.cell(row=row, column=col, value=value)
-        
-        # Save to response
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            return exporter.excel_response()
+    
+    def _start_background_export(self, request, options, fields):
+        """Queue an export task and return its id for polling."""
+        export_id = str(uuid.uuid4())
+        update_export_state(
+            export_id,
+            status='queued',
+            user_id=str(request.user.pk),
+            format=options['format'],
+            processed=0,
+            total=None
+        )
+        export_contacts.delay(
+            export_id,
+            [str(group_id) for group_id in request.user.groups.values_list('pk', flat=True)],
+            fields,
+            options['format'],
+            request.query_params.dict(),
+            str(options['list_id']) if options.get('list_id') else None
         )
-        response['Content-Disposition'] = f'attachment; filename="contacts_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx"'
+        return Response(
+            {'status': 'queued', 'export_id': export_id},
+            status=status.HTTP_202_ACCEPTED
+        )
+    
+    def _get_export_state(self, request, export_id):
+        state = get_export_state(export_id)
+        if state is None or state.get('user_id') != str(request.user.pk):
+            return None
+        return state
+    
+    @action(detail=False, methods=['get'], url_path=r'export/(?P<export_id>[0-9a-f-]+)')
+    def export_status(self, request, export_id=None):
+        """Status and progress of a background export."""
+        state = self._get_export_state(request, export_id)
+        if state is None:
+            return Response({'error': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({
+            'export_id': export_id,
+            'status': state['status'],
+            'format': state['format'],
+            'processed': state.get('processed', 0),
+            'total': state.get('total'),
+            'error': state.get('error'),
+        })
+    
+    @action(detail=False, methods=['get'], url_path=r'export/(?P<export_id>[0-9a-f-]+)/download')
+    def export_download(self, request, export_id=None):
+        """Download a completed background export."""
+        state = self._get_export_state(request, export_id)
+        if state is None:
+            return Response({'error': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
+        if state['status'] != 'completed':
+            return Response(
+                {'error': f"Export is {state['status']}"},
+                status=status.HTTP_409_CONFLICT
+            )
         
-        wb.save(response)
-        return response
+        return FileResponse(
+            default_storage.open(state['path'], 'rb'),
+            as_attachment=True,
+            filename=export_filename(state['format']),
+            content_type=EXPORT_FORMATS[state['format']][1]
+        )
     
     @action(detail=True, methods=['post'])
     def calculate_score(self, request, pk=None):
@@ -217,6 +315,50 @@ class ContactViewSet(GroupFilteredModelMixin, PlatformViewSet):
             'current_score': new_score
         })
     
+    @action(detail=False, methods=['post'])
+    def calculate_scores(self, request):
+        """
+        Recalculate lead scores for many contacts.
+        
+        With ``contact_ids`` (up to ``MAX_SYNC_SCORE_CONTACTS``) the contacts
+        are scored immediately and their new scores returned; without, every
+        contact in the user's groups is scored in the background.
+        """
+        contact_ids = request.data.get('contact_ids')
+        queryset = Contact.objects.filter(pk__in=self.get_queryset().values('pk'))
+    
+        if contact_ids is None:
+            group_ids = queryset.order_by().values_list('group_id', flat=True).distinct()
+            task_ids = [
+                score_group_contacts.delay(str(group_id)).id
+                for group_id in group_ids
+            ]
+            return Response(
+                {'status': 'queued', 'task_ids': task_ids},
+                status=status.HTTP_202_ACCEPTED
+            )
+    
+        if not isinstance(contact_ids, list) or len(contact_ids) > self.MAX_SYNC_SCORE_CONTACTS:
+            return Response(
+                {'error': f"contact_ids must be a list of at most {self.MAX_SYNC_SCORE_CONTACTS} IDs"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+        queryset = queryset.filter(pk__in=contact_ids)
+        try:
+            summary = BulkContactScoringEngine().score_queryset(queryset)
+        except DjangoValidationError as e:
+            return Response(
+                {'error': e.messages},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+        return Response({
+            'scored': summary['total_scored'],
+            'updated': summary['updated'],
+            'results': list(queryset.values('id', 'current_score'))
+        })
+    
     @action(detail=True, methods=['get'])
     def activities(self, request, pk=None):
         """
@@ -492,12 +634,17 @@ class ContactListViewSet(GroupFilteredModelMixin, PlatformViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # TODO: Implement dynamic list refresh logic
-        # This would parse filter_criteria and update contacts
+        try:
+            summary = ContactListService().refresh(contact_list)
+        except DjangoValidationError as e:
+            return Response(
+                {'error': 'Invalid filter criteria', 'details': e.messages},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         return Response({
             'status': 'success',
-            'message': 'Dynamic list refresh not yet implemented'
+            **summary
         })
 
 
@@ -12,7 +12,7 @@ from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from django_filters import rest_framework as filters
 
 from accounts.permissions import (
@@ -37,7 +37,7 @@ from .serializers_outreach import (
     SequenceAnalyticsSerializer,
     EnrollmentCreateSerializer
 )
-from .tasks_outreach import start_sequence_enrollment
+from .tasks_outreach import get_step_sweeper_metrics, start_sequence_enrollment
 
 
 class OutreachSequenceFilter(filters.FilterSet):
@@ -205,6 +205,11 @@ class OutreachSequenceViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED
         )
     
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsAdminUser])
+    def scheduler_metrics(self, request):
+        """Throughput and lag of the due-step sweeper (staff only: covers every group)."""
+        return Response(get_step_sweeper_metrics())
+    
     @action(detail=True, methods=['get'])
     def analytics(self, request, pk=None):
         """Get sequence analytics."""
@@ -0,0 +1,119 @@
+"""
+Result cache for location analyses.
+
+``GeographicIntelligenceService.analyze_location`` results are kept in a
+per-process LRU cache keyed by group, coordinates snapped to a grid, radius
+and the group's geographic data version. The data version lives in the
+Django cache so that a POI, university or neighborhood change in any process
+invalidates cached analyses everywhere.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+DATA_VERSION_KEY_PREFIX = "geographic_intelligence:data_version"
+
+# ~110m of latitude; leads geocoded to the same city centre share one entry
+DEFAULT_GRID_DEGREES = 0.001
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def get_data_version(group_id) -> int:
+    """Current geographic data version for a group."""
+    return cache.get(f"{DATA_VERSION_KEY_PREFIX}:{group_id}", 0)
+
+
+def bump_data_version(group_id) -> int:
+    """Invalidate cached analyses for a group by moving to a new data version."""
+    key = f"{DATA_VERSION_KEY_PREFIX}:{group_id}"
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Key missing (first change, or evicted); any change of value invalidates
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def snap_coordinate(value: float, grid_degrees: float) -> float:
+    """Snap a coordinate to the centre line of its grid cell."""
+    return round(round(value / grid_degrees) * grid_degrees, 7)
+
+
+class LocationAnalysisCache:
+    """
+    Thread-safe LRU cache of location analysis results.
+
+    Entries are deep-copied on the way in and out so callers can mutate the
+    returned analysis freely.
+    """
+
+    def __init__(self, max_entries: int = None, grid_degrees: float = None):
+        self.max_entries = max_entries or getattr(
+            settings, 'GEOGRAPHIC_ANALYSIS_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES
+        )
+        self.grid_degrees = grid_degrees or getattr(
+            settings, 'GEOGRAPHIC_ANALYSIS_CACHE_GRID_DEGREES', DEFAULT_GRID_DEGREES
+        )
+        self._entries: 'OrderedDict[Hashable, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def snap(self, lat: float, lng: float) -> Tuple[float, float]:
+        """Coordinates snapped to this cache's grid."""
+        return snap_coordinate(lat, self.grid_degrees), snap_coordinate(lng, self.grid_degrees)
+
+    def make_key(self, group_id, lat: float, lng: float, radius_km: float) -> Tuple:
+        """Cache key for an analysis; includes the group's current data version."""
+        snapped_lat, snapped_lng = self.snap(lat, lng)
+        return (str(group_id), snapped_lat, snapped_lng, float(radius_km), get_data_version(group_id))
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Cached analysis for ``key``, or None; counts a hit or a miss."""
+        with self._lock:
+            analysis = self._entries.get(key)
+            if analysis is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(analysis)
+
+    def set(self, key: Hashable, analysis: Dict[str, Any]):
+        """Store an analysis, evicting the least recently used entries past capacity."""
+        analysis = copy.deepcopy(analysis)
+        with self._lock:
+            self._entries[key] = analysis
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Shared by every service instance in the process
+location_analysis_cache = LocationAnalysisCache()
@@ -0,0 +1,157 @@
+"""
+Geodesic distance kernels for geographic intelligence.
+
+Distances between SRID 4326 coordinates are computed with vectorized NumPy
+kernels over coordinate arrays, so a whole candidate set is measured in one
+call instead of building a GEOS object per pair. For queryset work the
+``annotate_distance`` helper pushes the calculation into the database.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from django.contrib.gis.db.models.functions import Distance as DistanceFunc
+from django.contrib.gis.geos import Point
+from django.contrib.gis.measure import Distance
+from django.db.models import QuerySet
+
+# Mean Earth radius (IUGG) in kilometres
+EARTH_RADIUS_KM = 6371.0088
+
+# Streets aren't straight lines
+WALKING_FACTOR = 1.3
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+def haversine_km(lat1: ArrayLike, lng1: ArrayLike,
+                 lat2: ArrayLike, lng2: ArrayLike) -> np.ndarray:
+    """
+    Great-circle distance in kilometres between coordinate arrays.
+
+    Inputs are degrees and broadcast against each other, so one origin can be
+    measured against any number of destinations in a single call.
+    """
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(value, dtype=float))
+                              for value in (lat1, lng1, lat2, lng2))
+
+    a = (np.sin((lat2 - lat1) / 2.0) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2.0) ** 2)
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def equirectangular_km(lat1: ArrayLike, lng1: ArrayLike,
+                       lat2: ArrayLike, lng2: ArrayLike) -> np.ndarray:
+    """
+    Equirectangular approximation of distance in kilometres.
+
+    Cheaper than haversine and within 0.1% of it at city scale (tens of
+    kilometres); use ``haversine_km`` for long distances.
+    """
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(value, dtype=float))
+                              for value in (lat1, lng1, lat2, lng2))
+
+    x = (lng2 - lng1) * np.cos((lat1 + lat2) / 2.0)
+    y = lat2 - lat1
+    return EARTH_RADIUS_KM * np.hypot(x, y)
+
+
+def coordinate_arrays(points: Iterable[Point]) -> Tuple[np.ndarray, np.ndarray]:
+    """Split SRID 4326 points into (latitudes, longitudes) arrays."""
+    coords = np.array([(point.y, point.x) for point in points], dtype=float).reshape(-1, 2)
+    return coords[:, 0], coords[:, 1]
+
+
+def distances_from_point(origin: Point, points: Iterable[Point]) -> np.ndarray:
+    """Kilometres from ``origin`` to each point, computed in one kernel call."""
+    lats, lngs = coordinate_arrays(points)
+    return haversine_km(origin.y, origin.x, lats, lngs)
+
+
+def distance_km(point1: Point, point2: Point) -> float:
+    """Kilometres between two SRID 4326 points."""
+    return float(haversine_km(point1.y, point1.x, point2.y, point2.x))
+
+
+def walking_distances_from_point(origin: Point, points: Iterable[Point]) -> np.ndarray:
+    """Estimated walking kilometres from ``origin`` to each point."""
+    return distances_from_point(origin, points) * WALKING_FACTOR
+
+
+def annotate_distance(queryset: QuerySet, field: str, origin: Point,
+                      name: str = 'distance') -> QuerySet:
+    """
+    Annotate a queryset with the database-computed distance to ``origin``.
+
+    On geodetic fields the annotation is a ``Distance`` measure, so callers
+    read kilometres with ``.km``.
+    """
+    return queryset.annotate(**{name: DistanceFunc(field, origin)})
+
+
+class DistanceIndex:
+    """
+    Sorted distances from a fixed origin, grouped by a key such as POI type.
+
+    Built from one spatial query up to ``max_radius_km``; the number of
+    candidates within any smaller radius is then a binary search over the
+    sorted distances, so a whole radius sweep costs a single round trip.
+    """
+
+    def __init__(self, distances_by_key: Dict[str, Iterable[float]], max_radius_km: float):
+        self.max_radius_km = max_radius_km
+        self._distances = {
+            key: np.sort(np.asarray(list(distances), dtype=float))
+            for key, distances in distances_by_key.items()
+        }
+
+    @classmethod
+    def from_queryset(cls, queryset: QuerySet, field: str, origin: Point,
+                      max_radius_km: float, key_field: str) -> 'DistanceIndex':
+        """Fetch every candidate within ``max_radius_km`` once and index it by ``key_field``."""
+        rows = annotate_distance(
+            queryset.filter(**{f'{field}__distance_lte': (origin, Distance(km=max_radius_km))}),
+            field, origin
+        ).values_list(key_field, 'distance')
+
+        distances_by_key: Dict[str, List[float]] = {}
+        for key, distance in rows:
+            distances_by_key.setdefault(key, []).append(distance.km)
+
+        return cls(distances_by_key, max_radius_km)
+
+    def keys(self) -> List[str]:
+        """Keys with at least one candidate in range."""
+        return list(self._distances.keys())
+
+    def count(self, key: str, radius_km: float) -> int:
+        """Number of candidates for ``key`` within ``radius_km`` (inclusive)."""
+        self._check_radius(radius_km)
+        distances = self._distances.get(key)
+        if distances is None:
+            return 0
+        return int(np.searchsorted(distances, radius_km, side='right'))
+
+    def counts(self, radius_km: float, keys: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Candidate counts within ``radius_km`` for each key."""
+        keys = self.keys() if keys is None else keys
+        return {key: self.count(key, radius_km) for key in keys}
+
+    def count_matrix(self, radii: Sequence[float], keys: Sequence[str]) -> np.ndarray:
+        """Counts for every (radius, key) pair as a ``len(radii) x len(keys)`` array."""
+        radii = np.asarray(radii, dtype=float)
+        if radii.size:
+            self._check_radius(float(radii.max()))
+
+        matrix = np.zeros((radii.size, len(keys)), dtype=int)
+        for column, key in enumerate(keys):
+            distances = self._distances.get(key)
+            if distances is not None:
+                matrix[:, column] = np.searchsorted(distances, radii, side='right')
+        return matrix
+
+    def _check_radius(self, radius_km: float):
+        if radius_km > self.max_radius_km:
+            raise ValueError(
+                f"Radius {radius_km}km exceeds indexed radius {self.max_radius_km}km"
+            )
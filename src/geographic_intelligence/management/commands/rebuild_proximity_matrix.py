@@ -0,0 +1,52 @@
+"""
+Django management command to rebuild neighborhood proximity entries.
+
+Recomputes the materialized neighborhood-to-POI/university distances used by
+neighborhood scoring, for a whole group or selected neighborhoods.
+"""
+
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Group
+from geographic_intelligence.models import Neighborhood
+from geographic_intelligence.services import ProximityMatrixService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild materialized neighborhood proximity entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--group',
+            type=str,
+            required=True,
+            help='Group name whose neighborhoods should be rebuilt'
+        )
+        parser.add_argument(
+            '--stale-only',
+            action='store_true',
+            help='Only build neighborhoods that have never been indexed'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            group = Group.objects.get(name=options['group'])
+        except Group.DoesNotExist:
+            raise CommandError(f"Group '{options['group']}' does not exist")
+
+        service = ProximityMatrixService(group=group)
+        neighborhoods = Neighborhood.objects.filter(group=group)
+
+        if options['stale_only']:
+            neighborhoods = neighborhoods.filter(proximity_refreshed_at__isnull=True)
+
+        summary = service.rebuild(neighborhoods)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {summary['neighborhoods']} neighborhoods "
+            f"({summary['entries']} proximity entries)"
+        ))
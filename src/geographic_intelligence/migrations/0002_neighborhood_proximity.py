@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-16 09:12
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geographic_intelligence', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='neighborhood',
+            name='proximity_refreshed_at',
+            field=models.DateTimeField(blank=True, help_text="When the neighborhood's proximity entries were last rebuilt", null=True),
+        ),
+        migrations.CreateModel(
+            name='NeighborhoodProximity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('poi_type', models.CharField(choices=[('university', 'University/College'), ('dormitory', 'Existing Student Accommodation'), ('transport', 'Transport Hub'), ('metro', 'Metro/Subway Station'), ('bus', 'Bus Stop'), ('train', 'Train Station'), ('shopping', 'Shopping Center'), ('grocery', 'Grocery Store'), ('restaurant', 'Restaurant/Cafe'), ('nightlife', 'Nightlife Venue'), ('library', 'Library'), ('sports', 'Sports Facility'), ('healthcare', 'Healthcare Facility'), ('park', 'Park/Recreation')], help_text='Type of the nearby POI', max_length=20)),
+                ('distance_km', models.FloatField(help_text='Distance from the neighborhood centroid in kilometers', validators=[django.core.validators.MinValueValidator(0)])),
+                ('neighborhood', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='proximities', to='geographic_intelligence.neighborhood')),
+                ('point_of_interest', models.ForeignKey(blank=True, help_text='Nearby POI (empty for university entries)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='neighborhood_proximities', to='geographic_intelligence.pointofinterest')),
+                ('university', models.ForeignKey(blank=True, help_text='Nearby university (empty for POI entries)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='neighborhood_proximities', to='geographic_intelligence.university')),
+            ],
+            options={
+                'db_table': 'geographic_intelligence_neighborhood_proximities',
+                'ordering': ['distance_km'],
+                'indexes': [models.Index(fields=['neighborhood', 'poi_type', 'distance_km'], name='geo_nbhd_prox_type_dist_idx')],
+                'unique_together': {('neighborhood', 'university'), ('neighborhood', 'point_of_interest')},
+            },
+        ),
+    ]
@@ -536,6 +536,12 @@ class Neighborhood(UUIDModel, TimestampedModel, PlatformModel):
         help_text="Primary university serving this neighborhood"
     )
     
+    proximity_refreshed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the neighborhood's proximity entries were last rebuilt"
+    )
+    
     class Meta:
         db_table = 'geographic_intelligence_neighborhoods'
         indexes = [
@@ -584,6 +590,68 @@ class Neighborhood(UUIDModel, TimestampedModel, PlatformModel):
         service.calculate_neighborhood_scores(self)
 
 
+class NeighborhoodProximity(models.Model):
+    """
+    Materialized distance from a neighborhood centroid to a nearby POI or university.
+    
+    Lets neighborhood scoring read every nearby POI and university in one
+    query instead of issuing a spatial query per scoring dimension. Rows are
+    maintained incrementally by ``ProximityMatrixService``.
+    """
+    
+    neighborhood = models.ForeignKey(
+        Neighborhood,
+        on_delete=models.CASCADE,
+        related_name='proximities'
+    )
+    
+    point_of_interest = models.ForeignKey(
+        PointOfInterest,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='neighborhood_proximities',
+        help_text="Nearby POI (empty for university entries)"
+    )
+    
+    university = models.ForeignKey(
+        University,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='neighborhood_proximities',
+        help_text="Nearby university (empty for POI entries)"
+    )
+    
+    poi_type = models.CharField(
+        max_length=20,
+        choices=POIType.choices,
+        help_text="Type of the nearby POI"
+    )
+    
+    distance_km = models.FloatField(
+        validators=[MinValueValidator(0)],
+        help_text="Distance from the neighborhood centroid in kilometers"
+    )
+    
+    class Meta:
+        db_table = 'geographic_intelligence_neighborhood_proximities'
+        unique_together = [
+            ['neighborhood', 'point_of_interest'],
+            ['neighborhood', 'university'],
+        ]
+        indexes = [
+            models.Index(
+                fields=['neighborhood', 'poi_type', 'distance_km'],
+                name='geo_nbhd_prox_type_dist_idx'
+            ),
+        ]
+        ordering = ['distance_km']
+    
+    def __str__(self):
+        return f"{self.neighborhood_id} -> {self.poi_type} ({self.distance_km:.2f}km)"
+
+
 class PBSAMarketAnalysis(UUIDModel, TimestampedModel, PlatformModel):
     """
     Complete PBSA market analysis for a city or region.
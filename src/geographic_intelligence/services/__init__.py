@@ -9,10 +9,13 @@ from .geographic_intelligence_service import GeographicIntelligenceService
 from .neighborhood_scoring_service import NeighborhoodScoringService
 from .proximity_analysis_service import ProximityAnalysisService
 from .market_analysis_service import MarketAnalysisService
+from .proximity_matrix_service import ProximityMatrixService, NeighborhoodProximityProfile
 
 __all__ = [
     'GeographicIntelligenceService',
     'NeighborhoodScoringService', 
     'ProximityAnalysisService',
     'MarketAnalysisService',
+    'ProximityMatrixService',
+    'NeighborhoodProximityProfile',
 ]
\ No newline at end of file
@@ -11,11 +11,15 @@ from decimal import Decimal
 from datetime import datetime
 
 from django.contrib.gis.geos import Point, Polygon
+from django.contrib.gis.db.models.functions import Centroid
 from django.contrib.gis.measure import Distance
-from django.db.models import QuerySet, Count, Avg, Max, Min
+from django.db.models import QuerySet, Count, Avg, Max, Min, F, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 
 from accounts.models import Group, User
+from ..cache import location_analysis_cache
+from ..distance import annotate_distance, distances_from_point
 from ..models import (
     PointOfInterest, POIType, University, Neighborhood, 
     NeighborhoodMetrics, PBSAMarketAnalysis
@@ -32,25 +36,60 @@ class GeographicIntelligenceService:
     various geographic intelligence components.
     """
     
-    def __init__(self, group: Group):
-        """Initialize service for a specific group."""
+    # Nearest POIs reported per type in location analyses
+    POIS_PER_TYPE = 10
+    
+    def __init__(self, group: Group, use_cache: bool = True):
+        """
+        Initialize service for a specific group.
+        
+        Args:
+            group: Group whose geographic data is analysed
+            use_cache: Serve repeated location analyses from the shared cache
+        """
         self.group = group
+        self.use_cache = use_cache
+        self.cache = location_analysis_cache
     
     def analyze_location(self, 
                         lat: float, 
                         lng: float, 
-                        radius_km: float = 5.0) -> Dict[str, Any]:
+                        radius_km: float = 5.0,
+                        use_cache: bool = None) -> Dict[str, Any]:
         """
         Perform comprehensive location analysis for a given point.
         
+        Cached analyses are keyed by coordinates snapped to the cache grid, so
+        nearby points share a result computed at the cell centre. Any POI,
+        university or neighborhood change in the group invalidates them.
+        
         Args:
             lat: Latitude coordinate
             lng: Longitude coordinate  
             radius_km: Analysis radius in kilometers
+            use_cache: Override the service's cache setting (False bypasses it)
             
         Returns:
             Dictionary containing comprehensive location analysis
         """
+        if use_cache is None:
+            use_cache = self.use_cache
+        
+        if not use_cache:
+            return self._compute_location_analysis(lat, lng, radius_km)
+        
+        key = self.cache.make_key(self.group.pk if self.group else None, lat, lng, radius_km)
+        analysis = self.cache.get(key)
+        if analysis is None:
+            snapped_lat, snapped_lng = self.cache.snap(lat, lng)
+            analysis = self._compute_location_analysis(snapped_lat, snapped_lng, radius_km)
+            self.cache.set(key, analysis)
+        
+        analysis['location'] = {'lat': lat, 'lng': lng}
+        return analysis
+    
+    def _compute_location_analysis(self, lat: float, lng: float, radius_km: float) -> Dict[str, Any]:
+        """Run the full location analysis without consulting the cache."""
         point = Point(lng, lat, srid=4326)
         
         analysis = {
@@ -74,17 +113,19 @@ class GeographicIntelligenceService:
     
     def _analyze_universities(self, point: Point, radius_km: float) -> Dict[str, Any]:
         """Analyze universities within radius of the point."""
-        universities = University.objects.filter(
+        universities = list(University.objects.filter(
             group=self.group,
             main_campus__location__distance_lte=(point, Distance(km=radius_km))
-        ).select_related('main_campus')
+        ).select_related('main_campus'))
+        
+        distances = distances_from_point(point, (uni.main_campus.location for uni in universities))
         
         university_data = []
         total_students = 0
         international_students = 0
         
-        for uni in universities:
-            distance = uni.main_campus.location.distance(point) * 100  # Convert to km
+        for uni, distance in zip(universities, distances):
+            distance = float(distance)
             uni_data = {
                 'name': uni.name,
                 'type': uni.university_type,
@@ -113,69 +154,98 @@ class GeographicIntelligenceService:
         }
     
     def _analyze_pois(self, point: Point, radius_km: float) -> Dict[str, Any]:
-        """Analyze points of interest within radius."""
-        pois = PointOfInterest.objects.filter(
-            group=self.group,
-            location__distance_lte=(point, Distance(km=radius_km))
-        )
+        """
+        Analyze points of interest within radius.
         
-        poi_analysis = {}
+        Runs a single spatial query: every POI in range is ranked by distance
+        within its type, per-type count and average distance are computed as
+        window aggregates, and only the nearest ``POIS_PER_TYPE`` rows of each
+        type are returned.
+        """
+        pois = annotate_distance(
+            PointOfInterest.objects.filter(
+                group=self.group,
+                location__distance_lte=(point, Distance(km=radius_km))
+            ),
+            'location', point
+        ).annotate(
+            type_rank=Window(
+                expression=RowNumber(),
+                partition_by=[F('poi_type')],
+                order_by=F('distance').asc()
+            ),
+            type_count=Window(expression=Count('id'), partition_by=[F('poi_type')]),
+            type_avg_distance=Window(expression=Avg('distance'), partition_by=[F('poi_type')])
+        ).filter(
+            type_rank__lte=self.POIS_PER_TYPE
+        ).order_by(
+            'poi_type', 'type_rank'
+        ).values(
+            'name', 'address', 'verified', 'poi_type',
+            'distance', 'type_count', 'type_avg_distance'
+        )
         
-        # Group POIs by type
-        for poi_type in POIType.choices:
-            type_code = poi_type[0]
-            type_pois = pois.filter(poi_type=type_code)
-            
-            poi_analysis[type_code] = {
-                'count': type_pois.count(),
+        poi_analysis = {
+            type_code: {
+                'count': 0,
                 'closest_distance_km': None,
                 'average_distance_km': None,
                 'pois': []
             }
+            for type_code in POIType.values
+        }
+        
+        for row in pois:
+            type_data = poi_analysis.setdefault(row['poi_type'], {'pois': []})
+            distance_km = row['distance'].km
             
-            if type_pois.exists():
-                poi_data = []
-                distances = []
-                
-                for poi in type_pois[:10]:  # Limit to 10 closest
-                    distance = poi.location.distance(point) * 100  # Convert to km
-                    distances.append(distance)
-                    poi_data.append({
-                        'name': poi.name,
-                        'address': poi.address,
-                        'distance_km': round(distance, 2),
-                        'verified': poi.verified
-                    })
-                
-                poi_analysis[type_code].update({
-                    'closest_distance_km': round(min(distances), 2),
-                    'average_distance_km': round(sum(distances) / len(distances), 2),
-                    'pois': poi_data
+            if not type_data['pois']:
+                type_data.update({
+                    'count': row['type_count'],
+                    'closest_distance_km': round(distance_km, 2),
+                    'average_distance_km': round(self._as_km(row['type_avg_distance']), 2)
                 })
+            
+            type_data['pois'].append({
+                'name': row['name'],
+                'address': row['address'],
+                'distance_km': round(distance_km, 2),
+                'verified': row['verified']
+            })
         
         # Calculate convenience score based on POI availability
         convenience_score = self._calculate_convenience_score(poi_analysis)
         
         return {
             'by_type': poi_analysis,
-            'total_pois': pois.count(),
+            'total_pois': sum(type_data['count'] for type_data in poi_analysis.values()),
             'convenience_score': convenience_score
         }
     
+    @staticmethod
+    def _as_km(value) -> float:
+        """Convert an aggregated distance (measure or metres) to kilometres."""
+        if value is None:
+            return 0.0
+        return value.km if hasattr(value, 'km') else float(value) / 1000.0
+    
     def _analyze_neighborhoods(self, point: Point, radius_km: float) -> Dict[str, Any]:
         """Analyze neighborhoods that intersect with the search area."""
         # Find neighborhoods that contain the point or are within radius
-        neighborhoods = Neighborhood.objects.filter(
+        neighborhoods = list(Neighborhood.objects.filter(
             group=self.group,
             boundaries__distance_lte=(point, Distance(km=radius_km))
-        ).select_related('metrics', 'primary_university')
+        ).annotate(
+            centroid=Centroid('boundaries')
+        ).select_related('metrics', 'primary_university'))
+        
+        # Distance from point to each neighborhood centroid, in one kernel call
+        distances = distances_from_point(point, (n.centroid for n in neighborhoods))
         
         neighborhood_data = []
         
-        for neighborhood in neighborhoods:
-            # Calculate distance from point to neighborhood centroid
-            centroid = neighborhood.boundaries.centroid
-            distance = centroid.distance(point) * 100  # Convert to km
+        for neighborhood, distance in zip(neighborhoods, distances):
+            distance = float(distance)
             
             neighborhood_data.append({
                 'name': neighborhood.name,
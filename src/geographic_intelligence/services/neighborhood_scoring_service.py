@@ -6,20 +6,25 @@ criteria relevant to student accommodation investments.
 """
 
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from typing import Dict, List, Optional, Tuple, Any
 from decimal import Decimal
 from datetime import datetime
 
 from django.contrib.gis.geos import Point, Polygon
-from django.contrib.gis.measure import Distance
+from django.db import connection, connections
 from django.db.models import QuerySet, Count, Avg, Q
 from django.utils import timezone
 
 from accounts.models import Group
 from ..models import (
-    PointOfInterest, POIType, University, Neighborhood, 
+    POIType, Neighborhood, 
     NeighborhoodMetrics
 )
+from ..cache import bump_data_version
+from .proximity_matrix_service import NeighborhoodProximityProfile, ProximityMatrixService
 
 logger = logging.getLogger(__name__)
 
@@ -32,35 +37,66 @@ class NeighborhoodScoringService:
     university proximity, amenities, affordability, safety, and development feasibility.
     """
     
+    TRANSPORT_TYPES = ['metro', 'train', 'bus', 'transport']
+    
+    # Metric fields written by batch scoring
+    METRIC_FIELDS = [
+        'accessibility_score', 'university_proximity_score', 'amenities_score',
+        'affordability_score', 'safety_score', 'cultural_score',
+        'planning_feasibility_score', 'competition_score', 'overall_score',
+        'score_weights', 'transport_links_count', 'amenities_count',
+        'calculation_date', 'data_sources'
+    ]
+    
+    DEFAULT_CHUNK_SIZE = 250
+    
+    # module.json caps the container at 2 CPUs
+    MAX_WORKERS = 2
+    
     def __init__(self, group: Group = None):
         """Initialize service for a specific group."""
         self.group = group
+        self.proximity_service = ProximityMatrixService(group=group)
     
-    def calculate_neighborhood_scores(self, neighborhood: Neighborhood) -> NeighborhoodMetrics:
+    def calculate_neighborhood_scores(self,
+                                      neighborhood: Neighborhood,
+                                      profile: NeighborhoodProximityProfile = None) -> NeighborhoodMetrics:
         """
         Calculate comprehensive scores for a neighborhood.
         
         Args:
             neighborhood: Neighborhood instance to score
+            profile: Preloaded proximity profile (loaded on demand if omitted)
             
         Returns:
             Updated NeighborhoodMetrics instance
         """
+        if profile is None:
+            profile = self.proximity_service.load_profile(neighborhood)
+        
+        metrics = self._score_metrics(neighborhood, profile)
+        metrics.save()
+        return metrics
+    
+    def _score_metrics(self,
+                       neighborhood: Neighborhood,
+                       profile: NeighborhoodProximityProfile) -> NeighborhoodMetrics:
+        """Populate the neighborhood's metrics from its proximity profile without saving."""
         metrics = neighborhood.metrics
         
         # Calculate individual scores
-        metrics.accessibility_score = self._calculate_accessibility_score(neighborhood)
-        metrics.university_proximity_score = self._calculate_university_proximity_score(neighborhood)
-        metrics.amenities_score = self._calculate_amenities_score(neighborhood)
+        metrics.accessibility_score = self._calculate_accessibility_score(profile)
+        metrics.university_proximity_score = self._calculate_university_proximity_score(profile)
+        metrics.amenities_score = self._calculate_amenities_score(profile)
         metrics.affordability_score = self._calculate_affordability_score(neighborhood)
-        metrics.safety_score = self._calculate_safety_score(neighborhood)
-        metrics.cultural_score = self._calculate_cultural_score(neighborhood)
+        metrics.safety_score = self._calculate_safety_score(neighborhood, profile)
+        metrics.cultural_score = self._calculate_cultural_score(profile)
         metrics.planning_feasibility_score = self._calculate_planning_feasibility_score(neighborhood)
-        metrics.competition_score = self._calculate_competition_score(neighborhood)
+        metrics.competition_score = self._calculate_competition_score(profile)
         
         # Update supporting metrics
-        metrics.transport_links_count = self._count_transport_links(neighborhood)
-        metrics.amenities_count = self._count_amenities(neighborhood)
+        metrics.transport_links_count = self._count_transport_links(profile)
+        metrics.amenities_count = self._count_amenities(profile)
         
         # Calculate overall score
         metrics.calculate_overall_score()
@@ -69,25 +105,19 @@ class NeighborhoodScoringService:
         metrics.calculation_date = timezone.now()
         metrics.data_sources = self._get_data_sources()
         
-        metrics.save()
         return metrics
     
-    def _calculate_accessibility_score(self, neighborhood: Neighborhood) -> float:
+    def _calculate_accessibility_score(self, profile: NeighborhoodProximityProfile) -> float:
         """Calculate transport accessibility score (0-100)."""
-        centroid = neighborhood.boundaries.centroid
         score = 0.0
         
         # Find transport POIs within neighborhood and nearby
-        transport_pois = PointOfInterest.objects.filter(
-            group=neighborhood.group,
-            poi_type__in=['metro', 'train', 'bus', 'transport'],
-            location__distance_lte=(centroid, Distance(km=2.0))
-        )
+        transport_pois = profile.pois_within(self.TRANSPORT_TYPES, 2.0)
         
         # Score based on transport type and proximity
-        metro_count = transport_pois.filter(poi_type='metro').count()
-        train_count = transport_pois.filter(poi_type='train').count()
-        bus_count = transport_pois.filter(poi_type='bus').count()
+        metro_count = sum(1 for poi in transport_pois if poi.poi_type == 'metro')
+        train_count = sum(1 for poi in transport_pois if poi.poi_type == 'train')
+        bus_count = sum(1 for poi in transport_pois if poi.poi_type == 'bus')
         
         # Metro stations (highest value)
         score += min(metro_count * 30, 60)  # Max 60 points for metro
@@ -99,35 +129,27 @@ class NeighborhoodScoringService:
         score += min(bus_count * 2, 20)  # Max 20 points for buses
         
         # Distance penalty for closest transport
-        if transport_pois.exists():
-            closest_transport = min(
-                poi.location.distance(centroid) * 100  # Convert to km
-                for poi in transport_pois
-            )
+        if transport_pois:
+            closest_transport = transport_pois[0].distance_km
             distance_bonus = max(0, (1.0 - closest_transport) / 1.0) * 20
             score += distance_bonus
         
         return min(score, 100.0)
     
-    def _calculate_university_proximity_score(self, neighborhood: Neighborhood) -> float:
+    def _calculate_university_proximity_score(self, profile: NeighborhoodProximityProfile) -> float:
         """Calculate proximity to universities score (0-100)."""
-        centroid = neighborhood.boundaries.centroid
-        
         # Find universities within reasonable distance
-        universities = University.objects.filter(
-            group=neighborhood.group,
-            main_campus__location__distance_lte=(centroid, Distance(km=10.0))
-        ).select_related('main_campus')
+        universities = profile.universities_within(10.0)
         
-        if not universities.exists():
+        if not universities:
             return 0.0
         
         score = 0.0
         total_students = 0
         
-        for university in universities:
-            distance_km = university.main_campus.location.distance(centroid) * 100
-            student_count = university.total_students
+        for entry in universities:
+            distance_km = entry.distance_km
+            student_count = entry.university.total_students
             total_students += student_count
             
             # Distance scoring (closer is better)
@@ -149,7 +171,7 @@ class NeighborhoodScoringService:
             score += university_score
         
         # Bonus for multiple universities
-        if universities.count() > 1:
+        if len(universities) > 1:
             score *= 1.2
         
         # Bonus for large total student population
@@ -158,10 +180,8 @@ class NeighborhoodScoringService:
         
         return min(score, 100.0)
     
-    def _calculate_amenities_score(self, neighborhood: Neighborhood) -> float:
+    def _calculate_amenities_score(self, profile: NeighborhoodProximityProfile) -> float:
         """Calculate student amenities availability score (0-100)."""
-        centroid = neighborhood.boundaries.centroid
-        
         # Define amenity types and their weights
         amenity_weights = {
             'grocery': 15,      # Essential
@@ -177,13 +197,9 @@ class NeighborhoodScoringService:
         score = 0.0
         
         for poi_type, weight in amenity_weights.items():
-            pois = PointOfInterest.objects.filter(
-                group=neighborhood.group,
-                poi_type=poi_type,
-                location__distance_lte=(centroid, Distance(km=1.5))
-            )
+            pois = profile.pois_within([poi_type], 1.5)
             
-            count = pois.count()
+            count = len(pois)
             if count > 0:
                 # Base score for having any of this type
                 type_score = weight * 0.6
@@ -193,9 +209,7 @@ class NeighborhoodScoringService:
                     type_score += weight * 0.3 * min(count - 1, 3) / 3
                 
                 # Proximity bonus
-                closest_distance = min(
-                    poi.location.distance(centroid) * 100 for poi in pois
-                )
+                closest_distance = pois[0].distance_km
                 if closest_distance <= 0.5:
                     type_score += weight * 0.1
                 
@@ -232,27 +246,18 @@ class NeighborhoodScoringService:
         
         return max(0, min(score, 100.0))
     
-    def _calculate_safety_score(self, neighborhood: Neighborhood) -> float:
+    def _calculate_safety_score(self,
+                                neighborhood: Neighborhood,
+                                profile: NeighborhoodProximityProfile) -> float:
         """Calculate neighborhood safety score (0-100)."""
         score = 50.0  # Base safety score
         
-        # Check for safety-related POIs
-        centroid = neighborhood.boundaries.centroid
-        
         # Healthcare facilities nearby (positive factor)
-        healthcare_count = PointOfInterest.objects.filter(
-            group=neighborhood.group,
-            poi_type='healthcare',
-            location__distance_lte=(centroid, Distance(km=2.0))
-        ).count()
+        healthcare_count = profile.count(['healthcare'], 2.0)
         score += min(healthcare_count * 10, 20)
         
         # Well-lit areas (parks, shopping centers indicate activity)
-        activity_pois = PointOfInterest.objects.filter(
-            group=neighborhood.group,
-            poi_type__in=['shopping', 'restaurant', 'sports'],
-            location__distance_lte=(centroid, Distance(km=1.0))
-        ).count()
+        activity_pois = profile.count(['shopping', 'restaurant', 'sports'], 1.0)
         score += min(activity_pois * 3, 15)
         
         # Use crime rate if available
@@ -263,21 +268,17 @@ class NeighborhoodScoringService:
         
         return min(score, 100.0)
     
-    def _calculate_cultural_score(self, neighborhood: Neighborhood) -> float:
+    def _calculate_cultural_score(self, profile: NeighborhoodProximityProfile) -> float:
         """Calculate cultural and leisure options score (0-100)."""
-        centroid = neighborhood.boundaries.centroid
-        
-        cultural_pois = PointOfInterest.objects.filter(
-            group=neighborhood.group,
-            poi_type__in=['restaurant', 'nightlife', 'sports', 'park', 'library'],
-            location__distance_lte=(centroid, Distance(km=2.0))
+        cultural_pois = profile.pois_within(
+            ['restaurant', 'nightlife', 'sports', 'park', 'library'], 2.0
         )
         
         score = 0.0
         
         # Score by type diversity and quantity
-        poi_types = cultural_pois.values('poi_type').distinct().count()
-        total_count = cultural_pois.count()
+        poi_types = len({poi.poi_type for poi in cultural_pois})
+        total_count = len(cultural_pois)
         
         # Diversity bonus
         score += poi_types * 15  # Up to 75 points for all 5 types
@@ -317,23 +318,17 @@ class NeighborhoodScoringService:
         
         return max(0, min(score, 100.0))
     
-    def _calculate_competition_score(self, neighborhood: Neighborhood) -> float:
+    def _calculate_competition_score(self, profile: NeighborhoodProximityProfile) -> float:
         """Calculate competition score (0-100, higher = less competition)."""
-        centroid = neighborhood.boundaries.centroid
-        
         # Count existing student accommodation within area
-        competing_pois = PointOfInterest.objects.filter(
-            group=neighborhood.group,
-            poi_type='dormitory',
-            location__distance_lte=(centroid, Distance(km=2.0))
-        )
+        competing_pois = profile.pois_within(['dormitory'], 2.0)
         
-        competition_count = competing_pois.count()
+        competition_count = len(competing_pois)
         
         # Calculate total competing beds if capacity data available
         total_competing_beds = sum(
-            poi.capacity for poi in competing_pois 
-            if poi.capacity
+            entry.point_of_interest.capacity for entry in competing_pois
+            if entry.point_of_interest.capacity
         )
         
         # Base score (assumes moderate competition)
@@ -353,24 +348,14 @@ class NeighborhoodScoringService:
         
         return max(0, min(score, 100.0))
     
-    def _count_transport_links(self, neighborhood: Neighborhood) -> int:
+    def _count_transport_links(self, profile: NeighborhoodProximityProfile) -> int:
         """Count transport links in and around neighborhood."""
-        centroid = neighborhood.boundaries.centroid
-        return PointOfInterest.objects.filter(
-            group=neighborhood.group,
-            poi_type__in=['metro', 'train', 'bus', 'transport'],
-            location__distance_lte=(centroid, Distance(km=1.5))
-        ).count()
+        return profile.count(self.TRANSPORT_TYPES, 1.5)
     
-    def _count_amenities(self, neighborhood: Neighborhood) -> int:
+    def _count_amenities(self, profile: NeighborhoodProximityProfile) -> int:
         """Count relevant amenities in neighborhood."""
-        centroid = neighborhood.boundaries.centroid
         amenity_types = ['grocery', 'restaurant', 'shopping', 'library', 'sports', 'healthcare']
-        return PointOfInterest.objects.filter(
-            group=neighborhood.group,
-            poi_type__in=amenity_types,
-            location__distance_lte=(centroid, Distance(km=1.0))
-        ).count()
+        return profile.count(amenity_types, 1.0)
     
     def _get_data_sources(self) -> List[str]:
         """Get list of data sources used in calculations."""
@@ -382,16 +367,30 @@ class NeighborhoodScoringService:
             f'Calculated: {timezone.now().strftime("%Y-%m-%d")}'
         ]
     
-    def batch_calculate_scores(self, neighborhoods: QuerySet[Neighborhood]) -> Dict[str, Any]:
+    def batch_calculate_scores(self,
+                               neighborhoods: QuerySet[Neighborhood],
+                               parallel: bool = False,
+                               chunk_size: int = DEFAULT_CHUNK_SIZE,
+                               max_workers: int = None) -> Dict[str, Any]:
         """
         Calculate scores for multiple neighborhoods in batch.
         
+        Neighborhoods are scored in chunks of ``chunk_size``; each chunk loads
+        its proximity profiles in one query and returns computed metric values
+        without saving. With ``parallel=True`` chunks run on a process pool,
+        each worker on its own database connection. All metrics are then
+        written with a single ``bulk_update``.
+        
         Args:
             neighborhoods: QuerySet of neighborhoods to score
+            parallel: Score chunks on a process pool instead of in-process
+            chunk_size: Neighborhoods per chunk
+            max_workers: Pool size (defaults to ``MAX_WORKERS``)
             
         Returns:
-            Summary statistics of the scoring operation
+            Summary statistics of the scoring operation, including per-chunk timing
         """
+        started = time.perf_counter()
         results = {
             'processed': 0,
             'updated': 0,
@@ -401,17 +400,42 @@ class NeighborhoodScoringService:
                 'moderate': 0, # 60-79
                 'low': 0,     # 40-59
                 'poor': 0     # <40
-            }
+            },
+            'chunks': []
         }
         
-        for neighborhood in neighborhoods:
-            try:
-                self.calculate_neighborhood_scores(neighborhood)
-                results['processed'] += 1
-                results['updated'] += 1
+        # Index never-scored neighborhoods up front so workers only read
+        self.proximity_service.refresh_stale(
+            neighborhoods.filter(proximity_refreshed_at__isnull=True)
+        )
+        
+        ids = list(neighborhoods.order_by('pk').values_list('pk', flat=True))
+        chunk_size = max(int(chunk_size), 1)
+        chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+        
+        # Workers can't see uncommitted rows, so stay in-process inside a transaction
+        if parallel and len(chunks) > 1 and not connection.in_atomic_block:
+            chunk_results = self._run_chunks_in_pool(chunks, max_workers or self.MAX_WORKERS)
+        else:
+            chunk_results = [self.score_chunk(chunk) for chunk in chunks]
+        
+        updates = []
+        updated_at = timezone.now()
+        for index, chunk_result in enumerate(chunk_results):
+            results['chunks'].append({
+                'chunk': index,
+                'neighborhoods': chunk_result['processed'],
+                'errors': len(chunk_result['errors']),
+                'elapsed_seconds': chunk_result['elapsed_seconds']
+            })
+            results['processed'] += chunk_result['processed']
+            results['errors'].extend(chunk_result['errors'])
+            
+            for metrics_id, values in chunk_result['metrics']:
+                updates.append(NeighborhoodMetrics(id=metrics_id, updated_at=updated_at, **values))
                 
                 # Update distribution
-                score = neighborhood.metrics.overall_score
+                score = values['overall_score']
                 if score >= 80:
                     results['score_distribution']['high'] += 1
                 elif score >= 60:
@@ -420,11 +444,73 @@ class NeighborhoodScoringService:
                     results['score_distribution']['low'] += 1
                 else:
                     results['score_distribution']['poor'] += 1
-                    
+        
+        if updates:
+            NeighborhoodMetrics.objects.bulk_update(
+                updates, self.METRIC_FIELDS + ['updated_at'], batch_size=chunk_size
+            )
+            # bulk_update sends no signals; invalidate cached location analyses directly
+            for group_id in neighborhoods.order_by().values_list('group_id', flat=True).distinct():
+                bump_data_version(group_id)
+        results['updated'] = len(updates)
+        results['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        
+        logger.info(
+            f"Scored {results['updated']} neighborhoods in {len(chunks)} chunks "
+            f"({results['elapsed_seconds']}s, parallel={parallel})"
+        )
+        return results
+    
+    def score_chunk(self, neighborhood_ids: List[str]) -> Dict[str, Any]:
+        """
+        Score one chunk of neighborhoods without saving.
+        
+        Returns:
+            Dict with ``(metrics id, field values)`` pairs, errors and timing
+        """
+        started = time.perf_counter()
+        chunk_result = {'processed': 0, 'metrics': [], 'errors': []}
+        
+        neighborhoods = list(
+            Neighborhood.objects.filter(pk__in=neighborhood_ids).select_related('metrics')
+        )
+        profiles = self.proximity_service.load_profiles(neighborhoods)
+        
+        for neighborhood in neighborhoods:
+            chunk_result['processed'] += 1
+            try:
+                metrics = self._score_metrics(neighborhood, profiles[neighborhood.pk])
+                chunk_result['metrics'].append((
+                    metrics.pk,
+                    {field: getattr(metrics, field) for field in self.METRIC_FIELDS}
+                ))
             except Exception as e:
                 error_msg = f"Error processing neighborhood {neighborhood.name}: {str(e)}"
                 logger.error(error_msg)
-                results['errors'].append(error_msg)
-                results['processed'] += 1
+                chunk_result['errors'].append(error_msg)
+        
+        chunk_result['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        return chunk_result
+    
+    def _run_chunks_in_pool(self, chunks: List[List[str]], max_workers: int) -> List[Dict[str, Any]]:
+        """Score chunks on a process pool, returning results in chunk order."""
+        # Forked workers must not share the parent's connection; each opens its own
+        connections.close_all()
         
-        return results
\ No newline at end of file
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_scoring_worker) as pool:
+            return list(pool.map(_score_neighborhood_chunk, repeat(self.group), chunks))
+
+
+def _init_scoring_worker():
+    """Prepare a pool worker: load Django and drop any inherited connections."""
+    import django
+    django.setup()
+    connections.close_all()
+
+
+def _score_neighborhood_chunk(group: Optional[Group], neighborhood_ids: List[str]) -> Dict[str, Any]:
+    """Process pool entry point for ``NeighborhoodScoringService.score_chunk``."""
+    try:
+        return NeighborhoodScoringService(group=group).score_chunk(neighborhood_ids)
+    finally:
+        connections.close_all()
@@ -16,6 +16,9 @@ from django.db.models import QuerySet, Count, Avg, Q
 from django.utils import timezone
 
 from accounts.models import Group
+from ..distance import (
+    WALKING_FACTOR, DistanceIndex, distance_km, walking_distances_from_point
+)
 from ..models import (
     PointOfInterest, POIType, University, Neighborhood
 )
@@ -31,10 +34,36 @@ class ProximityAnalysisService:
     for investment analysis.
     """
     
+    # Radii tested by find_optimal_radius when none are given
+    DEFAULT_TEST_RADII = [0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0]
+    
     def __init__(self, group: Group = None):
         """Initialize service for a specific group."""
         self.group = group
     
+    def build_poi_distance_index(self,
+                                 location: Point,
+                                 max_radius_km: float,
+                                 poi_types: List[str] = None) -> DistanceIndex:
+        """
+        Index POI distances from a location, by type, with a single query.
+        
+        Args:
+            location: Center location
+            max_radius_km: Largest radius the index must answer
+            poi_types: Restrict the index to these POI types
+            
+        Returns:
+            DistanceIndex answering per-type counts for any radius up to max_radius_km
+        """
+        queryset = PointOfInterest.objects.filter(group=self.group)
+        if poi_types is not None:
+            queryset = queryset.filter(poi_type__in=poi_types)
+        
+        return DistanceIndex.from_queryset(
+            queryset, 'location', location, max_radius_km, key_field='poi_type'
+        )
+    
     def calculate_walking_distance(self, point1: Point, point2: Point) -> float:
         """
         Calculate estimated walking distance between two points.
@@ -46,10 +75,7 @@ class ProximityAnalysisService:
         Returns:
             Distance in kilometers (straight-line distance * walking factor)
         """
-        straight_distance = point1.distance(point2) * 100  # Convert to km
-        # Apply walking factor (streets aren't straight lines)
-        walking_factor = 1.3
-        return straight_distance * walking_factor
+        return distance_km(point1, point2) * WALKING_FACTOR
     
     def get_nearest_pois(self, 
                         location: Point, 
@@ -68,16 +94,18 @@ class ProximityAnalysisService:
         Returns:
             List of POI data with distances
         """
-        pois = PointOfInterest.objects.filter(
+        pois = list(PointOfInterest.objects.filter(
             group=self.group,
             poi_type=poi_type,
             location__distance_lte=(location, Distance(km=max_distance_km))
-        ).order_by('location')[:limit]
+        ).order_by('location')[:limit])
+        
+        walking_distances = walking_distances_from_point(location, (poi.location for poi in pois))
         
         results = []
-        for poi in pois:
-            distance_km = self.calculate_walking_distance(location, poi.location)
-            walking_time_minutes = self._estimate_walking_time(distance_km)
+        for poi, poi_distance_km in zip(pois, walking_distances):
+            poi_distance_km = float(poi_distance_km)
+            walking_time_minutes = self._estimate_walking_time(poi_distance_km)
             
             results.append({
                 'poi': {
@@ -87,7 +115,7 @@ class ProximityAnalysisService:
                     'poi_type': poi.poi_type,
                     'verified': poi.verified
                 },
-                'distance_km': round(distance_km, 2),
+                'distance_km': round(poi_distance_km, 2),
                 'walking_time_minutes': walking_time_minutes,
                 'coordinates': {
                     'lat': poi.location.y,
@@ -191,14 +219,19 @@ class ProximityAnalysisService:
     def find_optimal_radius(self, 
                            location: Point, 
                            target_poi_counts: Dict[str, int],
-                           max_radius_km: float = 10.0) -> Dict[str, Any]:
+                           max_radius_km: float = 10.0,
+                           test_radii: List[float] = None) -> Dict[str, Any]:
         """
         Find optimal radius that captures desired POI counts.
         
+        Candidate POIs are fetched once within ``max_radius_km``; each tested
+        radius is then answered by binary search over sorted distances.
+        
         Args:
             location: Center location
             target_poi_counts: Target counts for each POI type
             max_radius_km: Maximum search radius
+            test_radii: Radii to evaluate (defaults to DEFAULT_TEST_RADII)
             
         Returns:
             Analysis of optimal radius for different criteria
@@ -212,12 +245,13 @@ class ProximityAnalysisService:
         }
         
         # Test different radii
-        test_radii = [0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0]
+        radii = sorted(r for r in (test_radii or self.DEFAULT_TEST_RADII) if r <= max_radius_km)
+        poi_types = list(target_poi_counts.keys())
         
-        for radius in test_radii:
-            if radius > max_radius_km:
-                break
-                
+        distance_index = self.build_poi_distance_index(location, max_radius_km, poi_types)
+        count_matrix = distance_index.count_matrix(radii, poi_types)
+        
+        for radius, counts in zip(radii, count_matrix):
             radius_data = {
                 'radius_km': radius,
                 'poi_counts': {},
@@ -227,15 +261,10 @@ class ProximityAnalysisService:
             }
             
             targets_met = 0
-            for poi_type, target_count in target_poi_counts.items():
-                actual_count = PointOfInterest.objects.filter(
-                    group=self.group,
-                    poi_type=poi_type,
-                    location__distance_lte=(location, Distance(km=radius))
-                ).count()
-                
+            for poi_type, actual_count in zip(poi_types, counts):
+                actual_count = int(actual_count)
                 radius_data['poi_counts'][poi_type] = actual_count
-                if actual_count >= target_count:
+                if actual_count >= target_poi_counts[poi_type]:
                     targets_met += 1
             
             radius_data['targets_met'] = targets_met
@@ -308,14 +337,17 @@ class ProximityAnalysisService:
             'competitive_analysis': {}
         }
         
+        # One spatial query at the larger radius answers both catchments
+        distance_index = self.build_poi_distance_index(uni_location, cycling_radius_km)
+        
         # Analyze walking catchment
         catchment_data['walking_catchment'] = self._analyze_catchment_area(
-            uni_location, walking_radius_km
+            uni_location, walking_radius_km, distance_index
         )
         
         # Analyze cycling catchment
         catchment_data['cycling_catchment'] = self._analyze_catchment_area(
-            uni_location, cycling_radius_km
+            uni_location, cycling_radius_km, distance_index
         )
         
         # Competitive analysis - other universities in area
@@ -348,8 +380,19 @@ class ProximityAnalysisService:
         ]
         return round(sum(relevant_scores) / len(relevant_scores), 1) if relevant_scores else 0.0
     
-    def _analyze_catchment_area(self, location: Point, radius_km: float) -> Dict[str, Any]:
-        """Analyze POIs and amenities within a catchment area."""
+    def _analyze_catchment_area(self,
+                                location: Point,
+                                radius_km: float,
+                                distance_index: DistanceIndex = None) -> Dict[str, Any]:
+        """
+        Analyze POIs and amenities within a catchment area.
+        
+        Counts come from ``distance_index`` when given (it must cover
+        ``radius_km``); otherwise one is built for this radius.
+        """
+        if distance_index is None:
+            distance_index = self.build_poi_distance_index(location, radius_km)
+        
         catchment = {
             'radius_km': radius_km,
             'total_pois': 0,
@@ -358,13 +401,7 @@ class ProximityAnalysisService:
         }
         
         # Count POIs by type
-        for poi_type in POIType.values:
-            count = PointOfInterest.objects.filter(
-                group=self.group,
-                poi_type=poi_type,
-                location__distance_lte=(location, Distance(km=radius_km))
-            ).count()
-            
+        for poi_type, count in distance_index.counts(radius_km, POIType.values).items():
             if count > 0:
                 catchment['poi_breakdown'][poi_type] = count
                 catchment['total_pois'] += count
@@ -0,0 +1,237 @@
+"""
+Proximity Matrix Service for geographic intelligence.
+
+Maintains the materialized neighborhood-to-POI/university distance table used
+by neighborhood scoring, and loads it into in-memory profiles so every scoring
+dimension can be answered without further spatial queries.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.gis.db.models.functions import Centroid, Distance as DistanceFunc
+from django.contrib.gis.measure import Distance
+from django.db import transaction
+from django.utils import timezone
+
+from ..distance import annotate_distance
+from ..models import (
+    PointOfInterest, POIType, University, Neighborhood, NeighborhoodProximity
+)
+
+logger = logging.getLogger(__name__)
+
+
+class NeighborhoodProximityProfile:
+    """
+    In-memory view of a neighborhood's proximity entries.
+
+    Entries are sorted by distance, so radius filters and closest-distance
+    lookups are simple scans over a short list.
+    """
+
+    def __init__(self, entries: Iterable[NeighborhoodProximity] = ()):
+        entries = sorted(entries, key=lambda entry: entry.distance_km)
+        self.pois = [entry for entry in entries if entry.university_id is None]
+        self.universities = [entry for entry in entries if entry.university_id is not None]
+
+    def pois_within(self, poi_types: Iterable[str], radius_km: float) -> List[NeighborhoodProximity]:
+        """POI entries of the given types within ``radius_km``, nearest first."""
+        poi_types = set(poi_types)
+        return [
+            entry for entry in self.pois
+            if entry.poi_type in poi_types and entry.distance_km <= radius_km
+        ]
+
+    def count(self, poi_types: Iterable[str], radius_km: float) -> int:
+        """Number of POIs of the given types within ``radius_km``."""
+        return len(self.pois_within(poi_types, radius_km))
+
+    def closest_distance(self, poi_types: Iterable[str], radius_km: float) -> Optional[float]:
+        """Distance to the nearest POI of the given types, if any is in range."""
+        entries = self.pois_within(poi_types, radius_km)
+        return entries[0].distance_km if entries else None
+
+    def universities_within(self, radius_km: float) -> List[NeighborhoodProximity]:
+        """University entries within ``radius_km``, nearest first."""
+        return [entry for entry in self.universities if entry.distance_km <= radius_km]
+
+
+class ProximityMatrixService:
+    """
+    Service for building and reading neighborhood proximity entries.
+
+    POIs are stored up to ``POI_RADIUS_KM`` and universities up to
+    ``UNIVERSITY_RADIUS_KM`` from each neighborhood centroid, covering every
+    radius used by ``NeighborhoodScoringService``.
+    """
+
+    POI_RADIUS_KM = 2.0
+    UNIVERSITY_RADIUS_KM = 10.0
+
+    def __init__(self, group=None):
+        """Initialize service, optionally scoped to a group."""
+        self.group = group
+
+    # Reading
+
+    def load_profiles(self, neighborhoods: Iterable[Neighborhood]) -> Dict[str, NeighborhoodProximityProfile]:
+        """
+        Load proximity profiles for many neighborhoods in a single query.
+
+        Neighborhoods that have never been indexed are refreshed first.
+        """
+        neighborhoods = list(neighborhoods)
+        self.refresh_stale(neighborhoods)
+
+        entries_by_neighborhood: Dict[str, List[NeighborhoodProximity]] = {
+            neighborhood.pk: [] for neighborhood in neighborhoods
+        }
+        entries = NeighborhoodProximity.objects.filter(
+            neighborhood__in=[neighborhood.pk for neighborhood in neighborhoods]
+        ).select_related('point_of_interest', 'university')
+
+        for entry in entries:
+            entries_by_neighborhood[entry.neighborhood_id].append(entry)
+
+        return {
+            neighborhood_id: NeighborhoodProximityProfile(neighborhood_entries)
+            for neighborhood_id, neighborhood_entries in entries_by_neighborhood.items()
+        }
+
+    def load_profile(self, neighborhood: Neighborhood) -> NeighborhoodProximityProfile:
+        """Load the proximity profile for a single neighborhood."""
+        return self.load_profiles([neighborhood])[neighborhood.pk]
+
+    # Refreshing
+
+    def refresh_stale(self, neighborhoods: Iterable[Neighborhood]) -> int:
+        """Build entries for neighborhoods that have never been indexed."""
+        stale = [n for n in neighborhoods if n.proximity_refreshed_at is None]
+        for neighborhood in stale:
+            self.refresh_neighborhood(neighborhood)
+        return len(stale)
+
+    def refresh_neighborhood(self, neighborhood: Neighborhood) -> int:
+        """
+        Rebuild every proximity entry for a neighborhood.
+
+        Returns:
+            Number of entries written
+        """
+        centroid = neighborhood.boundaries.centroid
+
+        pois = annotate_distance(
+            PointOfInterest.objects.filter(
+                group_id=neighborhood.group_id,
+                location__distance_lte=(centroid, Distance(km=self.POI_RADIUS_KM))
+            ),
+            'location', centroid
+        ).values_list('id', 'poi_type', 'distance')
+
+        universities = annotate_distance(
+            University.objects.filter(
+                group_id=neighborhood.group_id,
+                main_campus__location__distance_lte=(centroid, Distance(km=self.UNIVERSITY_RADIUS_KM))
+            ),
+            'main_campus__location', centroid
+        ).values_list('id', 'distance')
+
+        entries = [
+            NeighborhoodProximity(
+                neighborhood=neighborhood,
+                point_of_interest_id=poi_id,
+                poi_type=poi_type,
+                distance_km=distance.km
+            )
+            for poi_id, poi_type, distance in pois
+        ] + [
+            NeighborhoodProximity(
+                neighborhood=neighborhood,
+                university_id=university_id,
+                poi_type=POIType.UNIVERSITY,
+                distance_km=distance.km
+            )
+            for university_id, distance in universities
+        ]
+
+        refreshed_at = timezone.now()
+        with transaction.atomic():
+            NeighborhoodProximity.objects.filter(neighborhood=neighborhood).delete()
+            NeighborhoodProximity.objects.bulk_create(entries)
+            # update() rather than save() so the neighborhood post_save hook isn't re-triggered
+            Neighborhood.objects.filter(pk=neighborhood.pk).update(proximity_refreshed_at=refreshed_at)
+
+        neighborhood.proximity_refreshed_at = refreshed_at
+        return len(entries)
+
+    def refresh_point_of_interest(self, poi: PointOfInterest) -> int:
+        """Re-link a POI to every neighborhood within range after it moves or is added."""
+        nearby = self._neighborhoods_near(poi.group_id, poi.location, self.POI_RADIUS_KM)
+
+        with transaction.atomic():
+            NeighborhoodProximity.objects.filter(point_of_interest=poi).delete()
+            NeighborhoodProximity.objects.bulk_create([
+                NeighborhoodProximity(
+                    neighborhood_id=neighborhood_id,
+                    point_of_interest=poi,
+                    poi_type=poi.poi_type,
+                    distance_km=distance.km
+                )
+                for neighborhood_id, distance in nearby
+            ])
+
+        # A university whose main campus moved needs its entries refreshed too
+        for university in University.objects.filter(main_campus=poi):
+            self.refresh_university(university)
+
+        return len(nearby)
+
+    def refresh_university(self, university: University) -> int:
+        """Re-link a university to every neighborhood within range."""
+        nearby = self._neighborhoods_near(
+            university.group_id, university.main_campus.location, self.UNIVERSITY_RADIUS_KM
+        )
+
+        with transaction.atomic():
+            NeighborhoodProximity.objects.filter(university=university).delete()
+            NeighborhoodProximity.objects.bulk_create([
+                NeighborhoodProximity(
+                    neighborhood_id=neighborhood_id,
+                    university=university,
+                    poi_type=POIType.UNIVERSITY,
+                    distance_km=distance.km
+                )
+                for neighborhood_id, distance in nearby
+            ])
+
+        return len(nearby)
+
+    def rebuild(self, neighborhoods: Iterable[Neighborhood] = None) -> Dict[str, int]:
+        """Rebuild entries for the given neighborhoods (defaults to the whole group)."""
+        if neighborhoods is None:
+            neighborhoods = Neighborhood.objects.filter(group=self.group)
+
+        summary = {'neighborhoods': 0, 'entries': 0}
+        for neighborhood in neighborhoods:
+            summary['entries'] += self.refresh_neighborhood(neighborhood)
+            summary['neighborhoods'] += 1
+
+        logger.info(
+            f"Rebuilt proximity entries for {summary['neighborhoods']} neighborhoods "
+            f"({summary['entries']} entries)"
+        )
+        return summary
+
+    def _neighborhoods_near(self, group_id, location, radius_km: float):
+        """(neighborhood id, centroid distance) pairs for indexed neighborhoods near a location."""
+        return list(
+            Neighborhood.objects.filter(
+                group_id=group_id,
+                proximity_refreshed_at__isnull=False
+            ).annotate(
+                distance=DistanceFunc(Centroid('boundaries'), location)
+            ).filter(
+                distance__lte=Distance(km=radius_km)
+            ).values_list('id', 'distance')
+        )
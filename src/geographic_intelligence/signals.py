@@ -0,0 +1,77 @@
+"""
+Signal handlers for geographic intelligence.
+
+Keeps the materialized neighborhood proximity entries in step with POI,
+university and neighborhood changes, and bumps the group's data version so
+cached location analyses are recomputed.
+"""
+
+import logging
+import os
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import bump_data_version
+from .models import PointOfInterest, University, Neighborhood, NeighborhoodMetrics
+
+logger = logging.getLogger(__name__)
+
+
+def _proximity_service():
+    from .services.proximity_matrix_service import ProximityMatrixService
+    return ProximityMatrixService()
+
+
+@receiver(post_save, sender=PointOfInterest)
+def point_of_interest_post_save(sender, instance, raw=False, **kwargs):
+    """Re-link a saved POI to the neighborhoods around it."""
+    if raw or os.environ.get('DISABLE_SIGNALS'):
+        return
+    
+    _proximity_service().refresh_point_of_interest(instance)
+
+
+@receiver(post_save, sender=University)
+def university_post_save(sender, instance, raw=False, **kwargs):
+    """Re-link a saved university to the neighborhoods around it."""
+    if raw or os.environ.get('DISABLE_SIGNALS'):
+        return
+    
+    _proximity_service().refresh_university(instance)
+
+
+@receiver(post_save, sender=Neighborhood)
+def neighborhood_post_save(sender, instance, raw=False, **kwargs):
+    """Rebuild proximity entries when a neighborhood (and possibly its boundaries) changes."""
+    if raw or os.environ.get('DISABLE_SIGNALS'):
+        return
+    
+    _proximity_service().refresh_neighborhood(instance)
+
+
+@receiver(post_save, sender=PointOfInterest)
+@receiver(post_delete, sender=PointOfInterest)
+@receiver(post_save, sender=University)
+@receiver(post_delete, sender=University)
+@receiver(post_save, sender=Neighborhood)
+@receiver(post_delete, sender=Neighborhood)
+def invalidate_location_analyses(sender, instance, raw=False, **kwargs):
+    """Move the group to a new data version so cached analyses are recomputed."""
+    if raw:
+        return
+    
+    bump_data_version(instance.group_id)
+
+
+@receiver(post_save, sender=NeighborhoodMetrics)
+def neighborhood_metrics_post_save(sender, instance, raw=False, **kwargs):
+    """Neighborhood scores appear in location analyses, so invalidate them too."""
+    if raw:
+        return
+    
+    try:
+        bump_data_version(instance.neighborhood.group_id)
+    except Neighborhood.DoesNotExist:
+        # Metrics are created before the neighborhood that owns them
+        pass
@@ -0,0 +1,82 @@
+"""
+Tests for the geodesic distance kernels.
+
+Accuracy is checked against known city-pair distances. The
+``benchmark_distance_kernel`` management command times the vectorized kernel
+against a per-pair GEOS loop.
+"""
+
+import numpy as np
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase
+
+from ..distance import (
+    WALKING_FACTOR, distance_km, distances_from_point, equirectangular_km,
+    haversine_km, walking_distances_from_point
+)
+
+# (lat, lng) city centres
+LONDON = (51.5074, -0.1278)
+PARIS = (48.8566, 2.3522)
+MANCHESTER = (53.4808, -2.2426)
+EDINBURGH = (55.9533, -3.1883)
+GLASGOW = (55.8642, -4.2518)
+NEW_YORK = (40.7128, -74.0060)
+LOS_ANGELES = (34.0522, -118.2437)
+
+
+class DistanceKernelAccuracyTest(SimpleTestCase):
+    """Test kernel accuracy against known city pairs."""
+    
+    def test_known_city_pairs(self):
+        """Haversine matches published great-circle distances."""
+        cases = [
+            (LONDON, PARIS, 344.0, 2.0),
+            (LONDON, MANCHESTER, 262.0, 2.0),
+            (EDINBURGH, GLASGOW, 67.0, 1.0),
+            (NEW_YORK, LOS_ANGELES, 3940.0, 15.0),
+        ]
+        for origin, destination, expected_km, tolerance in cases:
+            with self.subTest(origin=origin, destination=destination):
+                self.assertAlmostEqual(
+                    float(haversine_km(*origin, *destination)), expected_km, delta=tolerance
+                )
+    
+    def test_haversine_is_symmetric_and_zero_on_identity(self):
+        """Distance is symmetric and zero for identical points."""
+        self.assertEqual(float(haversine_km(*LONDON, *LONDON)), 0.0)
+        self.assertAlmostEqual(
+            float(haversine_km(*LONDON, *PARIS)),
+            float(haversine_km(*PARIS, *LONDON))
+        )
+    
+    def test_equirectangular_close_at_city_scale(self):
+        """Equirectangular stays within 0.1% of haversine inside a city region."""
+        for destination in (MANCHESTER, GLASGOW):
+            origin = LONDON if destination == MANCHESTER else EDINBURGH
+            exact = float(haversine_km(*origin, *destination))
+            approx = float(equirectangular_km(*origin, *destination))
+            self.assertLess(abs(approx - exact) / exact, 0.001)
+    
+    def test_broadcast_over_arrays(self):
+        """One origin broadcasts against an array of destinations."""
+        lats = np.array([PARIS[0], MANCHESTER[0], LONDON[0]])
+        lngs = np.array([PARIS[1], MANCHESTER[1], LONDON[1]])
+        
+        result = haversine_km(LONDON[0], LONDON[1], lats, lngs)
+        
+        self.assertEqual(result.shape, (3,))
+        self.assertAlmostEqual(result[0], float(haversine_km(*LONDON, *PARIS)))
+        self.assertEqual(result[2], 0.0)
+    
+    def test_point_helpers(self):
+        """GEOS point helpers use (lng, lat) ordering and the walking factor."""
+        london = Point(LONDON[1], LONDON[0], srid=4326)
+        paris = Point(PARIS[1], PARIS[0], srid=4326)
+        
+        self.assertAlmostEqual(distance_km(london, paris), float(haversine_km(*LONDON, *PARIS)))
+        self.assertAlmostEqual(
+            walking_distances_from_point(london, [paris])[0],
+            distance_km(london, paris) * WALKING_FACTOR
+        )
+        self.assertEqual(distances_from_point(london, []).shape, (0,))
@@ -0,0 +1,154 @@
+"""
+Tests for GeographicIntelligenceService location analysis.
+"""
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase
+
+from accounts.models import Group
+from ..cache import LocationAnalysisCache, location_analysis_cache
+from ..models import PointOfInterest, POIType
+from ..services import GeographicIntelligenceService
+
+
+class AnalyzePOIsTest(TestCase):
+    """Test single-query POI aggregation in _analyze_pois."""
+    
+    def setUp(self):
+        self.group = Group.objects.create(name="Geo Test Group")
+        self.service = GeographicIntelligenceService(group=self.group)
+        self.origin = Point(-0.1278, 51.5074, srid=4326)  # Central London
+        
+        # Twelve metro stations stepping east, three bus stops, one far away
+        for index in range(12):
+            self._create_poi(f"Metro {index}", POIType.METRO_STATION, -0.1278 + 0.001 * (index + 1))
+        for index in range(3):
+            self._create_poi(f"Bus {index}", POIType.BUS_STOP, -0.1278 - 0.002 * (index + 1))
+        self._create_poi("Distant Library", POIType.LIBRARY, 1.5)
+    
+    def _create_poi(self, name, poi_type, lng, lat=51.5074):
+        return PointOfInterest.objects.create(
+            group=self.group,
+            name=name,
+            address=f"{name}, London",
+            location=Point(lng, lat, srid=4326),
+            poi_type=poi_type
+        )
+    
+    def test_analyze_pois_runs_single_query(self):
+        """POI aggregation issues one query regardless of the number of types."""
+        with self.assertNumQueries(1):
+            self.service._analyze_pois(self.origin, radius_km=5.0)
+    
+    def test_by_type_shape_and_counts(self):
+        """Every POI type is reported with counts and nearest-first POIs."""
+        result = self.service._analyze_pois(self.origin, radius_km=5.0)
+        by_type = result['by_type']
+        
+        self.assertEqual(set(by_type.keys()), set(POIType.values))
+        self.assertEqual(result['total_pois'], 15)
+        
+        metro = by_type[POIType.METRO_STATION]
+        self.assertEqual(metro['count'], 12)
+        self.assertEqual(len(metro['pois']), GeographicIntelligenceService.POIS_PER_TYPE)
+        self.assertEqual(metro['pois'][0]['name'], "Metro 0")
+        distances = [poi['distance_km'] for poi in metro['pois']]
+        self.assertEqual(distances, sorted(distances))
+        self.assertEqual(metro['closest_distance_km'], distances[0])
+        self.assertGreater(metro['average_distance_km'], metro['closest_distance_km'])
+        
+        bus = by_type[POIType.BUS_STOP]
+        self.assertEqual(bus['count'], 3)
+        self.assertEqual(len(bus['pois']), 3)
+        
+        library = by_type[POIType.LIBRARY]
+        self.assertEqual(library['count'], 0)
+        self.assertIsNone(library['closest_distance_km'])
+        self.assertEqual(library['pois'], [])
+    
+    def test_distances_are_kilometres(self):
+        """Reported distances are geodesic kilometres."""
+        result = self.service._analyze_pois(self.origin, radius_km=5.0)
+        closest_metro = result['by_type'][POIType.METRO_STATION]['closest_distance_km']
+        
+        # 0.001 degrees of longitude at London's latitude is roughly 69 metres
+        self.assertAlmostEqual(closest_metro, 0.07, places=2)
+
+
+class LocationAnalysisCacheTest(SimpleTestCase):
+    """Test LRU behaviour and counters of the analysis cache."""
+    
+    def test_lru_eviction_and_counters(self):
+        cache = LocationAnalysisCache(max_entries=2)
+        cache.set('a', {'value': 1})
+        cache.set('b', {'value': 2})
+        cache.get('a')              # 'a' becomes most recently used
+        cache.set('c', {'value': 3})  # evicts 'b'
+        
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), {'value': 1})
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+    
+    def test_returned_analyses_are_copies(self):
+        cache = LocationAnalysisCache()
+        cache.set('a', {'pois': {'count': 1}})
+        cache.get('a')['pois']['count'] = 99
+        
+        self.assertEqual(cache.get('a')['pois']['count'], 1)
+    
+    def test_nearby_coordinates_share_a_cell(self):
+        cache = LocationAnalysisCache(grid_degrees=0.01)
+        
+        self.assertEqual(cache.snap(51.50741, -0.12781), cache.snap(51.50902, -0.12604))
+        self.assertNotEqual(cache.snap(51.5074, -0.1278), cache.snap(51.5174, -0.1278))
+
+
+class AnalyzeLocationCacheTest(TestCase):
+    """Test caching of analyze_location results."""
+    
+    def setUp(self):
+        location_analysis_cache.clear()
+        self.group = Group.objects.create(name="Geo Cache Group")
+        self.service = GeographicIntelligenceService(group=self.group)
+        PointOfInterest.objects.create(
+            group=self.group,
+            name="Bank Station",
+            address="Bank, London",
+            location=Point(-0.0886, 51.5133, srid=4326),
+            poi_type=POIType.METRO_STATION
+        )
+    
+    def tearDown(self):
+        location_analysis_cache.clear()
+    
+    def test_repeat_analysis_served_from_cache(self):
+        first = self.service.analyze_location(51.5074, -0.1278, radius_km=10.0)
+        
+        with self.assertNumQueries(0):
+            second = self.service.analyze_location(51.50741, -0.12779, radius_km=10.0)
+        
+        self.assertEqual(second['pois']['total_pois'], first['pois']['total_pois'])
+        self.assertEqual(second['location'], {'lat': 51.50741, 'lng': -0.12779})
+        self.assertEqual(location_analysis_cache.stats()['hits'], 1)
+    
+    def test_bypass_flag_recomputes(self):
+        self.service.analyze_location(51.5074, -0.1278, radius_km=10.0)
+        self.service.analyze_location(51.5074, -0.1278, radius_km=10.0, use_cache=False)
+        
+        stats = location_analysis_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (0, 1))
+    
+    def test_poi_change_invalidates_cached_analysis(self):
+        before = self.service.analyze_location(51.5074, -0.1278, radius_km=10.0)
+        PointOfInterest.objects.create(
+            group=self.group,
+            name="Holborn Station",
+            address="Holborn, London",
+            location=Point(-0.1200, 51.5174, srid=4326),
+            poi_type=POIType.METRO_STATION
+        )
+        after = self.service.analyze_location(51.5074, -0.1278, radius_km=10.0)
+        
+        self.assertEqual(after['pois']['total_pois'], before['pois']['total_pois'] + 1)
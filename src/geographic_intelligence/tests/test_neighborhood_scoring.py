@@ -0,0 +1,188 @@
+"""
+Tests for neighborhood scoring over the materialized proximity table.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.gis.geos import Point, Polygon
+from django.test import TestCase, TransactionTestCase
+
+from accounts.models import Group
+from ..models import (
+    Neighborhood, NeighborhoodMetrics, NeighborhoodProximity, PointOfInterest,
+    POIType, University
+)
+from ..services import NeighborhoodScoringService, ProximityMatrixService
+
+
+class GeographicTestDataMixin:
+    """Helpers for building neighborhoods, POIs and universities."""
+    
+    def create_poi(self, name, poi_type, lng, lat, **kwargs):
+        return PointOfInterest.objects.create(
+            group=self.group,
+            name=name,
+            address=f"{name}, Leeds",
+            location=Point(lng, lat, srid=4326),
+            poi_type=poi_type,
+            **kwargs
+        )
+    
+    def create_university(self, name, lng, lat, total_students=20000):
+        campus = self.create_poi(f"{name} Campus", POIType.UNIVERSITY, lng, lat)
+        return University.objects.create(
+            group=self.group,
+            name=name,
+            total_students=total_students,
+            main_campus=campus,
+            website="https://university.example.com"
+        )
+    
+    def create_neighborhood(self, name, lng, lat, half_size=0.005):
+        metrics = NeighborhoodMetrics.objects.create(
+            accessibility_score=0, university_proximity_score=0, amenities_score=0,
+            affordability_score=0, safety_score=0, cultural_score=0,
+            planning_feasibility_score=0, overall_score=0
+        )
+        return Neighborhood.objects.create(
+            group=self.group,
+            name=name,
+            description=f"{name} test neighborhood",
+            boundaries=Polygon.from_bbox(
+                (lng - half_size, lat - half_size, lng + half_size, lat + half_size)
+            ),
+            metrics=metrics,
+            investment_rationale="Test"
+        )
+
+
+class ProximityMatrixServiceTest(GeographicTestDataMixin, TestCase):
+    """Test building and incremental refresh of proximity entries."""
+    
+    def setUp(self):
+        self.group = Group.objects.create(name="Proximity Matrix Group")
+        self.service = ProximityMatrixService(group=self.group)
+        self.neighborhood = self.create_neighborhood("Hyde Park", -1.5650, 53.8100)
+    
+    def test_saving_poi_links_it_to_nearby_neighborhoods(self):
+        """A new POI in range gets an entry with its distance."""
+        poi = self.create_poi("Metro A", POIType.METRO_STATION, -1.5650, 53.8150)
+        
+        entry = NeighborhoodProximity.objects.get(point_of_interest=poi)
+        self.assertEqual(entry.neighborhood, self.neighborhood)
+        self.assertEqual(entry.poi_type, POIType.METRO_STATION)
+        self.assertAlmostEqual(entry.distance_km, 0.556, places=2)
+    
+    def test_moving_poi_out_of_range_removes_entry(self):
+        """Entries follow POIs as they move."""
+        poi = self.create_poi("Metro B", POIType.METRO_STATION, -1.5650, 53.8150)
+        poi.location = Point(-1.2, 53.8150, srid=4326)
+        poi.save()
+        
+        self.assertFalse(NeighborhoodProximity.objects.filter(point_of_interest=poi).exists())
+    
+    def test_universities_indexed_to_ten_kilometres(self):
+        """Universities are linked further out than ordinary POIs."""
+        university = self.create_university("Leeds Beckett", -1.5650, 53.8500)
+        
+        profile = self.service.load_profile(self.neighborhood)
+        self.assertEqual([e.university for e in profile.universities], [university])
+        self.assertEqual(profile.count([POIType.UNIVERSITY], 2.0), 0)
+
+
+class NeighborhoodScoringFixtureMixin(GeographicTestDataMixin):
+    """Four neighborhoods with a university and a handful of POIs near the first."""
+    
+    def setUp(self):
+        self.group = Group.objects.create(name="Scoring Group")
+        self.service = NeighborhoodScoringService(group=self.group)
+        
+        self.neighborhoods = [
+            self.create_neighborhood(f"Area {index}", -1.55 + 0.02 * index, 53.80)
+            for index in range(4)
+        ]
+        self.create_university("University of Leeds", -1.5550, 53.8070)
+        self.create_poi("Headingley Metro", POIType.METRO_STATION, -1.5500, 53.8010)
+        self.create_poi("Corner Shop", POIType.GROCERY, -1.5490, 53.8000)
+        self.create_poi("Halls", POIType.DORMITORY, -1.5480, 53.8005, capacity=400)
+
+
+class NeighborhoodScoringServiceTest(NeighborhoodScoringFixtureMixin, TestCase):
+    """Test scoring from preloaded proximity profiles."""
+    
+    def test_batch_scoring_issues_no_spatial_queries(self):
+        """Query count is fixed per chunk, with one bulk_update at the end."""
+        neighborhoods = Neighborhood.objects.filter(group=self.group)
+        
+        # Stale check, id list, chunk neighborhoods, proximity entries,
+        # bulk_update, groups to invalidate
+        with self.assertNumQueries(6):
+            results = self.service.batch_calculate_scores(neighborhoods)
+        
+        self.assertEqual(results['updated'], len(self.neighborhoods))
+        self.assertEqual(results['errors'], [])
+        self.assertEqual(len(results['chunks']), 1)
+    
+    def test_chunked_scoring_matches_single_chunk(self):
+        """Chunk size changes timing detail, not the scores."""
+        neighborhoods = Neighborhood.objects.filter(group=self.group)
+        
+        single = self.service.batch_calculate_scores(neighborhoods)
+        single_scores = dict(
+            NeighborhoodMetrics.objects.values_list('neighborhood__id', 'overall_score')
+        )
+        
+        chunked = self.service.batch_calculate_scores(neighborhoods, parallel=True, chunk_size=1)
+        chunked_scores = dict(
+            NeighborhoodMetrics.objects.values_list('neighborhood__id', 'overall_score')
+        )
+        
+        self.assertEqual(chunked_scores, single_scores)
+        self.assertEqual(chunked['score_distribution'], single['score_distribution'])
+        self.assertEqual([chunk['neighborhoods'] for chunk in chunked['chunks']], [1, 1, 1, 1])
+        self.assertTrue(all('elapsed_seconds' in chunk for chunk in chunked['chunks']))
+    
+    def test_scores_reflect_nearby_pois(self):
+        """The neighborhood next to the POIs outscores the distant ones."""
+        self.service.batch_calculate_scores(Neighborhood.objects.filter(group=self.group))
+        
+        near = NeighborhoodMetrics.objects.get(neighborhood=self.neighborhoods[0])
+        far = NeighborhoodMetrics.objects.get(neighborhood=self.neighborhoods[3])
+        
+        self.assertEqual(near.transport_links_count, 1)
+        self.assertGreater(near.accessibility_score, far.accessibility_score)
+        self.assertGreater(near.university_proximity_score, far.university_proximity_score)
+        self.assertLess(near.competition_score, far.competition_score)
+
+
+class ParallelNeighborhoodScoringTest(NeighborhoodScoringFixtureMixin, TransactionTestCase):
+    """Test scoring on the process pool against committed rows."""
+    
+    def _metric_values(self):
+        return {
+            row.pop('neighborhood__id'): row
+            for row in NeighborhoodMetrics.objects.values(
+                'neighborhood__id', *NeighborhoodScoringService.METRIC_FIELDS
+            )
+        }
+    
+    def test_pool_scores_match_serial_scores(self):
+        """Chunks scored by two worker processes give the serial results."""
+        neighborhoods = Neighborhood.objects.filter(group=self.group)
+        
+        serial = self.service.batch_calculate_scores(neighborhoods, chunk_size=1)
+        serial_values = self._metric_values()
+        NeighborhoodMetrics.objects.update(overall_score=0, accessibility_score=0)
+        
+        run_in_pool = self.service._run_chunks_in_pool
+        with patch.object(self.service, '_run_chunks_in_pool', wraps=run_in_pool) as pool:
+            parallel = self.service.batch_calculate_scores(
+                neighborhoods, parallel=True, chunk_size=1, max_workers=2
+            )
+        
+        pool.assert_called_once()
+        self.assertEqual(pool.call_args[0][1], 2)
+        self.assertEqual(parallel['errors'], [])
+        self.assertEqual(parallel['updated'], len(self.neighborhoods))
+        self.assertEqual(self._metric_values(), serial_values)
+        self.assertEqual(parallel['score_distribution'], serial['score_distribution'])
@@ -0,0 +1,96 @@
+"""
+Tests for ProximityAnalysisService radius sweeps and the distance index.
+"""
+
+from django.contrib.gis.geos import Point
+from django.contrib.gis.measure import Distance
+from django.test import SimpleTestCase, TestCase
+
+from accounts.models import Group
+from ..distance import DistanceIndex
+from ..models import PointOfInterest, POIType
+from ..services import ProximityAnalysisService
+
+
+class DistanceIndexTest(SimpleTestCase):
+    """Test binary-search radius counts."""
+    
+    def setUp(self):
+        self.index = DistanceIndex({
+            'metro': [2.5, 0.4, 1.0, 7.0],
+            'bus': [0.1, 0.2],
+        }, max_radius_km=10.0)
+    
+    def test_counts_are_inclusive(self):
+        """A candidate exactly on the radius is counted."""
+        self.assertEqual(self.index.count('metro', 1.0), 2)
+        self.assertEqual(self.index.count('metro', 0.3), 0)
+        self.assertEqual(self.index.count('metro', 10.0), 4)
+        self.assertEqual(self.index.count('library', 5.0), 0)
+    
+    def test_count_matrix(self):
+        """Every (radius, type) pair is answered in one call."""
+        matrix = self.index.count_matrix([0.5, 3.0], ['metro', 'bus', 'park'])
+        self.assertEqual(matrix.tolist(), [[1, 2, 0], [3, 2, 0]])
+    
+    def test_radius_beyond_index_rejected(self):
+        """Radii larger than the indexed radius would under-count."""
+        with self.assertRaises(ValueError):
+            self.index.count('metro', 12.0)
+
+
+class FindOptimalRadiusTest(TestCase):
+    """Test single-round-trip radius sweeps."""
+    
+    def setUp(self):
+        self.group = Group.objects.create(name="Proximity Test Group")
+        self.service = ProximityAnalysisService(group=self.group)
+        self.origin = Point(-2.2426, 53.4808, srid=4326)  # Manchester
+        
+        # POIs stepping north roughly 0.55km apart
+        for index in range(8):
+            self._create_poi(f"Metro {index}", POIType.METRO_STATION, 53.4808 + 0.005 * (index + 1))
+        for index in range(4):
+            self._create_poi(f"Grocery {index}", POIType.GROCERY, 53.4808 - 0.01 * (index + 1))
+    
+    def _create_poi(self, name, poi_type, lat, lng=-2.2426):
+        return PointOfInterest.objects.create(
+            group=self.group,
+            name=name,
+            address=f"{name}, Manchester",
+            location=Point(lng, lat, srid=4326),
+            poi_type=poi_type
+        )
+    
+    def test_sweep_runs_single_query(self):
+        """All radii and types are answered from one spatial query."""
+        with self.assertNumQueries(1):
+            self.service.find_optimal_radius(
+                self.origin, {'metro': 3, 'grocery': 2}, max_radius_km=10.0
+            )
+    
+    def test_counts_match_spatial_filter(self):
+        """Binary-search counts agree with a COUNT per radius and type."""
+        targets = {'metro': 3, 'grocery': 2, 'library': 1}
+        result = self.service.find_optimal_radius(self.origin, targets, max_radius_km=5.0)
+        
+        for radius_data in result['radius_analysis']:
+            for poi_type in targets:
+                expected = PointOfInterest.objects.filter(
+                    group=self.group,
+                    poi_type=poi_type,
+                    location__distance_lte=(self.origin, Distance(km=radius_data['radius_km']))
+                ).count()
+                self.assertEqual(radius_data['poi_counts'][poi_type], expected)
+        
+        self.assertEqual(result['radius_analysis'][-1]['radius_km'], 5.0)
+        self.assertEqual(result['best_targets_met'], 2)
+    
+    def test_custom_radii(self):
+        """Arbitrary radius lists are supported."""
+        result = self.service.find_optimal_radius(
+            self.origin, {'metro': 1}, max_radius_km=2.0, test_radii=[2.0, 0.25, 1.2]
+        )
+        radii = [r['radius_km'] for r in result['radius_analysis']]
+        self.assertEqual(radii, [0.25, 1.2, 2.0])
+        self.assertEqual(result['radius_analysis'][0]['poi_counts']['metro'], 0)
@@ -0,0 +1,67 @@
+"""
+Django management command to benchmark lead assignment.
+
+Times ``LeadAssignmentEngine`` assigning random leads across random team
+members with a shared capacity.
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from leads.services.assignment_engine import LeadAssignmentEngine
+
+
+class Command(BaseCommand):
+    help = 'Time heap-based lead assignment for many leads and members'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--leads',
+            type=int,
+            default=3000,
+            help='Number of leads to assign'
+        )
+        parser.add_argument(
+            '--members',
+            type=int,
+            default=40,
+            help='Number of team members'
+        )
+        parser.add_argument(
+            '--capacity',
+            type=int,
+            default=150,
+            help='Maximum leads per member'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=1,
+            help='Random seed for leads and members'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        members = [
+            {'id': index, 'load': rng.randint(0, 30),
+             'lat': rng.uniform(50.0, 56.0), 'lng': rng.uniform(-4.0, 1.0)}
+            for index in range(options['members'])
+        ]
+        leads = [
+            {'id': index, 'score': rng.uniform(0, 100),
+             'lat': rng.uniform(50.0, 56.0), 'lng': rng.uniform(-4.0, 1.0)}
+            for index in range(options['leads'])
+        ]
+
+        started = time.perf_counter()
+        engine = LeadAssignmentEngine(members, default_capacity=options['capacity'])
+        assignments, unassigned = engine.assign(leads)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Assigned {len(assignments)} of {len(leads)} leads across {len(members)} members "
+            f"in {elapsed * 1000:.1f}ms ({len(unassigned)} unassigned, "
+            f"max load {max(engine.loads)})"
+        ))
@@ -690,15 +690,8 @@ class Lead(UUIDModel, TimestampedModel, PlatformModel):
                 radius_km=10.0
             )
             
-            # Update individual scores
-            self.accessibility_score = analysis.get('accessibility_score', 0.0)
-            self.university_proximity_score = self._calculate_university_proximity_score(analysis)
-            self.market_demand_score = self._calculate_market_demand_score(analysis)
-            self.competition_score = self._calculate_competition_score(analysis)
-            
-            # Calculate overall geographic score
-            self.geographic_score = self._calculate_overall_geographic_score()
-            self.geographic_analysis_date = timezone.now()
+            # Update individual and overall scores
+            self.apply_geographic_analysis(analysis)
             
             # Auto-assign target neighborhood if not set
             if not self.target_neighborhood and analysis.get('neighborhoods', {}).get('best_neighborhood'):
@@ -720,15 +713,29 @@ class Lead(UUIDModel, TimestampedModel, PlatformModel):
             logger.warning(f"Geographic scoring failed for lead {self.id}: {str(e)}")
             
             # Basic scoring based on country
-            if self.headquarters_country == 'GB':
-                self.geographic_score = 70.0
-            elif self.headquarters_country in ['IE', 'NL', 'DE', 'FR']:
-                self.geographic_score = 50.0
-            else:
-                self.geographic_score = 30.0
-            
+            self.geographic_score = self._fallback_geographic_score()
             return self.geographic_score
     
+    def apply_geographic_analysis(self, analysis):
+        """Set the geographic scores derived from a location analysis (without saving)."""
+        self.accessibility_score = analysis.get('accessibility_score', 0.0)
+        self.university_proximity_score = self._calculate_university_proximity_score(analysis)
+        self.market_demand_score = self._calculate_market_demand_score(analysis)
+        self.competition_score = self._calculate_competition_score(analysis)
+        
+        # Calculate overall geographic score
+        self.geographic_score = self._calculate_overall_geographic_score()
+        self.geographic_analysis_date = timezone.now()
+        return self.geographic_score
+    
+    def _fallback_geographic_score(self):
+        """Country-based geographic score used when location analysis fails."""
+        if self.headquarters_country == 'GB':
+            return 70.0
+        elif self.headquarters_country in ['IE', 'NL', 'DE', 'FR']:
+            return 50.0
+        return 30.0
+    
     def _calculate_university_proximity_score(self, analysis):
         """Calculate university proximity score from location analysis."""
         universities = analysis.get('universities', {})
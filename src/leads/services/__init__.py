@@ -7,8 +7,12 @@ including scoring, workflow automation, and analytics.
 
 from .lead_scoring_service import LeadScoringService
 from .lead_workflow_service import LeadWorkflowService
+from .bulk_scoring_engine import BulkLeadScoringEngine
+from .geographic_rescoring_pipeline import GeographicRescoringPipeline
 
 __all__ = [
     'LeadScoringService',
     'LeadWorkflowService',
+    'BulkLeadScoringEngine',
+    'GeographicRescoringPipeline',
 ]
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Lead Assignment Engine.
+
+Greedy, workload-aware assignment of leads to team members. Members sit in a
+min-heap keyed by current load; for each lead the least-loaded members are
+examined first and the search stops as soon as no remaining member could
+beat the best match found, so most leads touch only a handful of members.
+Loads are updated as leads are assigned and members leave the heap when they
+reach their capacity.
+"""
+
+import heapq
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from geographic_intelligence.distance import EARTH_RADIUS_KM
+
+
+class LeadAssignmentEngine:
+    """
+    Assigns leads to members by match score.
+
+    A member's match score for a lead is the sum of:
+
+    - workload: ``WORKLOAD_WEIGHT * WORKLOAD_REFERENCE / (WORKLOAD_REFERENCE + load)``,
+      strictly decreasing as the member takes on leads
+    - proximity: up to ``PROXIMITY_WEIGHT``, falling linearly to zero at
+      ``proximity_radius_km`` between lead and member coordinates
+    - availability and high-value terms that are the same for every member
+
+    Members are dicts with ``id``, ``load`` and optional ``capacity``,
+    ``lat`` and ``lng``; leads are dicts with ``id``, ``score`` and optional
+    ``lat`` and ``lng``.
+    """
+
+    WORKLOAD_WEIGHT = 30.0
+    WORKLOAD_REFERENCE = 10.0
+    PROXIMITY_WEIGHT = 20.0
+    PROXIMITY_RADIUS_KM = 100.0
+    AVAILABILITY_SCORE = 25.0
+    HIGH_VALUE_SCORE = 25.0
+    HIGH_VALUE_THRESHOLD = 80
+
+    def __init__(self, members: List[Dict[str, Any]], proximity_radius_km: float = None,
+                 default_capacity: Optional[int] = None):
+        self.members = members
+        self.proximity_radius_km = proximity_radius_km or self.PROXIMITY_RADIUS_KM
+        self.loads = [member['load'] for member in members]
+        self.capacities = [
+            member.get('capacity') if member.get('capacity') is not None else default_capacity
+            for member in members
+        ]
+        self._coords = [
+            (math.radians(member['lat']), math.radians(member['lng']))
+            if member.get('lat') is not None and member.get('lng') is not None else None
+            for member in members
+        ]
+        self._heap = [
+            (load, index) for index, load in enumerate(self.loads)
+            if not self._at_capacity(index, load)
+        ]
+        heapq.heapify(self._heap)
+
+    def workload_score(self, load: int) -> float:
+        """Workload term for a member currently holding ``load`` leads."""
+        return self.WORKLOAD_WEIGHT * self.WORKLOAD_REFERENCE / (self.WORKLOAD_REFERENCE + load)
+
+    def assign(self, leads: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Assign leads in the given order (pass highest-value leads first).
+
+        Returns:
+            ``(assignments, unassigned)``; each assignment carries the lead
+            and member ids, the match score, the distance (when known) and
+            the reasons behind the score.
+        """
+        assignments = []
+        unassigned = []
+
+        for lead in leads:
+            match = self._best_member(lead)
+            if match is None:
+                unassigned.append(lead)
+                continue
+
+            index, member_score, distance_km = match
+            assignments.append(self._build_assignment(lead, index, member_score, distance_km))
+
+        return assignments, unassigned
+
+    def _best_member(self, lead: Dict[str, Any]) -> Optional[Tuple[int, float, Optional[float]]]:
+        """Pop members in load order until none left can beat the best; update the winner's load."""
+        lead_coords = self._lead_coords(lead)
+        proximity_bound = self.PROXIMITY_WEIGHT if lead_coords else 0.0
+
+        heap = self._heap
+        workload_score = self.workload_score
+        popped = []
+        best_index, best_score, best_distance = None, -1.0, None
+
+        while heap:
+            load = heap[0][0]
+            if best_index is not None and best_score >= workload_score(load) + proximity_bound:
+                break
+            load, index = heapq.heappop(heap)
+            popped.append((load, index))
+
+            distance_km = self._distance_km(lead_coords, index)
+            score = workload_score(load) + self._proximity_score(distance_km)
+            if score > best_score:
+                best_index, best_score, best_distance = index, score, distance_km
+
+        if best_index is None:
+            return None
+
+        for load, index in popped:
+            if index == best_index:
+                load += 1
+                self.loads[index] = load
+                if self._at_capacity(index, load):
+                    continue
+            heapq.heappush(heap, (load, index))
+
+        return best_index, best_score, best_distance
+
+    @staticmethod
+    def _lead_coords(lead: Dict[str, Any]) -> Optional[Tuple[float, float, float]]:
+        """Lead (lat, lng) in radians plus cos(lat), or None without a location."""
+        if lead.get('lat') is None or lead.get('lng') is None:
+            return None
+        lat = math.radians(lead['lat'])
+        return lat, math.radians(lead['lng']), math.cos(lat)
+
+    def _distance_km(self, lead_coords, index: int) -> Optional[float]:
+        """
+        Equirectangular distance from a lead to a member.
+
+        Within 0.1% of haversine across the proximity radius, and the
+        proximity term is zero beyond it anyway.
+        """
+        member_coords = self._coords[index]
+        if lead_coords is None or member_coords is None:
+            return None
+
+        lat, lng, cos_lat = lead_coords
+        x = (member_coords[1] - lng) * cos_lat
+        y = member_coords[0] - lat
+        return EARTH_RADIUS_KM * math.sqrt(x * x + y * y)
+
+    def _proximity_score(self, distance_km: Optional[float]) -> float:
+        if distance_km is None:
+            return 0.0
+        return self.PROXIMITY_WEIGHT * max(0.0, 1.0 - distance_km / self.proximity_radius_km)
+
+    def _at_capacity(self, index: int, load: int) -> bool:
+        capacity = self.capacities[index]
+        return capacity is not None and load >= capacity
+
+    def _build_assignment(self, lead: Dict[str, Any], index: int, member_score: float,
+                          distance_km: Optional[float]) -> Dict[str, Any]:
+        member = self.members[index]
+        reasons = [f"Workload {self.loads[index] - 1} leads before assignment"]
+
+        proximity = self._proximity_score(distance_km)
+        if proximity > 0:
+            reasons.append(f"Geographic proximity ({distance_km:.0f}km)")
+
+        match_score = member_score + self.AVAILABILITY_SCORE
+        reasons.append("Team member availability")
+
+        if lead['score'] >= self.HIGH_VALUE_THRESHOLD:
+            match_score += self.HIGH_VALUE_SCORE
+            reasons.append("High-value lead match")
+
+        return {
+            'lead_id': lead['id'],
+            'member_id': member['id'],
+            'match_score': round(match_score, 1),
+            'distance_km': round(distance_km, 1) if distance_km is not None else None,
+            'reasons': reasons,
+        }
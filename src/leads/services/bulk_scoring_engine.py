@@ -0,0 +1,321 @@
+"""
+Bulk Lead Scoring Engine.
+
+Vectorized scoring for large lead sets. Feature columns are read in a single
+``values()`` pass per chunk, component scores and the weighted result are
+computed with NumPy arrays, and results are persisted with ``bulk_update``
+and ``bulk_create``.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Exists, OuterRef, QuerySet
+from django.utils import timezone
+
+from ..models import Lead, LeadScoringModel, LeadActivity
+
+logger = logging.getLogger(__name__)
+
+
+class BulkLeadScoringEngine:
+    """
+    Scores leads in chunks using array arithmetic.
+
+    Mirrors the component rules in ``Lead._prepare_scoring_data`` and the
+    weighting in ``LeadScoringModel.calculate_score`` so that every lead ends
+    up with exactly the score the per-lead path would give it, while issuing
+    a fixed number of queries per chunk instead of several per lead.
+    """
+
+    COMPONENTS = (
+        'business_alignment',
+        'market_presence',
+        'financial_strength',
+        'strategic_fit',
+        'geographic_fit',
+        'engagement_potential',
+        'data_completeness',
+    )
+
+    COMPLETENESS_FIELDS = (
+        'company_name', 'domain', 'headquarters_city', 'headquarters_country',
+        'primary_contact_name', 'primary_contact_email', 'primary_contact_title',
+        'linkedin_url', 'trading_name', 'qualification_notes',
+    )
+
+    FEATURE_FIELDS = COMPLETENESS_FIELDS + (
+        'id',
+        'group_id',
+        'status',
+        'current_score',
+        'geographic_score',
+        'geographic_analysis_date',
+        'market_intelligence_target_id',
+        'market_intelligence_target__focus_sectors',
+        'market_intelligence_target__business_model',
+        'target_has_articles',
+    )
+
+    ENGAGED_STATUSES = (Lead.LeadStatus.CONTACTED, Lead.LeadStatus.MEETING_SCHEDULED)
+    GEOGRAPHIC_MAX_AGE_DAYS = 30
+    DEFAULT_CHUNK_SIZE = 2000
+
+    def __init__(self, scoring_model: LeadScoringModel, user=None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, create_activities: bool = True):
+        self.scoring_model = scoring_model
+        self.user = user
+        self.chunk_size = max(int(chunk_size), 1)
+        self.create_activities = create_activities
+
+    def get_weights(self) -> Dict[str, float]:
+        """Weights the per-lead path would use for this model's scoring method."""
+        model = self.scoring_model
+        if model.scoring_method == LeadScoringModel.ScoringMethod.NEURAL_NETWORK:
+            return model.get_default_weights()
+        return model.component_weights or model.get_default_weights()
+
+    def score_queryset(self, queryset: QuerySet) -> Dict[str, Any]:
+        """
+        Score every lead in ``queryset`` and persist the results.
+
+        Leads are walked in primary-key order with keyset pagination so each
+        chunk is a bounded query, independent of rows rescored earlier.
+        """
+        if not self.scoring_model.is_active:
+            raise ValueError("Cannot score with inactive model")
+
+        weights = self.get_weights()
+        started = time.perf_counter()
+        summary = {
+            'total_scored': 0,
+            'score_changes': [],
+            'processing_errors': [],
+            'chunks': 0,
+        }
+
+        last_pk = None
+        while True:
+            page = queryset.order_by('pk')
+            if last_pk is not None:
+                page = page.filter(pk__gt=last_pk)
+            rows = list(self._feature_values(page)[:self.chunk_size])
+            if not rows:
+                break
+
+            self._score_chunk(rows, weights, summary)
+            summary['chunks'] += 1
+            last_pk = rows[-1]['id']
+
+            if len(rows) < self.chunk_size:
+                break
+
+        elapsed = time.perf_counter() - started
+        summary['elapsed_seconds'] = round(elapsed, 3)
+        summary['leads_per_second'] = round(summary['total_scored'] / elapsed, 1) if elapsed > 0 else 0.0
+
+        logger.info(
+            f"Bulk scored {summary['total_scored']} leads in {summary['elapsed_seconds']}s "
+            f"({summary['leads_per_second']} leads/sec)"
+        )
+        return summary
+
+    def compute_components(self, rows: List[Dict[str, Any]],
+                           geographic: np.ndarray) -> Dict[str, np.ndarray]:
+        """Compute every scoring component as an array aligned with ``rows``."""
+        n = len(rows)
+
+        has_target = np.fromiter(
+            (r['market_intelligence_target_id'] is not None for r in rows), dtype=bool, count=n
+        )
+        pbsa_focus = np.fromiter(
+            ('pbsa' in (r['market_intelligence_target__focus_sectors'] or []) for r in rows),
+            dtype=bool, count=n
+        )
+        developer_model = np.fromiter(
+            (r['market_intelligence_target__business_model'] in ('developer', 'investor') for r in rows),
+            dtype=bool, count=n
+        )
+        has_articles = np.fromiter((bool(r['target_has_articles']) for r in rows), dtype=bool, count=n)
+
+        def flag(field):
+            return np.fromiter((bool(r[field]) for r in rows), dtype=bool, count=n)
+
+        engaged = np.fromiter((r['status'] in self.ENGAGED_STATUSES for r in rows), dtype=bool, count=n)
+
+        filled = np.zeros(n)
+        for field in self.COMPLETENESS_FIELDS:
+            filled += flag(field)
+
+        business_alignment = np.minimum(
+            50.0 + 30.0 * (has_target & pbsa_focus) + 20.0 * (has_target & developer_model), 100.0
+        )
+        market_presence = np.minimum(
+            15.0 * flag('domain') + 15.0 * flag('linkedin_url')
+            + 20.0 * (has_target & has_articles) + 50.0,
+            100.0
+        )
+        engagement_potential = np.minimum(
+            50.0 + 20.0 * flag('primary_contact_email') + 15.0 * flag('primary_contact_name')
+            + 15.0 * engaged,
+            100.0
+        )
+
+        return {
+            'business_alignment': business_alignment,
+            'market_presence': market_presence,
+            'financial_strength': np.full(n, 60.0),
+            'strategic_fit': np.full(n, 65.0),
+            'geographic_fit': geographic,
+            'engagement_potential': engagement_potential,
+            'data_completeness': (filled / len(self.COMPLETENESS_FIELDS)) * 100.0,
+        }
+
+    @staticmethod
+    def weighted_scores(components: Dict[str, np.ndarray], weights: Dict[str, float]) -> np.ndarray:
+        """
+        Weighted average across components, clamped to 0-100.
+
+        Components are accumulated in weight order, matching the scalar loop in
+        ``LeadScoringModel._weighted_average_score`` operation for operation.
+        """
+        n = len(next(iter(components.values())))
+        total_score = np.zeros(n)
+        total_weight = 0.0
+
+        for component, weight in weights.items():
+            if component in components:
+                total_score += components[component] * weight
+                total_weight += weight
+
+        scores = total_score / total_weight if total_weight > 0 else np.zeros(n)
+        return np.clip(scores, 0.0, 100.0)
+
+    def _feature_values(self, queryset: QuerySet) -> QuerySet:
+        """Project the queryset down to the columns scoring needs."""
+        from market_intelligence.models import TargetCompany
+
+        articles = TargetCompany.source_articles.through.objects.filter(
+            targetcompany_id=OuterRef('market_intelligence_target_id')
+        )
+        return queryset.annotate(target_has_articles=Exists(articles)).values(*self.FEATURE_FIELDS)
+
+    def _geographic_column(self, rows: List[Dict[str, Any]], failed: np.ndarray) -> np.ndarray:
+        """
+        Stored geographic scores, refreshing stale ones in bulk.
+
+        Fresh scores (younger than ``GEOGRAPHIC_MAX_AGE_DAYS``) are read
+        straight from the row; stale ones are rescored per group by
+        ``GeographicRescoringPipeline``, which applies the same rules and
+        fallbacks as ``Lead.update_geographic_scores``.
+        """
+        from .geographic_rescoring_pipeline import GeographicRescoringPipeline
+
+        now = timezone.now()
+        geographic = np.zeros(len(rows))
+        stale = []
+
+        for index, row in enumerate(rows):
+            analysed_at = row['geographic_analysis_date']
+            if (row['geographic_score'] > 0 and analysed_at and
+                    (now - analysed_at).days < self.GEOGRAPHIC_MAX_AGE_DAYS):
+                geographic[index] = row['geographic_score']
+            else:
+                stale.append(index)
+
+        if not stale:
+            return geographic
+
+        leads = Lead.objects.select_related('group').in_bulk([rows[index]['id'] for index in stale])
+        by_group: Dict[Any, List[int]] = {}
+        for index in stale:
+            by_group.setdefault(rows[index]['group_id'], []).append(index)
+
+        for indices in by_group.values():
+            group_leads = [leads[rows[index]['id']] for index in indices]
+            try:
+                GeographicRescoringPipeline(group_leads[0].group).rescore(group_leads)
+            except Exception as e:
+                for index in indices:
+                    failed[index] = True
+                    rows[index]['error'] = str(e)
+                continue
+
+            for index, lead in zip(indices, group_leads):
+                geographic[index] = lead.geographic_score
+
+        return geographic
+
+    def _score_chunk(self, rows: List[Dict[str, Any]], weights: Dict[str, float],
+                     summary: Dict[str, Any]):
+        """Score and persist a single chunk of feature rows."""
+        failed = np.zeros(len(rows), dtype=bool)
+        geographic = self._geographic_column(rows, failed)
+        scores = self.weighted_scores(self.compute_components(rows, geographic), weights)
+
+        scored_at = timezone.now()
+        updates = []
+        activities = []
+
+        for index, row in enumerate(rows):
+            if failed[index]:
+                summary['processing_errors'].append({
+                    'lead_id': str(row['id']),
+                    'error': row['error']
+                })
+                logger.error(f"Error scoring lead {row['id']}: {row['error']}")
+                continue
+
+            new_score = float(scores[index])
+            previous_score = row['current_score']
+
+            updates.append(Lead(
+                id=row['id'],
+                current_score=new_score,
+                scoring_model=self.scoring_model,
+                last_scored_at=scored_at
+            ))
+            summary['score_changes'].append({
+                'lead_id': str(row['id']),
+                'company_name': row['company_name'],
+                'previous_score': previous_score,
+                'new_score': new_score,
+                'score_change': new_score - previous_score
+            })
+
+            if self.create_activities:
+                activities.append(self._build_activity(row, previous_score, new_score))
+
+        with transaction.atomic():
+            Lead.objects.bulk_update(
+                updates, ['current_score', 'scoring_model', 'last_scored_at'],
+                batch_size=self.chunk_size
+            )
+            if activities:
+                LeadActivity.objects.bulk_create(activities, batch_size=self.chunk_size)
+
+        summary['total_scored'] += len(updates)
+
+    def _build_activity(self, row: Dict[str, Any], previous_score: float,
+                        new_score: float) -> LeadActivity:
+        """Build the score-update activity for a lead without saving it."""
+        model = self.scoring_model
+        return LeadActivity(
+            group_id=row['group_id'],
+            lead_id=row['id'],
+            activity_type=LeadActivity.ActivityType.SCORE_UPDATE,
+            title=f"Lead score updated to {new_score:.1f}",
+            description=f"Score calculated using {model.name} v{model.version}",
+            performed_by=self.user,
+            is_automated=True,
+            activity_data={
+                'scoring_model_id': str(model.id),
+                'scoring_model_name': model.name,
+                'previous_score': previous_score,
+                'new_score': new_score,
+                'score_change': new_score - previous_score
+            }
+        )
@@ -0,0 +1,236 @@
+"""
+Geographic Rescoring Pipeline.
+
+Bulk replacement for calling ``Lead.update_geographic_scores`` per lead.
+Leads are clustered by location on the location-analysis cache grid, each
+distinct cluster is analysed once, member leads derive their scores from the
+shared analysis in memory, and results are written with ``bulk_update``.
+Progress is checkpointed after every chunk so an interrupted run resumes
+where it stopped.
+"""
+
+import hashlib
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+
+from accounts.models import Group
+from ..models import Lead
+
+logger = logging.getLogger(__name__)
+
+
+class GeographicRescoringPipeline:
+    """
+    Rescores lead geography in chunks with one analysis per location cluster.
+
+    Scores are derived with ``Lead.apply_geographic_analysis`` and fall back
+    to ``Lead._fallback_geographic_score`` exactly as the per-lead path does,
+    so both paths agree on every lead.
+    """
+
+    ANALYSIS_RADIUS_KM = 10.0
+    DEFAULT_CHUNK_SIZE = 1000
+
+    CHECKPOINT_PREFIX = "leads:geographic_rescore"
+    CHECKPOINT_TTL = 7 * 24 * 3600
+    STALE_RUN_KEY = "stale"
+
+    UPDATE_FIELDS = [
+        'headquarters_location', 'geographic_score', 'accessibility_score',
+        'university_proximity_score', 'market_demand_score', 'competition_score',
+        'geographic_analysis_date', 'target_neighborhood'
+    ]
+
+    def __init__(self, group: Group, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None):
+        from geographic_intelligence.services import GeographicIntelligenceService
+
+        self.group = group
+        self.chunk_size = max(int(chunk_size), 1)
+        self.progress_callback = progress_callback
+        self.geo_service = GeographicIntelligenceService(group=group)
+
+        # Per-run memo of cluster -> analysis (or the exception it raised)
+        self._cluster_analyses: Dict[Tuple[float, float], Any] = {}
+        self._neighborhood_ids: Optional[Dict[str, Any]] = None
+
+    # Running
+
+    def run(self, queryset: QuerySet, run_key: str = None, resume: bool = True) -> Dict[str, Any]:
+        """
+        Rescore every lead in ``queryset`` in primary-key chunks.
+
+        Args:
+            queryset: Leads to rescore
+            run_key: Identifies the run for checkpointing (see
+                ``run_key_for``); runs without one are not checkpointed
+            resume: Continue from the last checkpoint for this run, if any
+
+        Returns:
+            Summary with counts, errors, cluster statistics and timing
+        """
+        checkpoint_key = f"{self.CHECKPOINT_PREFIX}:{self.group.pk}:{run_key}" if run_key else None
+
+        summary = cache.get(checkpoint_key) if checkpoint_key and resume else None
+        if summary:
+            logger.info(
+                f"Resuming geographic rescore {run_key} after lead {summary['last_pk']} "
+                f"({summary['processed']} already processed)"
+            )
+            summary['resumed'] = True
+        else:
+            summary = {
+                'total_leads': queryset.count(),
+                'processed': 0,
+                'updated_leads': 0,
+                'skipped': 0,
+                'errors': [],
+                'clusters_analyzed': 0,
+                'chunks': 0,
+                'last_pk': None,
+                'resumed': False,
+            }
+
+        started = time.perf_counter()
+
+        while True:
+            page = queryset.order_by('pk')
+            if summary['last_pk'] is not None:
+                page = page.filter(pk__gt=summary['last_pk'])
+            leads = list(page[:self.chunk_size])
+            if not leads:
+                break
+
+            clusters_before = len(self._cluster_analyses)
+            rescored = self.rescore(leads, summary['errors'])
+            summary['processed'] += len(leads)
+            summary['updated_leads'] += len(rescored)
+            summary['skipped'] += len(leads) - len(rescored)
+            summary['chunks'] += 1
+            summary['last_pk'] = leads[-1].pk
+            summary['clusters_analyzed'] += len(self._cluster_analyses) - clusters_before
+
+            if checkpoint_key:
+                cache.set(checkpoint_key, summary, timeout=self.CHECKPOINT_TTL)
+            self._report_progress(summary, started)
+
+            if len(leads) < self.chunk_size:
+                break
+
+        if checkpoint_key:
+            cache.delete(checkpoint_key)
+        summary['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        return summary
+
+    @classmethod
+    def run_key_for(cls, lead_ids: Optional[List[Any]] = None) -> str:
+        """
+        Stable run identifier, so reruns pick up the run's checkpoint.
+
+        Explicit leads are keyed by their sorted ids. Without ids the run is
+        the group's refresh of stale leads, which has one fixed key: its
+        cutoff moves between attempts, but leads rescored before an
+        interruption are no longer stale, so resuming after ``last_pk``
+        still covers the rest.
+        """
+        if not lead_ids:
+            return cls.STALE_RUN_KEY
+        ids = ','.join(sorted({str(lead_id) for lead_id in lead_ids}))
+        return hashlib.md5(ids.encode()).hexdigest()
+
+    # Scoring
+
+    def rescore(self, leads: List[Lead], errors: List[Dict[str, Any]] = None) -> Dict[Any, float]:
+        """
+        Score ``leads`` in memory and persist the ones with a successful analysis.
+
+        Every lead gets a ``geographic_score`` set on the instance, including
+        the default and fallback scores the per-lead path would return.
+
+        Returns:
+            Mapping of lead pk to score for the leads that were persisted
+        """
+        errors = errors if errors is not None else []
+        scores = {}
+        updates = []
+
+        for lead in leads:
+            if not lead.headquarters_location:
+                coordinates = lead._get_coordinates_from_address()
+                if coordinates:
+                    lead.headquarters_location = Point(coordinates[1], coordinates[0], srid=4326)
+
+            if not lead.headquarters_location:
+                # Default geographic score for unknown locations
+                lead.geographic_score = 40.0
+                continue
+
+            analysis = self._analysis_for(lead.headquarters_location)
+            if isinstance(analysis, Exception):
+                lead.geographic_score = lead._fallback_geographic_score()
+                errors.append({
+                    'lead_id': str(lead.id),
+                    'company_name': lead.company_name,
+                    'error': str(analysis)
+                })
+                continue
+
+            lead.apply_geographic_analysis(analysis)
+
+            # Auto-assign target neighborhood if not set
+            neighborhoods = analysis.get('neighborhoods', {})
+            if not lead.target_neighborhood_id and neighborhoods.get('best_neighborhood'):
+                neighborhood_id = self._neighborhood_id(neighborhoods['neighborhoods'][0]['name'])
+                if neighborhood_id:
+                    lead.target_neighborhood_id = neighborhood_id
+
+            updates.append(lead)
+            scores[lead.pk] = lead.geographic_score
+
+        if updates:
+            with transaction.atomic():
+                Lead.objects.bulk_update(updates, self.UPDATE_FIELDS, batch_size=self.chunk_size)
+
+        return scores
+
+    def _cluster_key(self, location: Point) -> Tuple[float, float]:
+        """Grid cell of a location, shared with the location-analysis cache."""
+        return self.geo_service.cache.snap(location.y, location.x)
+
+    def _analysis_for(self, location: Point):
+        """Location analysis for the location's cluster, computed once per run."""
+        key = self._cluster_key(location)
+        if key not in self._cluster_analyses:
+            try:
+                self._cluster_analyses[key] = self.geo_service.analyze_location(
+                    lat=key[0], lng=key[1], radius_km=self.ANALYSIS_RADIUS_KM
+                )
+            except Exception as e:
+                logger.warning(f"Geographic analysis failed for cluster {key}: {str(e)}")
+                self._cluster_analyses[key] = e
+        return self._cluster_analyses[key]
+
+    def _neighborhood_id(self, name: str):
+        """Resolve a neighborhood name through a map loaded once per run."""
+        if self._neighborhood_ids is None:
+            from geographic_intelligence.models import Neighborhood
+
+            self._neighborhood_ids = dict(
+                Neighborhood.objects.filter(group=self.group).values_list('name', 'id')
+            )
+        return self._neighborhood_ids.get(name)
+
+    def _report_progress(self, summary: Dict[str, Any], started: float):
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Geographic rescore: {summary['processed']}/{summary['total_leads']} leads, "
+            f"{summary['clusters_analyzed']} clusters analysed, {elapsed:.1f}s"
+        )
+        if self.progress_callback:
+            self.progress_callback(dict(summary))
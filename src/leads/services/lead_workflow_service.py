@@ -5,12 +5,13 @@ Automated workflow management for lead progression, status updates,
 activity tracking, and conversion management.
 """
 
+import heapq
 import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.db import transaction
-from django.db.models import Q, Count, F
+from django.db.models import Q, Count, F, Exists, OuterRef
 from django.core.exceptions import ValidationError
 
 from assessments.services.base import BaseService
@@ -349,122 +350,111 @@ class LeadWorkflowService(BaseService):
         return results
     
     def _process_stale_leads(self) -> int:
-        """Process leads that have been inactive for too long."""
-        stale_threshold = timezone.now() - timedelta(days=30)
-        
+        """Move leads that have been inactive for too long to nurturing."""
+        now = timezone.now()
+        # Same rule as Lead.is_stale (more than 30 calendar days in the
+        # pipeline, no activity for 14 days), evaluated as one anti-join
+        stale_threshold = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
+        
+        recent_activity = LeadActivity.objects.filter(
+            lead=OuterRef('pk'),
+            created_at__gte=now - timedelta(days=14)
+        )
         stale_leads = Lead.objects.filter(
             group=self.group,
             status__in=[Lead.LeadStatus.NEW, Lead.LeadStatus.QUALIFIED, Lead.LeadStatus.CONTACTED],
             created_at__lt=stale_threshold
-        )
+        ).filter(~Exists(recent_activity))
         
-        # Filter to leads without recent activity
-        leads_to_update = []
-        for lead in stale_leads:
-            if lead.is_stale:
-                leads_to_update.append(lead)
-        
-        # Update to nurturing status
-        updated_count = 0
-        for lead in leads_to_update:
-            try:
-                lead.status = Lead.LeadStatus.NURTURING
-                lead.save()
-                
-                self._create_lead_activity(
-                    lead=lead,
+        with transaction.atomic():
+            lead_ids = list(stale_leads.select_for_update().values_list('id', flat=True))
+            if not lead_ids:
+                return 0
+            
+            Lead.objects.filter(id__in=lead_ids).update(
+                status=Lead.LeadStatus.NURTURING,
+                updated_at=now
+            )
+            LeadActivity.objects.bulk_create([
+                self._build_lead_activity(
+                    lead_id=lead_id,
                     activity_type=LeadActivity.ActivityType.SYSTEM_UPDATE,
                     title="Lead moved to nurturing",
                     description="Lead automatically moved to nurturing due to inactivity",
                     is_automated=True
                 )
-                
-                updated_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error updating stale lead {lead.id}: {str(e)}")
+                for lead_id in lead_ids
+            ])
         
-        return updated_count
+        return len(lead_ids)
     
     def _apply_score_based_updates(self) -> int:
         """Apply automatic status updates based on lead scores."""
-        updated_count = 0
-        
-        # Get leads that should be auto-qualified
         leads_to_qualify = Lead.objects.filter(
             group=self.group,
             status=Lead.LeadStatus.NEW,
             current_score__gte=70
         )
         
-        for lead in leads_to_qualify:
-            try:
-                lead.status = Lead.LeadStatus.QUALIFIED
-                lead.save()
-                
-                self._create_lead_activity(
-                    lead=lead,
+        with transaction.atomic():
+            qualifying = list(
+                leads_to_qualify.select_for_update().values_list('id', 'current_score')
+            )
+            if not qualifying:
+                return 0
+            
+            Lead.objects.filter(id__in=[lead_id for lead_id, _ in qualifying]).update(
+                status=Lead.LeadStatus.QUALIFIED,
+                updated_at=timezone.now()
+            )
+            LeadActivity.objects.bulk_create([
+                self._build_lead_activity(
+                    lead_id=lead_id,
                     activity_type=LeadActivity.ActivityType.STATUS_CHANGE,
                     title="Lead automatically qualified",
-                    description=f"Lead automatically qualified based on score: {lead.current_score}",
+                    description=f"Lead automatically qualified based on score: {current_score}",
                     is_automated=True,
-                    activity_data={'qualifying_score': lead.current_score}
+                    activity_data={'qualifying_score': current_score}
                 )
-                
-                updated_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error auto-qualifying lead {lead.id}: {str(e)}")
+                for lead_id, current_score in qualifying
+            ])
         
-        return updated_count
+        return len(qualifying)
     
     def _generate_follow_up_reminders(self) -> int:
         """Generate follow-up reminder activities."""
-        # Find leads that need follow-up
-        leads_needing_followup = Lead.objects.filter(
+        now = timezone.now()
+        
+        # Leads needing follow-up: no activity of any kind in the last 7 days
+        recent_activity = LeadActivity.objects.filter(
+            lead=OuterRef('pk'),
+            created_at__gte=now - timedelta(days=7)
+        )
+        lead_ids = list(Lead.objects.filter(
             group=self.group,
             status__in=[Lead.LeadStatus.CONTACTED, Lead.LeadStatus.MEETING_SCHEDULED],
             assigned_to__isnull=False
-        )
+        ).filter(~Exists(recent_activity)).values_list('id', flat=True))
         
-        reminder_count = 0
+        LeadActivity.objects.bulk_create([
+            self._build_lead_activity(
+                lead_id=lead_id,
+                activity_type=LeadActivity.ActivityType.FOLLOW_UP,
+                title="Follow-up reminder",
+                description="Automated reminder to follow up with lead",
+                next_action="Follow up with lead",
+                next_action_date=now + timedelta(days=1),
+                is_automated=True
+            )
+            for lead_id in lead_ids
+        ])
         
-        for lead in leads_needing_followup:
-            try:
-                # Check if there's been any activity in the last 7 days
-                recent_activity = LeadActivity.objects.filter(
-                    lead=lead,
-                    created_at__gte=timezone.now() - timedelta(days=7)
-                ).exists()
-                
-                if not recent_activity:
-                    # Create follow-up reminder
-                    self._create_lead_activity(
-                        lead=lead,
-                        activity_type=LeadActivity.ActivityType.FOLLOW_UP,
-                        title="Follow-up reminder",
-                        description="Automated reminder to follow up with lead",
-                        next_action="Follow up with lead",
-                        next_action_date=timezone.now() + timedelta(days=1),
-                        is_automated=True
-                    )
-                    
-                    reminder_count += 1
-                    
-            except Exception as e:
-                logger.error(f"Error creating follow-up reminder for lead {lead.id}: {str(e)}")
-        
-        return reminder_count
+        return len(lead_ids)
     
     def _apply_automatic_assignments(self) -> int:
         """Apply automatic lead assignments based on rules."""
-        # Get unassigned high-scoring leads
-        unassigned_leads = Lead.objects.filter(
-            group=self.group,
-            assigned_to__isnull=True,
-            current_score__gte=80,
-            status__in=[Lead.LeadStatus.NEW, Lead.LeadStatus.QUALIFIED]
-        )
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
         
         # This would implement assignment rules based on:
         # - User workload
@@ -472,42 +462,56 @@ class LeadWorkflowService(BaseService):
         # - Specialization
         # For now, just assign to users with lowest workload
         
-        assignment_count = 0
-        
-        for lead in unassigned_leads:
-            try:
-                # Find user with lowest lead count
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-                
-                available_users = User.objects.filter(
-                    groups=self.group,
-                    role__in=[User.Role.BUSINESS_ANALYST, User.Role.PORTFOLIO_MANAGER]
-                ).annotate(
-                    lead_count=Count('assigned_leads')
-                ).order_by('lead_count')
+        # Workloads are read once and kept in a min-heap; each assignment
+        # pops the least-loaded user and pushes them back with one more lead.
+        # The position breaks ties in the same order as the query.
+        available_users = User.objects.filter(
+            groups=self.group,
+            role__in=[User.Role.BUSINESS_ANALYST, User.Role.PORTFOLIO_MANAGER]
+        ).annotate(
+            lead_count=Count('assigned_leads')
+        ).order_by('lead_count', 'pk')
+        
+        workloads = [
+            (user.lead_count, position, user)
+            for position, user in enumerate(available_users)
+        ]
+        if not workloads:
+            return 0
+        heapq.heapify(workloads)
+        
+        with transaction.atomic():
+            # Highest-scoring leads are assigned first (Lead default ordering)
+            unassigned_leads = list(Lead.objects.filter(
+                group=self.group,
+                assigned_to__isnull=True,
+                current_score__gte=80,
+                status__in=[Lead.LeadStatus.NEW, Lead.LeadStatus.QUALIFIED]
+            ).select_for_update().only('id', 'current_score', 'assigned_to'))
+            if not unassigned_leads:
+                return 0
+            
+            now = timezone.now()
+            activities = []
+            for lead in unassigned_leads:
+                lead_count, position, assigned_user = heapq.heappop(workloads)
+                lead.assigned_to = assigned_user
+                lead.updated_at = now
+                heapq.heappush(workloads, (lead_count + 1, position, assigned_user))
                 
-                if available_users.exists():
-                    assigned_user = available_users.first()
-                    
-                    lead.assigned_to = assigned_user
-                    lead.save()
-                    
-                    self._create_lead_activity(
-                        lead=lead,
-                        activity_type=LeadActivity.ActivityType.SYSTEM_UPDATE,
-                        title=f"Lead automatically assigned to {assigned_user.get_full_name()}",
-                        description=f"High-scoring lead automatically assigned based on workload balancing",
-                        is_automated=True,
-                        activity_data={'assignment_score': lead.current_score}
-                    )
-                    
-                    assignment_count += 1
-                    
-            except Exception as e:
-                logger.error(f"Error auto-assigning lead {lead.id}: {str(e)}")
-        
-        return assignment_count
+                activities.append(self._build_lead_activity(
+                    lead_id=lead.id,
+                    activity_type=LeadActivity.ActivityType.SYSTEM_UPDATE,
+                    title=f"Lead automatically assigned to {assigned_user.get_full_name()}",
+                    description=f"High-scoring lead automatically assigned based on workload balancing",
+                    is_automated=True,
+                    activity_data={'assignment_score': lead.current_score}
+                ))
+            
+            Lead.objects.bulk_update(unassigned_leads, ['assigned_to', 'updated_at'])
+            LeadActivity.objects.bulk_create(activities)
+        
+        return len(unassigned_leads)
     
     # Workflow Analytics
     
@@ -733,6 +737,12 @@ class LeadWorkflowService(BaseService):
     
     def _create_lead_activity(self, lead: Lead, **activity_data) -> LeadActivity:
         """Helper method to create lead activity with proper defaults."""
+        activity = self._build_lead_activity(lead=lead, **activity_data)
+        activity.save()
+        return activity
+    
+    def _build_lead_activity(self, **activity_data) -> LeadActivity:
+        """Build an unsaved lead activity with proper defaults, e.g. for bulk_create."""
         defaults = {
             'group': self.group,
             'performed_by': self.user,
@@ -742,6 +752,4 @@ class LeadWorkflowService(BaseService):
         }
         
         # Merge provided data with defaults
-        activity_data = {**defaults, **activity_data}
-        
-        return LeadActivity.objects.create(lead=lead, **activity_data)
\ No newline at end of file
+        return LeadActivity(**{**defaults, **activity_data})
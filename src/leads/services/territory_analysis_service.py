@@ -6,18 +6,21 @@ geographic intelligence, workload balancing, and performance analytics.
 """
 
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Tuple
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.db import transaction
 from django.db.models import Q, Avg, Count, F, Max, Min, Sum, Case, When, IntegerField
 from django.core.exceptions import ValidationError
+from django.contrib.gis.db.models.aggregates import Collect
+from django.contrib.gis.db.models.functions import Centroid
 from django.contrib.gis.geos import Point, Polygon
 from django.contrib.gis.measure import Distance
 from django.contrib.auth import get_user_model
 
 from assessments.services.base import BaseService
 from ..models import Lead, LeadScoringModel, LeadActivity
+from .assignment_engine import LeadAssignmentEngine
 from geographic_intelligence.models import Neighborhood, University, PointOfInterest
 from geographic_intelligence.services import GeographicIntelligenceService
 
@@ -97,8 +100,8 @@ class TerritoryAnalysisService(BaseService):
                 geographic_analysis_date__isnull=False
             ).select_related('target_neighborhood')
             
-            # Get available team members
-            team_members = self._get_available_team_members()
+            # Get available team members (current workloads are read once here)
+            team_members = list(self._get_available_team_members())
             
             if not team_members:
                 return {
@@ -107,7 +110,7 @@ class TerritoryAnalysisService(BaseService):
                 }
             
             # Calculate optimal assignments
-            assignments = self._calculate_optimal_assignments(
+            assignments, capacity_limited = self._calculate_optimal_assignments(
                 unassigned_leads, team_members, criteria
             )
             
@@ -120,6 +123,7 @@ class TerritoryAnalysisService(BaseService):
             return {
                 'unassigned_leads': unassigned_leads.count(),
                 'available_team_members': len(team_members),
+                'capacity_limited_leads': len(capacity_limited),
                 'optimization_criteria': criteria,
                 'recommended_assignments': recommendations,
                 'assignment_impact': impact_analysis,
@@ -461,64 +465,90 @@ class TerritoryAnalysisService(BaseService):
             current_lead_count=Count('assigned_leads', filter=Q(assigned_leads__group=self.group))
         ).order_by('current_lead_count')
     
-    def _calculate_optimal_assignments(self, leads, team_members, criteria) -> List[Dict[str, Any]]:
-        """Calculate optimal lead assignments."""
+    def _calculate_optimal_assignments(self, leads, team_members, criteria) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Calculate optimal lead assignments with ``LeadAssignmentEngine``.
+        
+        Supported criteria:
+            max_leads_per_member: Capacity cap applied to every member
+            member_capacity: Per-member caps keyed by user id
+            member_locations: (lat, lng) per user id, overriding the centroid
+                of the member's current leads
+            proximity_radius_km: Distance at which the proximity term reaches zero
+        
+        Returns:
+            (assignments, leads left unassigned because every member is at capacity)
+        """
+        member_capacity = {str(k): v for k, v in (criteria.get('member_capacity') or {}).items()}
+        locations = self._get_member_locations(team_members)
+        locations.update({
+            str(user_id): tuple(location)
+            for user_id, location in (criteria.get('member_locations') or {}).items()
+        })
+        
+        members_by_id = {str(member.id): member for member in team_members}
+        engine = LeadAssignmentEngine(
+            [
+                {
+                    'id': member_id,
+                    'load': getattr(member, 'current_lead_count', 0),
+                    'capacity': member_capacity.get(member_id),
+                    'lat': locations.get(member_id, (None, None))[0],
+                    'lng': locations.get(member_id, (None, None))[1],
+                }
+                for member_id, member in members_by_id.items()
+            ],
+            proximity_radius_km=criteria.get('proximity_radius_km'),
+            default_capacity=criteria.get('max_leads_per_member')
+        )
+        
+        # Highest-value leads get first pick of members
+        lead_rows = leads.order_by('-current_score', 'pk').values_list(
+            'id', 'company_name', 'current_score', 'headquarters_location'
+        )
+        engine_leads = []
+        company_names = {}
+        for lead_id, company_name, current_score, location in lead_rows:
+            company_names[str(lead_id)] = company_name
+            engine_leads.append({
+                'id': str(lead_id),
+                'score': current_score,
+                'lat': location.y if location else None,
+                'lng': location.x if location else None,
+            })
+        
+        matches, unassigned = engine.assign(engine_leads)
+        
         assignments = []
+        for match in matches:
+            user = members_by_id[match['member_id']]
+            assignments.append({
+                'lead_id': match['lead_id'],
+                'company_name': company_names[match['lead_id']],
+                'assigned_to_id': match['member_id'],
+                'assigned_to_name': user.get_full_name() or user.username,
+                'match_score': match['match_score'],
+                'distance_km': match['distance_km'],
+                'reason': '; '.join(match['reasons'])
+            })
         
-        for lead in leads:
-            best_match = self._find_best_team_member_match(lead, team_members, criteria)
-            if best_match:
-                assignments.append({
-                    'lead_id': str(lead.id),
-                    'company_name': lead.company_name,
-                    'assigned_to_id': str(best_match['user'].id),
-                    'assigned_to_name': best_match['user'].get_full_name() or best_match['user'].username,
-                    'match_score': best_match['score'],
-                    'reason': best_match['reason']
-                })
-        
-        return assignments
+        return assignments, unassigned
     
-    def _find_best_team_member_match(self, lead, team_members, criteria) -> Optional[Dict[str, Any]]:
-        """Find the best team member match for a lead."""
-        best_match = None
-        best_score = 0
+    def _get_member_locations(self, team_members) -> Dict[str, Tuple[float, float]]:
+        """Centroid of each member's current leads in the group, as (lat, lng)."""
+        centroids = Lead.objects.filter(
+            group=self.group,
+            assigned_to__in=team_members,
+            headquarters_location__isnull=False
+        ).order_by().values('assigned_to').annotate(
+            centroid=Centroid(Collect('headquarters_location'))
+        ).values_list('assigned_to', 'centroid')
         
-        for member in team_members:
-            # Calculate match score
-            match_score = 0
-            reasons = []
-            
-            # Geographic proximity (if lead has location)
-            if lead.headquarters_location and hasattr(member, 'geographic_focus'):
-                # This would calculate geographic proximity
-                match_score += 20
-                reasons.append("Geographic proximity")
-            
-            # Workload balance
-            current_leads = getattr(member, 'current_lead_count', 0)
-            if current_leads < 10:  # Arbitrary threshold
-                match_score += 30
-                reasons.append("Balanced workload")
-            
-            # Experience/expertise (placeholder)
-            match_score += 25
-            reasons.append("Team member availability")
-            
-            # Lead complexity matching
-            if lead.current_score >= 80:  # High-value lead
-                match_score += 25
-                reasons.append("High-value lead match")
-            
-            if match_score > best_score:
-                best_score = match_score
-                best_match = {
-                    'user': member,
-                    'score': match_score,
-                    'reason': '; '.join(reasons)
-                }
-        
-        return best_match
+        return {
+            str(user_id): (centroid.y, centroid.x)
+            for user_id, centroid in centroids
+            if centroid is not None
+        }
     
     def _generate_assignment_recommendations(self, assignments) -> List[Dict[str, Any]]:
         """Generate assignment recommendations with reasoning."""
@@ -0,0 +1,153 @@
+"""
+Tests for the heap-based lead assignment engine and its use in
+TerritoryAnalysisService.
+"""
+
+import random
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from ..models import Lead
+from ..services.assignment_engine import LeadAssignmentEngine
+from ..services.territory_analysis_service import TerritoryAnalysisService
+from .factories import LeadFactory, UserFactory, TestDataMixin
+
+LONDON = (51.5074, -0.1278)
+LEEDS = (53.8008, -1.5491)
+
+
+class LeadAssignmentEngineTest(SimpleTestCase):
+    """Test assignment rules of LeadAssignmentEngine."""
+    
+    def _leads(self, count, location=(None, None), score=50.0):
+        return [
+            {'id': f"lead-{index}", 'score': score, 'lat': location[0], 'lng': location[1]}
+            for index in range(count)
+        ]
+    
+    def test_loads_update_as_leads_are_assigned(self):
+        """Leads spread across members instead of piling onto one."""
+        engine = LeadAssignmentEngine([
+            {'id': 'a', 'load': 0},
+            {'id': 'b', 'load': 3},
+            {'id': 'c', 'load': 5},
+        ])
+        assignments, unassigned = engine.assign(self._leads(12))
+        
+        self.assertEqual(unassigned, [])
+        self.assertEqual(engine.loads, [7, 7, 6])
+        self.assertEqual([a['member_id'] for a in assignments[:3]], ['a', 'a', 'a'])
+    
+    def test_capacity_caps(self):
+        """Members stop receiving leads at their cap; surplus leads are returned."""
+        engine = LeadAssignmentEngine(
+            [{'id': 'a', 'load': 0, 'capacity': 2}, {'id': 'b', 'load': 1}],
+            default_capacity=3
+        )
+        assignments, unassigned = engine.assign(self._leads(6))
+        
+        self.assertEqual(len(assignments), 4)
+        self.assertEqual(len(unassigned), 2)
+        self.assertEqual(engine.loads, [2, 3])
+    
+    def test_proximity_outweighs_small_load_difference(self):
+        """A nearby member wins over a slightly less loaded distant one."""
+        engine = LeadAssignmentEngine([
+            {'id': 'london', 'load': 4, 'lat': LONDON[0], 'lng': LONDON[1]},
+            {'id': 'leeds', 'load': 2, 'lat': LEEDS[0], 'lng': LEEDS[1]},
+        ])
+        assignments, _ = engine.assign(self._leads(1, location=(51.52, -0.10), score=90.0))
+        
+        self.assertEqual(assignments[0]['member_id'], 'london')
+        self.assertLess(assignments[0]['distance_km'], 5)
+        self.assertIn("High-value lead match", assignments[0]['reasons'])
+    
+    def test_matches_exhaustive_scan(self):
+        """Pruned heap search picks the same members as scoring every pair."""
+        rng = random.Random(7)
+        members = [
+            {'id': index, 'load': rng.randint(0, 20),
+             'lat': rng.uniform(50.5, 55.5), 'lng': rng.uniform(-3.5, 0.5)}
+            for index in range(15)
+        ]
+        leads = [
+            {'id': index, 'score': 50.0, 'lat': rng.uniform(50.5, 55.5), 'lng': rng.uniform(-3.5, 0.5)}
+            for index in range(300)
+        ]
+        
+        engine = LeadAssignmentEngine(members)
+        assignments, _ = engine.assign(leads)
+        
+        reference = LeadAssignmentEngine(members)
+        for lead, assignment in zip(leads, assignments):
+            scores = [
+                (reference.workload_score(reference.loads[index])
+                 + reference._proximity_score(
+                     reference._distance_km(reference._lead_coords(lead), index)
+                 ), -index)
+                for index in range(len(members))
+            ]
+            best = -max(scores)[1]
+            reference.loads[best] += 1
+            self.assertEqual(assignment['member_id'], members[best]['id'])
+
+
+class LeadAssignmentEngineCapacityTest(SimpleTestCase):
+    """Test assignment of thousands of leads across dozens of members."""
+    
+    def test_thousands_of_leads_respect_capacity(self):
+        rng = random.Random(1)
+        members = [
+            {'id': index, 'load': rng.randint(0, 30),
+             'lat': rng.uniform(50.0, 56.0), 'lng': rng.uniform(-4.0, 1.0)}
+            for index in range(40)
+        ]
+        leads = [
+            {'id': index, 'score': rng.uniform(0, 100),
+             'lat': rng.uniform(50.0, 56.0), 'lng': rng.uniform(-4.0, 1.0)}
+            for index in range(3000)
+        ]
+        
+        engine = LeadAssignmentEngine(members, default_capacity=150)
+        assignments, unassigned = engine.assign(leads)
+        
+        self.assertEqual(len(assignments) + len(unassigned), len(leads))
+        self.assertLessEqual(max(engine.loads), 150)
+
+
+class OptimizeLeadAssignmentsTest(TestCase, TestDataMixin):
+    """Test TerritoryAnalysisService assignment optimization end to end."""
+    
+    def setUp(self):
+        super().setUp()
+        self.service = TerritoryAnalysisService(user=self.admin_user, group=self.group1)
+        self.london_rep = UserFactory.create()
+        self.leeds_rep = UserFactory.create()
+        for user, location in ((self.london_rep, LONDON), (self.leeds_rep, LEEDS)):
+            user.groups.add(self.group1)
+            self._create_lead(location, assigned_to=user)
+    
+    def _create_lead(self, location, **kwargs):
+        return LeadFactory.create(
+            group=self.group1,
+            headquarters_location=Point(location[1], location[0], srid=4326),
+            geographic_analysis_date=timezone.now(),
+            **kwargs
+        )
+    
+    def test_leads_go_to_nearest_territory(self):
+        """Member territories come from the centroid of their current leads."""
+        london_lead = self._create_lead((51.50, -0.12), assigned_to=None)
+        leeds_lead = self._create_lead((53.79, -1.55), assigned_to=None)
+        
+        team_members = list(self.service._get_available_team_members())
+        assignments, unassigned = self.service._calculate_optimal_assignments(
+            Lead.objects.filter(pk__in=[london_lead.pk, leeds_lead.pk]), team_members, {}
+        )
+        
+        by_lead = {a['lead_id']: a['assigned_to_id'] for a in assignments}
+        self.assertEqual(unassigned, [])
+        self.assertEqual(by_lead[str(london_lead.pk)], str(self.london_rep.pk))
+        self.assertEqual(by_lead[str(leeds_lead.pk)], str(self.leeds_rep.pk))
@@ -0,0 +1,152 @@
+"""
+Tests for the bulk geographic rescoring pipeline.
+
+Verifies that clustered rescoring matches ``Lead.update_geographic_scores``,
+analyses each location cluster once and resumes from its checkpoint.
+"""
+
+from unittest import mock
+
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from geographic_intelligence.cache import location_analysis_cache
+from geographic_intelligence.models import PointOfInterest, POIType, University
+from ..models import Lead
+from ..services import LeadScoringService, GeographicRescoringPipeline
+from .factories import LeadFactory, TestDataMixin
+
+
+class GeographicRescoringPipelineTest(TestCase, TestDataMixin):
+    """Test GeographicRescoringPipeline parity, clustering and resumability."""
+    
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        location_analysis_cache.clear()
+        self.service = LeadScoringService(user=self.admin_user, group=self.group1)
+        
+        campus = PointOfInterest.objects.create(
+            group=self.group1,
+            name="UCL Main Campus",
+            address="Gower Street, London",
+            location=Point(-0.1340, 51.5246, srid=4326),
+            poi_type=POIType.UNIVERSITY
+        )
+        University.objects.create(
+            group=self.group1,
+            name="University College London",
+            total_students=42000,
+            international_students=15000,
+            main_campus=campus,
+            website="https://www.ucl.ac.uk"
+        )
+        
+        # Four leads at central London, two in Leeds
+        coordinates = [(51.5074, -0.1278)] * 4 + [(53.8008, -1.5491)] * 2
+        self.leads = [
+            LeadFactory.create(
+                group=self.group1,
+                headquarters_location=Point(lng, lat, srid=4326),
+                headquarters_country='GB',
+                geographic_analysis_date=None
+            )
+            for lat, lng in coordinates
+        ]
+    
+    def tearDown(self):
+        location_analysis_cache.clear()
+    
+    def test_bulk_scores_match_per_lead_path(self):
+        """Pipeline scores equal the per-lead update_geographic_scores result."""
+        expected = {lead.pk: Lead.objects.get(pk=lead.pk).update_geographic_scores()
+                    for lead in self.leads}
+        Lead.objects.filter(pk__in=expected).update(geographic_score=0, geographic_analysis_date=None)
+        
+        summary = GeographicRescoringPipeline(self.group1).run(
+            Lead.objects.filter(pk__in=expected)
+        )
+        
+        self.assertEqual(summary['updated_leads'], len(self.leads))
+        actual = dict(Lead.objects.filter(pk__in=expected).values_list('pk', 'geographic_score'))
+        self.assertEqual(actual, expected)
+        self.assertFalse(
+            Lead.objects.filter(pk__in=expected, geographic_analysis_date__isnull=True).exists()
+        )
+    
+    def test_each_cluster_analysed_once(self):
+        """Leads sharing coordinates share one location analysis."""
+        pipeline = GeographicRescoringPipeline(self.group1)
+        
+        with mock.patch.object(
+            pipeline.geo_service, 'analyze_location', wraps=pipeline.geo_service.analyze_location
+        ) as analyze:
+            summary = pipeline.run(Lead.objects.filter(group=self.group1))
+        
+        self.assertEqual(analyze.call_count, 2)
+        self.assertEqual(summary['clusters_analyzed'], 2)
+        self.assertEqual(summary['processed'], len(self.leads))
+    
+    def test_interrupted_refresh_resumes_from_checkpoint(self):
+        """A refresh that dies after one chunk continues from the next lead."""
+        lead_ids = [str(lead.pk) for lead in self.leads]
+        
+        def crash_after_first_chunk(progress):
+            raise RuntimeError("worker killed")
+        
+        with self.assertRaises(ValidationError):
+            self.service.refresh_geographic_scores(
+                lead_ids=lead_ids, bulk=True, chunk_size=2,
+                progress_callback=crash_after_first_chunk
+            )
+        self.assertEqual(
+            Lead.objects.filter(pk__in=lead_ids, geographic_analysis_date__isnull=False).count(), 2
+        )
+        
+        progress = []
+        summary = self.service.refresh_geographic_scores(
+            lead_ids=lead_ids, bulk=True, chunk_size=2, progress_callback=progress.append
+        )
+        
+        self.assertTrue(summary['resumed'])
+        self.assertEqual(summary['processed'], len(self.leads))
+        self.assertEqual(summary['chunks'], 3)
+        self.assertEqual([p['processed'] for p in progress], [4, 6])
+        self.assertFalse(
+            Lead.objects.filter(pk__in=lead_ids, geographic_analysis_date__isnull=True).exists()
+        )
+    
+    def test_interrupted_stale_refresh_resumes_from_checkpoint(self):
+        """The default stale-lead refresh keeps one run key across attempts."""
+        def crash_after_first_chunk(progress):
+            raise RuntimeError("worker killed")
+        
+        with self.assertRaises(ValidationError):
+            self.service.refresh_geographic_scores(
+                bulk=True, chunk_size=2, progress_callback=crash_after_first_chunk
+            )
+        
+        summary = self.service.refresh_geographic_scores(bulk=True, chunk_size=2)
+        
+        self.assertTrue(summary['resumed'])
+        self.assertEqual(summary['processed'], summary['total_leads'])
+        self.assertFalse(
+            Lead.objects.filter(
+                pk__in=[lead.pk for lead in self.leads], geographic_analysis_date__isnull=True
+            ).exists()
+        )
+    
+    def test_run_key_depends_only_on_lead_ids(self):
+        """Run keys ignore id order and fall back to the fixed stale key."""
+        lead_ids = [str(lead.pk) for lead in self.leads]
+        
+        self.assertEqual(
+            GeographicRescoringPipeline.run_key_for(lead_ids),
+            GeographicRescoringPipeline.run_key_for(list(reversed(lead_ids)))
+        )
+        self.assertEqual(
+            GeographicRescoringPipeline.run_key_for(),
+            GeographicRescoringPipeline.STALE_RUN_KEY
+        )
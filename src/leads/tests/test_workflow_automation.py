@@ -0,0 +1,144 @@
+"""
+Tests for set-based automated lead workflows.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Lead, LeadActivity
+from ..services import LeadWorkflowService
+from .factories import LeadFactory, UserFactory, TestDataMixin
+
+User = get_user_model()
+
+
+class AutomatedWorkflowTest(TestCase, TestDataMixin):
+    """Test LeadWorkflowService automated workflow steps."""
+    
+    def setUp(self):
+        super().setUp()
+        self.service = LeadWorkflowService(user=self.admin_user, group=self.group1)
+    
+    def _create_lead(self, status, days_old=0, **kwargs):
+        lead = LeadFactory.create(group=self.group1, **kwargs)
+        Lead.objects.filter(pk=lead.pk).update(
+            status=status,
+            created_at=timezone.now() - timedelta(days=days_old)
+        )
+        lead.refresh_from_db()
+        return lead
+    
+    def _log_activity(self, lead):
+        return self.service._create_lead_activity(
+            lead=lead,
+            activity_type=LeadActivity.ActivityType.NOTE,
+            title="Call notes"
+        )
+    
+    def test_stale_leads_moved_to_nurturing_in_bulk(self):
+        """Inactive leads move to nurturing with a fixed number of queries."""
+        stale = [self._create_lead(Lead.LeadStatus.NEW, days_old=40) for _ in range(5)]
+        active = self._create_lead(Lead.LeadStatus.NEW, days_old=40)
+        self._log_activity(active)
+        young = self._create_lead(Lead.LeadStatus.NEW, days_old=5)
+        
+        # Savepoint, locked id select, status update, activity insert, release
+        with self.assertNumQueries(5):
+            updated = self.service._process_stale_leads()
+        
+        self.assertEqual(updated, len(stale))
+        self.assertEqual(
+            Lead.objects.filter(status=Lead.LeadStatus.NURTURING).count(), len(stale)
+        )
+        for lead in (active, young):
+            lead.refresh_from_db()
+            self.assertEqual(lead.status, Lead.LeadStatus.NEW)
+        self.assertEqual(
+            LeadActivity.objects.filter(
+                lead__in=stale,
+                activity_type=LeadActivity.ActivityType.SYSTEM_UPDATE,
+                is_automated=True
+            ).count(),
+            len(stale)
+        )
+    
+    def test_stale_cutoff_matches_is_stale(self):
+        """Leads are stale after more than 30 calendar days, like Lead.is_stale."""
+        day_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        leads = {}
+        for name, created_at in [
+            ('day_31', day_start - timedelta(days=30, seconds=1)),
+            ('day_30', day_start - timedelta(days=30) + timedelta(seconds=1)),
+        ]:
+            leads[name] = self._create_lead(Lead.LeadStatus.NEW)
+            Lead.objects.filter(pk=leads[name].pk).update(created_at=created_at)
+            leads[name].refresh_from_db()
+        
+        self.assertEqual({name: lead.is_stale for name, lead in leads.items()},
+                         {'day_31': True, 'day_30': False})
+        
+        self.assertEqual(self.service._process_stale_leads(), 1)
+        
+        leads['day_31'].refresh_from_db()
+        leads['day_30'].refresh_from_db()
+        self.assertEqual(leads['day_31'].status, Lead.LeadStatus.NURTURING)
+        self.assertEqual(leads['day_30'].status, Lead.LeadStatus.NEW)
+    
+    def test_score_based_qualification(self):
+        """New leads scoring 70+ are qualified with the score recorded."""
+        high = self._create_lead(Lead.LeadStatus.NEW, current_score=82.5)
+        low = self._create_lead(Lead.LeadStatus.NEW, current_score=40.0)
+        
+        self.assertEqual(self.service._apply_score_based_updates(), 1)
+        
+        high.refresh_from_db()
+        low.refresh_from_db()
+        self.assertEqual(high.status, Lead.LeadStatus.QUALIFIED)
+        self.assertEqual(low.status, Lead.LeadStatus.NEW)
+        activity = high.activities.get(activity_type=LeadActivity.ActivityType.STATUS_CHANGE)
+        self.assertEqual(activity.activity_data, {'qualifying_score': 82.5})
+    
+    def test_follow_up_reminders_only_for_quiet_leads(self):
+        """Reminders go to assigned, contacted leads with no activity in 7 days."""
+        quiet = self._create_lead(Lead.LeadStatus.CONTACTED)
+        recent = self._create_lead(Lead.LeadStatus.MEETING_SCHEDULED)
+        self._log_activity(recent)
+        self._create_lead(Lead.LeadStatus.CONTACTED, assigned_to=None)
+        
+        # One anti-join select and one bulk insert
+        with self.assertNumQueries(2):
+            reminders = self.service._generate_follow_up_reminders()
+        
+        self.assertEqual(reminders, 1)
+        reminder = LeadActivity.objects.get(activity_type=LeadActivity.ActivityType.FOLLOW_UP)
+        self.assertEqual(reminder.lead_id, quiet.pk)
+        self.assertIsNotNone(reminder.next_action_date)
+    
+    def test_assignments_balance_workload(self):
+        """Unassigned leads go to the least-loaded user, re-balanced after each one."""
+        idle = UserFactory.create(role=User.Role.BUSINESS_ANALYST)
+        busy = UserFactory.create(role=User.Role.PORTFOLIO_MANAGER)
+        for user in (idle, busy):
+            user.groups.add(self.group1)
+        for _ in range(2):
+            self._create_lead(Lead.LeadStatus.CONTACTED, assigned_to=busy)
+        
+        leads = [
+            self._create_lead(Lead.LeadStatus.QUALIFIED, current_score=95.0 - index, assigned_to=None)
+            for index in range(3)
+        ]
+        
+        self.assertEqual(self.service._apply_automatic_assignments(), 3)
+        
+        assignees = [Lead.objects.get(pk=lead.pk).assigned_to_id for lead in leads]
+        # idle takes two leads to catch up, then wins the tie on query order
+        self.assertEqual(assignees, [idle.pk, idle.pk, idle.pk])
+        self.assertEqual(
+            LeadActivity.objects.filter(
+                lead__in=leads, activity_type=LeadActivity.ActivityType.SYSTEM_UPDATE
+            ).count(),
+            3
+        )